@@ -9,14 +9,12 @@ from functools import lru_cache
 from typing import Any, Iterable, Mapping, MutableMapping, Sequence
 from zoneinfo import ZoneInfo
 
+from cloud_clients import shared_client
 from google_credentials import get_service_account_credentials
+from utils.lazy_import import lazy_module
 
-try:  # pragma: no cover - optional dependency checked at runtime
-    from google.cloud import firestore  # type: ignore
-    from google.cloud.firestore_v1 import FieldFilter  # type: ignore[attr-defined]
-except Exception:  # pragma: no cover - gracefully handle missing package
-    firestore = None  # type: ignore
-    FieldFilter = None  # type: ignore
+firestore = lazy_module("google.cloud.firestore")
+FieldFilter = lazy_module("google.cloud.firestore_v1.FieldFilter")
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -56,7 +54,7 @@ class ActivityLogEntry:
 
 
 def _ensure_firestore_ready() -> None:
-    if firestore is None:
+    if not firestore:
         raise RuntimeError("google-cloud-firestore must be installed for activity logging")
 
     if GCP_PROJECT_ID:
@@ -84,7 +82,7 @@ def _get_firestore_client():
         credentials_project = getattr(credentials, "project_id", "") if credentials else ""
         if credentials_project:
             client_kwargs["project"] = credentials_project
-    return firestore.Client(**client_kwargs)  # type: ignore[arg-type]
+    return shared_client("firestore", firestore.Client, user=__name__, **client_kwargs)
 
 
 def _get_activity_collection():
@@ -121,6 +119,14 @@ def init_activity_log() -> None:
     _LOGGER.debug("Activity logging enabled using Firestore collection '%s'", ACTIVITY_LOG_COLLECTION)
 
 
+def warm_up_activity_log() -> None:
+    """Initialise activity logging and raise when an enabled backend is unreachable."""
+
+    init_activity_log()
+    if ACTIVITY_LOG_ENABLED and not _ACTIVITY_LOG_ACTIVE:
+        raise RuntimeError(_ACTIVITY_DISABLE_REASON or "activity logging is unavailable")
+
+
 def is_activity_logging_enabled() -> bool:
     return _ACTIVITY_LOG_ACTIVE
 
@@ -282,7 +288,7 @@ def _apply_in_filter(query: Any, field: str, values: Iterable[str]) -> Any:
 
 
 def _apply_where(query: Any, field: str, operator: str, value: Any) -> Any:
-    if FieldFilter is not None:
+    if FieldFilter:
         try:
             return query.where(filter=FieldFilter(field, operator, value))
         except Exception:  # pragma: no cover - fall back for unsupported ops
@@ -370,5 +376,6 @@ __all__ = [
     "get_activity_logging_status",
     "init_activity_log",
     "is_activity_logging_enabled",
+    "warm_up_activity_log",
     "log_event",
 ]
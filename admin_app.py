@@ -18,7 +18,7 @@ if ENV_PATH.is_file():
     load_dotenv(ENV_PATH, override=False)
 
 
-from activity_log import init_activity_log, is_activity_logging_enabled, log_event
+from activity_log import is_activity_logging_enabled, log_event, warm_up_activity_log
 from admin_tool.auth import (
     admin_display_name,
     admin_email,
@@ -28,13 +28,14 @@ from admin_tool.auth import (
     store_admin_session,
 )
 from firebase_auth import FirebaseAuthError, sign_in, verify_id_token
+from services.process_init import ensure_initialized
 from utils.network import get_client_ip
 
-from admin_ui import announcements, dashboard, explorer, moderation, exports
+from admin_ui import announcements, dashboard, explorer, moderation, exports, runtime
 
 
 st.set_page_config(page_title="운영자 콘솔", page_icon="🛡️", layout="wide")
-init_activity_log()
+ensure_initialized("activity_log", warm_up_activity_log)
 
 NAV_KEY = "admin_nav_selection"
 
@@ -207,6 +208,7 @@ def _sidebar(admin_user: Mapping[str, Any]) -> str:
                 "활동 탐색기",
                 "공지 관리",
                 "내보내기",
+                "런타임 메모리",
             ),
             key=NAV_KEY,
         )
@@ -270,6 +272,8 @@ def main() -> None:
             trigger_rerun=_trigger_rerun,
             admin_email_lookup=admin_email,
         )
+    elif section == "런타임 메모리":
+        runtime.render_runtime_metrics(admin_session)
     else:
         exports.render_exports(
             admin_session,
@@ -0,0 +1,32 @@
+"""Admin helpers for reading per-replica runtime memory metrics."""
+from __future__ import annotations
+
+from typing import Any
+
+from services.session_memory import KEY_FAMILIES, fetch_published_snapshots
+
+
+def list_replica_metrics(limit: int = 50) -> list[dict[str, Any]]:
+    """Return the latest published memory snapshot for each replica."""
+
+    return fetch_published_snapshots(limit=limit)
+
+
+def summarize_replicas(rows: list[dict[str, Any]]) -> dict[str, int]:
+    """Sum sessions and byte counters across replicas."""
+
+    totals = {
+        "replicas": len(rows),
+        "sessions": 0,
+        "accounted_bytes": 0,
+        "rss_bytes": 0,
+        "blob_disk_bytes": 0,
+    }
+    for row in rows:
+        totals["sessions"] += int(row.get("sessions") or 0)
+        totals["accounted_bytes"] += int(row.get("accounted_bytes") or 0)
+        totals["rss_bytes"] += int(row.get("rss_bytes") or 0)
+        totals["blob_disk_bytes"] += int(row.get("blob_disk_bytes") or 0)
+    for family in KEY_FAMILIES:
+        totals[f"family_{family}"] = sum(int((row.get("families") or {}).get(family) or 0) for row in rows)
+    return totals
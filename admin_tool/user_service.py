@@ -5,9 +5,10 @@ from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Any, Mapping, Sequence
 
-from firebase_admin import auth as admin_auth
-
 from firebase_auth import ensure_firebase_admin_initialized
+from utils.lazy_import import lazy_module
+
+admin_auth = lazy_module("firebase_admin.auth")
 
 
 @dataclass(slots=True)
@@ -1,6 +1,6 @@
 """Submodules for the admin Streamlit app."""
 
-from . import announcements, common, dashboard, explorer, moderation, exports
+from . import announcements, common, dashboard, explorer, moderation, exports, runtime
 
 __all__ = [
     "announcements",
@@ -9,4 +9,5 @@ __all__ = [
     "explorer",
     "moderation",
     "exports",
+    "runtime",
 ]
@@ -6,17 +6,12 @@ from typing import Any
 
 import streamlit as st
 
-try:  # Optional analytics helpers
-    import altair as alt  # type: ignore
-except Exception:  # pragma: no cover
-    alt = None
-
-try:  # Optional DataFrame support
-    import pandas as pd  # type: ignore
-except Exception:  # pragma: no cover
-    pd = None
-
 from admin_tool.activity_service import ActivityFilters
+from utils.lazy_import import lazy_module
+
+# Optional analytics helpers; imported when the first chart or table is drawn.
+alt = lazy_module("altair")
+pd = lazy_module("pandas")
 
 
 def apply_date_filters(state: dict[str, Any]) -> tuple[datetime | None, datetime | None]:
@@ -0,0 +1,95 @@
+"""Runtime memory view for the admin console."""
+from __future__ import annotations
+
+from typing import Any, Mapping
+
+import streamlit as st
+
+from admin_tool.runtime_metrics import list_replica_metrics, summarize_replicas
+from services.session_memory import KEY_FAMILIES
+
+from . import common
+
+_FAMILY_LABELS = {
+    "images": "이미지",
+    "story": "동화 텍스트",
+    "auth": "인증",
+    "board": "게시판",
+    "other": "기타",
+}
+
+
+def _mb(value: Any) -> str:
+    return f"{int(value or 0) / (1024 * 1024):,.1f} MB"
+
+
+def render_runtime_metrics(admin_user: Mapping[str, Any]) -> None:
+    st.title("🧠 런타임 메모리")
+    st.caption("각 앱 인스턴스가 주기적으로 기록한 세션 메모리 사용량입니다. 레플리카 크기를 정할 때 참고하세요.")
+
+    try:
+        rows = list_replica_metrics()
+    except Exception as exc:  # pragma: no cover - Firestore unavailable
+        st.error(f"런타임 지표를 불러오지 못했습니다: {exc}")
+        return
+
+    if not rows:
+        st.info("아직 기록된 런타임 지표가 없습니다.")
+        return
+
+    totals = summarize_replicas(rows)
+    cols = st.columns(4)
+    cols[0].metric("인스턴스", f"{totals['replicas']:,}")
+    cols[1].metric("활성 세션", f"{totals['sessions']:,}")
+    cols[2].metric("집계 메모리", _mb(totals["accounted_bytes"]))
+    cols[3].metric("RSS 합계", _mb(totals["rss_bytes"]))
+
+    st.subheader("키 그룹별 사용량")
+    family_rows = [
+        {"그룹": _FAMILY_LABELS.get(family, family), "MB": round(totals[f"family_{family}"] / (1024 * 1024), 2)}
+        for family in KEY_FAMILIES
+    ]
+    if common.pd:
+        st.bar_chart(common.pd.DataFrame(family_rows).set_index("그룹"))
+    else:
+        st.table(family_rows)
+
+    st.subheader("인스턴스별 상세")
+    table = []
+    for row in rows:
+        sessions = int(row.get("sessions") or 0)
+        accounted = int(row.get("accounted_bytes") or 0)
+        table.append(
+            {
+                "인스턴스": row.get("replica_id"),
+                "세션": sessions,
+                "집계": _mb(accounted),
+                "세션당 평균": _mb(accounted / sessions if sessions else 0),
+                "RSS": _mb(row.get("rss_bytes")),
+                "디스크 스필": _mb(row.get("blob_disk_bytes")),
+                "예산": _mb(row.get("budget_bytes")),
+                "축출 횟수": sum((row.get("evictions") or {}).values()),
+                "기록 시각": row.get("captured_at"),
+            }
+        )
+    st.dataframe(table, width='stretch', hide_index=True)
+
+    st.subheader("클라우드 클라이언트")
+    st.caption("인스턴스마다 설정별로 하나씩 만들어 모든 저장소가 함께 쓰는 Google Cloud 클라이언트입니다.")
+    client_rows = [
+        {
+            "인스턴스": row.get("replica_id"),
+            "종류": client.get("kind"),
+            "프로젝트": client.get("project") or "-",
+            "사용 모듈": ", ".join(client.get("users") or []),
+            "요청 수": client.get("acquisitions"),
+            "생성(ms)": client.get("build_ms"),
+            "워밍업(ms)": client.get("warm_up_ms"),
+        }
+        for row in rows
+        for client in row.get("cloud_clients") or []
+    ]
+    if client_rows:
+        st.dataframe(client_rows, width='stretch', hide_index=True)
+    else:
+        st.info("아직 기록된 클라이언트 지표가 없습니다.")
@@ -14,14 +14,18 @@ load_dotenv(BASE_DIR / ".env")
 
 import streamlit as st
 
-from activity_log import init_activity_log
+from activity_log import warm_up_activity_log
 from app_constants import STORY_PHASES
+from cloud_clients import start_cloud_client_warm_up
 from services.generation_tokens import (
     GenerationTokenStatus,
     sync_on_login,
     status_from_mapping,
     status_to_dict,
 )
+from services.process_init import ensure_initialized
+from services.static_assets import static_asset_url
+from services.session_memory import track_session
 from session_state import ensure_state, reset_all_state
 from session_proxy import StorySessionProxy
 from story_library import init_story_library
@@ -42,7 +46,7 @@ from utils.auth import (
 )
 from utils.network import get_client_ip
 from utils.time_utils import format_kst
-from motd_store import get_motd
+from motd_store import get_cached_motd
 
 st.set_page_config(page_title="동화책 생성기", page_icon="📖", layout="centered")
 
@@ -53,13 +57,11 @@ ENDING_JSON_PATH = BASE_DIR / "ending.json"
 ILLUST_DIR = BASE_DIR / "illust"
 HOME_BACKGROUND_IMAGE_PATH = BASE_DIR / "assets/illus-home-hero.png"
 
-STORY_LIBRARY_INIT_ERROR: str | None = None
-try:
-    init_story_library()
-except Exception as exc:  # pragma: no cover - initialization failure surfaced later
-    STORY_LIBRARY_INIT_ERROR = str(exc)
-
-init_activity_log()
+# Warm-ups run once per process; reruns only read the cached status.
+STORY_LIBRARY_INIT_ERROR: str | None = ensure_initialized("story_library", init_story_library).error
+ensure_initialized("activity_log", warm_up_activity_log)
+# Builds the shared Storage/TTS/Firestore clients off the render path.
+start_cloud_client_warm_up()
 
 
 def _clear_generation_token_state() -> None:
@@ -222,6 +224,12 @@ def load_image_as_base64(path: str) -> str | None:
     return base64.b64encode(data).decode("utf-8")
 
 
+def _inline_image_url(path: Path) -> str | None:
+    """Data URI fallback for when the fingerprinted static asset is unavailable."""
+    encoded = load_image_as_base64(str(path))
+    return f"data:image/png;base64,{encoded}" if encoded else None
+
+
 story_types = load_story_types()
 if not story_types:
     st.error("storytype.json에서 story_types를 찾지 못했습니다.")
@@ -233,6 +241,7 @@ ending_cards = load_ending_cards()
 
 ensure_state(story_types)
 session_proxy = StorySessionProxy(st.session_state)
+track_session(session_proxy)
 
 
 
@@ -261,13 +270,13 @@ def logout_user() -> None:
 # ─────────────────────────────────────────────────────────────────────
 # 헤더/인증/진행
 # ─────────────────────────────────────────────────────────────────────
-home_bg = load_image_as_base64(str(HOME_BACKGROUND_IMAGE_PATH))
+home_bg = static_asset_url(HOME_BACKGROUND_IMAGE_PATH) or _inline_image_url(HOME_BACKGROUND_IMAGE_PATH)
 auth_user = ensure_active_auth_session()
 _maybe_sync_generation_tokens(auth_user)
 mode = st.session_state.get("mode")
 current_step = st.session_state["step"]
 
-motd_record = get_motd()
+motd_record = get_cached_motd()
 active_motd: dict[str, Any] | None = None
 if motd_record and motd_record.is_active and motd_record.message.strip():
     active_motd = {
@@ -0,0 +1,206 @@
+"""Process-wide registry of Google Cloud clients.
+
+Every Firestore, Storage and Text-to-Speech client owns a gRPC channel or an
+authorized HTTP session plus its own token cache. Modules used to build one
+client each (and ``tts_client`` one per narration); they now ask the registry,
+which hands every caller with the same configuration the same client.
+
+Constructing a client does not connect. The startup warm-up therefore makes
+one cheap request per client, which opens the connection and fetches the
+access token before the first user request.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+CLOUD_CLIENT_WARMUP = (os.getenv("CLOUD_CLIENT_WARMUP") or "true").strip().lower() not in {"0", "false", "no"}
+
+
+@dataclass(slots=True)
+class ClientMetrics:
+    """What the registry knows about one shared client."""
+
+    kind: str
+    project: str | None
+    users: list[str] = field(default_factory=list)
+    acquisitions: int = 0
+    build_seconds: float = 0.0
+    warm_up_seconds: float | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "project": self.project,
+            "users": list(self.users),
+            "acquisitions": self.acquisitions,
+            "build_ms": round(self.build_seconds * 1000, 1),
+            "warm_up_ms": round(self.warm_up_seconds * 1000, 1) if self.warm_up_seconds is not None else None,
+        }
+
+
+class _Entry:
+    __slots__ = ("client", "credentials", "lock", "metrics")
+
+    def __init__(self, kind: str, project: str | None, credentials: Any) -> None:
+        self.client: Any = None
+        # Held so the ``id()`` in the registry key cannot be reused by another object.
+        self.credentials = credentials
+        self.lock = threading.Lock()
+        self.metrics = ClientMetrics(kind=kind, project=project)
+
+
+class CloudClientRegistry:
+    """Build each distinct client configuration once and share it."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[Any, ...], _Entry] = {}
+        self._warm_ups: dict[str, tuple[Callable[[], Any], Callable[[Any], Any] | None]] = {}
+        self._warm_up_started = False
+
+    def get(self, kind: str, factory: Callable[..., Any], *, user: str, **client_kwargs: Any) -> Any:
+        """Return the client ``factory(**client_kwargs)``, building it on first use.
+
+        Callers with the same factory, project and credentials share one
+        client; ``user`` only labels the metrics.
+        """
+
+        credentials = client_kwargs.get("credentials")
+        options = tuple(sorted((name, value) for name, value in client_kwargs.items() if name != "credentials"))
+        key = (kind, factory, id(credentials) if credentials is not None else None, options)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _Entry(kind, client_kwargs.get("project"), credentials)
+                self._entries[key] = entry
+        if entry.client is None:
+            with entry.lock:
+                if entry.client is None:
+                    started = time.perf_counter()
+                    entry.client = factory(**client_kwargs)
+                    entry.metrics.build_seconds = time.perf_counter() - started
+                    logger.debug("Built shared %s client for %s in %.0f ms", kind, user, entry.metrics.build_seconds * 1000)
+        with self._lock:
+            entry.metrics.acquisitions += 1
+            if user not in entry.metrics.users:
+                entry.metrics.users.append(user)
+        return entry.client
+
+    def register_warm_up(
+        self,
+        name: str,
+        build: Callable[[], Any],
+        probe: Callable[[Any], Any] | None = None,
+    ) -> None:
+        """Register ``build`` (a module's client getter) and ``probe`` to run during :meth:`warm_up`.
+
+        ``probe(client)`` should make one cheap request (a document or object
+        metadata read) so the channel, TLS session and access token are ready
+        before the first user request needs them.
+        """
+
+        with self._lock:
+            self._warm_ups[name] = (build, probe)
+
+    def warm_up(self) -> dict[str, str | None]:
+        """Build every registered client and run its probe; returns ``{name: error or None}``.
+
+        Getters for unconfigured backends raise and are reported, not retried.
+        ``warm_up_seconds`` records how long the probe's round trip took.
+        """
+
+        with self._lock:
+            warm_ups = list(self._warm_ups.items())
+        results: dict[str, str | None] = {}
+        for name, (build, probe) in warm_ups:
+            try:
+                client = build()
+                started = time.perf_counter()
+                if probe is not None:
+                    probe(client)
+            except Exception as exc:  # noqa: BLE001 - a missing backend must not stop the others
+                results[name] = str(exc) or exc.__class__.__name__
+                logger.debug("Cloud client warm-up for %s skipped: %s", name, results[name])
+                continue
+            results[name] = None
+            elapsed = time.perf_counter() - started
+            logger.debug("Warmed up %s client in %.0f ms", name, elapsed * 1000)
+            with self._lock:
+                for entry in self._entries.values():
+                    if entry.client is client and entry.metrics.warm_up_seconds is None:
+                        entry.metrics.warm_up_seconds = elapsed
+        return results
+
+    def start_warm_up(self) -> bool:
+        """Run :meth:`warm_up` once per process on a daemon thread; False if already started."""
+
+        with self._lock:
+            if self._warm_up_started or not CLOUD_CLIENT_WARMUP:
+                return False
+            self._warm_up_started = True
+        threading.Thread(target=self.warm_up, name="cloud-client-warm-up", daemon=True).start()
+        return True
+
+    def metrics(self) -> list[ClientMetrics]:
+        with self._lock:
+            return [
+                ClientMetrics(
+                    kind=entry.metrics.kind,
+                    project=entry.metrics.project,
+                    users=list(entry.metrics.users),
+                    acquisitions=entry.metrics.acquisitions,
+                    build_seconds=entry.metrics.build_seconds,
+                    warm_up_seconds=entry.metrics.warm_up_seconds,
+                )
+                for entry in self._entries.values()
+                if entry.client is not None
+            ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._warm_up_started = False
+
+
+_REGISTRY = CloudClientRegistry()
+
+
+def get_cloud_client_registry() -> CloudClientRegistry:
+    return _REGISTRY
+
+
+def shared_client(kind: str, factory: Callable[..., Any], *, user: str, **client_kwargs: Any) -> Any:
+    """Module-level shortcut for :meth:`CloudClientRegistry.get` on the process registry."""
+
+    return _REGISTRY.get(kind, factory, user=user, **client_kwargs)
+
+
+def register_client_warm_up(name: str, build: Callable[[], Any], probe: Callable[[Any], Any] | None = None) -> None:
+    _REGISTRY.register_warm_up(name, build, probe)
+
+
+def start_cloud_client_warm_up() -> bool:
+    return _REGISTRY.start_warm_up()
+
+
+def cloud_client_metrics() -> list[ClientMetrics]:
+    return _REGISTRY.metrics()
+
+
+__all__ = [
+    "CLOUD_CLIENT_WARMUP",
+    "ClientMetrics",
+    "CloudClientRegistry",
+    "cloud_client_metrics",
+    "get_cloud_client_registry",
+    "register_client_warm_up",
+    "shared_client",
+    "start_cloud_client_warm_up",
+]
@@ -7,12 +7,11 @@ from datetime import datetime, timezone
 from functools import lru_cache
 from typing import Protocol
 
+from cloud_clients import shared_client
 from google_credentials import get_service_account_credentials
+from utils.lazy_import import lazy_module
 
-try:  # pragma: no cover - optional dependency checked at runtime
-    from google.cloud import firestore  # type: ignore
-except Exception:  # pragma: no cover - gracefully handle missing package
-    firestore = None  # type: ignore
+firestore = lazy_module("google.cloud.firestore")
 
 GCP_PROJECT_ID = (
     os.getenv("GCP_PROJECT_ID")
@@ -38,7 +37,7 @@ class SupportsStripped(Protocol):
 
 
 def _ensure_remote_ready() -> None:
-    if firestore is None:
+    if not firestore:
         raise RuntimeError("google-cloud-firestore must be installed for remote board storage")
 
     if GCP_PROJECT_ID:
@@ -65,7 +64,7 @@ def _get_firestore_client():
                 client_kwargs["project"] = project_id
     if GCP_PROJECT_ID:
         client_kwargs["project"] = GCP_PROJECT_ID
-    return firestore.Client(**client_kwargs)  # type: ignore[arg-type]
+    return shared_client("firestore", firestore.Client, user=__name__, **client_kwargs)
 
 
 def _get_firestore_collection():
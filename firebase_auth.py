@@ -9,9 +9,13 @@ from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any, Mapping, MutableMapping
 
-import firebase_admin
-import requests
-from firebase_admin import auth as admin_auth, credentials
+from utils.lazy_import import lazy_module
+
+# The Admin SDK and requests are only needed once a user signs in or a token is checked.
+firebase_admin = lazy_module("firebase_admin")
+requests = lazy_module("requests")
+admin_auth = lazy_module("firebase_admin.auth")
+credentials = lazy_module("firebase_admin.credentials")
 
 
 logger = logging.getLogger(__name__)
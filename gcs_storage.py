@@ -1,6 +1,8 @@
 """Utilities for uploading and listing story exports on Google Cloud Storage."""
 from __future__ import annotations
 
+import gzip
+import json
 import logging
 import os
 from dataclasses import dataclass
@@ -10,27 +12,35 @@ from typing import Any, Iterable
 
 from dotenv import load_dotenv
 
+from cloud_clients import register_client_warm_up, shared_client
 from google_credentials import get_service_account_credentials
+from utils.lazy_import import google_api_error, lazy_attribute, lazy_module
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
-try:  # noqa: SIM105
-    from google.cloud import storage  # type: ignore
-    from google.api_core.exceptions import GoogleAPIError  # type: ignore
-except Exception:  # pragma: no cover - handled gracefully when package missing
-    storage = None  # type: ignore
-
-    class GoogleAPIError(Exception):  # type: ignore
-        """Fallback error type when google-cloud-storage is unavailable."""
-
-        pass
+storage = lazy_module("google.cloud.storage")
 
 GCS_BUCKET_NAME = (os.getenv("GCS_BUCKET_NAME") or "").strip()
 _GCS_PREFIX_RAW = (os.getenv("GCS_PREFIX") or "").strip()
 GCP_PROJECT = (os.getenv("GCP_PROJECT") or "").strip()
-_HTML_CONTENT_TYPE = "text/html; charset=utf-8"
+_MANIFEST_CONTENT_TYPE = "application/json; charset=utf-8"
+# Exports are gzip-compressed before upload and stored with ``Content-Encoding: gzip``;
+# GCS decompresses on the fly for clients that do not accept gzip.
+GCS_HTML_GZIP = (os.getenv("GCS_HTML_GZIP", "true").strip().lower() not in {"0", "false", "no"})
+# Export object names carry a timestamp and are never rewritten, so they can be cached indefinitely.
+GCS_HTML_CACHE_CONTROL = (
+    os.getenv("GCS_HTML_CACHE_CONTROL") or "public, max-age=31536000, immutable"
+).strip()
+_GZIP_MAGIC = b"\x1f\x8b"
+# One JSON object under GCS_PREFIX lists every export, so the library reads a single small
+# object instead of listing the prefix (which also holds manifests and image assets).
+GCS_EXPORTS_INDEX = (os.getenv("GCS_EXPORTS_INDEX") or "exports-index.json").strip()
+_GCS_LIST_PAGE_SIZE_RAW = (os.getenv("GCS_LIST_PAGE_SIZE") or "").strip()
+GCS_LIST_PAGE_SIZE = int(_GCS_LIST_PAGE_SIZE_RAW) if _GCS_LIST_PAGE_SIZE_RAW.isdigit() else 1000
+_EXPORTS_INDEX_VERSION = 1
+_EXPORTS_INDEX_ATTEMPTS = 5
 
 
 def _normalize_prefix(raw: str) -> str:
@@ -75,78 +85,293 @@ def _get_client() -> Any:
             project_id = getattr(credentials, "project_id", "")
             if project_id:
                 client_kwargs["project"] = project_id
-    return storage.Client(**client_kwargs)  # type: ignore[arg-type]
+    return shared_client("storage", storage.Client, user=__name__, **client_kwargs)
 
 
 def _qualify_object_name(filename: str) -> str:
     return f"{GCS_PREFIX}{filename}" if GCS_PREFIX else filename
 
 
-def upload_html_to_gcs(html: str, filename: str) -> tuple[str, str] | None:
-    """Upload HTML content to the configured bucket.
+def upload_file_to_gcs(source: str | os.PathLike[str], filename: str, *, content_type: str) -> str | None:
+    """Upload a local file uncompressed under ``GCS_PREFIX``; returns the object name or None."""
+
+    if not is_gcs_available():
+        return None
+
+    object_name = _qualify_object_name(filename)
+    try:
+        blob = _get_client().bucket(GCS_BUCKET_NAME).blob(object_name)
+        blob.upload_from_filename(os.fspath(source), content_type=content_type)
+        return object_name
+    except google_api_error() as exc:  # pragma: no cover - thin wrapper
+        logger.warning("GCS upload of %s failed: %s", object_name, exc)
+    except Exception as exc:  # pragma: no cover - defensive catch
+        logger.warning("Unexpected error uploading %s to GCS: %s", object_name, exc)
+    return None
+
+
+class GCSGenerationMismatch(Exception):
+    """The object changed since the generation passed to :func:`upload_file_if_generation`."""
+
+
+def upload_file_if_generation(
+    source: str | os.PathLike[str],
+    filename: str,
+    *,
+    content_type: str,
+    generation: int,
+) -> int | None:
+    """Upload ``source`` only while the object is still at ``generation`` (0: absent).
+
+    Returns the new generation, or None when GCS is unavailable or the upload
+    fails. Raises :class:`GCSGenerationMismatch` when another writer got there
+    first, so the caller can merge with the newer object and retry.
+    """
+
+    if not is_gcs_available():
+        return None
+
+    object_name = _qualify_object_name(filename)
+    try:
+        blob = _get_client().bucket(GCS_BUCKET_NAME).blob(object_name)
+        blob.cache_control = "no-cache"
+        blob.upload_from_filename(os.fspath(source), content_type=content_type, if_generation_match=generation)
+    except _precondition_failed() as exc:
+        raise GCSGenerationMismatch(object_name) from exc
+    except google_api_error() as exc:  # pragma: no cover - thin wrapper
+        logger.warning("GCS upload of %s failed: %s", object_name, exc)
+        return None
+    except Exception as exc:  # pragma: no cover - defensive catch
+        logger.warning("Unexpected error uploading %s to GCS: %s", object_name, exc)
+        return None
+    return int(blob.generation)
+
+
+def gcs_object_name(filename: str) -> str:
+    """Full object name for ``filename`` under ``GCS_PREFIX``."""
+
+    return _qualify_object_name(filename)
+
+
+def _export_from_blob(blob: Any) -> GCSExport:
+    name = getattr(blob, "name", "")
+    filename = name[len(GCS_PREFIX) :] if GCS_PREFIX and name.startswith(GCS_PREFIX) else name
+    return GCSExport(
+        object_name=name,
+        filename=filename,
+        public_url=getattr(blob, "public_url", ""),
+        updated=getattr(blob, "updated", None),
+        size=getattr(blob, "size", None),
+    )
+
+
+def _sort_exports(exports: Iterable[GCSExport]) -> list[GCSExport]:
+    epoch = datetime.fromtimestamp(0, tz=timezone.utc)
+    return sorted(exports, key=lambda item: item.updated or epoch, reverse=True)
+
+
+def _exports_index_to_json(exports: Iterable[GCSExport]) -> bytes:
+    payload = {
+        "version": _EXPORTS_INDEX_VERSION,
+        "exports": [
+            {
+                "object_name": item.object_name,
+                "filename": item.filename,
+                "public_url": item.public_url,
+                "updated": item.updated.isoformat() if item.updated else None,
+                "size": item.size,
+            }
+            for item in exports
+        ],
+    }
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _parse_exports_index(data: bytes) -> list[GCSExport] | None:
+    try:
+        payload = json.loads(data)
+        if payload.get("version") != _EXPORTS_INDEX_VERSION:
+            return None
+        return [
+            GCSExport(
+                object_name=item["object_name"],
+                filename=item["filename"],
+                public_url=item.get("public_url") or "",
+                updated=datetime.fromisoformat(item["updated"]) if item.get("updated") else None,
+                size=item.get("size"),
+            )
+            for item in payload["exports"]
+        ]
+    except (ValueError, TypeError, KeyError, AttributeError) as exc:
+        logger.warning("GCS exports index could not be parsed: %s", exc)
+        return None
+
+
+class _IndexConflict(Exception):
+    """Stand-in for ``PreconditionFailed`` when google-api-core is missing."""
+
+
+def _precondition_failed() -> type[BaseException]:
+    return lazy_attribute("google.api_core.exceptions", "PreconditionFailed", _IndexConflict)
+
+
+def _read_exports_index(bucket: Any) -> tuple[list[GCSExport] | None, int]:
+    """Return the indexed exports (None when missing or unreadable) and the object generation.
+
+    Generation 0 means the object does not exist; writes pass it as
+    ``if_generation_match`` so concurrent updates never overwrite each other.
+    """
+
+    blob = bucket.get_blob(_qualify_object_name(GCS_EXPORTS_INDEX))
+    if blob is None:
+        return None, 0
+    generation = int(blob.generation)
+    data = blob.download_as_bytes(if_generation_match=generation)
+    return _parse_exports_index(data), generation
+
+
+def _write_exports_index(bucket: Any, exports: Iterable[GCSExport], generation: int) -> None:
+    blob = bucket.blob(_qualify_object_name(GCS_EXPORTS_INDEX))
+    blob.cache_control = "no-cache"
+    blob.upload_from_string(
+        _exports_index_to_json(_sort_exports(exports)),
+        content_type=_MANIFEST_CONTENT_TYPE,
+        if_generation_match=generation,
+    )
+
+
+def scan_gcs_exports() -> list[GCSExport]:
+    """List the HTML exports directly under ``GCS_PREFIX`` page by page (most recent first).
 
-    Returns a tuple of (object_name, public_url) on success, or None when
-    GCS is not configured or the upload fails.
+    The glob is evaluated by GCS, so manifests, assets and audio are never
+    transferred, and only the fields the listing needs are requested.
+    Raises on API errors; callers decide how to degrade.
+    """
+
+    iterator = _get_client().list_blobs(
+        GCS_BUCKET_NAME,
+        prefix=GCS_PREFIX or None,
+        match_glob=f"{GCS_PREFIX}*.html",
+        page_size=GCS_LIST_PAGE_SIZE,
+        fields="items(name,size,updated),nextPageToken",
+    )
+    exports: list[GCSExport] = []
+    for page_number, page in enumerate(iterator.pages, start=1):
+        exports.extend(_export_from_blob(blob) for blob in page)
+        logger.debug("Listed GCS export page %d (%d exports so far)", page_number, len(exports))
+    return _sort_exports(exports)
+
+
+def record_gcs_export(object_name: str, public_url: str, *, size: int | None = None) -> bool:
+    """Add (or refresh) an uploaded export in the exports index.
+
+    A missing index is left alone: the next listing scans the prefix and
+    writes a complete one. Returns True when the index now contains the export.
     """
 
     if not is_gcs_available():
-        return None
+        return False
 
-    object_name = _qualify_object_name(filename)
+    filename = object_name[len(GCS_PREFIX) :] if GCS_PREFIX and object_name.startswith(GCS_PREFIX) else object_name
+    entry = GCSExport(object_name, filename, public_url, datetime.now(timezone.utc), size)
     try:
-        client = _get_client()
-        bucket = client.bucket(GCS_BUCKET_NAME)
-        blob = bucket.blob(object_name)
-        blob.upload_from_string(html, content_type=_HTML_CONTENT_TYPE)
-        return object_name, blob.public_url
-    except GoogleAPIError as exc:  # pragma: no cover - thin wrapper
-        logger.warning("GCS upload failed: %s", exc)
+        bucket = _get_client().bucket(GCS_BUCKET_NAME)
+        for _ in range(_EXPORTS_INDEX_ATTEMPTS):
+            exports, generation = _read_exports_index(bucket)
+            if exports is None:
+                return False
+            merged = [item for item in exports if item.object_name != object_name]
+            merged.append(entry)
+            try:
+                _write_exports_index(bucket, merged, generation)
+                return True
+            except _precondition_failed():
+                continue
+        logger.warning("GCS exports index kept changing; %s will appear after reconciliation", object_name)
+    except google_api_error() as exc:  # pragma: no cover - network error path
+        logger.warning("Failed to update GCS exports index for %s: %s", object_name, exc)
     except Exception as exc:  # pragma: no cover - defensive catch
-        logger.warning("Unexpected error uploading to GCS: %s", exc)
-    return None
+        logger.warning("Unexpected error updating GCS exports index for %s: %s", object_name, exc)
+    return False
+
+
+def rebuild_gcs_exports_index() -> list[GCSExport]:
+    """Replace the exports index with a fresh scan of the prefix; returns the indexed exports.
+
+    Raises on API errors so the reconciliation script reports them.
+    """
+
+    bucket = _get_client().bucket(GCS_BUCKET_NAME)
+    for _ in range(_EXPORTS_INDEX_ATTEMPTS):
+        _, generation = _read_exports_index(bucket)
+        exports = scan_gcs_exports()
+        try:
+            _write_exports_index(bucket, exports, generation)
+            return exports
+        except _precondition_failed():
+            # An upload landed mid-scan; rescan so it is not dropped.
+            continue
+    raise RuntimeError("GCS exports index changed during every rebuild attempt")
 
 
 def list_gcs_exports() -> list[GCSExport]:
-    """Return the list of HTML exports stored in GCS (most recent first)."""
+    """Return the list of HTML exports stored in GCS (most recent first).
+
+    Reads the exports index object; when it does not exist yet the prefix is
+    scanned and the result written back as the index.
+    """
 
     if not is_gcs_available():
         return []
 
     try:
-        client = _get_client()
-        blobs: Iterable[Any] = client.list_blobs(GCS_BUCKET_NAME, prefix=GCS_PREFIX or None)
-    except GoogleAPIError as exc:  # pragma: no cover - network error path
+        bucket = _get_client().bucket(GCS_BUCKET_NAME)
+        exports, generation = _read_exports_index(bucket)
+        if exports is not None:
+            return _sort_exports(exports)
+        exports = scan_gcs_exports()
+    except google_api_error() as exc:  # pragma: no cover - network error path
         logger.warning("Failed to list GCS exports: %s", exc)
         return []
     except Exception as exc:  # pragma: no cover - defensive catch
         logger.warning("Unexpected error listing GCS exports: %s", exc)
         return []
 
-    exports: list[GCSExport] = []
-    for blob in blobs:
-        name = getattr(blob, "name", "")
-        if not name.endswith(".html"):
-            continue
-        filename = name[len(GCS_PREFIX) :] if GCS_PREFIX and name.startswith(GCS_PREFIX) else name
-        exports.append(
-            GCSExport(
-                object_name=name,
-                filename=filename,
-                public_url=getattr(blob, "public_url", ""),
-                updated=getattr(blob, "updated", None),
-                size=getattr(blob, "size", None),
-            )
-        )
+    try:
+        _write_exports_index(bucket, exports, generation)
+    except Exception as exc:  # another replica may have written it first
+        logger.info("GCS exports index was not written after listing: %s", exc)
+    return exports
 
-    def _sort_key(item: GCSExport) -> datetime:
-        return item.updated or datetime.fromtimestamp(0, tz=timezone.utc)
 
-    exports.sort(key=_sort_key, reverse=True)
-    return exports
+def decode_export_html(data: bytes) -> str:
+    """Decode stored export bytes, gunzipping objects uploaded compressed."""
 
+    if data[:2] == _GZIP_MAGIC:
+        data = gzip.decompress(data)
+    return data.decode("utf-8")
 
-def download_gcs_export(object_name: str) -> str | None:
-    """Download HTML content from GCS using the blob's object name."""
+
+def get_gcs_export_generation(object_name: str) -> int | None:
+    """Current generation of an export object (a metadata request), or None if missing."""
+
+    if not is_gcs_available():
+        return None
+
+    try:
+        blob = _get_client().bucket(GCS_BUCKET_NAME).get_blob(object_name)
+    except google_api_error() as exc:  # pragma: no cover - network error path
+        logger.warning("Failed to read metadata for GCS export %s: %s", object_name, exc)
+        return None
+    except Exception as exc:  # pragma: no cover - defensive catch
+        logger.warning("Unexpected error reading metadata for GCS export %s: %s", object_name, exc)
+        return None
+    generation = getattr(blob, "generation", None) if blob is not None else None
+    return int(generation) if generation is not None else None
+
+
+def download_gcs_export_bytes(object_name: str, *, generation: int | None = None) -> tuple[bytes, int | None] | None:
+    """Download the stored (possibly gzip-compressed) bytes and the generation they came from."""
 
     if not is_gcs_available():
         return None
@@ -154,13 +379,33 @@ def download_gcs_export(object_name: str) -> str | None:
     try:
         client = _get_client()
         bucket = client.bucket(GCS_BUCKET_NAME)
-        blob = bucket.blob(object_name)
-        return blob.download_as_text(encoding="utf-8")
-    except GoogleAPIError as exc:  # pragma: no cover - network error path
+        blob = bucket.blob(object_name, generation=generation) if generation is not None else bucket.blob(object_name)
+        data = blob.download_as_bytes(raw_download=True)
+    except google_api_error() as exc:  # pragma: no cover - network error path
         logger.warning("Failed to download GCS export %s: %s", object_name, exc)
+        return None
     except Exception as exc:  # pragma: no cover - defensive catch
         logger.warning("Unexpected error downloading GCS export %s: %s", object_name, exc)
-    return None
+        return None
+    fetched_generation = getattr(blob, "generation", None)
+    return data, int(fetched_generation) if fetched_generation is not None else generation
+
+
+def download_gcs_export(object_name: str) -> str | None:
+    """Download HTML content from GCS using the blob's object name.
+
+    The stored bytes are fetched as-is and gunzipped here when the object was
+    uploaded compressed, so older uncompressed exports keep working.
+    """
+
+    fetched = download_gcs_export_bytes(object_name)
+    if fetched is None:
+        return None
+    try:
+        return decode_export_html(fetched[0])
+    except (OSError, UnicodeDecodeError) as exc:
+        logger.warning("GCS export %s could not be decoded: %s", object_name, exc)
+        return None
 
 
 def reset_gcs_client_cache() -> None:
@@ -169,11 +414,34 @@ def reset_gcs_client_cache() -> None:
     _get_client.cache_clear()
 
 
+def _warm_up_client() -> Any:
+    if not is_gcs_available():
+        raise RuntimeError("GCS is not configured")
+    return _get_client()
+
+
+def _probe_client(client: Any) -> None:
+    # Object metadata (not bucket metadata, which needs storage.buckets.get).
+    client.bucket(GCS_BUCKET_NAME).get_blob(_qualify_object_name(GCS_EXPORTS_INDEX))
+
+
+register_client_warm_up("storage", _warm_up_client, _probe_client)
+
+
 __all__ = [
     "GCSExport",
+    "GCSGenerationMismatch",
+    "decode_export_html",
     "download_gcs_export",
+    "download_gcs_export_bytes",
+    "gcs_object_name",
+    "get_gcs_export_generation",
     "is_gcs_available",
     "list_gcs_exports",
+    "rebuild_gcs_exports_index",
+    "record_gcs_export",
     "reset_gcs_client_cache",
-    "upload_html_to_gcs",
+    "scan_gcs_exports",
+    "upload_file_if_generation",
+    "upload_file_to_gcs",
 ]
@@ -16,6 +16,7 @@ from prompts.story import (
 )
 from services import gemini_api
 from services.gemini_api import TextGenerationResult as _TextGenerationResult
+from services.image_asset import ImageAsset
 
 API_KEY = gemini_api.API_KEY
 _MODEL = gemini_api.TEXT_MODEL
@@ -449,10 +450,15 @@ def generate_story_with_gemini(
     return cast(dict[str, Any], result.payload)
 
 
-def generate_image_with_gemini(prompt: str, *, image_input: bytes | None = None) -> dict:
-    """Gemini/Imagen 모델로 prompt 기반 삽화를 생성."""
+def generate_image_with_gemini(
+    prompt: str,
+    *,
+    image_input: ImageAsset | bytes | None = None,
+    style_name: str | None = None,
+) -> dict:
+    """Gemini/Imagen 모델로 prompt 기반 삽화를 생성 (동일 요청은 캐시에서 반환)."""
 
-    return gemini_api.generate_image(prompt, image_input=image_input)
+    return gemini_api.generate_image(prompt, image_input=image_input, style_name=style_name)
 
 
 __all__ = [
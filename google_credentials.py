@@ -6,20 +6,27 @@ import logging
 import os
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, Mapping
+from typing import TYPE_CHECKING, Any, Mapping
 
 logger = logging.getLogger(__name__)
 
-try:  # pragma: no cover - optional dependency
-    from google.oauth2 import service_account  # type: ignore
-    from google.auth.credentials import Credentials  # type: ignore
-except Exception:  # pragma: no cover - degrade gracefully when package missing
-    service_account = None  # type: ignore
+from utils.lazy_import import lazy_attribute, lazy_module
 
-    class Credentials:  # type: ignore[override]
-        """Fallback stub when google-auth is unavailable."""
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from google.auth.credentials import Credentials
 
-        pass
+# google-auth pulls in the crypto stack; import it only when credentials are read.
+service_account = lazy_module("google.oauth2.service_account")
+
+
+class _CredentialsStub:
+    """Fallback stub when google-auth is unavailable."""
+
+
+def __getattr__(name: str) -> Any:
+    if name == "Credentials":
+        return lazy_attribute("google.auth.credentials", "Credentials", _CredentialsStub)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 _SECRET_KEYS = (
     "google_credentials",
@@ -122,7 +129,7 @@ def _service_account_path_candidates() -> list[Path]:
 
 
 def _credentials_from_file() -> Credentials | None:
-    if service_account is None:
+    if not service_account:
         return None
 
     for path in _service_account_path_candidates():
@@ -135,7 +142,7 @@ def _credentials_from_file() -> Credentials | None:
 
 
 def _credentials_from_info(info: Mapping[str, Any]) -> Credentials | None:
-    if service_account is None:
+    if not service_account:
         return None
 
     try:
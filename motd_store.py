@@ -1,22 +1,29 @@
 """Storage helpers for a message-of-the-day announcement."""
 from __future__ import annotations
 
+import logging
 import os
+import threading
+import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from functools import lru_cache
 from typing import Any, Mapping
 
+from cloud_clients import shared_client
 from google_credentials import get_service_account_credentials
+from utils.lazy_import import lazy_module
 
-try:  # pragma: no cover - optional dependency resolved at runtime
-    from google.cloud import firestore  # type: ignore
-except Exception:  # pragma: no cover - gracefully handle missing package
-    firestore = None  # type: ignore
+firestore = lazy_module("google.cloud.firestore")
 
 GCP_PROJECT_ID = (os.getenv("GCP_PROJECT_ID") or "").strip()
 MOTD_COLLECTION = (os.getenv("FIRESTORE_MOTD_COLLECTION") or "motd").strip() or "motd"
 MOTD_DOCUMENT_ID = (os.getenv("FIRESTORE_MOTD_DOCUMENT") or "current").strip() or "current"
+MOTD_LISTENER_ENABLED = (os.getenv("MOTD_LISTENER_ENABLED", "true").strip().lower() not in {"0", "false", "no"})
+_MOTD_TTL_ENV = (os.getenv("MOTD_CACHE_TTL_SECONDS") or "").strip()
+MOTD_CACHE_TTL_SECONDS = int(_MOTD_TTL_ENV) if _MOTD_TTL_ENV.isdigit() else 15
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass(slots=True)
@@ -35,7 +42,7 @@ class Motd:
 
 
 def _ensure_remote_ready() -> None:
-    if firestore is None:
+    if not firestore:
         raise RuntimeError("google-cloud-firestore must be installed for MOTD storage")
 
     if GCP_PROJECT_ID:
@@ -62,9 +69,9 @@ def _get_firestore_client():
                 client_kwargs["project"] = project_id
     if GCP_PROJECT_ID:
         client_kwargs["project"] = GCP_PROJECT_ID
-    if firestore is None:  # pragma: no cover - defensive guard
+    if not firestore:  # pragma: no cover - defensive guard
         raise RuntimeError("Firestore client unavailable")
-    return firestore.Client(**client_kwargs)  # type: ignore[arg-type]
+    return shared_client("firestore", firestore.Client, user=__name__, **client_kwargs)
 
 
 def _get_firestore_document():
@@ -99,6 +106,102 @@ def _deserialize(payload: Mapping[str, Any]) -> Motd:
     )
 
 
+def _motd_from_snapshot(doc: Any) -> Motd | None:
+    if not doc or not getattr(doc, "exists", False):
+        return None
+    data = doc.to_dict() or {}
+    if not isinstance(data, Mapping):
+        return None
+    return _deserialize(data)
+
+
+class _MotdCache:
+    """Process-wide MOTD copy kept fresh by a snapshot listener or TTL polling."""
+
+    def __init__(self, clock=time.monotonic) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._value: Motd | None = None
+        self._loaded = False
+        self._fetched_at = 0.0
+        self._watch: Any = None
+        self._refreshing = False
+
+    def _listening(self) -> bool:
+        return self._watch is not None and getattr(self._watch, "is_active", True)
+
+    def _on_snapshot(self, docs: Any, _changes: Any, _read_time: Any) -> None:
+        value = _motd_from_snapshot(docs[0]) if docs else None
+        self.set(value)
+
+    def _start_listener(self) -> None:
+        if not MOTD_LISTENER_ENABLED or self._listening():
+            return
+        try:
+            self._watch = _get_firestore_document().on_snapshot(self._on_snapshot)
+        except Exception as exc:  # pragma: no cover - listener unsupported; poll instead
+            logger.info("MOTD listener unavailable, polling every %ss: %s", MOTD_CACHE_TTL_SECONDS, exc)
+            self._watch = None
+
+    def _refresh(self) -> None:
+        try:
+            with self._refresh_lock:
+                self.set(get_motd())
+                self._start_listener()
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def set(self, value: Motd | None) -> None:
+        with self._lock:
+            self._value = value
+            self._loaded = True
+            self._fetched_at = self._clock()
+
+    def get(self) -> Motd | None:
+        with self._lock:
+            loaded = self._loaded
+            stale = self._clock() - self._fetched_at >= MOTD_CACHE_TTL_SECONDS
+            start_refresh = loaded and stale and not self._listening() and not self._refreshing
+            if start_refresh:
+                self._refreshing = True
+            value = self._value
+        if not loaded:
+            # First request in this process pays for one synchronous read.
+            with self._refresh_lock:
+                if not self._loaded:
+                    self.set(get_motd())
+                    self._start_listener()
+            with self._lock:
+                return self._value
+        if start_refresh:
+            threading.Thread(target=self._refresh, name="motd-refresh", daemon=True).start()
+        return value
+
+    def reset(self) -> None:
+        with self._lock:
+            watch, self._watch = self._watch, None
+            self._value = None
+            self._loaded = False
+            self._fetched_at = 0.0
+            self._refreshing = False
+        if watch is not None:
+            try:
+                watch.unsubscribe()
+            except Exception:  # pragma: no cover - best effort shutdown
+                pass
+
+
+_MOTD_CACHE = _MotdCache()
+
+
+def get_cached_motd() -> Motd | None:
+    """Return the MOTD from process memory; refreshed by push updates or TTL polling."""
+
+    return _MOTD_CACHE.get()
+
+
 def get_motd() -> Motd | None:
     """Return the stored MOTD record, or ``None`` when none exists."""
 
@@ -106,12 +209,7 @@ def get_motd() -> Motd | None:
         doc = _get_firestore_document().get()
     except Exception:
         return None
-    if not doc or not getattr(doc, "exists", False):
-        return None
-    data = doc.to_dict() or {}
-    if not isinstance(data, Mapping):
-        return None
-    return _deserialize(data)
+    return _motd_from_snapshot(doc)
 
 
 def save_motd(*, message: str, is_active: bool, updated_by: str | None) -> Motd:
@@ -128,8 +226,10 @@ def save_motd(*, message: str, is_active: bool, updated_by: str | None) -> Motd:
     document = _get_firestore_document()
     document.set(record)
 
-    clear_cache()
-    return _deserialize(record)
+    motd = _deserialize(record)
+    # Other replicas pick the change up through their listener (or TTL poll).
+    _MOTD_CACHE.set(motd)
+    return motd
 
 
 def clear_motd(*, updated_by: str | None = None) -> None:
@@ -137,13 +237,15 @@ def clear_motd(*, updated_by: str | None = None) -> None:
 
 
 def clear_cache() -> None:
-    """Clear cached remote clients so other processes pick up updates quickly."""
+    """Drop the cached client, listener and MOTD copy for this process."""
 
+    _MOTD_CACHE.reset()
     _get_firestore_client.cache_clear()
 
 
 __all__ = [
     "Motd",
+    "get_cached_motd",
     "get_motd",
     "save_motd",
     "clear_motd",
@@ -0,0 +1,44 @@
+"""Convert legacy string ``created_at_utc`` values on story records to timestamps.
+
+The indexed library query only sees Firestore timestamps. Documents written
+with an ISO string are served by a slower compatibility query until this script
+has rewritten them; afterwards set ``STORY_LIBRARY_LEGACY_FALLBACK=false``.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from dotenv import load_dotenv
+
+load_dotenv(ROOT / ".env", override=False)
+
+import story_library  # noqa: E402  (reads the environment at import time)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dry-run", action="store_true", help="report documents without updating them")
+    args = parser.parse_args()
+
+    collection = story_library._get_story_collection()
+    query = story_library._apply_where(collection, "created_at_utc", ">=", "")
+    converted = 0
+    for doc in query.stream():
+        raw = (doc.to_dict() or {}).get("created_at_utc")
+        timestamp = story_library._coerce_datetime(raw)
+        print(f"{doc.id}: {raw!r} -> {timestamp.isoformat()}")
+        if not args.dry_run:
+            doc.reference.update({"created_at_utc": timestamp})
+        converted += 1
+    print(f"{'would convert' if args.dry_run else 'converted'} {converted} document(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,49 @@
+"""Build the per-user story index documents from existing story records.
+
+``record_story_export`` keeps each user's index current, but only marks it
+complete once older records have been merged in; until then "내 동화" falls
+back to the collection query. Run this once after deploying the index (it is
+safe to re-run at any time).
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from dotenv import load_dotenv
+
+load_dotenv(ROOT / ".env", override=False)
+
+import story_library  # noqa: E402  (reads the environment at import time)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dry-run", action="store_true", help="report users without writing their index")
+    parser.add_argument("--user", help="only rebuild this uid")
+    args = parser.parse_args()
+
+    by_user: dict[str, list[story_library.StoryRecord]] = defaultdict(list)
+    for record in story_library.list_story_records(user_id=args.user, limit=None):
+        if record.user_id:
+            by_user[record.user_id].append(record)
+
+    for user_id, records in sorted(by_user.items()):
+        newest = records[: story_library.USER_STORY_INDEX_SIZE]
+        if args.dry_run:
+            print(f"{user_id}: would index {len(newest)} of {len(records)} stories")
+            continue
+        stored = story_library.rebuild_user_story_index(user_id, newest)
+        print(f"{user_id}: indexed {stored} of {len(records)} stories")
+    print(f"{'would rebuild' if args.dry_run else 'rebuilt'} {len(by_user)} user index document(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
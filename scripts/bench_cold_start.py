@@ -0,0 +1,120 @@
+"""Cold-start benchmark for the Streamlit entry points.
+
+Each run starts a fresh interpreter and times the top-level imports of
+``app.py`` and ``admin_app.py`` (collected with ``ast``, so the scripts never
+execute and no backend is contacted). ``--eager-sdks`` also imports the heavy
+Google/Firebase/Pillow SDKs up front, which is what every page paid before they
+were deferred. Use ``--json`` to append results to a file tracked across releases.
+"""
+from __future__ import annotations
+
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+ENTRY_POINTS = ("app.py", "admin_app.py")
+HEAVY_SDKS = (
+    "firebase_admin.auth",
+    "google.api_core.exceptions",
+    "google.cloud.firestore",
+    "google.cloud.storage",
+    "google.cloud.texttospeech",
+    "google.oauth2.service_account",
+    "PIL.Image",
+    "requests",
+)
+
+_PROBE = """
+import importlib, json, sys, time
+modules = json.loads(sys.argv[1])
+started = time.perf_counter()
+for name in modules:
+    importlib.import_module(name)
+elapsed = time.perf_counter() - started
+print(json.dumps({"seconds": elapsed, "modules": len(sys.modules)}))
+"""
+
+
+def entry_point_imports(path: Path) -> list[str]:
+    """Top-level modules imported by an entry-point script, in source order."""
+
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    names: list[str] = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            if node.module != "__future__":
+                names.append(node.module)
+    return list(dict.fromkeys(names))
+
+
+def _run_once(modules: list[str]) -> dict[str, float]:
+    env = dict(os.environ, PYTHONPATH=str(ROOT), PYTHONDONTWRITEBYTECODE="1")
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE, json.dumps(modules)],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if completed.returncode != 0:
+        raise SystemExit(completed.stderr[-2000:])
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _bench(label: str, modules: list[str], runs: int) -> dict[str, object]:
+    _run_once(modules)  # warm the bytecode and filesystem caches
+    samples = [_run_once(modules) for _ in range(runs)]
+    seconds = sorted(sample["seconds"] for sample in samples)
+    result = {
+        "label": label,
+        "runs": runs,
+        "median_ms": round(statistics.median(seconds) * 1000, 1),
+        "p90_ms": round(seconds[min(len(seconds) - 1, int(len(seconds) * 0.9))] * 1000, 1),
+        "min_ms": round(seconds[0] * 1000, 1),
+        "modules": int(samples[-1]["modules"]),
+    }
+    print(
+        f"{label:<22} median={result['median_ms']:7.1f} ms  p90={result['p90_ms']:7.1f} ms  "
+        f"min={result['min_ms']:7.1f} ms  modules={result['modules']}"
+    )
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=7, help="fresh interpreters per entry point")
+    parser.add_argument("--eager-sdks", action="store_true", help="also time with the heavy SDKs imported up front")
+    parser.add_argument("--json", type=Path, help="append results as one JSON line to this file")
+    args = parser.parse_args()
+
+    results = []
+    for entry in ENTRY_POINTS:
+        modules = entry_point_imports(ROOT / entry)
+        results.append(_bench(entry, modules, args.runs))
+        if args.eager_sdks:
+            results.append(_bench(f"{entry} +eager SDKs", list(HEAVY_SDKS) + modules, args.runs))
+
+    if args.json:
+        record = {
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "results": results,
+        }
+        with args.json.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps(record) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,85 @@
+"""Bytes saved by gzip-compressing story HTML exports before upload.
+
+Measures every ``.html`` file under the export directory (``HTML_EXPORT_DIR``
+by default). When there are none, it builds a typical 5-stage story with a
+cover from the repository's illustration PNGs. Brotli is reported too when the
+``brotli`` package is installed, for comparison only: GCS decompressive
+transcoding supports gzip alone, so uploads use gzip.
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import io
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from services.image_asset import ImageAsset
+from services.story_html import HtmlStage, StoryHtmlWriter
+from services.story_service import HTML_EXPORT_PATH
+from utils.lazy_import import lazy_module
+
+brotli = lazy_module("brotli")
+
+_SAMPLE_IMAGES = ("illust/ending_dream.png", "illust/ending_happiness.png", "illust/ending_home.png", "illust/default.png")
+
+
+def _sample_export() -> tuple[str, bytes]:
+    images = [ImageAsset((ROOT / name).read_bytes(), "image/png") for name in _SAMPLE_IMAGES if (ROOT / name).is_file()]
+    stages = [
+        HtmlStage(paragraphs=["옛날 옛적에 작은 마을에 호기심 많은 토끼가 살았어요. " * 6] * 4, image=images[idx % len(images)] if images else None)
+        for idx in range(5)
+    ]
+    buffer = io.BytesIO()
+    StoryHtmlWriter(buffer).write_document(title="벤치마크 동화", stages=stages, cover=images[0] if images else None)
+    return "sample (5 stages + cover)", buffer.getvalue()
+
+
+def _row(label: str, raw: int, size: int, elapsed: float) -> str:
+    return f"  {label:<10} {size / 1024:9.1f} KiB  saved={(1 - size / raw) * 100:5.1f}%  {elapsed * 1000:7.1f} ms"
+
+
+def _measure(name: str, data: bytes) -> tuple[int, int]:
+    print(f"{name}: {len(data) / 1024:.1f} KiB raw")
+    best = len(data)
+    for level in (6, 9):
+        started = time.perf_counter()
+        size = len(gzip.compress(data, compresslevel=level, mtime=0))
+        print(_row(f"gzip-{level}", len(data), size, time.perf_counter() - started))
+        if level == 6:
+            best = size
+    if brotli:
+        started = time.perf_counter()
+        size = len(brotli.compress(data, quality=9))
+        print(_row("brotli-9", len(data), size, time.perf_counter() - started))
+    return len(data), best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dir", type=Path, default=HTML_EXPORT_PATH, help="directory of exported .html files")
+    parser.add_argument("--limit", type=int, default=20, help="newest files to measure")
+    args = parser.parse_args()
+
+    files = sorted(args.dir.glob("*.html"), key=lambda path: path.stat().st_mtime, reverse=True)[: args.limit]
+    samples = [(path.name, path.read_bytes()) for path in files] or [_sample_export()]
+
+    total_raw = total_gzip = 0
+    for name, data in samples:
+        raw, compressed = _measure(name, data)
+        total_raw += raw
+        total_gzip += compressed
+    print(
+        f"\ntotal: {total_raw / 1024:.1f} KiB -> {total_gzip / 1024:.1f} KiB with gzip-6 "
+        f"({(1 - total_gzip / total_raw) * 100:.1f}% fewer bytes stored and transferred)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
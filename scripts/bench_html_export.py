@@ -0,0 +1,80 @@
+"""Peak memory of a story HTML export: in-memory document vs streaming writer.
+
+Builds a 5-stage story with a cover from random "illustrations" and exports it
+twice. The first run uses the previous approach: data URIs for every image, one
+f-string document, encoded to bytes, then written. The second run uses
+StoryHtmlWriter, which streams to a file. Images are allocated before tracing,
+so the reported peak is what the export itself adds.
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from services.image_asset import ImageAsset
+from services.story_html import HtmlStage, StoryHtmlWriter
+
+
+def _legacy_export(cover: ImageAsset, stages: list[HtmlStage], target: Path) -> int:
+    def uri(asset: ImageAsset) -> str:
+        return f"data:{asset.mime_type};base64,{base64.b64encode(asset.view).decode('ascii')}"
+
+    cover_html = f"<section class=\"cover stage\"><figure><img src=\"{uri(cover)}\" /></figure></section>"
+    sections = "".join(
+        f"<section class=\"stage\"><figure><img src=\"{uri(stage.image)}\" /></figure>"
+        + "".join(f"<p>{p}</p>" for p in stage.paragraphs)
+        + "</section>"
+        for stage in stages
+        if stage.image
+    )
+    html_bytes = f"<!DOCTYPE html><html><body>{cover_html}{sections}</body></html>".encode("utf-8")
+    target.write_bytes(html_bytes)
+    return len(html_bytes)
+
+
+def _streaming_export(cover: ImageAsset, stages: list[HtmlStage], target: Path) -> int:
+    with target.open("wb") as fh:
+        return StoryHtmlWriter(fh).write_document(title="벤치마크", stages=stages, cover=cover)
+
+
+def _measure(label: str, func: Callable[..., int], *args: object) -> None:
+    tracemalloc.start()
+    started = time.perf_counter()
+    written = func(*args)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<10} time={elapsed * 1000:8.1f} ms  peak={peak / 1024 / 1024:7.2f} MiB  html={written / 1024 / 1024:6.2f} MiB")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--stages", type=int, default=5, help="stage illustrations besides the cover")
+    parser.add_argument("--size-kb", type=int, default=1500, help="size of each illustration")
+    args = parser.parse_args()
+
+    cover = ImageAsset(os.urandom(args.size_kb * 1024), "image/png")
+    stages = [
+        HtmlStage(paragraphs=["옛날 옛적에 " * 40] * 4, image=ImageAsset(os.urandom(args.size_kb * 1024), "image/png"))
+        for _ in range(args.stages)
+    ]
+    print(f"{args.stages} stages + cover, {args.size_kb} KiB per image")
+    with tempfile.TemporaryDirectory() as tmp:
+        _measure("legacy", _legacy_export, cover, stages, Path(tmp) / "legacy.html")
+        _measure("streaming", _streaming_export, cover, stages, Path(tmp) / "streaming.html")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,79 @@
+"""Compare allocations of the legacy bytes image path against ImageAsset.
+
+Simulates a Step 6 session: every rerun hashes each illustration for the
+export signature, and each export base64-encodes the images into HTML that is
+written locally and uploaded. Reports wall time and peak traced memory.
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from services.image_asset import ImageAsset
+
+
+def _legacy_session(images: list[bytes], reruns: int, exports: int) -> int:
+    produced = 0
+    for _ in range(reruns):
+        for image in images:
+            hashlib.sha256(image).hexdigest()
+    for _ in range(exports):
+        uris = [f"data:image/png;base64,{base64.b64encode(image).decode('utf-8')}" for image in images]
+        html_doc = "<html>" + "".join(f'<img src="{uri}">' for uri in uris) + "</html>"
+        local = html_doc.encode("utf-8")  # Path.write_text
+        upload = html_doc.encode("utf-8")  # blob.upload_from_string(str)
+        produced += len(local) + len(upload)
+    return produced
+
+
+def _asset_session(images: list[bytes], reruns: int, exports: int) -> int:
+    assets = [ImageAsset(image, "image/png") for image in images]
+    produced = 0
+    for _ in range(reruns):
+        for asset in assets:
+            asset.sha256
+    for _ in range(exports):
+        html_bytes = (
+            "<html>" + "".join(f'<img src="{asset.data_uri}">' for asset in assets) + "</html>"
+        ).encode("utf-8")
+        produced += len(html_bytes)
+    return produced
+
+
+def _measure(label: str, func: Callable[..., int], *args: object) -> None:
+    tracemalloc.start()
+    started = time.perf_counter()
+    produced = func(*args)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<8} time={elapsed * 1000:8.1f} ms  peak={peak / 1024 / 1024:7.2f} MiB  html_bytes={produced / 1024 / 1024:7.2f} MiB")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", type=int, default=6, help="illustrations per story (cover + stages)")
+    parser.add_argument("--size-kb", type=int, default=1500, help="size of each illustration")
+    parser.add_argument("--reruns", type=int, default=20, help="Step 6 reruns before exporting")
+    parser.add_argument("--exports", type=int, default=3, help="number of exports in the session")
+    args = parser.parse_args()
+
+    images = [os.urandom(args.size_kb * 1024) for _ in range(args.images)]
+    _measure("legacy", _legacy_session, images, args.reruns, args.exports)
+    _measure("asset", _asset_session, images, args.reruns, args.exports)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,117 @@
+"""Time the export and library storage paths without cloud access.
+
+An in-memory backend is injected as the bucket behind ``story_storage()``.
+Replica A renders a story (5 stages + cover by default) into its own
+``html_exports/`` with ``render_story_html`` and publishes it with
+``upload_story_html``. Replica B starts with an empty disk and opens the
+story the way the library reader does: ``load_story_manifest`` from the
+manifest object, then every image with ``load_story_asset``. The first pass
+reads through to the "bucket" and backfills the local disk; the second is
+served locally. Images are random bytes, so the cover-thumbnail step logs
+that it was skipped.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from services import story_service  # noqa: E402
+from services.image_asset import ImageAsset  # noqa: E402
+from services.storage_backend import MemoryStorageBackend  # noqa: E402
+from services.story_reader import document_from_manifest  # noqa: E402
+from services.story_service import StagePayload, StoryBundle  # noqa: E402
+
+
+def _bundle(stages: int, size_kb: int) -> StoryBundle:
+    def image() -> ImageAsset:
+        return ImageAsset(os.urandom(size_kb * 1024), "image/png")
+
+    return StoryBundle(
+        title="벤치마크",
+        stages=[
+            StagePayload(
+                stage_name=f"장면 {index + 1}",
+                card_name=None,
+                card_prompt=None,
+                paragraphs=["옛날 옛적에 " * 40] * 4,
+                image_bytes=None,
+                image_mime="image/png",
+                image_asset=image(),
+            )
+            for index in range(stages)
+        ],
+        synopsis=None,
+        protagonist=None,
+        cover={"image_asset": image()},
+        story_type_name="모험",
+        age="6-8",
+        topic=None,
+    )
+
+
+def _report(label: str, started: float, nbytes: int) -> None:
+    elapsed = time.perf_counter() - started
+    print(f"{label:<22} {elapsed * 1000:8.1f} ms  {nbytes / 1024 / 1024:7.2f} MiB")
+
+
+def _open_story(manifest_object: str) -> int:
+    manifest = story_service.load_story_manifest(local_path=None, gcs_object=manifest_object)
+    if manifest is None:
+        raise SystemExit(f"manifest {manifest_object} could not be read")
+    document = document_from_manifest(manifest)
+    total = 0
+    for ref in [document.cover_ref, *(stage.image_ref for stage in document.stages)]:
+        if ref is None:
+            continue
+        asset = story_service.load_story_asset(ref)
+        if asset is None:
+            raise SystemExit(f"image {ref.sha256[:12]} could not be read")
+        total += asset.size
+    return total
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--stages", type=int, default=5, help="stage illustrations besides the cover")
+    parser.add_argument("--size-kb", type=int, default=1500, help="size of each illustration")
+    args = parser.parse_args()
+
+    bundle = _bundle(args.stages, args.size_kb)
+    bucket = MemoryStorageBackend()
+    story_service.use_remote_story_storage(bucket)
+    print(f"{args.stages} stages + cover, {args.size_kb} KiB per image")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            story_service.HTML_EXPORT_PATH = Path(tmp) / "replica-a"
+            started = time.perf_counter()
+            export_path = story_service.render_story_html(bundle=bundle, author="벤치")
+            _report("export: render", started, sum(item.size for item in story_service.story_storage().tiers[0].list()))
+
+            started = time.perf_counter()
+            result = story_service.upload_story_html(export_path)
+            _report("export: publish", started, sum(item.size for item in bucket.list()))
+            if result.manifest_object is None:
+                raise SystemExit("the manifest was not published")
+
+            story_service.HTML_EXPORT_PATH = Path(tmp) / "replica-b"
+            started = time.perf_counter()
+            _report("library: cold open", started, _open_story(result.manifest_object))
+            started = time.perf_counter()
+            _report("library: warm open", started, _open_story(result.manifest_object))
+            stats = story_service.story_storage().stats()
+            print(f"replica B tiers: hits {stats.hits}, backfills {stats.backfills}, misses {stats.misses}")
+    finally:
+        story_service.use_remote_story_storage(None)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,57 @@
+"""Rebuild the story search index from every Firestore story record.
+
+Stories with a manifest are indexed from it; older exports are parsed from
+their HTML. Replicas build the index the same way, in the background, when
+they find none; run this with ``--upload`` before a first deploy so search is
+complete from the start, or to force a full rebuild (e.g. after deleting
+stories).
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from dotenv import load_dotenv
+
+load_dotenv(ROOT / ".env", override=False)
+
+from gcs_storage import upload_file_to_gcs  # noqa: E402  (reads the environment at import time)
+from services.story_search import SEARCH_INDEX_GCS_OBJECT, SEARCH_INDEX_PATH, build_search_index  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", default=SEARCH_INDEX_PATH, help="index file to write")
+    parser.add_argument("--upload", action="store_true", help="also upload to SEARCH_INDEX_GCS_OBJECT")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    sources: Counter[str] = Counter()
+    index = build_search_index(sources)
+    index.save(args.output)
+    print(
+        f"indexed {len(index)} stories ({sources['manifest']} from manifests, {sources['html']} from HTML) "
+        f"into {args.output} ({Path(args.output).stat().st_size / 1024:.1f} KiB) "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+    if args.upload:
+        if not SEARCH_INDEX_GCS_OBJECT:
+            print("SEARCH_INDEX_GCS_OBJECT is not set; skipping upload")
+            return 1
+        if not upload_file_to_gcs(args.output, SEARCH_INDEX_GCS_OBJECT, content_type="application/octet-stream"):
+            print("upload failed")
+            return 1
+        print(f"uploaded to {SEARCH_INDEX_GCS_OBJECT}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,95 @@
+"""Build fingerprinted WebP copies of the hero and illustration images.
+
+Writes ``static/<kind>/<name>.<hash>.webp`` plus ``static/manifest.json`` and
+fails when a built file exceeds its size budget. ``--check`` only validates
+the committed manifest (for CI). ``--upload-gcs`` also copies the files to the
+configured bucket with immutable Cache-Control so STATIC_ASSET_BASE_URL can
+point at a CDN.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from dotenv import load_dotenv
+
+load_dotenv(ROOT / ".env")
+
+from services.static_assets import (
+    IMMUTABLE_CACHE_CONTROL,
+    STATIC_DIR,
+    StaticAsset,
+    build_asset,
+    check_budgets,
+    load_manifest,
+    write_manifest,
+)
+
+SOURCES: tuple[tuple[str, str], ...] = (
+    ("assets/illus-home-hero.png", "hero"),
+    ("illust/*.png", "illustration"),
+)
+
+
+def _collect_sources() -> list[tuple[Path, str]]:
+    found: list[tuple[Path, str]] = []
+    for pattern, kind in SOURCES:
+        found.extend((path, kind) for path in sorted(ROOT.glob(pattern)))
+    return found
+
+
+def _upload(assets: list[StaticAsset]) -> None:
+    import gcs_storage
+
+    if not gcs_storage.is_gcs_available():
+        raise SystemExit("GCS is not configured; set GCS_BUCKET_NAME and credentials.")
+    bucket = gcs_storage._get_client().bucket(gcs_storage.GCS_BUCKET_NAME)
+    for asset in assets:
+        blob = bucket.blob(gcs_storage._qualify_object_name(f"static/{asset.file}"))
+        if blob.exists():
+            continue
+        blob.cache_control = IMMUTABLE_CACHE_CONTROL
+        blob.upload_from_filename(str(STATIC_DIR / asset.file), content_type=asset.mime_type)
+        print(f"uploaded {asset.file}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--check", action="store_true", help="validate the existing manifest without rebuilding")
+    parser.add_argument("--upload-gcs", action="store_true", help="upload built files with immutable Cache-Control")
+    args = parser.parse_args()
+
+    if args.check:
+        assets = list(load_manifest().values())
+        if not assets:
+            print("static/manifest.json is missing or empty; run without --check to build it.")
+            return 1
+    else:
+        sources = _collect_sources()
+        assets = [build_asset(path, kind) for path, kind in sources]
+        manifest_path = write_manifest(assets)
+        source_bytes = sum(path.stat().st_size for path, _ in sources)
+        built_bytes = sum(asset.bytes for asset in assets)
+        print(
+            f"built {len(assets)} assets: {source_bytes / 1024 / 1024:.1f} MiB -> "
+            f"{built_bytes / 1024 / 1024:.1f} MiB ({manifest_path.relative_to(ROOT)})"
+        )
+
+    violations = check_budgets(assets)
+    for message in violations:
+        print(f"over budget: {message}")
+    if violations:
+        return 1
+
+    if args.upload_gcs:
+        _upload(assets)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
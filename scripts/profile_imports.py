@@ -0,0 +1,82 @@
+"""Summarize ``python -X importtime`` for the Streamlit entry points.
+
+Runs each target import in a fresh interpreter and reports the slowest
+top-level imports by cumulative time plus totals per package, so regressions
+such as an SDK imported at module load show up at a glance. ``--exclude``
+subtracts a baseline import (Streamlit by default) that every page pays anyway.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+DEFAULT_TARGETS = ("ui.home", "ui.library", "ui.auth", "ui.create.step6", "admin_ui")
+
+
+def _importtime(statement: str) -> dict[str, tuple[int, int, int]]:
+    """Return ``{module: (self_us, cumulative_us, depth)}`` for one import statement."""
+
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if completed.returncode != 0:
+        raise SystemExit(f"{statement!r} failed:\n{completed.stderr[-2000:]}")
+
+    timings: dict[str, tuple[int, int, int]] = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        timings.setdefault(name.strip(), (int(self_us), int(cumulative_us), depth))
+    return timings
+
+
+def _report(target: str, baseline: dict[str, tuple[int, int, int]], top: int) -> None:
+    timings = _importtime(f"import {target}")
+    extra = {name: value for name, value in timings.items() if name not in baseline}
+    total_us = sum(self_us for self_us, _, _ in extra.values())
+    print(f"\n== {target}: {len(extra)} modules, {total_us / 1000:.1f} ms beyond baseline")
+
+    print(f"{'cumulative':>12}  module")
+    ranked = sorted(extra.items(), key=lambda item: item[1][1], reverse=True)
+    for name, (_, cumulative_us, depth) in ranked[:top]:
+        print(f"{cumulative_us / 1000:9.1f} ms  {'  ' * min(depth, 8)}{name}")
+
+    by_package: dict[str, int] = defaultdict(int)
+    for name, (self_us, _, _) in extra.items():
+        parts = name.split(".")
+        package = ".".join(parts[:2]) if parts[0] == "google" and len(parts) > 1 else parts[0]
+        by_package[package] += self_us
+    print(f"{'self total':>12}  package")
+    for package, self_us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"{self_us / 1000:9.1f} ms  {package}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("targets", nargs="*", default=list(DEFAULT_TARGETS), help="modules to import")
+    parser.add_argument("--exclude", default="streamlit", help="baseline import to subtract ('' to disable)")
+    parser.add_argument("--top", type=int, default=15, help="rows per table")
+    args = parser.parse_args()
+
+    baseline = _importtime(f"import {args.exclude}") if args.exclude else {}
+    for target in args.targets:
+        _report(target, baseline, args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
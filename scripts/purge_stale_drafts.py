@@ -0,0 +1,40 @@
+"""Discard story drafts nobody has touched for STORY_DRAFT_MAX_AGE_DAYS.
+
+Exported stories remove their own draft, but drafts users walked away from
+stay in Firestore together with their images under ``drafts/assets/``. Run
+this daily (Cloud Scheduler, cron) on one replica; it also clears this
+replica's untouched local copies in STORY_DRAFTS_DIR.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from dotenv import load_dotenv
+
+load_dotenv(ROOT / ".env", override=False)
+
+import story_drafts  # noqa: E402  (reads the environment at import time)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=story_drafts.STORY_DRAFT_MAX_AGE_DAYS, help="maximum draft age")
+    parser.add_argument("--dry-run", action="store_true", help="list stale drafts without deleting them")
+    args = parser.parse_args()
+
+    stale = story_drafts.purge_stale_drafts(max_age_days=args.days, dry_run=args.dry_run)
+    for story_id in stale:
+        print(story_id)
+    action = "would discard" if args.dry_run else "discarded"
+    print(f"{action} {len(stale)} drafts older than {args.days} days")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
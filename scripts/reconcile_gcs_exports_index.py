@@ -0,0 +1,54 @@
+"""Rebuild the GCS exports index object from a full listing of GCS_PREFIX.
+
+Uploads add themselves to the index, but an upload whose index update failed,
+or exports removed by hand, leave it out of date. Run this periodically (or
+after bucket maintenance) to make the index match the bucket again.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from dotenv import load_dotenv
+
+load_dotenv(ROOT / ".env", override=False)
+
+import gcs_storage  # noqa: E402  (reads the environment at import time)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dry-run", action="store_true", help="report differences without rewriting the index")
+    args = parser.parse_args()
+
+    if not gcs_storage.is_gcs_available():
+        print("GCS is not configured (GCS_BUCKET_NAME / google-cloud-storage)")
+        return 1
+
+    started = time.perf_counter()
+    indexed = {item.object_name for item in gcs_storage.list_gcs_exports()}
+    if args.dry_run:
+        scanned = {item.object_name for item in gcs_storage.scan_gcs_exports()}
+    else:
+        scanned = {item.object_name for item in gcs_storage.rebuild_gcs_exports_index()}
+
+    for name in sorted(scanned - indexed):
+        print(f"missing from index: {name}")
+    for name in sorted(indexed - scanned):
+        print(f"no longer in bucket: {name}")
+    action = "would index" if args.dry_run else "indexed"
+    print(
+        f"{action} {len(scanned)} exports ({len(scanned - indexed)} added, {len(indexed - scanned)} removed) "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,387 @@
+"""Process-wide store for large session artefacts with spill to disk."""
+from __future__ import annotations
+
+import logging
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Iterable
+
+from services.image_asset import ImageAsset
+
+logger = logging.getLogger(__name__)
+
+BLOB_STORE_DIR = (os.getenv("BLOB_STORE_DIR") or "").strip() or ".cache/blobs"
+_MEMORY_MB_ENV = (os.getenv("BLOB_STORE_MEMORY_MB") or "").strip()
+BLOB_STORE_MEMORY_BYTES = (int(_MEMORY_MB_ENV) if _MEMORY_MB_ENV.isdigit() else 128) * 1024 * 1024
+_TTL_ENV = (os.getenv("BLOB_STORE_SESSION_TTL_SECONDS") or "").strip()
+BLOB_STORE_SESSION_TTL_SECONDS = int(_TTL_ENV) if _TTL_ENV.isdigit() else 3 * 60 * 60
+_SWEEP_INTERVAL_SECONDS = 60.0
+
+BlobLoader = Callable[[str, str], "ImageAsset | None"]
+SessionProbe = Callable[[str], "bool | None"]
+_LOADERS: list[BlobLoader] = []
+
+
+def register_blob_loader(loader: BlobLoader) -> None:
+    """Register a fallback ``loader(sha256, mime_type)`` consulted on store misses."""
+
+    if loader not in _LOADERS:
+        _LOADERS.append(loader)
+
+
+def streamlit_session_id() -> str | None:
+    """Runtime id of the Streamlit session running this script, or None outside one."""
+
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        ctx = get_script_run_ctx(suppress_warning=True)
+    except Exception:  # pragma: no cover - outside a Streamlit runtime
+        return None
+    return ctx.session_id if ctx is not None else None
+
+
+def streamlit_session_active(session_id: str) -> bool | None:
+    """Whether the Streamlit runtime still holds ``session_id``; None outside a runtime."""
+
+    try:
+        from streamlit.runtime import Runtime
+
+        if not Runtime.exists():
+            return None
+        return Runtime.instance().is_active_session(session_id)
+    except Exception:  # pragma: no cover - outside a Streamlit runtime
+        return None
+
+
+@dataclass(frozen=True, slots=True)
+class BlobHandle:
+    """Small stand-in kept in session state instead of the image bytes."""
+
+    sha256: str
+    mime_type: str
+    size: int
+
+    def resolve_asset(self) -> ImageAsset | None:
+        return get_blob_store().get(self)
+
+
+@dataclass(slots=True)
+class BlobStoreStats:
+    memory_bytes: int = 0
+    encoded_bytes: int = 0
+    memory_entries: int = 0
+    disk_bytes: int = 0
+    disk_entries: int = 0
+    owners: int = 0
+    spills: int = 0
+    misses: int = 0
+
+
+class BlobStore:
+    """Reference-counted, content-addressed blobs shared by every session.
+
+    Blobs stay in memory up to ``memory_limit_bytes``; the least recently used
+    ones are then written to disk and served back through ``mmap``. Each
+    session registers as an owner and blobs disappear once no owner holds them,
+    either explicitly or once the owner's session has ended. Owners idle for
+    ``session_ttl_seconds`` whose session ``session_probe`` still reports as
+    open only have their blobs spilled to disk; owners without a known session
+    (or without a probe) are released.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        memory_limit_bytes: int,
+        session_ttl_seconds: float,
+        session_probe: SessionProbe | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.directory = Path(directory) / str(os.getpid())
+        self.memory_limit_bytes = max(int(memory_limit_bytes), 0)
+        self.session_ttl_seconds = float(session_ttl_seconds)
+        self._session_probe = session_probe
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._memory: OrderedDict[str, ImageAsset] = OrderedDict()
+        self._spilled: dict[str, tuple[Path, str, int]] = {}
+        self._refs: dict[str, set[str]] = {}
+        self._owned: dict[str, set[str]] = {}
+        self._last_seen: dict[str, float] = {}
+        self._sessions: dict[str, str] = {}
+        self._memory_bytes = 0
+        self._stats = BlobStoreStats()
+        self._last_sweep = clock()
+
+    # Public API ------------------------------------------------------------------
+    def put(self, asset: ImageAsset, *, owner: str) -> BlobHandle:
+        key = asset.sha256
+        with self._lock:
+            now = self._clock()
+            self._last_seen[owner] = now
+            self._refs.setdefault(key, set()).add(owner)
+            self._owned.setdefault(owner, set()).add(key)
+            if key in self._memory:
+                self._memory.move_to_end(key)
+            elif key not in self._spilled:
+                self._memory[key] = asset
+                self._memory_bytes += asset.size
+                self._spill_locked()
+            self._maybe_sweep_locked(now)
+        return BlobHandle(sha256=key, mime_type=asset.mime_type, size=asset.size)
+
+    def adopt(self, handle: BlobHandle, *, owner: str) -> None:
+        """Reference a blob that may not be loaded yet (e.g. restored from a draft)."""
+
+        with self._lock:
+            self._last_seen[owner] = self._clock()
+            self._refs.setdefault(handle.sha256, set()).add(owner)
+            self._owned.setdefault(owner, set()).add(handle.sha256)
+
+    def get(self, handle: BlobHandle) -> ImageAsset | None:
+        with self._lock:
+            asset = self._memory.get(handle.sha256)
+            if asset is not None:
+                self._memory.move_to_end(handle.sha256)
+                return asset
+            spilled = self._spilled.get(handle.sha256)
+        if spilled is None:
+            return self._load(handle)
+        path, mime_type, _size = spilled
+        try:
+            with open(path, "rb") as fh:
+                mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as exc:
+            logger.warning("Spilled blob %s unreadable: %s", handle.sha256, exc)
+            return None
+        return ImageAsset(memoryview(mapped), mime_type, sha256=handle.sha256)
+
+    def _load(self, handle: BlobHandle) -> ImageAsset | None:
+        for loader in list(_LOADERS):
+            try:
+                asset = loader(handle.sha256, handle.mime_type)
+            except Exception as exc:  # noqa: BLE001 - a broken loader is just a miss
+                logger.warning("Blob loader failed for %s: %s", handle.sha256, exc)
+                continue
+            if asset is None or asset.sha256 != handle.sha256:
+                continue
+            with self._lock:
+                if self._refs.get(handle.sha256) and handle.sha256 not in self._memory:
+                    self._memory[handle.sha256] = asset
+                    self._memory_bytes += asset.size
+                    self._spill_locked()
+            return asset
+        with self._lock:
+            self._stats.misses += 1
+        return None
+
+    def touch(self, owner: str, *, session: str | None = None) -> None:
+        """Mark ``owner`` as active; ``session`` is the runtime session it belongs to."""
+
+        with self._lock:
+            now = self._clock()
+            self._last_seen[owner] = now
+            if session:
+                self._sessions[owner] = session
+            self._maybe_sweep_locked(now)
+
+    def retain(self, owner: str, live: Iterable[str]) -> None:
+        """Drop every reference ``owner`` holds except the digests in ``live``."""
+
+        keep = set(live)
+        with self._lock:
+            for key in self._owned.get(owner, set()) - keep:
+                self._unref_locked(owner, key)
+
+    def release(self, owner: str) -> None:
+        with self._lock:
+            for key in list(self._owned.get(owner, ())):
+                self._unref_locked(owner, key)
+            self._owned.pop(owner, None)
+            self._last_seen.pop(owner, None)
+            self._sessions.pop(owner, None)
+
+    def sweep(self, now: float | None = None) -> int:
+        """Release owners idle past the session TTL whose session has ended; return how many.
+
+        Idle owners whose session is still open keep their blobs, moved to disk.
+        """
+
+        with self._lock:
+            current = self._clock() if now is None else now
+            self._last_sweep = current
+            idle = [
+                owner
+                for owner, seen in self._last_seen.items()
+                if current - seen > self.session_ttl_seconds
+            ]
+            released = 0
+            for owner in idle:
+                if self._session_open_locked(owner):
+                    self._spill_keys_locked(self._owned.get(owner, ()))
+                    continue
+                self.release(owner)
+                released += 1
+            return released
+
+    def stats(self) -> BlobStoreStats:
+        with self._lock:
+            return BlobStoreStats(
+                memory_bytes=self._memory_bytes,
+                encoded_bytes=sum(asset.encoded_size for asset in self._memory.values()),
+                memory_entries=len(self._memory),
+                disk_bytes=sum(size for _path, _mime, size in self._spilled.values()),
+                disk_entries=len(self._spilled),
+                owners=len(self._last_seen),
+                spills=self._stats.spills,
+                misses=self._stats.misses,
+            )
+
+    def drop_encodings(self) -> int:
+        """Release cached base64/data URI text on in-memory blobs; return bytes freed."""
+
+        with self._lock:
+            return sum(asset.drop_encodings() for asset in self._memory.values())
+
+    def shrink_memory(self, target_bytes: int) -> int:
+        """Spill blobs to disk until at most ``target_bytes`` stay in memory; return bytes moved."""
+
+        with self._lock:
+            before = self._memory_bytes
+            limit = self.memory_limit_bytes
+            self.memory_limit_bytes = max(int(target_bytes), 0)
+            try:
+                self._spill_locked()
+            finally:
+                self.memory_limit_bytes = limit
+            return before - self._memory_bytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._spilled.clear()
+            self._refs.clear()
+            self._owned.clear()
+            self._last_seen.clear()
+            self._sessions.clear()
+            self._memory_bytes = 0
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    # Internal helpers ------------------------------------------------------------
+    def _unref_locked(self, owner: str, key: str) -> None:
+        self._owned.get(owner, set()).discard(key)
+        holders = self._refs.get(key)
+        if holders is not None:
+            holders.discard(owner)
+            if holders:
+                return
+            self._refs.pop(key, None)
+        asset = self._memory.pop(key, None)
+        if asset is not None:
+            self._memory_bytes -= asset.size
+        spilled = self._spilled.pop(key, None)
+        if spilled is not None:
+            try:
+                spilled[0].unlink()
+            except OSError:  # pragma: no cover - file still mapped on some platforms
+                pass
+
+    def _session_open_locked(self, owner: str) -> bool:
+        session = self._sessions.get(owner)
+        if session is None or self._session_probe is None:
+            return False
+        try:
+            return bool(self._session_probe(session))
+        except Exception as exc:  # noqa: BLE001 - an unknown session falls back to the TTL
+            logger.warning("Session probe failed for %s: %s", session, exc)
+            return False
+
+    def _spill_keys_locked(self, keys: Iterable[str]) -> None:
+        for key in [key for key in keys if key in self._memory]:
+            asset = self._memory.pop(key)
+            try:
+                path = self._write_locked(key, asset)
+            except OSError as exc:
+                logger.warning("Blob spill failed for %s: %s", key, exc)
+                self._memory[key] = asset
+                return
+            self._memory_bytes -= asset.size
+            self._spilled[key] = (path, asset.mime_type, asset.size)
+            self._stats.spills += 1
+
+    def _spill_locked(self) -> None:
+        while self._memory_bytes > self.memory_limit_bytes and self._memory:
+            key, asset = self._memory.popitem(last=False)
+            try:
+                path = self._write_locked(key, asset)
+            except OSError as exc:
+                logger.warning("Blob spill failed for %s: %s", key, exc)
+                self._memory[key] = asset
+                self._memory.move_to_end(key, last=False)
+                return
+            self._memory_bytes -= asset.size
+            self._spilled[key] = (path, asset.mime_type, asset.size)
+            self._stats.spills += 1
+
+    def _write_locked(self, key: str, asset: ImageAsset) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{key}.bin"
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(asset.view)
+            os.replace(tmp_name, path)
+        except OSError:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+        return path
+
+    def _maybe_sweep_locked(self, now: float) -> None:
+        if now - self._last_sweep >= _SWEEP_INTERVAL_SECONDS:
+            self.sweep(now)
+
+
+@lru_cache(maxsize=1)
+def get_blob_store() -> BlobStore:
+    """Return the process-wide blob store configured from the environment."""
+
+    return BlobStore(
+        BLOB_STORE_DIR,
+        memory_limit_bytes=BLOB_STORE_MEMORY_BYTES,
+        session_ttl_seconds=BLOB_STORE_SESSION_TTL_SECONDS,
+        session_probe=streamlit_session_active,
+    )
+
+
+def reset_blob_store() -> None:
+    """Clear and drop the process-wide store (used in tests)."""
+
+    if get_blob_store.cache_info().currsize:
+        get_blob_store().clear()
+    get_blob_store.cache_clear()
+
+
+__all__ = [
+    "BlobHandle",
+    "BlobStore",
+    "BlobStoreStats",
+    "SessionProbe",
+    "get_blob_store",
+    "register_blob_loader",
+    "reset_blob_store",
+    "streamlit_session_active",
+    "streamlit_session_id",
+]
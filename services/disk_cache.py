@@ -0,0 +1,153 @@
+"""Size-capped, least-recently-used byte cache stored on local disk."""
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    bytes_stored: int = 0
+    entries: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class DiskLRUCache:
+    """Store opaque byte payloads under hex keys, evicting the least recently used.
+
+    Recency is tracked through file modification times so the ordering survives
+    process restarts; the in-memory index is rebuilt lazily from the directory.
+    """
+
+    def __init__(self, directory: str | Path, *, max_bytes: int) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max(int(max_bytes), 0)
+        self._lock = threading.Lock()
+        self._index: dict[str, tuple[int, float]] | None = None
+        self._stats = CacheStats()
+        self._clock = 0.0
+
+    # Internal helpers ------------------------------------------------------------
+    def _path_for(self, key: str) -> Path:
+        normalized = key.strip().lower()
+        if not normalized or not all(ch in "0123456789abcdef" for ch in normalized):
+            raise ValueError(f"cache keys must be hex digests: {key!r}")
+        return self.directory / normalized[:2] / f"{normalized}.bin"
+
+    def _ensure_index(self) -> dict[str, tuple[int, float]]:
+        if self._index is not None:
+            return self._index
+        index: dict[str, tuple[int, float]] = {}
+        if self.directory.is_dir():
+            for path in self.directory.glob("*/*.bin"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                index[path.stem] = (stat.st_size, stat.st_mtime)
+        self._index = index
+        return index
+
+    def _touch_locked(self, path: Path) -> float:
+        # Keep recency strictly increasing even when the filesystem clock is coarse.
+        self._clock = max(time.time(), self._clock + 0.001)
+        try:
+            os.utime(path, (self._clock, self._clock))
+        except OSError:  # pragma: no cover - read-only cache directory
+            pass
+        return self._clock
+
+    def _evict_locked(self, index: dict[str, tuple[int, float]]) -> None:
+        total = sum(size for size, _ in index.values())
+        if total <= self.max_bytes:
+            return
+        for key, (size, _mtime) in sorted(index.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            try:
+                self._path_for(key).unlink(missing_ok=True)
+            except OSError as exc:  # pragma: no cover - filesystem edge case
+                logger.warning("Failed to evict cache entry %s: %s", key, exc)
+                continue
+            index.pop(key, None)
+            total -= size
+            self._stats.evictions += 1
+
+    # Public API ------------------------------------------------------------------
+    def get(self, key: str) -> bytes | None:
+        path = self._path_for(key)
+        with self._lock:
+            index = self._ensure_index()
+            try:
+                data = path.read_bytes()
+            except FileNotFoundError:
+                index.pop(path.stem, None)
+                self._stats.misses += 1
+                return None
+            except OSError as exc:  # pragma: no cover - filesystem edge case
+                logger.warning("Failed to read cache entry %s: %s", key, exc)
+                self._stats.misses += 1
+                return None
+            index[path.stem] = (len(data), self._touch_locked(path))
+            self._stats.hits += 1
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if self.max_bytes <= 0 or len(data) > self.max_bytes:
+            return
+        path = self._path_for(key)
+        with self._lock:
+            index = self._ensure_index()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a sibling temp file first so readers never observe partial data.
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as handle:
+                    handle.write(data)
+                os.replace(tmp_name, path)
+            except OSError as exc:  # pragma: no cover - filesystem edge case
+                logger.warning("Failed to write cache entry %s: %s", key, exc)
+                Path(tmp_name).unlink(missing_ok=True)
+                return
+            index[path.stem] = (len(data), self._touch_locked(path))
+            self._evict_locked(index)
+
+    def discard(self, key: str) -> None:
+        path = self._path_for(key)
+        with self._lock:
+            path.unlink(missing_ok=True)
+            self._ensure_index().pop(path.stem, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._ensure_index()):
+                self._path_for(key).unlink(missing_ok=True)
+            self._index = {}
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            index = self._ensure_index()
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                bytes_stored=sum(size for size, _ in index.values()),
+                entries=len(index),
+            )
+
+
+__all__ = ["CacheStats", "DiskLRUCache"]
@@ -0,0 +1,156 @@
+"""Local disk cache for story HTML downloaded from GCS.
+
+The library view used to download the full export (several MB of base64
+images) every time an entry was selected or the page reran. Downloads are now
+kept in a size-capped LRU on disk, keyed by object name plus GCS generation,
+and stored as the bucket holds them (gzip), so a popular story is fetched once
+per replica. The generation remembered for an object is trusted for
+``EXPORT_CACHE_REVALIDATE_SECONDS``; after that a metadata request revalidates
+it before the cached bytes are served again.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable
+
+from gcs_storage import (
+    decode_export_html,
+    download_gcs_export,
+    download_gcs_export_bytes,
+    get_gcs_export_generation,
+)
+from services.disk_cache import DiskLRUCache
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CACHE_ENABLED = (os.getenv("EXPORT_CACHE_ENABLED", "true").strip().lower() not in {"0", "false", "no"})
+EXPORT_CACHE_DIR = (os.getenv("EXPORT_CACHE_DIR") or "").strip() or ".cache/exports"
+_MAX_MB_ENV = (os.getenv("EXPORT_CACHE_MAX_MB") or "").strip()
+EXPORT_CACHE_MAX_BYTES = (int(_MAX_MB_ENV) if _MAX_MB_ENV.isdigit() else 256) * 1024 * 1024
+_REVALIDATE_ENV = (os.getenv("EXPORT_CACHE_REVALIDATE_SECONDS") or "").strip()
+EXPORT_CACHE_REVALIDATE_SECONDS = int(_REVALIDATE_ENV) if _REVALIDATE_ENV.isdigit() else 300
+
+
+@dataclass(slots=True)
+class ExportCacheStats:
+    hits: int = 0
+    misses: int = 0
+    revalidations: int = 0
+    evictions: int = 0
+    bytes_stored: int = 0
+    entries: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def _cache_key(object_name: str, generation: int) -> str:
+    return hashlib.sha256(f"{object_name}\x1f{generation}".encode("utf-8")).hexdigest()
+
+
+class ExportHtmlCache:
+    """Serve export HTML from disk when the object's generation is unchanged."""
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        max_bytes: int,
+        revalidate_seconds: float = EXPORT_CACHE_REVALIDATE_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._disk = DiskLRUCache(directory, max_bytes=max_bytes)
+        self._revalidate_seconds = revalidate_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        # object name -> (generation, monotonic time it was last confirmed)
+        self._generations: dict[str, tuple[int, float]] = {}
+        self._stats = ExportCacheStats()
+
+    def _generation(self, object_name: str) -> int | None:
+        with self._lock:
+            known = self._generations.get(object_name)
+        if known is not None and self._clock() - known[1] < self._revalidate_seconds:
+            return known[0]
+
+        generation = get_gcs_export_generation(object_name)
+        with self._lock:
+            self._stats.revalidations += 1
+            if generation is None:
+                self._generations.pop(object_name, None)
+            else:
+                self._generations[object_name] = (generation, self._clock())
+        return generation
+
+    def load(self, object_name: str) -> str | None:
+        generation = self._generation(object_name)
+        if generation is not None:
+            raw = self._disk.get(_cache_key(object_name, generation))
+            if raw is not None:
+                with self._lock:
+                    self._stats.hits += 1
+                return decode_export_html(raw)
+
+        with self._lock:
+            self._stats.misses += 1
+        fetched = download_gcs_export_bytes(object_name, generation=generation)
+        if fetched is None:
+            return None
+        data, fetched_generation = fetched
+        if fetched_generation is not None:
+            self._disk.put(_cache_key(object_name, fetched_generation), data)
+            with self._lock:
+                self._generations[object_name] = (fetched_generation, self._clock())
+        return decode_export_html(data)
+
+    def stats(self) -> ExportCacheStats:
+        disk = self._disk.stats()
+        with self._lock:
+            return ExportCacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                revalidations=self._stats.revalidations,
+                evictions=disk.evictions,
+                bytes_stored=disk.bytes_stored,
+                entries=disk.entries,
+            )
+
+
+@lru_cache(maxsize=1)
+def get_export_cache() -> ExportHtmlCache | None:
+    """Return the process-wide export cache, or None when disabled."""
+
+    if not EXPORT_CACHE_ENABLED or EXPORT_CACHE_MAX_BYTES <= 0:
+        return None
+    return ExportHtmlCache(EXPORT_CACHE_DIR, max_bytes=EXPORT_CACHE_MAX_BYTES)
+
+
+def load_export_html(object_name: str) -> str | None:
+    """Export HTML for ``object_name``, from the local cache when it is still current."""
+
+    cache = get_export_cache()
+    if cache is None:
+        return download_gcs_export(object_name)
+    try:
+        return cache.load(object_name)
+    except (OSError, UnicodeDecodeError) as exc:
+        logger.warning("Cached export %s unreadable, downloading directly: %s", object_name, exc)
+        return download_gcs_export(object_name)
+
+
+__all__ = [
+    "EXPORT_CACHE_ENABLED",
+    "ExportCacheStats",
+    "ExportHtmlCache",
+    "get_export_cache",
+    "load_export_html",
+]
@@ -0,0 +1,288 @@
+"""Background export jobs for the Step 6 page.
+
+Narration, HTML rendering, GCS upload and library/token bookkeeping used to
+run inside the Streamlit render path. They now run on a process-wide worker
+pool, one job per story signature, so the page can draw the story at once and
+pick up the artifacts on a later rerun. Submitting the same signature again
+returns the existing job; a failed job is only restarted on an explicit retry,
+which resumes after the last stage that completed.
+"""
+from __future__ import annotations
+
+import dataclasses
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable
+
+from activity_log import log_event
+from services.generation_tokens import GenerationTokenStatus, InsufficientGenerationTokens, consume_token
+from services.story_service import StoryBundle, render_story_html, upload_story_html
+from story_drafts import discard_draft
+from story_library import record_story_export
+from tts_client import generate_story_audio
+
+logger = logging.getLogger(__name__)
+
+_WORKERS_ENV = (os.getenv("EXPORT_JOB_WORKERS") or "").strip()
+EXPORT_JOB_WORKERS = max(int(_WORKERS_ENV), 1) if _WORKERS_ENV.isdigit() else 2
+_TTL_ENV = (os.getenv("EXPORT_JOB_TTL_SECONDS") or "").strip()
+EXPORT_JOB_TTL_SECONDS = int(_TTL_ENV) if _TTL_ENV.isdigit() else 30 * 60
+
+QUEUED = "queued"
+SYNTHESIZING = "synthesizing"
+RENDERING = "rendering"
+UPLOADING = "uploading"
+RECORDED = "recorded"
+FAILED = "failed"
+
+AUDIO_ERROR_MESSAGE = "음성 파일을 준비하지 못했어요. 잠시 후 다시 시도해 주세요."
+
+
+@dataclass(slots=True)
+class ExportRequest:
+    signature: str
+    bundle: StoryBundle
+    full_text: str
+    story_id: str | None = None
+    author: str | None = None
+    user_id: str | None = None
+    user_email: str | None = None
+    synthesize_audio: bool = False
+    # Narration already produced for this signature; skips synthesis when set.
+    audio_url: str | None = None
+    audio_blob: str | None = None
+
+
+@dataclass(slots=True)
+class ExportJob:
+    signature: str
+    state: str = QUEUED
+    error: str | None = None
+    attempts: int = 0
+    audio_done: bool = False
+    audio_url: str | None = None
+    audio_blob: str | None = None
+    audio_error: str | None = None
+    local_path: str | None = None
+    uploaded: bool = False
+    gcs_object: str | None = None
+    gcs_url: str | None = None
+    manifest_path: str | None = None
+    manifest_object: str | None = None
+    thumbnail_url: str | None = None
+    thumbnail_path: str | None = None
+    token_status: GenerationTokenStatus | None = None
+    token_consumed: bool = False
+    token_error: str | None = None
+    updated_at: float = 0.0
+
+    @property
+    def done(self) -> bool:
+        return self.state in {RECORDED, FAILED}
+
+
+class _Entry:
+    __slots__ = ("job", "request")
+
+    def __init__(self, job: ExportJob, request: ExportRequest) -> None:
+        self.job = job
+        self.request: ExportRequest | None = request
+
+
+class ExportJobManager:
+    """Run export jobs on a small thread pool, keyed by (user, story signature)."""
+
+    def __init__(
+        self,
+        *,
+        max_workers: int = EXPORT_JOB_WORKERS,
+        ttl_seconds: float = EXPORT_JOB_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="story-export")
+        self._ttl = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[str, str], _Entry] = {}
+
+    @staticmethod
+    def _key(signature: str, user_id: str | None) -> tuple[str, str]:
+        return (str(user_id or ""), signature)
+
+    def submit(self, request: ExportRequest, *, retry: bool = False) -> ExportJob:
+        """Start a job for ``request.signature`` unless one exists; return a snapshot of it."""
+
+        key = self._key(request.signature, request.user_id)
+        with self._lock:
+            self._prune()
+            entry = self._entries.get(key)
+            if entry is not None and not (retry and entry.job.state == FAILED):
+                return dataclasses.replace(entry.job)
+            if entry is None:
+                entry = _Entry(ExportJob(signature=request.signature), request)
+                self._entries[key] = entry
+            else:
+                entry.request = request
+            entry.job.state = QUEUED
+            entry.job.error = None
+            entry.job.attempts += 1
+            entry.job.updated_at = self._clock()
+            snapshot = dataclasses.replace(entry.job)
+        self._executor.submit(self._run, entry)
+        return snapshot
+
+    def get(self, signature: str, user_id: str | None = None) -> ExportJob | None:
+        with self._lock:
+            entry = self._entries.get(self._key(signature, user_id))
+            return dataclasses.replace(entry.job) if entry else None
+
+    def _prune(self) -> None:
+        cutoff = self._clock() - self._ttl
+        stale = [key for key, entry in self._entries.items() if entry.job.done and entry.job.updated_at < cutoff]
+        for key in stale:
+            del self._entries[key]
+
+    def _set(self, entry: _Entry, **changes: object) -> None:
+        with self._lock:
+            for name, value in changes.items():
+                setattr(entry.job, name, value)
+            entry.job.updated_at = self._clock()
+
+    def _run(self, entry: _Entry) -> None:
+        request = entry.request
+        job = entry.job
+        if request is None:
+            return
+        try:
+            if not job.audio_done:
+                self._synthesize(entry, request)
+            if not job.local_path:
+                self._set(entry, state=RENDERING)
+                bundle = dataclasses.replace(request.bundle, audio_url=job.audio_url)
+                self._set(entry, local_path=str(render_story_html(bundle=bundle, author=request.author)))
+            if not job.uploaded:
+                self._set(entry, state=UPLOADING)
+                result = upload_story_html(Path(job.local_path))
+                self._set(
+                    entry,
+                    uploaded=True,
+                    gcs_object=result.gcs_object,
+                    gcs_url=result.gcs_url,
+                    manifest_path=result.manifest_path,
+                    manifest_object=result.manifest_object,
+                    thumbnail_url=result.thumbnail_url,
+                    thumbnail_path=result.thumbnail_path,
+                )
+                log_event(
+                    type="story",
+                    action="story save",
+                    result="success",
+                    user_id=request.user_email,
+                    params=[request.story_id, request.bundle.title, job.gcs_object or job.local_path, job.gcs_url, "auto-save"],
+                )
+            self._record(entry, request)
+        except Exception as exc:  # noqa: BLE001 - surfaced on the job for the page to show
+            logger.warning("Story export %s failed: %s", job.signature[:12], exc)
+            self._set(entry, state=FAILED, error=str(exc))
+            log_event(
+                type="story",
+                action="story save",
+                result="fail",
+                user_id=request.user_email,
+                params=[request.story_id, request.bundle.title, None, None, str(exc)],
+            )
+            return
+        with self._lock:
+            entry.request = None  # release the image buffers held by the bundle
+        self._set(entry, state=RECORDED)
+
+    def _synthesize(self, entry: _Entry, request: ExportRequest) -> None:
+        if request.audio_url or not (request.synthesize_audio and request.story_id):
+            self._set(entry, audio_done=True, audio_url=request.audio_url, audio_blob=request.audio_blob)
+            return
+        self._set(entry, state=SYNTHESIZING)
+        audio = generate_story_audio(story_id=request.story_id, full_text=request.full_text, voice_name=None)
+        if audio is None:
+            self._set(entry, audio_done=True, audio_url=None, audio_blob=None, audio_error=AUDIO_ERROR_MESSAGE)
+            return
+        self._set(entry, audio_done=True, audio_url=audio.public_url, audio_blob=audio.blob_name, audio_error=None)
+        log_event(
+            type="tts",
+            action="story audio",
+            result="success",
+            user_id=request.user_email,
+            params=[request.story_id, audio.blob_name, audio.public_url, None, None],
+        )
+
+    def _record(self, entry: _Entry, request: ExportRequest) -> None:
+        job = entry.job
+        uid = str(request.user_id or "").strip()
+        if not uid:
+            return
+        try:
+            record_story_export(
+                user_id=uid,
+                title=request.bundle.title,
+                local_path=job.local_path,
+                gcs_object=job.gcs_object,
+                gcs_url=job.gcs_url,
+                story_id=request.story_id,
+                author_name=request.author,
+                manifest_path=job.manifest_path,
+                manifest_object=job.manifest_object,
+                thumbnail_url=job.thumbnail_url,
+                thumbnail_path=job.thumbnail_path,
+            )
+            discard_draft(request.story_id)
+        except Exception as exc:  # noqa: BLE001 - the export itself succeeded
+            log_event(
+                type="story",
+                action="story save",
+                result="fail",
+                user_id=request.user_email,
+                params=[request.story_id, request.bundle.title, job.gcs_object or job.local_path, job.gcs_url, f"library error: {exc}"],
+            )
+
+        # consume_token is idempotent per signature, so a retried job never double-charges.
+        try:
+            outcome = consume_token(uid=uid, signature=request.signature)
+        except InsufficientGenerationTokens:
+            self._set(entry, token_error="생성 토큰이 부족해 새로 만든 이야기를 저장할 수 없었어요.")
+            token_params = [request.story_id, uid, request.signature, "insufficient", None]
+            token_result = "fail"
+        except Exception as exc:  # noqa: BLE001
+            self._set(entry, token_error=f"토큰을 차감하지 못했어요: {exc}")
+            token_params = [request.story_id, uid, request.signature, "error", str(exc)]
+            token_result = "fail"
+        else:
+            self._set(entry, token_status=outcome.status, token_consumed=outcome.consumed, token_error=None)
+            token_params = [request.story_id, uid, request.signature, str(outcome.status.tokens), None]
+            token_result = "success" if outcome.consumed else "noop"
+        log_event(type="user", action="token consume", result=token_result, user_id=request.user_email, params=token_params)
+
+
+@lru_cache(maxsize=1)
+def get_export_job_manager() -> ExportJobManager:
+    return ExportJobManager()
+
+
+__all__ = [
+    "EXPORT_JOB_TTL_SECONDS",
+    "EXPORT_JOB_WORKERS",
+    "FAILED",
+    "QUEUED",
+    "RECORDED",
+    "RENDERING",
+    "SYNTHESIZING",
+    "UPLOADING",
+    "ExportJob",
+    "ExportJobManager",
+    "ExportRequest",
+    "get_export_job_manager",
+]
@@ -4,13 +4,21 @@ from __future__ import annotations
 import base64
 import io
 import os
+import threading
+from contextlib import contextmanager
 from dataclasses import dataclass
 from types import SimpleNamespace
-from typing import Any, Callable, Iterable, Tuple
+from typing import Any, Callable, Iterable, Iterator, Tuple
 
-from PIL import Image
 from dotenv import load_dotenv
 
+from services.image_asset import ImageAsset
+from services.image_cache import CachedImage, get_image_cache, make_image_cache_key
+from utils.lazy_import import lazy_module
+
+# Pillow is only needed when a reference image is attached to a request.
+Image = lazy_module("PIL.Image")
+
 # Quiet gRPC/absl logs before importing the SDK.
 os.environ.setdefault("GRPC_VERBOSITY", "ERROR")
 os.environ.setdefault("GRPC_TRACE", "")
@@ -32,6 +40,13 @@ _IMAGE_MODEL_ENV = (os.getenv("GEMINI_IMAGE_MODEL") or "").strip()
 IMAGE_MODEL = _IMAGE_MODEL_ENV or "gemini-1.5-flash"
 IMAGE_MODEL_FALLBACKS: Tuple[str, ...] = tuple()
 
+_MAX_CONCURRENT_ENV = (os.getenv("GEMINI_MAX_CONCURRENT_REQUESTS") or "").strip()
+MAX_CONCURRENT_REQUESTS = max(int(_MAX_CONCURRENT_ENV), 1) if _MAX_CONCURRENT_ENV.isdigit() else 4
+
+# Process-wide limiter shared by every session so parallel fan-outs cannot
+# exceed the configured number of in-flight Gemini calls.
+_REQUEST_SLOTS = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+
 _GENAI_MODULE: Any | None = None
 _GENAI_CONFIGURED = False
 genai: Any = SimpleNamespace(GenerativeModel=None)
@@ -67,6 +82,14 @@ def get_genai_module():
     return _GENAI_MODULE
 
 
+@contextmanager
+def request_slot() -> Iterator[None]:
+    """Hold one slot of the global Gemini request limiter."""
+
+    with _REQUEST_SLOTS:
+        yield
+
+
 @dataclass(frozen=True)
 class TextGenerationResult:
     ok: bool
@@ -113,7 +136,8 @@ def generate_text_with_retry(
     for attempt in range(1, attempts + 1):
         try:
             model = factory(target_model)
-            response = model.generate_content(prompt)
+            with request_slot():
+                response = model.generate_content(prompt)
         except Exception as exc:
             last_error = {"error": f"{type(exc).__name__}: {exc}", "attempt": attempt}
             continue
@@ -143,7 +167,8 @@ def generate_text_with_retry(
 def _coerce_bytes(value):
     if value is None:
         return None
-    if isinstance(value, bytes):
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        # Hand buffers through untouched; ImageAsset freezes them without copying bytes.
         return value
     if isinstance(value, str):
         try:
@@ -201,10 +226,34 @@ def _extract_image_from_response(resp):
     return None, None
 
 
-def generate_image(prompt: str, *, image_input: bytes | None = None) -> dict:
+def _image_result(asset: ImageAsset, **extra: Any) -> dict:
+    return {"asset": asset, "bytes": asset.data, "mime_type": asset.mime_type, **extra}
+
+
+def generate_image(
+    prompt: str,
+    *,
+    image_input: ImageAsset | bytes | None = None,
+    style_name: str | None = None,
+    use_cache: bool = True,
+) -> dict:
     if not API_KEY:
         return missing_api_key_error()
 
+    reference = ImageAsset.coerce(image_input)
+    cache = get_image_cache() if use_cache else None
+    cache_key = None
+    if cache is not None:
+        cache_key = make_image_cache_key(
+            model=IMAGE_MODEL,
+            prompt=prompt,
+            style_name=style_name,
+            reference_hash=reference.sha256 if reference else None,
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return _image_result(ImageAsset(cached.data, cached.mime_type), cached=True)
+
     last_error: dict | None = None
 
     for attempt in range(1, 4):
@@ -234,10 +283,11 @@ def generate_image(prompt: str, *, image_input: bytes | None = None) -> dict:
 
         try:
             content = [prompt]
-            if image_input:
-                img = Image.open(io.BytesIO(image_input))
+            if reference:
+                img = Image.open(io.BytesIO(reference.data))
                 content.append(img)
-            response = model.generate_content(content)
+            with request_slot():
+                response = model.generate_content(content)
         except Exception as exc:
             last_exc = exc
 
@@ -259,7 +309,10 @@ def generate_image(prompt: str, *, image_input: bytes | None = None) -> dict:
             last_error = {"error": f"모델이 이미지 데이터를 반환하지 않았습니다: {error_details}", "attempt": attempt}
             continue
 
-        return {"bytes": image_bytes, "mime_type": mime_type or "image/png"}
+        asset = ImageAsset(image_bytes, mime_type or "image/png")
+        if cache is not None and cache_key:
+            cache.put(cache_key, CachedImage(data=asset.data, mime_type=asset.mime_type))
+        return _image_result(asset)
 
     if last_error is None:
         last_error = {"error": "이미지 생성에 실패했습니다."}
@@ -272,6 +325,7 @@ __all__ = [
     "TEXT_MODEL",
     "IMAGE_MODEL",
     "IMAGE_MODEL_FALLBACKS",
+    "MAX_CONCURRENT_REQUESTS",
     "genai",
     "get_genai_module",
     "generate_text_with_retry",
@@ -279,5 +333,6 @@ __all__ = [
     "extract_text_from_response",
     "missing_api_key_error",
     "require_api_key",
+    "request_slot",
     "TextGenerationResult",
 ]
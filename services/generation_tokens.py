@@ -8,12 +8,11 @@ from typing import Any, Mapping
 
 from zoneinfo import ZoneInfo
 
+from cloud_clients import shared_client
 from google_credentials import get_service_account_credentials
+from utils.lazy_import import lazy_module
 
-try:  # pragma: no cover - optional dependency checked at runtime
-    from google.cloud import firestore  # type: ignore
-except Exception:  # pragma: no cover - degrade gracefully when package missing
-    firestore = None  # type: ignore
+firestore = lazy_module("google.cloud.firestore")
 
 
 KST = ZoneInfo("Asia/Seoul")
@@ -88,7 +87,7 @@ class InsufficientGenerationTokens(GenerationTokenError):
 
 
 def _ensure_firestore_ready() -> None:
-    if firestore is None:
+    if not firestore:
         raise RuntimeError("google-cloud-firestore must be installed for generation token tracking")
 
     project_id = _get_project_id()
@@ -115,7 +114,7 @@ def _get_firestore_client():
             project_id = project_from_creds
     if project_id:
         client_kwargs["project"] = project_id
-    return firestore.Client(**client_kwargs)  # type: ignore[arg-type]
+    return shared_client("firestore", firestore.Client, user=__name__, **client_kwargs)
 
 
 def _get_collection():
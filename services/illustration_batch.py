@@ -0,0 +1,219 @@
+"""Concurrent rendering of stage illustrations that are still missing."""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Mapping, Sequence
+
+from services.gemini_api import MAX_CONCURRENT_REQUESTS
+from services.image_asset import ImageAsset, stage_image
+
+
+@dataclass(slots=True)
+class StageIllustrationJob:
+    stage_index: int
+    stage_name: str
+    card_name: str | None
+    story: Mapping[str, Any]
+
+
+@dataclass(slots=True)
+class StageIllustrationResult:
+    stage_index: int
+    image_asset: ImageAsset | None
+    image_style: dict | None
+    image_prompt: str | None
+    image_error: str | None
+
+
+def find_missing_illustrations(stages: Sequence[Mapping[str, Any] | None] | None) -> list[int]:
+    """Return indices of stages whose text exists but whose image is missing or failed."""
+
+    missing: list[int] = []
+    for idx, entry in enumerate(stages or []):
+        if not entry:
+            continue
+        paragraphs = (entry.get("story") or {}).get("paragraphs") or []
+        if paragraphs and not stage_image(entry):
+            missing.append(idx)
+    return missing
+
+
+def build_illustration_jobs(
+    stages: Sequence[Mapping[str, Any] | None],
+    indices: Sequence[int],
+) -> list[StageIllustrationJob]:
+    jobs: list[StageIllustrationJob] = []
+    for idx in indices:
+        entry = stages[idx] if 0 <= idx < len(stages) else None
+        if not entry:
+            continue
+        jobs.append(
+            StageIllustrationJob(
+                stage_index=idx,
+                stage_name=str(entry.get("stage") or ""),
+                card_name=(entry.get("card") or {}).get("name"),
+                story=entry.get("story") or {},
+            )
+        )
+    return jobs
+
+
+def _render_job(
+    job: StageIllustrationJob,
+    *,
+    age: str,
+    topic: str | None,
+    story_type_name: str,
+    style_choice: Mapping[str, Any] | None,
+    protagonist_text: str | None,
+    reference_image: ImageAsset | None,
+    prompt_builder: Callable[..., dict],
+    image_generator: Callable[..., dict],
+) -> StageIllustrationResult:
+    prompt_data = prompt_builder(
+        story=dict(job.story),
+        age=age,
+        topic=topic,
+        story_type_name=story_type_name,
+        story_card_name=job.card_name,
+        stage_name=job.stage_name,
+        style_override=dict(style_choice) if style_choice else None,
+        use_reference_image=False,
+        protagonist_text=protagonist_text,
+    )
+    if "error" in prompt_data:
+        return StageIllustrationResult(
+            stage_index=job.stage_index,
+            image_asset=None,
+            image_style=None,
+            image_prompt=None,
+            image_error=str(prompt_data["error"]),
+        )
+
+    style_info = {
+        "name": prompt_data.get("style_name") or (style_choice or {}).get("name"),
+        "style": prompt_data.get("style_text") or (style_choice or {}).get("style"),
+    }
+    image_response = image_generator(
+        prompt_data["prompt"],
+        image_input=reference_image,
+        style_name=style_info.get("name"),
+    )
+    if "error" in image_response:
+        return StageIllustrationResult(
+            stage_index=job.stage_index,
+            image_asset=None,
+            image_style=style_info,
+            image_prompt=prompt_data["prompt"],
+            image_error=str(image_response["error"]),
+        )
+
+    return StageIllustrationResult(
+        stage_index=job.stage_index,
+        image_asset=ImageAsset.coerce(
+            image_response.get("asset") or image_response.get("bytes"),
+            image_response.get("mime_type", "image/png"),
+        ),
+        image_style=style_info,
+        image_prompt=prompt_data["prompt"],
+        image_error=None,
+    )
+
+
+def render_stage_illustrations(
+    jobs: Sequence[StageIllustrationJob],
+    *,
+    age: str,
+    topic: str | None,
+    story_type_name: str,
+    style_choice: Mapping[str, Any] | None,
+    protagonist_text: str | None = None,
+    reference_image: ImageAsset | bytes | None = None,
+    max_workers: int | None = None,
+    prompt_builder: Callable[..., dict] | None = None,
+    image_generator: Callable[..., dict] | None = None,
+) -> Iterator[StageIllustrationResult]:
+    """Fan out prompt + image generation for each job and yield results as they finish.
+
+    Workers only call the Gemini helpers, which share the global request limiter,
+    so callers are free to apply results to session state from the main thread.
+    """
+
+    if not jobs:
+        return
+
+    # Wrap once so every worker shares the same reference buffer and digest.
+    reference_image = ImageAsset.coerce(reference_image)
+
+    if prompt_builder is None or image_generator is None:
+        from gemini_client import build_image_prompt, generate_image_with_gemini
+
+        prompt_builder = prompt_builder or build_image_prompt
+        image_generator = image_generator or generate_image_with_gemini
+
+    workers = max(1, min(len(jobs), max_workers or MAX_CONCURRENT_REQUESTS))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stage-illust") as executor:
+        futures = {
+            executor.submit(
+                _render_job,
+                job,
+                age=age,
+                topic=topic,
+                story_type_name=story_type_name,
+                style_choice=style_choice,
+                protagonist_text=protagonist_text,
+                reference_image=reference_image,
+                prompt_builder=prompt_builder,
+                image_generator=image_generator,
+            ): job
+            for job in jobs
+        }
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                yield future.result()
+            except Exception as exc:  # noqa: BLE001 - surface as a per-stage failure
+                yield StageIllustrationResult(
+                    stage_index=job.stage_index,
+                    image_asset=None,
+                    image_style=None,
+                    image_prompt=None,
+                    image_error=f"{type(exc).__name__}: {exc}",
+                )
+
+
+def apply_illustration_result(
+    stages: Sequence[Mapping[str, Any] | None],
+    result: StageIllustrationResult,
+) -> list[Mapping[str, Any] | None]:
+    """Return a copy of ``stages`` with the result merged into its stage entry."""
+
+    updated = list(stages)
+    idx = result.stage_index
+    if not (0 <= idx < len(updated)) or not updated[idx]:
+        return updated
+
+    entry = dict(updated[idx])
+    entry["image_error"] = result.image_error
+    if result.image_prompt is not None:
+        entry["image_prompt"] = result.image_prompt
+    if result.image_style is not None:
+        entry["image_style"] = result.image_style
+    if result.image_asset:
+        entry["image_asset"] = result.image_asset
+        entry["image_sha256"] = result.image_asset.sha256
+        entry.pop("image_bytes", None)
+        entry["image_mime"] = result.image_asset.mime_type
+    updated[idx] = entry
+    return updated
+
+
+__all__ = [
+    "StageIllustrationJob",
+    "StageIllustrationResult",
+    "apply_illustration_result",
+    "build_illustration_jobs",
+    "find_missing_illustrations",
+    "render_stage_illustrations",
+]
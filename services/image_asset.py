@@ -0,0 +1,151 @@
+"""Immutable image payloads shared from generation through export."""
+from __future__ import annotations
+
+import base64
+import hashlib
+from typing import Any, Mapping
+
+
+class ImageAsset:
+    """Image bytes plus MIME type with derived values computed at most once.
+
+    The payload is kept as the original ``bytes`` object (or a read-only
+    ``memoryview``) so session state, stage entries and exports all share one
+    buffer. The SHA-256 digest, base64 text and data URI are computed lazily
+    and cached on the instance.
+    """
+
+    __slots__ = ("_payload", "_mime_type", "_bytes", "_sha256", "_base64", "_data_uri", "__weakref__")
+
+    def __init__(
+        self,
+        payload: bytes | bytearray | memoryview,
+        mime_type: str | None = "image/png",
+        *,
+        sha256: str | None = None,
+    ) -> None:
+
+        if isinstance(payload, bytearray):
+            payload = bytes(payload)  # freeze mutable buffers once
+        elif isinstance(payload, memoryview) and not payload.readonly:
+            payload = payload.toreadonly()
+        elif not isinstance(payload, (bytes, memoryview)):
+            raise TypeError(f"ImageAsset payload must be bytes-like, not {type(payload).__name__}")
+        object.__setattr__(self, "_payload", payload)
+        object.__setattr__(self, "_mime_type", (mime_type or "image/png").strip() or "image/png")
+        object.__setattr__(self, "_bytes", payload if isinstance(payload, bytes) else None)
+        # Callers holding a content-addressed key pass it so the payload is never rehashed.
+        object.__setattr__(self, "_sha256", sha256)
+        object.__setattr__(self, "_base64", None)
+        object.__setattr__(self, "_data_uri", None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("ImageAsset is immutable")
+
+    # Constructors ----------------------------------------------------------------
+    @classmethod
+    def coerce(cls, value: Any, mime_type: str | None = "image/png") -> "ImageAsset | None":
+        """Wrap ``value`` as an asset, passing existing assets through untouched.
+
+        Handles exposing ``resolve_asset()`` (see ``services.blob_store``) are
+        resolved to the asset they point at.
+        """
+
+        if value is None:
+            return None
+        if isinstance(value, ImageAsset):
+            return value
+        resolver = getattr(value, "resolve_asset", None)
+        if callable(resolver):
+            return resolver()
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return cls(value, mime_type) if len(value) else None
+        return None
+
+    # Payload accessors ------------------------------------------------------------
+    @property
+    def mime_type(self) -> str:
+        return self._mime_type
+
+    @property
+    def view(self) -> memoryview:
+        """Zero-copy read-only view of the payload."""
+
+        return memoryview(self._payload).toreadonly()
+
+    @property
+    def data(self) -> bytes:
+        """The payload as ``bytes`` (no copy unless the asset wraps a memoryview)."""
+
+        if self._bytes is None:
+            object.__setattr__(self, "_bytes", bytes(self._payload))
+        return self._bytes  # type: ignore[return-value]
+
+    @property
+    def size(self) -> int:
+        return self._payload.nbytes if isinstance(self._payload, memoryview) else len(self._payload)
+
+    # Derived values --------------------------------------------------------------
+    @property
+    def sha256(self) -> str:
+        if self._sha256 is None:
+            object.__setattr__(self, "_sha256", hashlib.sha256(self._payload).hexdigest())
+        return self._sha256  # type: ignore[return-value]
+
+    @property
+    def base64(self) -> str:
+        if self._base64 is None:
+            object.__setattr__(self, "_base64", base64.b64encode(self._payload).decode("ascii"))
+        return self._base64  # type: ignore[return-value]
+
+    @property
+    def data_uri(self) -> str:
+        if self._data_uri is None:
+            object.__setattr__(self, "_data_uri", f"data:{self._mime_type};base64,{self.base64}")
+        return self._data_uri  # type: ignore[return-value]
+
+    @property
+    def encoded_size(self) -> int:
+        """Approximate bytes held by cached base64 text and data URI."""
+
+        return len(self._base64 or "") + len(self._data_uri or "")
+
+    def drop_encodings(self) -> int:
+        """Release cached encodings and return the approximate bytes freed."""
+
+        freed = self.encoded_size
+        object.__setattr__(self, "_base64", None)
+        object.__setattr__(self, "_data_uri", None)
+        return freed
+
+    # Dunder helpers --------------------------------------------------------------
+    def __len__(self) -> int:
+        return self.size
+
+    def __bool__(self) -> bool:
+        return self.size > 0
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ImageAsset):
+            return NotImplemented
+        return self._mime_type == other._mime_type and self.sha256 == other.sha256
+
+    def __hash__(self) -> int:
+        return hash((self._mime_type, self.sha256))
+
+    def __repr__(self) -> str:
+        return f"ImageAsset(mime_type={self._mime_type!r}, size={self.size})"
+
+
+def stage_image(entry: Mapping[str, Any] | None) -> ImageAsset | None:
+    """Return the illustration stored on a stage entry, accepting legacy ``image_bytes``."""
+
+    if not entry:
+        return None
+    asset = entry.get("image_asset")
+    if asset is not None:
+        return ImageAsset.coerce(asset, entry.get("image_mime"))
+    return ImageAsset.coerce(entry.get("image_bytes"), entry.get("image_mime"))
+
+
+__all__ = ["ImageAsset", "stage_image"]
@@ -0,0 +1,164 @@
+"""Content-addressed cache for generated illustrations."""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Protocol
+
+from services.disk_cache import CacheStats, DiskLRUCache
+
+logger = logging.getLogger(__name__)
+
+IMAGE_CACHE_ENABLED = (os.getenv("IMAGE_CACHE_ENABLED", "true").strip().lower() not in {"0", "false", "no"})
+IMAGE_CACHE_DIR = (os.getenv("IMAGE_CACHE_DIR") or "").strip() or ".cache/images"
+_MAX_MB_ENV = (os.getenv("IMAGE_CACHE_MAX_MB") or "").strip()
+IMAGE_CACHE_MAX_BYTES = (int(_MAX_MB_ENV) if _MAX_MB_ENV.isdigit() else 512) * 1024 * 1024
+IMAGE_CACHE_GCS = (os.getenv("IMAGE_CACHE_GCS", "false").strip().lower() in {"1", "true", "yes"})
+_GCS_CACHE_FOLDER = "image-cache/"
+
+
+@dataclass(frozen=True, slots=True)
+class CachedImage:
+    data: bytes
+    mime_type: str
+
+
+class ImageCacheBackend(Protocol):
+    def get(self, key: str) -> CachedImage | None: ...
+
+    def put(self, key: str, image: CachedImage) -> None: ...
+
+
+def make_image_cache_key(
+    *,
+    model: str,
+    prompt: str,
+    style_name: str | None,
+    reference_hash: str | None,
+) -> str:
+    """Return a stable hex key for an image request.
+
+    The reference image contributes its precomputed SHA-256 digest so the
+    key never requires rehashing the reference bytes.
+    """
+
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    raw = "\x1f".join([model or "", prompt_hash, (style_name or "").strip(), reference_hash or "-"])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _pack(image: CachedImage) -> bytes:
+    # MIME types never contain newlines, so the first one separates header and payload.
+    return image.mime_type.encode("ascii", "ignore") + b"\n" + image.data
+
+
+def _unpack(raw: bytes) -> CachedImage | None:
+    header, sep, payload = raw.partition(b"\n")
+    if not sep or not payload:
+        return None
+    return CachedImage(data=payload, mime_type=header.decode("ascii", "ignore") or "image/png")
+
+
+class LocalImageCache:
+    """Disk-backed image cache capped by total size with LRU eviction."""
+
+    def __init__(self, directory: str | Path, *, max_bytes: int) -> None:
+        self._disk = DiskLRUCache(directory, max_bytes=max_bytes)
+
+    def get(self, key: str) -> CachedImage | None:
+        raw = self._disk.get(key)
+        return _unpack(raw) if raw is not None else None
+
+    def put(self, key: str, image: CachedImage) -> None:
+        self._disk.put(key, _pack(image))
+
+    def stats(self) -> CacheStats:
+        return self._disk.stats()
+
+
+class GCSImageCache:
+    """Bucket-backed image cache shared by every replica."""
+
+    def get(self, key: str) -> CachedImage | None:
+        import gcs_storage
+
+        if not gcs_storage.is_gcs_available():
+            return None
+        try:
+            bucket = gcs_storage._get_client().bucket(gcs_storage.GCS_BUCKET_NAME)
+            blob = bucket.get_blob(gcs_storage._qualify_object_name(f"{_GCS_CACHE_FOLDER}{key}"))
+            if blob is None:
+                return None
+            data = blob.download_as_bytes()
+        except Exception as exc:  # pragma: no cover - network error path
+            logger.warning("Image cache lookup failed for %s: %s", key, exc)
+            return None
+        if not data:
+            return None
+        return CachedImage(data=data, mime_type=getattr(blob, "content_type", None) or "image/png")
+
+    def put(self, key: str, image: CachedImage) -> None:
+        import gcs_storage
+
+        if not gcs_storage.is_gcs_available():
+            return
+        try:
+            bucket = gcs_storage._get_client().bucket(gcs_storage.GCS_BUCKET_NAME)
+            blob = bucket.blob(gcs_storage._qualify_object_name(f"{_GCS_CACHE_FOLDER}{key}"))
+            blob.upload_from_string(image.data, content_type=image.mime_type)
+        except Exception as exc:  # pragma: no cover - network error path
+            logger.warning("Image cache upload failed for %s: %s", key, exc)
+
+
+class TieredImageCache:
+    """Read through a list of backends, promoting hits into the faster tiers."""
+
+    def __init__(self, *backends: ImageCacheBackend) -> None:
+        self.backends = tuple(backends)
+
+    def get(self, key: str) -> CachedImage | None:
+        for position, backend in enumerate(self.backends):
+            image = backend.get(key)
+            if image is None:
+                continue
+            for faster in self.backends[:position]:
+                faster.put(key, image)
+            return image
+        return None
+
+    def put(self, key: str, image: CachedImage) -> None:
+        for backend in self.backends:
+            backend.put(key, image)
+
+
+@lru_cache(maxsize=1)
+def get_image_cache() -> TieredImageCache | None:
+    """Return the process-wide image cache configured from the environment."""
+
+    if not IMAGE_CACHE_ENABLED:
+        return None
+    backends: list[ImageCacheBackend] = [LocalImageCache(IMAGE_CACHE_DIR, max_bytes=IMAGE_CACHE_MAX_BYTES)]
+    if IMAGE_CACHE_GCS:
+        backends.append(GCSImageCache())
+    return TieredImageCache(*backends)
+
+
+def reset_image_cache() -> None:
+    """Drop the cached backend instance (used in tests)."""
+
+    get_image_cache.cache_clear()
+
+
+__all__ = [
+    "CachedImage",
+    "GCSImageCache",
+    "LocalImageCache",
+    "TieredImageCache",
+    "get_image_cache",
+    "make_image_cache_key",
+    "reset_image_cache",
+]
@@ -0,0 +1,161 @@
+"""Process-wide TTL cache for story and export listings.
+
+The library view and Step 6 list Firestore story records and GCS exports on
+every rerun. Listings are cached here per scope (all stories, one user's
+stories, GCS exports) and page for ``LISTING_CACHE_TTL_SECONDS``, shared by
+every session in the process. ``record_story_export`` invalidates the affected
+scopes, so a new story shows up immediately on this replica; other replicas
+pick it up once their entries expire.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_TTL_ENV = (os.getenv("LISTING_CACHE_TTL_SECONDS") or "").strip()
+LISTING_CACHE_TTL_SECONDS = int(_TTL_ENV) if _TTL_ENV.isdigit() else 30
+_MAX_ENTRIES = 256
+_REPORT_EVERY = 500
+
+ALL_STORIES_SCOPE = "stories:all"
+GCS_EXPORTS_SCOPE = "gcs:exports"
+
+
+def user_stories_scope(user_id: str) -> str:
+    return f"stories:user:{user_id}"
+
+
+@dataclass(slots=True)
+class ListingCacheStats:
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+    entries: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ListingCache:
+    """Thread-safe TTL cache keyed by ``(scope, page)``.
+
+    Loaders run outside the lock. A load that overlaps an invalidation of its
+    scope is returned to its caller but not stored, so a listing fetched
+    before a write can never be served after it.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float = LISTING_CACHE_TTL_SECONDS,
+        max_entries: int = _MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ttl = max(0.0, ttl_seconds)
+        self._max_entries = max(1, max_entries)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, Hashable], tuple[float, Any]] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self._stats = ListingCacheStats()
+
+    def get_or_load(self, scope: str, page: Hashable, loader: Callable[[], T]) -> T:
+        key = (scope, page)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] > self._clock():
+                self._entries.move_to_end(key)
+                self._stats.hits += 1
+                self._maybe_report_locked()
+                return cached[1]
+            self._stats.misses += 1
+            self._maybe_report_locked()
+            generation = self._generations.get(scope, 0)
+
+        value = loader()
+        if self._ttl <= 0:
+            return value
+
+        with self._lock:
+            if self._generations.get(scope, 0) == generation:
+                self._entries[key] = (self._clock() + self._ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, *scopes: str) -> None:
+        """Drop every page of ``scopes`` (all scopes when none are given)."""
+
+        with self._lock:
+            targets = set(scopes) if scopes else {scope for scope, _ in self._entries} | set(self._generations)
+            for scope in targets:
+                self._generations[scope] = self._generations.get(scope, 0) + 1
+            for key in [key for key in self._entries if key[0] in targets]:
+                del self._entries[key]
+            self._stats.invalidations += 1
+
+    def stats(self) -> ListingCacheStats:
+        with self._lock:
+            return ListingCacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                invalidations=self._stats.invalidations,
+                entries=len(self._entries),
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self._stats = ListingCacheStats()
+
+    def _maybe_report_locked(self) -> None:
+        lookups = self._stats.hits + self._stats.misses
+        if lookups % _REPORT_EVERY == 0:
+            logger.info(
+                "Listing cache: %.1f%% hit rate over %d lookups, %d entries, %d invalidations",
+                self._stats.hit_rate * 100,
+                lookups,
+                len(self._entries),
+                self._stats.invalidations,
+            )
+
+
+_CACHE = ListingCache()
+
+
+def get_listing_cache() -> ListingCache:
+    return _CACHE
+
+
+def invalidate_story_listings(user_id: str | None = None) -> None:
+    """Called after a story export is recorded: the story and export listings changed."""
+
+    scopes = [ALL_STORIES_SCOPE, GCS_EXPORTS_SCOPE]
+    if user_id:
+        scopes.append(user_stories_scope(user_id))
+    _CACHE.invalidate(*scopes)
+
+
+__all__ = [
+    "ALL_STORIES_SCOPE",
+    "GCS_EXPORTS_SCOPE",
+    "LISTING_CACHE_TTL_SECONDS",
+    "ListingCache",
+    "ListingCacheStats",
+    "get_listing_cache",
+    "invalidate_story_listings",
+    "user_stories_scope",
+]
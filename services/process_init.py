@@ -0,0 +1,178 @@
+"""Process-scoped backend warm-up registry.
+
+Streamlit re-executes the entry script on every rerun, so backend warm-ups
+(Firestore touches, credential checks) must not run there directly. Each
+backend is initialised once per process with retry; reruns only read the
+cached status, and a daemon thread re-checks it on a schedule.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+_ATTEMPTS_ENV = (os.getenv("INIT_RETRY_ATTEMPTS") or "").strip()
+INIT_RETRY_ATTEMPTS = max(1, int(_ATTEMPTS_ENV) if _ATTEMPTS_ENV.isdigit() else 3)
+# Seconds may be fractional ("0.5"); anything else falls back to the default.
+_BACKOFF_ENV = (os.getenv("INIT_RETRY_BACKOFF_SECONDS") or "").strip()
+INIT_RETRY_BACKOFF_SECONDS = float(_BACKOFF_ENV) if _BACKOFF_ENV.replace(".", "", 1).isdigit() else 0.5
+_RECHECK_ENV = (os.getenv("INIT_RECHECK_SECONDS") or "").strip()
+INIT_RECHECK_SECONDS = float(_RECHECK_ENV) if _RECHECK_ENV.replace(".", "", 1).isdigit() else 300.0
+
+InitCheck = Callable[[], None]
+
+
+@dataclass(frozen=True, slots=True)
+class BackendStatus:
+    name: str
+    ok: bool
+    error: str | None
+    checked_at: float
+    attempts: int
+
+
+class _Backend:
+    __slots__ = ("name", "check", "recheck_seconds", "status", "lock", "rechecking")
+
+    def __init__(self, name: str, check: InitCheck, recheck_seconds: float) -> None:
+        self.name = name
+        self.check = check
+        self.recheck_seconds = recheck_seconds
+        self.status: BackendStatus | None = None
+        self.lock = threading.Lock()
+        self.rechecking = False
+
+
+class InitRegistry:
+    """Run each backend's warm-up once and serve the cached result afterwards."""
+
+    def __init__(
+        self,
+        *,
+        attempts: int = INIT_RETRY_ATTEMPTS,
+        backoff_seconds: float = INIT_RETRY_BACKOFF_SECONDS,
+        recheck_seconds: float = INIT_RECHECK_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self._attempts = max(1, attempts)
+        self._backoff = max(0.0, backoff_seconds)
+        self._recheck_seconds = recheck_seconds
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._backends: dict[str, _Backend] = {}
+
+    def ensure(self, name: str, check: InitCheck, *, recheck_seconds: float | None = None) -> BackendStatus:
+        """Return the cached status for ``name``, running ``check`` on first use.
+
+        ``check`` signals failure by raising. Only the first caller pays for the
+        warm-up; concurrent sessions wait on the same attempt instead of
+        repeating it.
+        """
+
+        with self._lock:
+            backend = self._backends.get(name)
+            if backend is None:
+                interval = self._recheck_seconds if recheck_seconds is None else recheck_seconds
+                backend = _Backend(name, check, interval)
+                self._backends[name] = backend
+
+        status = backend.status
+        if status is None:
+            with backend.lock:
+                if backend.status is None:
+                    backend.status = self._run(backend)
+            status = backend.status
+        self._maybe_recheck(backend)
+        return status
+
+    def status(self, name: str) -> BackendStatus | None:
+        backend = self._backends.get(name)
+        return backend.status if backend else None
+
+    def statuses(self) -> list[BackendStatus]:
+        with self._lock:
+            backends = list(self._backends.values())
+        return [backend.status for backend in backends if backend.status is not None]
+
+    def recheck(self, name: str) -> BackendStatus | None:
+        """Run the warm-up for ``name`` again synchronously."""
+
+        backend = self._backends.get(name)
+        if backend is None:
+            return None
+        with backend.lock:
+            backend.status = self._run(backend)
+        return backend.status
+
+    def reset(self) -> None:
+        with self._lock:
+            self._backends.clear()
+
+    def _run(self, backend: _Backend) -> BackendStatus:
+        error: str | None = None
+        attempt = 0
+        for attempt in range(1, self._attempts + 1):
+            try:
+                backend.check()
+            except Exception as exc:  # noqa: BLE001 - any failure marks the backend unavailable
+                error = str(exc) or exc.__class__.__name__
+                logger.warning("Initialization of %s failed (attempt %d/%d): %s", backend.name, attempt, self._attempts, error)
+                if attempt < self._attempts and self._backoff:
+                    self._sleep(self._backoff * (2 ** (attempt - 1)))
+                continue
+            error = None
+            break
+        return BackendStatus(
+            name=backend.name,
+            ok=error is None,
+            error=error,
+            checked_at=self._clock(),
+            attempts=attempt,
+        )
+
+    def _maybe_recheck(self, backend: _Backend) -> None:
+        status = backend.status
+        if status is None or backend.recheck_seconds <= 0 or backend.rechecking:
+            return
+        if self._clock() - status.checked_at < backend.recheck_seconds:
+            return
+        with self._lock:
+            if backend.rechecking:
+                return
+            backend.rechecking = True
+
+        def _worker() -> None:
+            try:
+                self.recheck(backend.name)
+            finally:
+                backend.rechecking = False
+
+        threading.Thread(target=_worker, name=f"init-recheck-{backend.name}", daemon=True).start()
+
+
+_REGISTRY = InitRegistry()
+
+
+def get_init_registry() -> InitRegistry:
+    return _REGISTRY
+
+
+def ensure_initialized(name: str, check: InitCheck, *, recheck_seconds: float | None = None) -> BackendStatus:
+    """Module-level shortcut for :meth:`InitRegistry.ensure` on the process registry."""
+
+    return _REGISTRY.ensure(name, check, recheck_seconds=recheck_seconds)
+
+
+__all__ = [
+    "BackendStatus",
+    "InitRegistry",
+    "ensure_initialized",
+    "get_init_registry",
+]
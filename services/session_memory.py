@@ -0,0 +1,461 @@
+"""Per-session memory accounting, process budget enforcement and metric publishing."""
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Mapping
+
+from cloud_clients import cloud_client_metrics, shared_client
+from google_credentials import get_service_account_credentials
+from utils.lazy_import import lazy_module
+from services.blob_store import (
+    BLOB_STORE_SESSION_TTL_SECONDS,
+    BlobHandle,
+    BlobStore,
+    SessionProbe,
+    get_blob_store,
+    streamlit_session_active,
+    streamlit_session_id,
+)
+from services.image_asset import ImageAsset
+
+firestore = lazy_module("google.cloud.firestore")
+FieldFilter = lazy_module("google.cloud.firestore_v1.FieldFilter")
+
+logger = logging.getLogger(__name__)
+
+SESSION_MEMORY_TRACKING = (os.getenv("SESSION_MEMORY_TRACKING", "true").strip().lower() not in {"0", "false", "no"})
+_BUDGET_MB_ENV = (os.getenv("SESSION_MEMORY_BUDGET_MB") or "").strip()
+SESSION_MEMORY_BUDGET_BYTES = (int(_BUDGET_MB_ENV) if _BUDGET_MB_ENV.isdigit() else 1024) * 1024 * 1024
+# Session state changes little between reruns; walking it on every one is wasted work.
+_MEASURE_ENV = (os.getenv("SESSION_MEMORY_MEASURE_INTERVAL_SECONDS") or "").strip()
+MEASURE_INTERVAL_SECONDS = int(_MEASURE_ENV) if _MEASURE_ENV.isdigit() else 30
+_PUBLISH_ENV = (os.getenv("SESSION_MEMORY_PUBLISH_INTERVAL_SECONDS") or "").strip()
+PUBLISH_INTERVAL_SECONDS = int(_PUBLISH_ENV) if _PUBLISH_ENV.isdigit() else 60
+# Replicas that stopped publishing (scaled down, crashed) drop out of the admin view.
+_MAX_AGE_ENV = (os.getenv("SESSION_MEMORY_SNAPSHOT_MAX_AGE_SECONDS") or "").strip()
+SNAPSHOT_MAX_AGE_SECONDS = int(_MAX_AGE_ENV) if _MAX_AGE_ENV.isdigit() else 10 * 60
+RUNTIME_METRICS_COLLECTION = (
+    (os.getenv("FIRESTORE_RUNTIME_METRICS_COLLECTION") or "runtime_metrics").strip() or "runtime_metrics"
+)
+REPLICA_ID = (os.getenv("REPLICA_ID") or "").strip() or f"{socket.gethostname()}-{os.getpid()}"
+GCP_PROJECT_ID = (os.getenv("GCP_PROJECT_ID") or "").strip()
+
+KEY_FAMILIES = ("images", "story", "auth", "board", "other")
+_FAMILY_PREFIXES: tuple[tuple[str, tuple[str, ...]], ...] = (
+    ("images", ("story_image", "cover_image", "character_image")),
+    ("auth", ("auth_", "generation_token_")),
+    ("board", ("board_",)),
+    ("story", ("story_", "stages_data", "synopsis_", "protagonist_", "character_prompt", "cover_prompt", "rand8")),
+)
+
+# Process caches whose contents can be rebuilt on demand (parsed reader documents, ...).
+# Session state itself holds nothing regenerable: images live in the blob store.
+_REGENERABLE_CACHES: dict[str, Callable[[], int]] = {}
+
+
+def register_regenerable_cache(name: str, clear: Callable[[], int]) -> None:
+    """Register ``clear`` (returns entries dropped) to run when the process is over budget."""
+
+    _REGENERABLE_CACHES[name] = clear
+
+
+def classify_key(key: str) -> str:
+    for family, prefixes in _FAMILY_PREFIXES:
+        if key.startswith(prefixes):
+            return family
+    return "other"
+
+
+def _measure_value(value: Any, seen: set[int]) -> tuple[int, int]:
+    """Return ``(resident_bytes, referenced_blob_bytes)`` for ``value``."""
+
+    if isinstance(value, BlobHandle):
+        return sys.getsizeof(value), value.size
+    if isinstance(value, ImageAsset):
+        return value.size + value.encoded_size, 0
+    if isinstance(value, memoryview):
+        return value.nbytes, 0
+    if isinstance(value, (bytes, bytearray, str, int, float, bool)) or value is None:
+        return sys.getsizeof(value), 0
+
+    marker = id(value)
+    if marker in seen:
+        return 0, 0
+    seen.add(marker)
+
+    resident = sys.getsizeof(value)
+    blob_bytes = 0
+    if isinstance(value, Mapping):
+        children: Iterable[Any] = (item for pair in value.items() for item in pair)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        children = value
+    else:
+        children = ()
+    for child in children:
+        child_resident, child_blob = _measure_value(child, seen)
+        resident += child_resident
+        blob_bytes += child_blob
+    return resident, blob_bytes
+
+
+@dataclass(slots=True)
+class SessionMemoryReport:
+    session_id: str
+    families: dict[str, int]
+    blob_bytes: int
+    measured_at: float
+
+    @property
+    def total_bytes(self) -> int:
+        """Logical size including images held in the shared blob store."""
+
+        return sum(self.families.values())
+
+    @property
+    def resident_bytes(self) -> int:
+        """Bytes held directly in session state."""
+
+        return self.total_bytes - self.blob_bytes
+
+
+@dataclass(slots=True)
+class ProcessMemorySnapshot:
+    replica_id: str
+    sessions: int
+    families: dict[str, int]
+    session_resident_bytes: int
+    blob_memory_bytes: int
+    blob_encoded_bytes: int
+    blob_disk_bytes: int
+    rss_bytes: int | None
+    budget_bytes: int
+    evictions: dict[str, int] = field(default_factory=dict)
+    cloud_clients: list[dict[str, Any]] = field(default_factory=list)
+    captured_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    @property
+    def accounted_bytes(self) -> int:
+        return self.session_resident_bytes + self.blob_memory_bytes + self.blob_encoded_bytes
+
+    def to_dict(self) -> dict[str, Any]:
+        payload = asdict(self)
+        payload["accounted_bytes"] = self.accounted_bytes
+        return payload
+
+
+def measure_session(session: Any, *, session_id: str | None = None, clock: Callable[[], float] = time.monotonic) -> SessionMemoryReport:
+    """Walk a ``StorySessionProxy`` (or mapping) and tally bytes per key family."""
+
+    families = {family: 0 for family in KEY_FAMILIES}
+    blob_total = 0
+    seen: set[int] = set()
+    for key, value in list(session.items()):
+        resident, blob_bytes = _measure_value(value, seen)
+        families[classify_key(str(key))] += resident
+        families["images"] += blob_bytes
+        blob_total += blob_bytes
+    resolved_id = session_id or getattr(session, "session_id", None) or "anonymous"
+    return SessionMemoryReport(
+        session_id=resolved_id,
+        families=families,
+        blob_bytes=blob_total,
+        measured_at=clock(),
+    )
+
+
+def _current_rss_bytes() -> int | None:
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as fh:
+            resident_pages = int(fh.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except Exception:  # pragma: no cover - unsupported platform
+        return None
+    # ru_maxrss is the peak, reported in bytes on macOS and kilobytes elsewhere.
+    return int(usage if sys.platform == "darwin" else usage * 1024)
+
+
+class SessionMemoryTracker:
+    """Aggregate the latest report of every live session in this process.
+
+    A report is dropped once its Streamlit session has ended (per
+    ``session_probe``) or, when that is unknown, after ``session_ttl_seconds``.
+    """
+
+    def __init__(
+        self,
+        *,
+        budget_bytes: int,
+        session_ttl_seconds: float,
+        measure_interval_seconds: float = 0.0,
+        blob_store: BlobStore | None = None,
+        session_probe: SessionProbe | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.budget_bytes = max(int(budget_bytes), 0)
+        self.session_ttl_seconds = float(session_ttl_seconds)
+        self.measure_interval_seconds = float(measure_interval_seconds)
+        self._blob_store = blob_store
+        self._session_probe = session_probe
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._reports: dict[str, SessionMemoryReport] = {}
+        # report session id -> Streamlit runtime session id / tracker time it was last recorded
+        self._runtime_sessions: dict[str, str] = {}
+        self._recorded_at: dict[str, float] = {}
+        self._evictions = {"encodings": 0, "regenerable": 0, "spilled": 0}
+
+    def _store(self) -> BlobStore:
+        return self._blob_store or get_blob_store()
+
+    def due(self, session_id: str) -> bool:
+        """Whether ``session_id`` has no report younger than the measure interval."""
+
+        with self._lock:
+            recorded_at = self._recorded_at.get(session_id)
+        return recorded_at is None or self._clock() - recorded_at >= self.measure_interval_seconds
+
+    def record(self, report: SessionMemoryReport, *, runtime_session: str | None = None) -> None:
+        with self._lock:
+            self._reports[report.session_id] = report
+            self._recorded_at[report.session_id] = self._clock()
+            if runtime_session:
+                self._runtime_sessions[report.session_id] = runtime_session
+            self._prune_locked()
+
+    def forget(self, session_id: str) -> None:
+        with self._lock:
+            self._reports.pop(session_id, None)
+            self._runtime_sessions.pop(session_id, None)
+            self._recorded_at.pop(session_id, None)
+
+    def _session_ended_locked(self, session_id: str) -> bool:
+        runtime_session = self._runtime_sessions.get(session_id)
+        if runtime_session is None or self._session_probe is None:
+            return False
+        try:
+            return self._session_probe(runtime_session) is False
+        except Exception as exc:  # noqa: BLE001 - an unknown session falls back to the TTL
+            logger.warning("Session probe failed for %s: %s", runtime_session, exc)
+            return False
+
+    def _prune_locked(self) -> None:
+        cutoff = self._clock() - self.session_ttl_seconds
+        for session_id in [
+            sid
+            for sid, item in self._reports.items()
+            if self._recorded_at.get(sid, item.measured_at) < cutoff or self._session_ended_locked(sid)
+        ]:
+            self._reports.pop(session_id, None)
+            self._runtime_sessions.pop(session_id, None)
+            self._recorded_at.pop(session_id, None)
+
+    def snapshot(self) -> ProcessMemorySnapshot:
+        stats = self._store().stats()
+        with self._lock:
+            self._prune_locked()
+            reports = list(self._reports.values())
+            evictions = dict(self._evictions)
+        families = {family: 0 for family in KEY_FAMILIES}
+        for report in reports:
+            for family, size in report.families.items():
+                families[family] = families.get(family, 0) + size
+        return ProcessMemorySnapshot(
+            replica_id=REPLICA_ID,
+            sessions=len(reports),
+            families=families,
+            session_resident_bytes=sum(report.resident_bytes for report in reports),
+            blob_memory_bytes=stats.memory_bytes,
+            blob_encoded_bytes=stats.encoded_bytes,
+            blob_disk_bytes=stats.disk_bytes,
+            rss_bytes=_current_rss_bytes(),
+            budget_bytes=self.budget_bytes,
+            evictions=evictions,
+            cloud_clients=[metrics.to_dict() for metrics in cloud_client_metrics()],
+        )
+
+    def enforce_budget(self, snapshot: ProcessMemorySnapshot | None = None) -> list[str]:
+        """Bring the process back under budget, cheapest-to-rebuild data first.
+
+        Order: cached image encodings, registered regenerable caches, then
+        spilling in-memory blobs to disk. Returns the steps that ran. Pass a
+        fresh ``snapshot`` to avoid taking another one.
+        """
+
+        snapshot = snapshot or self.snapshot()
+        over = snapshot.accounted_bytes - self.budget_bytes
+        actions: list[str] = []
+        if over <= 0:
+            return actions
+
+        store = self._store()
+        freed = store.drop_encodings()
+        if freed:
+            actions.append("encodings")
+            over -= freed
+            self._count("encodings")
+
+        if over > 0:
+            # These caches sit outside the accounted bytes, so ``over`` is unchanged.
+            dropped = 0
+            for name, clear in list(_REGENERABLE_CACHES.items()):
+                try:
+                    dropped += clear()
+                except Exception as exc:  # noqa: BLE001 - a broken cache must not stop the others
+                    logger.warning("Clearing regenerable cache %s failed: %s", name, exc)
+            if dropped:
+                actions.append("regenerable")
+                self._count("regenerable")
+
+        if over > 0:
+            moved = store.shrink_memory(max(snapshot.blob_memory_bytes - over, 0))
+            if moved:
+                actions.append("spilled")
+                self._count("spilled")
+        if actions:
+            logger.info("Session memory budget exceeded; ran %s", ", ".join(actions))
+        return actions
+
+    def _count(self, step: str) -> None:
+        with self._lock:
+            self._evictions[step] = self._evictions.get(step, 0) + 1
+
+
+@lru_cache(maxsize=1)
+def get_memory_tracker() -> SessionMemoryTracker:
+    return SessionMemoryTracker(
+        budget_bytes=SESSION_MEMORY_BUDGET_BYTES,
+        session_ttl_seconds=BLOB_STORE_SESSION_TTL_SECONDS,
+        measure_interval_seconds=MEASURE_INTERVAL_SECONDS,
+        session_probe=streamlit_session_active,
+    )
+
+
+# Publishing ------------------------------------------------------------------------
+_last_publish = 0.0
+_publish_lock = threading.Lock()
+
+
+def _ensure_remote_ready() -> None:
+    if not firestore:
+        raise RuntimeError("google-cloud-firestore must be installed for runtime metrics")
+    if GCP_PROJECT_ID:
+        return
+    credentials = get_service_account_credentials()
+    project_id = getattr(credentials, "project_id", "") if credentials else ""
+    if not project_id:
+        raise RuntimeError("GCP_PROJECT_ID must be configured for runtime metrics.")
+
+
+@lru_cache(maxsize=1)
+def _get_firestore_client():
+    _ensure_remote_ready()
+    client_kwargs: dict[str, Any] = {}
+    credentials = get_service_account_credentials()
+    if credentials is not None:
+        client_kwargs["credentials"] = credentials
+        if not GCP_PROJECT_ID:
+            project_id = getattr(credentials, "project_id", "")
+            if project_id:
+                client_kwargs["project"] = project_id
+    if GCP_PROJECT_ID:
+        client_kwargs["project"] = GCP_PROJECT_ID
+    return shared_client("firestore", firestore.Client, user=__name__, **client_kwargs)
+
+
+def publish_snapshot(snapshot: ProcessMemorySnapshot, *, force: bool = False) -> bool:
+    """Write the snapshot to Firestore at most once per publish interval."""
+
+    global _last_publish
+    now = time.monotonic()
+    with _publish_lock:
+        if not force and now - _last_publish < PUBLISH_INTERVAL_SECONDS:
+            return False
+        _last_publish = now
+    try:
+        collection = _get_firestore_client().collection(RUNTIME_METRICS_COLLECTION)
+        collection.document(snapshot.replica_id).set(snapshot.to_dict())
+    except Exception as exc:  # pragma: no cover - metrics must never break the app
+        logger.debug("Runtime metrics publish skipped: %s", exc)
+        return False
+    return True
+
+
+def _apply_where(query: Any, field: str, operator: str, value: Any) -> Any:
+    if FieldFilter:
+        try:
+            return query.where(filter=FieldFilter(field, operator, value))
+        except Exception:  # pragma: no cover - fall back for unsupported ops
+            pass
+    return query.where(field, operator, value)
+
+
+def fetch_published_snapshots(
+    limit: int = 50,
+    *,
+    max_age_seconds: int = SNAPSHOT_MAX_AGE_SECONDS,
+) -> list[dict[str, Any]]:
+    """Return the latest snapshot of every live replica, most recently captured first.
+
+    Replicas whose last snapshot is older than ``max_age_seconds`` are left out.
+    """
+
+    collection = _get_firestore_client().collection(RUNTIME_METRICS_COLLECTION)
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=max_age_seconds)
+    query = _apply_where(collection, "captured_at", ">=", cutoff)
+    query_cls = getattr(firestore, "Query", None) if firestore else None
+    direction = getattr(query_cls, "DESCENDING", "DESCENDING")
+    query = query.order_by("captured_at", direction=direction).limit(limit)
+    return [doc.to_dict() or {} for doc in query.stream()]
+
+
+def track_session(session: Any) -> SessionMemoryReport | None:
+    """Measure ``session``, record it, enforce the process budget and publish.
+
+    Runs at most once per ``MEASURE_INTERVAL_SECONDS`` per session and takes
+    a single process snapshot; returns None when the session was not due.
+    """
+
+    if not SESSION_MEMORY_TRACKING:
+        return None
+    tracker = get_memory_tracker()
+    session_id = getattr(session, "session_id", None) or "anonymous"
+    if not tracker.due(session_id):
+        return None
+    report = measure_session(session, session_id=session_id)
+    tracker.record(report, runtime_session=streamlit_session_id())
+    snapshot = tracker.snapshot()
+    tracker.enforce_budget(snapshot)
+    if time.monotonic() - _last_publish >= PUBLISH_INTERVAL_SECONDS:
+        publish_snapshot(snapshot)
+    return report
+
+
+__all__ = [
+    "KEY_FAMILIES",
+    "MEASURE_INTERVAL_SECONDS",
+    "ProcessMemorySnapshot",
+    "SNAPSHOT_MAX_AGE_SECONDS",
+    "SessionMemoryReport",
+    "SessionMemoryTracker",
+    "classify_key",
+    "fetch_published_snapshots",
+    "get_memory_tracker",
+    "measure_session",
+    "publish_snapshot",
+    "register_regenerable_cache",
+    "track_session",
+]
@@ -0,0 +1,207 @@
+"""Fingerprinted static assets served through Streamlit's static file route.
+
+``scripts/build_static_assets.py`` converts the hero and illustration PNGs to
+WebP under ``static/`` with a content hash in each file name and records them
+in ``static/manifest.json``. Pages reference those URLs instead of inlining
+base64 images, so the browser fetches each image once and every rerun's page
+payload stays small. When the manifest or static serving is unavailable,
+callers fall back to their previous inline behaviour.
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Mapping
+
+from utils.lazy_import import lazy_module
+
+logger = logging.getLogger(__name__)
+
+Image = lazy_module("PIL.Image")
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+# Streamlit serves ``<main script dir>/static`` at ``/app/static`` when enableStaticServing is on.
+STATIC_DIR = ROOT_DIR / "static"
+MANIFEST_PATH = STATIC_DIR / "manifest.json"
+
+STATIC_ASSETS_ENABLED = (os.getenv("STATIC_ASSETS_ENABLED", "true").strip().lower() not in {"0", "false", "no"})
+# Optional CDN/bucket prefix holding the same fingerprinted files (e.g. uploaded with --upload-gcs).
+STATIC_ASSET_BASE_URL = (os.getenv("STATIC_ASSET_BASE_URL") or "").strip().rstrip("/")
+
+# Per-kind size budgets for the built files, in bytes.
+ASSET_BUDGETS: dict[str, int] = {
+    "hero": 200 * 1024,
+    "illustration": 96 * 1024,
+}
+# Longest edge (pixels) and WebP quality used when building each kind.
+BUILD_PROFILES: dict[str, tuple[int, int]] = {
+    "hero": (1280, 82),
+    "illustration": (512, 80),
+}
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@dataclass(frozen=True, slots=True)
+class StaticAsset:
+    source: str
+    file: str
+    kind: str
+    bytes: int
+    width: int
+    height: int
+    source_sha256: str
+    mime_type: str = "image/webp"
+
+
+# Lookup ------------------------------------------------------------------------------
+def _source_key(source: str | os.PathLike[str]) -> str:
+    path = Path(source)
+    if path.is_absolute():
+        try:
+            path = path.resolve().relative_to(ROOT_DIR)
+        except ValueError:
+            return path.as_posix()
+    return path.as_posix()
+
+
+@lru_cache(maxsize=1)
+def load_manifest(path: Path = MANIFEST_PATH) -> dict[str, StaticAsset]:
+    """Read the manifest, keeping only entries whose built file exists."""
+
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as exc:
+        logger.warning("Static asset manifest unreadable at %s: %s", path, exc)
+        return {}
+
+    assets: dict[str, StaticAsset] = {}
+    for source, entry in (payload.get("assets") or {}).items():
+        try:
+            asset = StaticAsset(**entry)
+        except TypeError:
+            continue
+        if (path.parent / asset.file).is_file():
+            assets[source] = asset
+    return assets
+
+
+def _static_base_url() -> str | None:
+    if STATIC_ASSET_BASE_URL:
+        return STATIC_ASSET_BASE_URL
+    try:
+        import streamlit as st
+
+        if not st.get_option("server.enableStaticServing"):
+            return None
+        base_path = str(st.get_option("server.baseUrlPath") or "").strip("/")
+    except Exception:  # pragma: no cover - outside a Streamlit runtime
+        return None
+    # Absolute so the URL also resolves inside component iframes.
+    return f"/{base_path}/app/static" if base_path else "/app/static"
+
+
+def static_asset_url(source: str | os.PathLike[str]) -> str | None:
+    """URL of the built asset for ``source`` (a repo-relative or absolute path), if any."""
+
+    if not STATIC_ASSETS_ENABLED:
+        return None
+    asset = load_manifest().get(_source_key(source))
+    if asset is None:
+        return None
+    base_url = _static_base_url()
+    return f"{base_url}/{asset.file}" if base_url else None
+
+
+def static_asset_url_or_path(source: str | os.PathLike[str]) -> str:
+    """Built asset URL when available, otherwise the original path (inlined by the caller)."""
+
+    return static_asset_url(source) or str(source)
+
+
+# Build --------------------------------------------------------------------------------
+def build_asset(source: Path, kind: str, *, output_dir: Path = STATIC_DIR) -> StaticAsset:
+    """Convert ``source`` to a resized, fingerprinted WebP file under ``output_dir``."""
+
+    max_edge, quality = BUILD_PROFILES[kind]
+    raw = source.read_bytes()
+    with Image.open(io.BytesIO(raw)) as image:
+        image.load()
+        converted = image.convert("RGBA" if image.mode in {"RGBA", "LA", "P"} else "RGB")
+    converted.thumbnail((max_edge, max_edge))
+    buffer = io.BytesIO()
+    converted.save(buffer, format="WEBP", quality=quality, method=6)
+    data = buffer.getvalue()
+
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    relative = Path(kind) / f"{source.stem}.{digest}.webp"
+    target = output_dir / relative
+    if not target.exists():
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(data)
+    return StaticAsset(
+        source=_source_key(source),
+        file=relative.as_posix(),
+        kind=kind,
+        bytes=len(data),
+        width=converted.width,
+        height=converted.height,
+        source_sha256=hashlib.sha256(raw).hexdigest(),
+    )
+
+
+def write_manifest(assets: Iterable[StaticAsset], *, output_dir: Path = STATIC_DIR) -> Path:
+    """Write the manifest and delete fingerprinted files no entry references any more."""
+
+    entries = {asset.source: asdict(asset) for asset in sorted(assets, key=lambda item: item.source)}
+    manifest_path = output_dir / MANIFEST_PATH.name
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(
+        json.dumps({"version": 1, "assets": entries}, ensure_ascii=False, indent=2) + "\n",
+        encoding="utf-8",
+    )
+
+    referenced = {entry["file"] for entry in entries.values()}
+    for kind in BUILD_PROFILES:
+        for stale in (output_dir / kind).glob("*.webp"):
+            if stale.relative_to(output_dir).as_posix() not in referenced:
+                stale.unlink()
+    load_manifest.cache_clear()
+    return manifest_path
+
+
+def check_budgets(
+    assets: Iterable[StaticAsset],
+    budgets: Mapping[str, int] = ASSET_BUDGETS,
+) -> list[str]:
+    """Return one message per asset whose built size exceeds its kind's budget."""
+
+    violations = []
+    for asset in assets:
+        limit = budgets.get(asset.kind)
+        if limit is not None and asset.bytes > limit:
+            violations.append(
+                f"{asset.source} -> {asset.file}: {asset.bytes / 1024:.0f} KiB exceeds the "
+                f"{asset.kind} budget of {limit / 1024:.0f} KiB"
+            )
+    return violations
+
+
+__all__ = [
+    "ASSET_BUDGETS",
+    "IMMUTABLE_CACHE_CONTROL",
+    "StaticAsset",
+    "build_asset",
+    "check_budgets",
+    "load_manifest",
+    "static_asset_url",
+    "static_asset_url_or_path",
+    "write_manifest",
+]
@@ -0,0 +1,442 @@
+"""Pluggable object storage for story files.
+
+Keys are ``/``-separated paths relative to a root: ``html_exports/`` on disk
+mirrors ``GCS_PREFIX`` in the bucket (exports and manifests at the top,
+images under ``assets/``), so the same key names an object in every backend
+and :class:`TieredStorageBackend` can stack them. Missing objects read as
+``None``; transport and disk errors propagate, except inside the tiered
+composite, which skips a failing tier.
+
+The in-memory backend stands in for the bucket in tests and in
+``scripts/bench_storage_backends.py``, so the export and library paths can be
+measured without cloud access.
+"""
+from __future__ import annotations
+
+import gzip
+import logging
+import mimetypes
+import os
+import shutil
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path, PurePosixPath
+from typing import Callable, Collection, Iterator, Protocol, Sequence
+
+import gcs_storage
+from utils.lazy_import import lazy_attribute
+
+logger = logging.getLogger(__name__)
+
+STREAM_CHUNK_BYTES = 1024 * 1024
+_GZIP_LEVEL = 6
+
+ObjectData = bytes | memoryview | os.PathLike[str]
+
+
+@dataclass(frozen=True, slots=True)
+class ObjectStat:
+    key: str
+    size: int
+    updated: datetime | None = None
+    content_type: str | None = None
+    url: str | None = None
+
+
+class StorageBackend(Protocol):
+    def put(self, key: str, data: ObjectData, *, content_type: str | None = None) -> ObjectStat: ...
+
+    def get(self, key: str) -> bytes | None: ...
+
+    def stat(self, key: str) -> ObjectStat | None: ...
+
+    def list(self, prefix: str = "") -> list[ObjectStat]: ...
+
+    def stream(self, key: str, *, chunk_size: int = STREAM_CHUNK_BYTES) -> Iterator[bytes] | None: ...
+
+
+def _validate_key(key: str) -> str:
+    path = PurePosixPath(key)
+    if not key or path.is_absolute() or ".." in path.parts:
+        raise ValueError(f"invalid storage key: {key!r}")
+    return path.as_posix()
+
+
+def _chunks(data: bytes, chunk_size: int) -> Iterator[bytes]:
+    for offset in range(0, len(data), chunk_size):
+        yield data[offset : offset + chunk_size]
+
+
+class LocalStorageBackend:
+    """Files under ``root``; writes are atomic (temp file + rename)."""
+
+    def __init__(self, root: str | os.PathLike[str]) -> None:
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        return self.root / _validate_key(key)
+
+    def put(self, key: str, data: ObjectData, *, content_type: str | None = None) -> ObjectStat:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                if isinstance(data, os.PathLike):
+                    with open(data, "rb") as src:
+                        shutil.copyfileobj(src, fh, STREAM_CHUNK_BYTES)
+                else:
+                    fh.write(data)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        return self._stat(key, path)
+
+    def get(self, key: str) -> bytes | None:
+        try:
+            return self._path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def _stat(self, key: str, path: Path) -> ObjectStat:
+        info = path.stat()
+        return ObjectStat(
+            key=key,
+            size=info.st_size,
+            updated=datetime.fromtimestamp(info.st_mtime, tz=timezone.utc),
+            content_type=mimetypes.guess_type(path.name)[0],
+        )
+
+    def stat(self, key: str) -> ObjectStat | None:
+        path = self._path(key)
+        try:
+            return self._stat(key, path)
+        except FileNotFoundError:
+            return None
+
+    def list(self, prefix: str = "") -> list[ObjectStat]:
+        if not self.root.is_dir():
+            return []
+        stats = []
+        for path in self.root.rglob("*"):
+            # Skip in-flight temp files from concurrent puts.
+            if path.name.startswith(".") or not path.is_file():
+                continue
+            key = path.relative_to(self.root).as_posix()
+            if key.startswith(prefix):
+                stats.append(self._stat(key, path))
+        return sorted(stats, key=lambda item: item.key)
+
+    def stream(self, key: str, *, chunk_size: int = STREAM_CHUNK_BYTES) -> Iterator[bytes] | None:
+        try:
+            fh = self._path(key).open("rb")
+        except FileNotFoundError:
+            return None
+
+        def _read() -> Iterator[bytes]:
+            with fh:
+                while chunk := fh.read(chunk_size):
+                    yield chunk
+
+        return _read()
+
+
+class MemoryStorageBackend:
+    """Process-local dict of objects; a cloud-free stand-in for the bucket."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._objects: dict[str, tuple[bytes, str | None, datetime]] = {}
+
+    def put(self, key: str, data: ObjectData, *, content_type: str | None = None) -> ObjectStat:
+        key = _validate_key(key)
+        payload = Path(data).read_bytes() if isinstance(data, os.PathLike) else bytes(data)
+        updated = datetime.now(timezone.utc)
+        with self._lock:
+            self._objects[key] = (payload, content_type, updated)
+        return ObjectStat(key, len(payload), updated, content_type)
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            stored = self._objects.get(key)
+        return stored[0] if stored else None
+
+    def stat(self, key: str) -> ObjectStat | None:
+        with self._lock:
+            stored = self._objects.get(key)
+        if stored is None:
+            return None
+        data, content_type, updated = stored
+        return ObjectStat(key, len(data), updated, content_type)
+
+    def list(self, prefix: str = "") -> list[ObjectStat]:
+        with self._lock:
+            items = sorted(self._objects.items())
+        return [
+            ObjectStat(key, len(data), updated, content_type)
+            for key, (data, content_type, updated) in items
+            if key.startswith(prefix)
+        ]
+
+    def stream(self, key: str, *, chunk_size: int = STREAM_CHUNK_BYTES) -> Iterator[bytes] | None:
+        data = self.get(key)
+        return _chunks(data, chunk_size) if data is not None else None
+
+
+def _gzip_file(source: os.PathLike[str]) -> Path:
+    """Compress ``source`` into a temporary ``.gz`` file next to it, streaming in chunks."""
+
+    source_path = Path(source)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{source_path.name}.", suffix=".gz", dir=source_path.parent)
+    try:
+        with source_path.open("rb") as src, os.fdopen(fd, "wb") as raw, gzip.GzipFile(
+            filename="", mode="wb", fileobj=raw, compresslevel=_GZIP_LEVEL, mtime=0
+        ) as dst:
+            shutil.copyfileobj(src, dst, STREAM_CHUNK_BYTES)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    return Path(tmp_name)
+
+
+class _NotFound(Exception):
+    """Stand-in for ``NotFound`` when google-api-core is missing."""
+
+
+def _not_found() -> type[BaseException]:
+    return lazy_attribute("google.api_core.exceptions", "NotFound", _NotFound)
+
+
+class GCSStorageBackend:
+    """Objects under ``prefix`` (default ``GCS_PREFIX``) in ``GCS_BUCKET_NAME``, through the shared storage client.
+
+    ``cache_control`` is one header for every object or a function of the
+    key. Puts whose content type is in ``gzip_content_types`` are stored
+    gzip-compressed with ``Content-Encoding: gzip``; reads return the content
+    as served, which the client decodes.
+    """
+
+    def __init__(
+        self,
+        *,
+        prefix: str | None = None,
+        cache_control: str | Callable[[str], str | None] | None = None,
+        gzip_content_types: Collection[str] = (),
+    ) -> None:
+        self.prefix = prefix
+        self.cache_control = cache_control
+        self.gzip_content_types = frozenset(gzip_content_types)
+
+    def _bucket(self):
+        return gcs_storage._get_client().bucket(gcs_storage.GCS_BUCKET_NAME)
+
+    def _prefix(self) -> str:
+        return gcs_storage.GCS_PREFIX if self.prefix is None else self.prefix
+
+    def _object_name(self, key: str) -> str:
+        return f"{self._prefix()}{_validate_key(key)}"
+
+    def _key(self, object_name: str) -> str:
+        prefix = self._prefix()
+        return object_name[len(prefix) :] if prefix and object_name.startswith(prefix) else object_name
+
+    def _stat(self, blob) -> ObjectStat:
+        return ObjectStat(
+            key=self._key(blob.name),
+            size=int(blob.size or 0),
+            updated=blob.updated,
+            content_type=blob.content_type,
+            url=blob.public_url,
+        )
+
+    def put(self, key: str, data: ObjectData, *, content_type: str | None = None) -> ObjectStat:
+        blob = self._bucket().blob(self._object_name(key))
+        cache_control = self.cache_control(key) if callable(self.cache_control) else self.cache_control
+        if cache_control:
+            blob.cache_control = cache_control
+        if content_type not in self.gzip_content_types:
+            if isinstance(data, os.PathLike):
+                blob.upload_from_filename(os.fspath(data), content_type=content_type)
+            else:
+                blob.upload_from_string(bytes(data), content_type=content_type)
+            return self._stat(blob)
+
+        blob.content_encoding = "gzip"
+        if isinstance(data, os.PathLike):
+            compressed = _gzip_file(data)
+            try:
+                blob.upload_from_filename(os.fspath(compressed), content_type=content_type)
+            finally:
+                compressed.unlink(missing_ok=True)
+        else:
+            payload = gzip.compress(bytes(data), compresslevel=_GZIP_LEVEL, mtime=0)
+            blob.upload_from_string(payload, content_type=content_type)
+        return self._stat(blob)
+
+    def get(self, key: str) -> bytes | None:
+        try:
+            return self._bucket().blob(self._object_name(key)).download_as_bytes()
+        except _not_found():
+            return None
+
+    def stat(self, key: str) -> ObjectStat | None:
+        blob = self._bucket().get_blob(self._object_name(key))
+        return self._stat(blob) if blob is not None else None
+
+    def list(self, prefix: str = "") -> list[ObjectStat]:
+        blobs = gcs_storage._get_client().list_blobs(
+            gcs_storage.GCS_BUCKET_NAME,
+            prefix=f"{self._prefix()}{prefix}" or None,
+        )
+        return [self._stat(blob) for blob in blobs]
+
+    def stream(self, key: str, *, chunk_size: int = STREAM_CHUNK_BYTES) -> Iterator[bytes] | None:
+        blob = self._bucket().get_blob(self._object_name(key))
+        if blob is None:
+            return None
+
+        def _read() -> Iterator[bytes]:
+            with blob.open("rb", chunk_size=chunk_size) as fh:
+                while chunk := fh.read(chunk_size):
+                    yield chunk
+
+        return _read()
+
+
+@dataclass(slots=True)
+class TieredStats:
+    hits: list[int] = field(default_factory=list)
+    misses: int = 0
+    backfills: int = 0
+    rejected: int = 0
+
+
+class TieredStorageBackend:
+    """Read-through stack of backends, fastest first.
+
+    ``get`` returns the first copy that passes ``validate`` and copies it into
+    every faster tier that missed. ``put`` writes every tier in order, so the
+    local copy exists even when a slower upload fails; ``publish`` writes only
+    the tiers behind the first, for objects already written locally.
+    """
+
+    def __init__(
+        self,
+        tiers: Sequence[StorageBackend],
+        *,
+        validate: Callable[[str, bytes], bool] | None = None,
+    ) -> None:
+        if not tiers:
+            raise ValueError("TieredStorageBackend needs at least one tier")
+        self.tiers = list(tiers)
+        self.validate = validate
+        self._lock = threading.Lock()
+        self._stats = TieredStats(hits=[0] * len(self.tiers))
+
+    def put(self, key: str, data: ObjectData, *, content_type: str | None = None) -> ObjectStat:
+        stats = [tier.put(key, data, content_type=content_type) for tier in self.tiers]
+        return stats[-1]
+
+    def publish(
+        self,
+        key: str,
+        data: ObjectData,
+        *,
+        content_type: str | None = None,
+        skip_existing: bool = False,
+    ) -> ObjectStat | None:
+        """Copy a locally written object to the slower tiers; None when there are none.
+
+        With ``skip_existing`` a tier that already holds ``key`` (content-
+        addressed objects) is only asked for its metadata. Returns the last
+        tier's stat; upload errors propagate.
+        """
+
+        published = None
+        for tier in self.tiers[1:]:
+            existing = tier.stat(key) if skip_existing else None
+            published = existing or tier.put(key, data, content_type=content_type)
+        return published
+
+    def get(self, key: str) -> bytes | None:
+        for index, tier in enumerate(self.tiers):
+            try:
+                data = tier.get(key)
+            except Exception as exc:  # noqa: BLE001 - a failing tier must not hide the others
+                logger.warning("Storage tier %s failed to read %s: %s", type(tier).__name__, key, exc)
+                continue
+            if data is None:
+                continue
+            if self.validate is not None and not self.validate(key, data):
+                logger.warning("Storage tier %s returned a corrupt copy of %s", type(tier).__name__, key)
+                self._count(rejected=True)
+                continue
+            self._count(hit=index)
+            self._backfill(key, data, self.tiers[:index])
+            return data
+        self._count()
+        return None
+
+    def _backfill(self, key: str, data: bytes, tiers: Sequence[StorageBackend]) -> None:
+        for tier in tiers:
+            try:
+                tier.put(key, data)
+            except Exception as exc:  # noqa: BLE001 - the read already succeeded
+                logger.warning("Could not cache %s in %s: %s", key, type(tier).__name__, exc)
+                continue
+            with self._lock:
+                self._stats.backfills += 1
+
+    def _count(self, *, hit: int | None = None, rejected: bool = False) -> None:
+        with self._lock:
+            if rejected:
+                self._stats.rejected += 1
+            elif hit is None:
+                self._stats.misses += 1
+            else:
+                self._stats.hits[hit] += 1
+
+    def stat(self, key: str) -> ObjectStat | None:
+        for tier in self.tiers:
+            found = tier.stat(key)
+            if found is not None:
+                return found
+        return None
+
+    def list(self, prefix: str = "") -> list[ObjectStat]:
+        merged: dict[str, ObjectStat] = {}
+        for tier in reversed(self.tiers):
+            merged.update((item.key, item) for item in tier.list(prefix))
+        return [merged[key] for key in sorted(merged)]
+
+    def stream(self, key: str, *, chunk_size: int = STREAM_CHUNK_BYTES) -> Iterator[bytes] | None:
+        if self.validate is None:
+            streamed = self.tiers[0].stream(key, chunk_size=chunk_size)
+            if streamed is not None:
+                return streamed
+        data = self.get(key)
+        return _chunks(data, chunk_size) if data is not None else None
+
+    def stats(self) -> TieredStats:
+        with self._lock:
+            return TieredStats(
+                hits=list(self._stats.hits),
+                misses=self._stats.misses,
+                backfills=self._stats.backfills,
+                rejected=self._stats.rejected,
+            )
+
+
+__all__ = [
+    "GCSStorageBackend",
+    "LocalStorageBackend",
+    "MemoryStorageBackend",
+    "ObjectStat",
+    "STREAM_CHUNK_BYTES",
+    "StorageBackend",
+    "TieredStats",
+    "TieredStorageBackend",
+]
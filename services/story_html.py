@@ -0,0 +1,127 @@
+"""Streaming writer for exported story HTML documents.
+
+The document is written section by section to a binary stream. Images are
+base64-encoded straight from each asset's buffer in fixed-size chunks, so the
+writer never holds more than one chunk of encoded text. Export memory stays
+proportional to the largest image rather than to the whole book.
+"""
+from __future__ import annotations
+
+import base64
+import html
+from dataclasses import dataclass
+from typing import BinaryIO, Sequence
+
+from services.image_asset import ImageAsset
+
+# Multiple of 3 so chunk encodings concatenate into one valid base64 string.
+BASE64_CHUNK_BYTES = 3 * 64 * 1024
+
+_STYLE = (
+    "    <style>\n"
+    "        body { font-family: 'Noto Sans KR', sans-serif; margin: 2rem; background: #faf7f2; color: #2c2c2c; }\n"
+    "        header { margin-bottom: 2.5rem; }\n"
+    "        h1 { font-size: 2rem; margin-bottom: 0.5rem; }\n"
+    "        .meta { color: #555; font-size: 0.95rem; margin-bottom: 0.5rem; }\n"
+    "        .cover { margin-bottom: 3rem; }\n"
+    "        .audio-player { margin: 2rem 0; padding: 1.5rem; background: #ffffff; border-radius: 12px; box-shadow: 0 8px 24px rgba(0,0,0,0.08); }\n"
+    "        .audio-player h2 { margin-top: 0; font-size: 1.25rem; }\n"
+    "        .audio-player audio { width: 100%; margin-top: 1rem; }\n"
+    "        .stage { margin-bottom: 3rem; padding-bottom: 2rem; border-bottom: 1px solid rgba(0,0,0,0.08); }\n"
+    "        .stage:last-of-type { border-bottom: none; }\n"
+    "        figure { text-align: center; margin: 1.5rem auto; }\n"
+    "        figure img { max-width: 100%; height: auto; border-radius: 12px; box-shadow: 0 12px 36px rgba(0,0,0,0.12); }\n"
+    "        figcaption { font-size: 0.9rem; color: #666; margin-top: 0.5rem; }\n"
+    "        p { line-height: 1.65; font-size: 1.05rem; margin-bottom: 1rem; }\n"
+    "    </style>\n"
+)
+
+
+@dataclass(slots=True)
+class HtmlStage:
+    paragraphs: Sequence[str]
+    image: ImageAsset | None = None
+
+
+class StoryHtmlWriter:
+    """Write one story document to ``stream`` (any object with ``write(bytes)``)."""
+
+    def __init__(self, stream: BinaryIO, *, chunk_bytes: int = BASE64_CHUNK_BYTES) -> None:
+        if chunk_bytes <= 0 or chunk_bytes % 3:
+            raise ValueError("chunk_bytes must be a positive multiple of 3")
+        self._stream = stream
+        self._chunk_bytes = chunk_bytes
+        self.bytes_written = 0
+
+    def _write(self, text: str) -> None:
+        self._write_bytes(text.encode("utf-8"))
+
+    def _write_bytes(self, data: bytes) -> None:
+        self._stream.write(data)
+        self.bytes_written += len(data)
+
+    def _write_image(self, asset: ImageAsset, alt: str) -> None:
+        self._write(f"        <figure>\n            <img src=\"data:{html.escape(asset.mime_type, quote=True)};base64,")
+        view = asset.view
+        for start in range(0, len(view), self._chunk_bytes):
+            self._write_bytes(base64.b64encode(view[start : start + self._chunk_bytes]))
+        self._write(f"\" alt=\"{alt}\" />\n        </figure>\n")
+
+    def write_document(
+        self,
+        *,
+        title: str,
+        stages: Sequence[HtmlStage],
+        cover: ImageAsset | None = None,
+        author: str | None = None,
+        audio_url: str | None = None,
+    ) -> int:
+        """Write the full document and return the number of bytes written."""
+
+        escaped_title = html.escape(title)
+        self._write(
+            "<!DOCTYPE html>\n"
+            "<html lang=\"ko\">\n"
+            "<head>\n"
+            "    <meta charset=\"utf-8\" />\n"
+            f"    <title>{escaped_title}</title>\n"
+            f"{_STYLE}"
+            "</head>\n"
+            "<body>\n"
+            "    <header>\n"
+            f"        <h1>{escaped_title}</h1>\n"
+        )
+        if author:
+            self._write(f"        <p class=\"meta\">작성자: {html.escape(author)}</p>\n")
+        self._write("    </header>\n")
+
+        if cover:
+            self._write("    <section class=\"cover stage\">\n")
+            self._write_image(cover, f"{escaped_title} 표지")
+            self._write("    </section>\n")
+
+        if audio_url:
+            escaped_audio_url = html.escape(audio_url, quote=True)
+            self._write(
+                "    <section class=\"audio-player\">\n"
+                "        <h2>동화 읽어주기</h2>\n"
+                f"        <audio controls autoplay src=\"{escaped_audio_url}\">\n"
+                "            이 브라우저는 오디오 재생을 지원하지 않습니다.\n"
+                "        </audio>\n"
+                "    </section>\n"
+            )
+
+        for stage in stages:
+            self._write("    <section class=\"stage\">\n")
+            if stage.image:
+                self._write_image(stage.image, f"{escaped_title} 삽화")
+            paragraphs_html = "\n".join(
+                f"            <p>{html.escape(paragraph)}</p>" for paragraph in stage.paragraphs
+            ) or "            <p>(본문이 없습니다)</p>"
+            self._write(f"{paragraphs_html}\n    </section>\n")
+
+        self._write("</body>\n</html>\n")
+        return self.bytes_written
+
+
+__all__ = ["BASE64_CHUNK_BYTES", "HtmlStage", "StoryHtmlWriter"]
@@ -0,0 +1,174 @@
+"""Compact JSON manifest written next to every story export.
+
+The rendered HTML inlines every image, so reading a story's title, stages or
+paragraphs back from it means downloading and parsing the whole document. The
+manifest carries the same structure as plain data: stages, paragraphs, style
+and age, the narration URL, the HTML size, and each image as a content hash.
+Image bytes live once per hash in the story asset store (see
+``services.story_service``), so consumers fetch only the images they show.
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Mapping
+
+from services.image_asset import ImageAsset
+
+MANIFEST_VERSION = 1
+MANIFEST_SUFFIX = ".json"
+
+
+@dataclass(slots=True)
+class ManifestImage:
+    sha256: str
+    mime_type: str
+    size: int
+    style: str | None = None
+
+    @classmethod
+    def from_asset(cls, asset: ImageAsset, style: str | None = None) -> "ManifestImage":
+        return cls(sha256=asset.sha256, mime_type=asset.mime_type, size=asset.size, style=style)
+
+
+@dataclass(slots=True)
+class ManifestStage:
+    name: str
+    paragraphs: list[str]
+    card: str | None = None
+    image: ManifestImage | None = None
+
+
+@dataclass(slots=True)
+class StoryManifest:
+    title: str
+    stages: list[ManifestStage]
+    author: str | None = None
+    age: str | None = None
+    topic: str | None = None
+    story_type: str | None = None
+    synopsis: str | None = None
+    protagonist: str | None = None
+    style: str | None = None
+    audio_url: str | None = None
+    cover: ManifestImage | None = None
+    # Small WebP preview of the cover (or first illustration) for the library grid.
+    thumbnail: ManifestImage | None = None
+    html_filename: str | None = None
+    html_bytes: int | None = None
+    version: int = MANIFEST_VERSION
+
+    def images(self) -> list[ManifestImage]:
+        """Every referenced image, cover and thumbnail first, without duplicates."""
+
+        seen: dict[str, ManifestImage] = {}
+        for image in [self.cover, self.thumbnail, *(stage.image for stage in self.stages)]:
+            if image is not None:
+                seen.setdefault(image.sha256, image)
+        return list(seen.values())
+
+
+def manifest_path_for(export_path: str | Path) -> Path:
+    """Local manifest path that sits next to an HTML export."""
+
+    return Path(export_path).with_suffix(MANIFEST_SUFFIX)
+
+
+def _image_to_dict(image: ManifestImage | None) -> dict[str, Any] | None:
+    if image is None:
+        return None
+    return {"sha256": image.sha256, "mime_type": image.mime_type, "size": image.size, "style": image.style}
+
+
+def _image_from_dict(data: Any) -> ManifestImage | None:
+    if not isinstance(data, Mapping) or not data.get("sha256"):
+        return None
+    return ManifestImage(
+        sha256=str(data["sha256"]),
+        mime_type=str(data.get("mime_type") or "image/png"),
+        size=int(data.get("size") or 0),
+        style=str(data["style"]) if data.get("style") else None,
+    )
+
+
+def _optional_str(value: Any) -> str | None:
+    return str(value) if value else None
+
+
+def manifest_to_json(manifest: StoryManifest) -> bytes:
+    payload = {
+        "version": manifest.version,
+        "title": manifest.title,
+        "author": manifest.author,
+        "age": manifest.age,
+        "topic": manifest.topic,
+        "story_type": manifest.story_type,
+        "synopsis": manifest.synopsis,
+        "protagonist": manifest.protagonist,
+        "style": manifest.style,
+        "audio_url": manifest.audio_url,
+        "html": {"filename": manifest.html_filename, "bytes": manifest.html_bytes},
+        "cover": _image_to_dict(manifest.cover),
+        "thumbnail": _image_to_dict(manifest.thumbnail),
+        "stages": [
+            {
+                "name": stage.name,
+                "card": stage.card,
+                "paragraphs": list(stage.paragraphs),
+                "image": _image_to_dict(stage.image),
+            }
+            for stage in manifest.stages
+        ],
+    }
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def parse_manifest(data: bytes | str) -> StoryManifest | None:
+    """Parse a stored manifest, or return ``None`` when it is unreadable or from a newer version."""
+
+    try:
+        payload = json.loads(data)
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if not isinstance(payload, Mapping) or payload.get("version") != MANIFEST_VERSION:
+        return None
+    html_info = payload.get("html") if isinstance(payload.get("html"), Mapping) else {}
+    stages = [
+        ManifestStage(
+            name=str(stage.get("name") or ""),
+            paragraphs=[str(paragraph) for paragraph in stage.get("paragraphs") or []],
+            card=_optional_str(stage.get("card")),
+            image=_image_from_dict(stage.get("image")),
+        )
+        for stage in payload.get("stages") or []
+        if isinstance(stage, Mapping)
+    ]
+    return StoryManifest(
+        title=str(payload.get("title") or ""),
+        stages=stages,
+        author=_optional_str(payload.get("author")),
+        age=_optional_str(payload.get("age")),
+        topic=_optional_str(payload.get("topic")),
+        story_type=_optional_str(payload.get("story_type")),
+        synopsis=_optional_str(payload.get("synopsis")),
+        protagonist=_optional_str(payload.get("protagonist")),
+        style=_optional_str(payload.get("style")),
+        audio_url=_optional_str(payload.get("audio_url")),
+        cover=_image_from_dict(payload.get("cover")),
+        thumbnail=_image_from_dict(payload.get("thumbnail")),
+        html_filename=_optional_str(html_info.get("filename")),
+        html_bytes=int(html_info["bytes"]) if html_info.get("bytes") is not None else None,
+    )
+
+
+__all__ = [
+    "MANIFEST_SUFFIX",
+    "MANIFEST_VERSION",
+    "ManifestImage",
+    "ManifestStage",
+    "StoryManifest",
+    "manifest_path_for",
+    "manifest_to_json",
+    "parse_manifest",
+]
@@ -0,0 +1,218 @@
+"""Structured story documents for the paged library reader.
+
+The reader shows one stage at a time instead of handing the whole export,
+with every image inlined, to ``components.html``. Stories exported with a
+manifest are built from it, and their images are referenced by hash and
+loaded only for the page being shown. Older exports written by
+:class:`services.story_html.StoryHtmlWriter` are parsed back from the HTML
+once per process; documents in any other layout return ``None`` and the
+caller falls back to the full HTML view.
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Callable, Hashable
+
+from services.image_asset import ImageAsset
+from services.session_memory import register_regenerable_cache
+from services.story_manifest import ManifestImage, StoryManifest
+
+_DATA_URI_PREFIX = "data:"
+_ENTRIES_ENV = (os.getenv("READER_CACHE_ENTRIES") or "").strip()
+READER_CACHE_ENTRIES = int(_ENTRIES_ENV) if _ENTRIES_ENV.isdigit() else 4
+
+
+@dataclass(slots=True)
+class ReaderStage:
+    paragraphs: list[str] = field(default_factory=list)
+    image: ImageAsset | None = None
+    # Set instead of ``image`` for manifest-backed documents; loaded on display.
+    image_ref: ManifestImage | None = None
+
+
+@dataclass(slots=True)
+class StoryDocument:
+    title: str
+    author: str | None = None
+    cover: ImageAsset | None = None
+    audio_url: str | None = None
+    stages: list[ReaderStage] = field(default_factory=list)
+    cover_ref: ManifestImage | None = None
+
+
+def document_from_manifest(manifest: StoryManifest) -> StoryDocument:
+    return StoryDocument(
+        title=manifest.title,
+        author=manifest.author,
+        audio_url=manifest.audio_url,
+        stages=[ReaderStage(paragraphs=list(stage.paragraphs), image_ref=stage.image) for stage in manifest.stages],
+        cover_ref=manifest.cover,
+    )
+
+
+def _decode_data_uri(uri: str) -> ImageAsset | None:
+    if not uri.startswith(_DATA_URI_PREFIX):
+        return None
+    header, sep, payload = uri[len(_DATA_URI_PREFIX):].partition(",")
+    if not sep or not header.endswith(";base64"):
+        return None
+    try:
+        data = base64.b64decode(payload, validate=True)
+    except (binascii.Error, ValueError):
+        return None
+    return ImageAsset(data, header[: -len(";base64")]) if data else None
+
+
+class _StoryHtmlParser(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.title: str | None = None
+        self.author: str | None = None
+        self.cover: ImageAsset | None = None
+        self.audio_url: str | None = None
+        self.stages: list[ReaderStage] = []
+        self._section: str | None = None
+        self._text_target: str | None = None
+        self._text: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        attributes = dict(attrs)
+        classes = set((attributes.get("class") or "").split())
+        if tag == "section":
+            if "cover" in classes:
+                self._section = "cover"
+            elif "audio-player" in classes:
+                self._section = "audio"
+            elif "stage" in classes:
+                self._section = "stage"
+                self.stages.append(ReaderStage())
+            return
+        if tag == "img" and self._section in {"cover", "stage"}:
+            asset = _decode_data_uri(attributes.get("src") or "")
+            if self._section == "cover":
+                self.cover = asset
+            else:
+                self.stages[-1].image = asset
+            return
+        if tag == "audio" and self._section == "audio":
+            self.audio_url = attributes.get("src") or None
+            return
+        if tag == "h1" and self.title is None:
+            self._start_text("title")
+        elif tag == "p" and self._section == "stage":
+            self._start_text("paragraph")
+        elif tag == "p" and "meta" in classes and self._section is None:
+            self._start_text("author")
+
+    def _start_text(self, target: str) -> None:
+        self._text_target = target
+        self._text = []
+
+    def handle_data(self, data: str) -> None:
+        if self._text_target is not None:
+            self._text.append(data)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "section":
+            self._section = None
+            return
+        if self._text_target is None or tag not in {"h1", "p"}:
+            return
+        text = "".join(self._text).strip()
+        if self._text_target == "title":
+            self.title = text
+        elif self._text_target == "author":
+            self.author = text.split(":", 1)[-1].strip() or None
+        elif text and text != "(본문이 없습니다)":
+            self.stages[-1].paragraphs.append(text)
+        self._text_target = None
+
+
+def parse_story_html(html: str) -> StoryDocument | None:
+    """Parse an exported story, or return ``None`` when it is not in the export layout."""
+
+    parser = _StoryHtmlParser()
+    parser.feed(html)
+    parser.close()
+    if parser.title is None or not parser.stages:
+        return None
+    return StoryDocument(
+        title=parser.title,
+        author=parser.author,
+        cover=parser.cover,
+        audio_url=parser.audio_url,
+        stages=parser.stages,
+    )
+
+
+class StoryDocumentCache:
+    """Small process-wide LRU of parsed documents, shared by every session."""
+
+    def __init__(self, max_entries: int = READER_CACHE_ENTRIES) -> None:
+        self._max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        self._documents: OrderedDict[Hashable, StoryDocument | None] = OrderedDict()
+
+    def get(self, key: Hashable) -> tuple[bool, StoryDocument | None]:
+        with self._lock:
+            if key not in self._documents:
+                return False, None
+            self._documents.move_to_end(key)
+            return True, self._documents[key]
+
+    def get_or_parse(
+        self,
+        key: Hashable,
+        load_html: Callable[[], str | None],
+        load_manifest: Callable[[], StoryManifest | None] | None = None,
+    ) -> StoryDocument | None:
+        """Build the document from the manifest when there is one, else from the HTML."""
+
+        found, document = self.get(key)
+        if found:
+            return document
+        manifest = load_manifest() if load_manifest is not None else None
+        if manifest is not None:
+            document = document_from_manifest(manifest)
+        else:
+            html = load_html()
+            if html is None:
+                return None
+            document = parse_story_html(html)
+        with self._lock:
+            self._documents[key] = document
+            self._documents.move_to_end(key)
+            while len(self._documents) > self._max_entries:
+                self._documents.popitem(last=False)
+        return document
+
+    def clear(self) -> int:
+        with self._lock:
+            dropped = len(self._documents)
+            self._documents.clear()
+            return dropped
+
+
+_CACHE = StoryDocumentCache()
+register_regenerable_cache("story_documents", _CACHE.clear)
+
+
+def get_story_document_cache() -> StoryDocumentCache:
+    return _CACHE
+
+
+__all__ = [
+    "READER_CACHE_ENTRIES",
+    "ReaderStage",
+    "StoryDocument",
+    "StoryDocumentCache",
+    "document_from_manifest",
+    "get_story_document_cache",
+    "parse_story_html",
+]
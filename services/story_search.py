@@ -0,0 +1,643 @@
+"""Full-text search over saved stories.
+
+Title, author, synopsis, protagonist and paragraphs of every recorded story
+are split into character bigrams, which match Korean words inside longer
+eojeol ("토끼" in "토끼와") without a morphological analyser, and kept in an
+inverted index. The index is one file: a JSON header (documents and the term
+table) followed by packed uint32 ``(document, weight)`` postings. The file is
+memory-mapped on startup, so a query reads only the posting lists it touches.
+
+``record_story_export`` adds each new story in memory, and the file is
+rewritten at most once per ``SEARCH_INDEX_PUBLISH_INTERVAL_SECONDS`` for all
+stories added since. A process that finds no index starts with an empty one
+and builds it from Firestore on a background thread, as
+``scripts/build_search_index.py`` does; until then only newly added stories
+are found. With ``SEARCH_INDEX_GCS_OBJECT`` set, the file is also uploaded
+after each write and downloaded by replicas that start without a local copy.
+Uploads are conditional on the object's generation: a replica that lost the
+race downloads the newer index, re-adds its own new stories and tries again.
+"""
+from __future__ import annotations
+
+import atexit
+import bisect
+import json
+import logging
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+import threading
+import time
+import unicodedata
+from array import array
+from collections import Counter
+from dataclasses import asdict, dataclass, fields
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Mapping
+
+from gcs_storage import (
+    GCSGenerationMismatch,
+    download_gcs_export_bytes,
+    gcs_object_name,
+    get_gcs_export_generation,
+    upload_file_if_generation,
+)
+from services.export_cache import load_export_html
+from services.story_manifest import StoryManifest
+from services.story_reader import parse_story_html
+from services.story_service import load_story_manifest
+
+logger = logging.getLogger(__name__)
+
+SEARCH_INDEX_ENABLED = (os.getenv("SEARCH_INDEX_ENABLED", "true").strip().lower() not in {"0", "false", "no"})
+SEARCH_INDEX_PATH = (os.getenv("SEARCH_INDEX_PATH") or "").strip() or ".cache/search/stories.idx"
+# Object name under GCS_PREFIX (e.g. "search/stories.idx"); empty keeps the index local.
+SEARCH_INDEX_GCS_OBJECT = (os.getenv("SEARCH_INDEX_GCS_OBJECT") or "").strip()
+_PUBLISH_INTERVAL_ENV = (os.getenv("SEARCH_INDEX_PUBLISH_INTERVAL_SECONDS") or "").strip()
+SEARCH_INDEX_PUBLISH_INTERVAL_SECONDS = int(_PUBLISH_INTERVAL_ENV) if _PUBLISH_INTERVAL_ENV.isdigit() else 60
+
+# Relative weight of a bigram occurrence in each indexed field.
+FIELD_WEIGHTS: dict[str, int] = {"title": 4, "author": 2, "protagonist": 2, "synopsis": 2, "body": 1}
+# Share of a query's bigrams a story must contain to be returned.
+MIN_MATCH_RATIO = 0.6
+_BM25_K1 = 1.2
+_MAGIC = b"FBSIDX1\n"
+_HEADER_LENGTH = struct.Struct("<I")
+_WORD = re.compile(r"[0-9a-zㄱ-ㆎ가-힣]+")
+_MAX_WEIGHT = 2**32 - 1
+_PUBLISH_ATTEMPTS = 5
+
+
+@dataclass(slots=True)
+class SearchDocument:
+    """What a search hit needs to open the story without another Firestore read."""
+
+    record_id: str
+    user_id: str
+    title: str
+    story_id: str | None = None
+    author: str | None = None
+    created_at: str | None = None  # ISO-8601, UTC
+    html_filename: str | None = None
+    local_path: str | None = None
+    gcs_object: str | None = None
+    gcs_url: str | None = None
+    manifest_path: str | None = None
+    manifest_object: str | None = None
+    thumbnail_url: str | None = None
+    thumbnail_path: str | None = None
+
+
+@dataclass(slots=True)
+class SearchHit:
+    document: SearchDocument
+    score: float
+
+
+_DOCUMENT_FIELDS = frozenset(field.name for field in fields(SearchDocument))
+
+
+def tokenize(text: str) -> Counter[str]:
+    """Character bigrams of each word (single-character words are kept whole)."""
+
+    grams: Counter[str] = Counter()
+    for word in _WORD.findall(unicodedata.normalize("NFKC", text).lower()):
+        if len(word) == 1:
+            grams[word] += 1
+            continue
+        for start in range(len(word) - 1):
+            grams[word[start : start + 2]] += 1
+    return grams
+
+
+def story_texts(
+    *,
+    title: str,
+    author: str | None = None,
+    manifest: StoryManifest | None = None,
+    paragraphs: Iterable[str] = (),
+) -> dict[str, str]:
+    """Indexed text per field, from the manifest when there is one."""
+
+    body = list(paragraphs)
+    texts = {"title": title, "author": author or ""}
+    if manifest is not None:
+        texts["synopsis"] = manifest.synopsis or ""
+        texts["protagonist"] = manifest.protagonist or ""
+        body.extend(paragraph for stage in manifest.stages for paragraph in stage.paragraphs)
+    texts["body"] = "\n".join(body)
+    return texts
+
+
+def _weigh(texts: Mapping[str, str]) -> Counter[str]:
+    weights: Counter[str] = Counter()
+    for field_name, text in texts.items():
+        factor = FIELD_WEIGHTS.get(field_name, 1)
+        for gram, count in tokenize(text).items():
+            weights[gram] += count * factor
+    return weights
+
+
+class StorySearchIndex:
+    """Inverted index of bigram -> packed (document, weight) pairs.
+
+    Posting lists loaded from disk stay in the memory map; documents added
+    afterwards are kept in per-term arrays until the next :meth:`save`.
+    Re-adding a record replaces its previous document. Documents added since
+    the last publish are also remembered so :meth:`rebase` can replay them
+    onto a newer shared copy.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._documents: list[SearchDocument] = []
+        self._live: list[bool] = []
+        self._by_record: dict[str, int] = {}
+        self._file_terms: dict[str, tuple[int, int]] = {}
+        self._packed: memoryview | None = None
+        self._mmap: mmap.mmap | None = None
+        self._added: dict[str, array] = {}
+        self._sorted_terms: list[str] | None = None
+        self._pending: dict[str, tuple[SearchDocument, Counter[str]]] = {}
+        # GCS generation of the shared index this copy was loaded from or last published as.
+        self.generation = 0
+        # False while a background build is filling this index; it is not published until then.
+        self.ready = True
+
+    # Loading and saving -------------------------------------------------------------
+    @classmethod
+    def load(cls, path: str | Path) -> "StorySearchIndex":
+        index = cls()
+        with open(path, "rb") as fh:
+            mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if mapped[: len(_MAGIC)] != _MAGIC:
+                raise ValueError(f"{path} is not a story search index")
+            header_start = len(_MAGIC) + _HEADER_LENGTH.size
+            (header_length,) = _HEADER_LENGTH.unpack_from(mapped, len(_MAGIC))
+            header = json.loads(mapped[header_start : header_start + header_length])
+            data_start = -(-(header_start + header_length) // 4) * 4
+            if header.get("byteorder") == sys.byteorder:
+                packed = memoryview(mapped)[data_start:].cast("I")
+                index._mmap = mapped
+            else:
+                swapped = array("I", mapped[data_start:])
+                swapped.byteswap()
+                packed = memoryview(swapped)
+                mapped.close()
+        except BaseException:
+            if index._mmap is None:
+                mapped.close()
+            raise
+        index._packed = packed
+        index._file_terms = {term: (int(offset), int(count)) for term, (offset, count) in header["terms"].items()}
+        for raw in header["documents"]:
+            index._append_document(SearchDocument(**{k: v for k, v in raw.items() if k in _DOCUMENT_FIELDS}))
+        return index
+
+    def save(self, path: str | Path) -> None:
+        """Write live documents to ``path`` atomically and keep serving from memory."""
+
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            renumber = self._renumbering()
+            documents = [asdict(doc) for doc, live in zip(self._documents, self._live) if live]
+            merged = self._merged_postings(renumber)
+            terms: dict[str, list[int]] = {}
+            packed = array("I")
+            for term in sorted(merged):
+                postings = merged[term]
+                if postings:
+                    terms[term] = [len(packed) // 2, len(postings) // 2]
+                    packed.extend(postings)
+            header = json.dumps(
+                {"version": 1, "byteorder": sys.byteorder, "documents": documents, "terms": terms},
+                ensure_ascii=False,
+                separators=(",", ":"),
+            ).encode("utf-8")
+            header_end = len(_MAGIC) + _HEADER_LENGTH.size + len(header)
+            padding = b"\0" * (-header_end % 4)
+
+            fd, tmp_name = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as fh:
+                    fh.write(_MAGIC)
+                    fh.write(_HEADER_LENGTH.pack(len(header)))
+                    fh.write(header)
+                    fh.write(padding)
+                    packed.tofile(fh)
+                self._release_map()
+                os.replace(tmp_name, target)
+            except BaseException:
+                Path(tmp_name).unlink(missing_ok=True)
+                raise
+
+            live_documents = [doc for doc, live in zip(self._documents, self._live) if live]
+            self._documents, self._live, self._by_record = [], [], {}
+            for document in live_documents:
+                self._append_document(document)
+            self._added = {term: postings for term, postings in merged.items() if postings}
+            self._file_terms = {}
+            self._sorted_terms = None
+
+    def rebase(self, base: "StorySearchIndex", generation: int) -> None:
+        """Take over ``base`` (a newer shared copy) and re-add the documents not yet published."""
+
+        with self._lock:
+            pending = list(self._pending.values())
+            self._release_map()
+            with base._lock:
+                self._documents, self._live, self._by_record = base._documents, base._live, base._by_record
+                self._file_terms, self._added = base._file_terms, base._added
+                self._packed, self._mmap = base._packed, base._mmap
+                base._packed = base._mmap = None
+            self._sorted_terms = None
+            self.generation = generation
+        for document, weights in pending:
+            self._add_weights(document, weights)
+
+    def pending(self) -> dict[str, tuple[SearchDocument, Counter[str]]]:
+        with self._lock:
+            return dict(self._pending)
+
+    def mark_published(self, generation: int, published: Mapping[str, tuple[SearchDocument, Counter[str]]]) -> None:
+        """Forget the ``published`` documents; ones re-added meanwhile stay pending."""
+
+        with self._lock:
+            for record_id, entry in published.items():
+                if self._pending.get(record_id) is entry:
+                    del self._pending[record_id]
+            self.generation = generation
+
+    def close(self) -> None:
+        """Copy the mapped postings into memory and release the file."""
+
+        with self._lock:
+            if self._mmap is None:
+                return
+            self._added = self._merged_postings(None)
+            self._file_terms = {}
+            self._release_map()
+
+    def _release_map(self) -> None:
+        if self._packed is not None:
+            self._packed.release()
+            self._packed = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def _renumbering(self) -> list[int] | None:
+        if all(self._live):
+            return None
+        mapping: list[int] = []
+        next_id = 0
+        for live in self._live:
+            mapping.append(next_id if live else -1)
+            next_id += live
+        return mapping
+
+    def _merged_postings(self, renumber: list[int] | None) -> dict[str, array]:
+        merged: dict[str, array] = {}
+        for term in self._file_terms.keys() | self._added.keys():
+            postings = self._postings(term)
+            if renumber is not None:
+                filtered = array("I")
+                for position in range(0, len(postings), 2):
+                    doc_id = renumber[postings[position]]
+                    if doc_id >= 0:
+                        filtered.extend((doc_id, postings[position + 1]))
+                postings = filtered
+            merged[term] = postings
+        return merged
+
+    # Updates and queries --------------------------------------------------------------
+    def _append_document(self, document: SearchDocument) -> int:
+        previous = self._by_record.get(document.record_id)
+        if previous is not None:
+            self._live[previous] = False
+        self._documents.append(document)
+        self._live.append(True)
+        self._by_record[document.record_id] = len(self._documents) - 1
+        return len(self._documents) - 1
+
+    def add(self, document: SearchDocument, texts: Mapping[str, str]) -> None:
+        self._add_weights(document, _weigh(texts))
+
+    def _add_weights(self, document: SearchDocument, weights: Counter[str]) -> None:
+        with self._lock:
+            self._pending[document.record_id] = (document, weights)
+            doc_id = self._append_document(document)
+            for gram, weight in weights.items():
+                self._added.setdefault(gram, array("I")).extend((doc_id, min(weight, _MAX_WEIGHT)))
+            self._sorted_terms = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(self._live)
+
+    def _postings(self, term: str) -> array:
+        postings = array("I")
+        location = self._file_terms.get(term)
+        if location is not None and self._packed is not None:
+            offset, count = location
+            postings.frombytes(self._packed[offset * 2 : (offset + count) * 2].tobytes())
+        added = self._added.get(term)
+        if added is not None:
+            postings.extend(added)
+        return postings
+
+    def _expand(self, gram: str) -> list[str]:
+        """A one-character query term matches every bigram starting with it."""
+
+        if len(gram) > 1:
+            return [gram]
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._file_terms.keys() | self._added.keys())
+        start = bisect.bisect_left(self._sorted_terms, gram)
+        matches: list[str] = []
+        for term in self._sorted_terms[start:]:
+            if not term.startswith(gram):
+                break
+            matches.append(term)
+        return matches
+
+    def search(self, query: str, *, user_id: str | None = None, limit: int = 20) -> list[SearchHit]:
+        """Stories ranked by BM25-style bigram scores, best first."""
+
+        grams = list(tokenize(query))
+        if not grams or limit <= 0:
+            return []
+        with self._lock:
+            total = max(sum(self._live), 1)
+            scores: dict[int, float] = {}
+            matched: Counter[int] = Counter()
+            for gram in grams:
+                weights: Counter[int] = Counter()
+                for term in self._expand(gram):
+                    postings = self._postings(term)
+                    for position in range(0, len(postings), 2):
+                        weights[postings[position]] += postings[position + 1]
+                if not weights:
+                    continue
+                idf = math.log(1 + (total - len(weights) + 0.5) / (len(weights) + 0.5))
+                for doc_id, weight in weights.items():
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * weight * (_BM25_K1 + 1) / (weight + _BM25_K1)
+                    matched[doc_id] += 1
+
+            required = max(1, math.ceil(len(grams) * MIN_MATCH_RATIO))
+            hits = [
+                SearchHit(self._documents[doc_id], score)
+                for doc_id, score in scores.items()
+                if self._live[doc_id]
+                and matched[doc_id] >= required
+                and (user_id is None or self._documents[doc_id].user_id == user_id)
+            ]
+        hits.sort(key=lambda hit: (hit.score, hit.document.created_at or ""), reverse=True)
+        return hits[:limit]
+
+
+def _download_index(path: Path, *, generation: int | None = None) -> int:
+    """Write the shared index to ``path``; returns its generation (0 when there is none)."""
+
+    fetched = download_gcs_export_bytes(gcs_object_name(SEARCH_INDEX_GCS_OBJECT), generation=generation)
+    if fetched is None:
+        return 0
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(fetched[0])
+    os.replace(tmp_name, path)
+    return fetched[1] or 0
+
+
+def _legacy_paragraphs(local_path: str | None, gcs_object: str | None) -> list[str]:
+    html = None
+    if local_path and Path(local_path).exists():
+        html = Path(local_path).read_text("utf-8")
+    elif gcs_object:
+        html = load_export_html(gcs_object)
+    document = parse_story_html(html) if html else None
+    if document is None:
+        return []
+    return [paragraph for stage in document.stages for paragraph in stage.paragraphs]
+
+
+def build_search_index(sources: Counter[str] | None = None) -> StorySearchIndex:
+    """Index every Firestore story record, from its manifest or else its HTML.
+
+    ``sources`` (when given) counts the records indexed from ``"manifest"`` and ``"html"``.
+    """
+
+    from story_library import list_story_records, search_document
+
+    index = StorySearchIndex()
+    for record in reversed(list_story_records(limit=None)):
+        manifest = None
+        if record.manifest_path or record.manifest_object:
+            manifest = load_story_manifest(local_path=record.manifest_path, gcs_object=record.manifest_object)
+        paragraphs = [] if manifest is not None else _legacy_paragraphs(record.local_path, record.gcs_object)
+        if sources is not None:
+            sources["manifest"] += manifest is not None
+            sources["html"] += bool(paragraphs)
+        index.add(
+            search_document(record),
+            story_texts(title=record.title, author=record.author_name, manifest=manifest, paragraphs=paragraphs),
+        )
+    return index
+
+
+_build_thread: threading.Thread | None = None
+
+
+def _build_in_background(index: StorySearchIndex) -> None:
+    def _build() -> None:
+        try:
+            built = build_search_index()
+        except Exception as exc:  # noqa: BLE001 - search must never break the library
+            logger.warning("Story search index could not be built from Firestore, staying partial: %s", exc)
+            return
+        # Stories recorded while the build ran are still pending and are replayed on top.
+        index.rebase(built, index.generation)
+        index.ready = True
+        publish_search_index(index)
+
+    global _build_thread
+    index.ready = False
+    _build_thread = threading.Thread(target=_build, name="story-search-build", daemon=True)
+    _build_thread.start()
+
+
+@lru_cache(maxsize=1)
+def get_story_search_index() -> StorySearchIndex:
+    """Process-wide index, loaded from ``SEARCH_INDEX_PATH`` (or GCS) on first use.
+
+    Without either copy an empty index is returned at once and filled from
+    Firestore in the background (see :func:`search_index_ready`).
+    """
+
+    path = Path(SEARCH_INDEX_PATH)
+    try:
+        generation = 0
+        if not path.exists() and SEARCH_INDEX_GCS_OBJECT:
+            generation = _download_index(path)
+        if path.exists():
+            index = StorySearchIndex.load(path)
+            index.generation = generation
+            return index
+    except (OSError, ValueError, KeyError) as exc:
+        logger.warning("Story search index at %s unreadable, rebuilding: %s", path, exc)
+    index = StorySearchIndex()
+    _build_in_background(index)
+    return index
+
+
+def search_index_ready() -> bool:
+    """False while the index is still being built, i.e. results may be missing stories."""
+
+    return not SEARCH_INDEX_ENABLED or get_story_search_index().ready
+
+
+_publish_lock = threading.Lock()
+_schedule_lock = threading.Lock()
+_scheduled_index: StorySearchIndex | None = None
+_publish_timer: threading.Timer | None = None
+_last_publish = 0.0
+
+
+def publish_search_index(index: StorySearchIndex) -> bool:
+    """Persist the index locally and, when configured, to GCS; False if the upload did not land.
+
+    The upload only replaces the generation this index last saw. When another
+    replica published in between, its index is downloaded and this one's new
+    documents are replayed onto it before retrying. An index that is still
+    being built is left to its builder, so a partial index is never shared.
+    """
+
+    global _last_publish
+    if not index.ready:
+        return False
+    with _publish_lock:
+        _last_publish = time.monotonic()
+        return _publish_locked(index)
+
+
+def _publish_locked(index: StorySearchIndex) -> bool:
+    if not SEARCH_INDEX_GCS_OBJECT:
+        published = index.pending()
+        index.save(SEARCH_INDEX_PATH)
+        index.mark_published(index.generation, published)
+        return True
+
+    object_name = gcs_object_name(SEARCH_INDEX_GCS_OBJECT)
+    path = Path(SEARCH_INDEX_PATH)
+    for _ in range(_PUBLISH_ATTEMPTS):
+        current = get_gcs_export_generation(object_name) or 0
+        if current and current != index.generation:
+            fetched_path = path.with_name(f"{path.name}.remote")
+            try:
+                if _download_index(fetched_path, generation=current) != current:
+                    continue  # replaced again (or unreadable right now); look again
+                index.rebase(StorySearchIndex.load(fetched_path), current)
+            except (ValueError, KeyError) as exc:
+                logger.warning("Shared story search index is corrupt, replacing it: %s", exc)
+            finally:
+                fetched_path.unlink(missing_ok=True)
+        published = index.pending()
+        index.save(path)
+        try:
+            generation = upload_file_if_generation(
+                path,
+                SEARCH_INDEX_GCS_OBJECT,
+                content_type="application/octet-stream",
+                generation=current,
+            )
+        except GCSGenerationMismatch:
+            continue
+        if generation is None:
+            return False
+        index.mark_published(generation, published)
+        return True
+    logger.warning("Shared story search index kept changing; new stories stay local until the next publish")
+    return False
+
+
+def _schedule_publish(index: StorySearchIndex) -> None:
+    """Publish ``index`` once the publish interval has passed, batching every story added until then."""
+
+    global _scheduled_index, _publish_timer
+    with _schedule_lock:
+        _scheduled_index = index
+        if _publish_timer is not None:
+            return
+        delay = max(0.0, _last_publish + SEARCH_INDEX_PUBLISH_INTERVAL_SECONDS - time.monotonic())
+        _publish_timer = threading.Timer(delay, _publish_scheduled)
+        _publish_timer.name = "story-search-publish"
+        _publish_timer.daemon = True
+        _publish_timer.start()
+
+
+def _publish_scheduled() -> None:
+    global _publish_timer
+    with _schedule_lock:
+        _publish_timer = None
+    flush_search_index()
+
+
+def flush_search_index() -> bool:
+    """Publish the stories added since the last publish now (also run at exit)."""
+
+    with _schedule_lock:
+        index = _scheduled_index
+    if index is None or not index.pending():
+        return True
+    return publish_search_index(index)
+
+
+atexit.register(flush_search_index)
+
+
+def index_story_export(document: SearchDocument) -> None:
+    """Add a newly recorded story (read from its manifest when available); it is published in the next batch."""
+
+    if not SEARCH_INDEX_ENABLED:
+        return
+    manifest = None
+    if document.manifest_path or document.manifest_object:
+        manifest = load_story_manifest(local_path=document.manifest_path, gcs_object=document.manifest_object)
+    index = get_story_search_index()
+    index.add(document, story_texts(title=document.title, author=document.author, manifest=manifest))
+    _schedule_publish(index)
+
+
+def search_stories(query: str, *, user_id: str | None = None, limit: int = 20) -> list[SearchHit]:
+    if not SEARCH_INDEX_ENABLED:
+        return []
+    return get_story_search_index().search(query, user_id=user_id, limit=limit)
+
+
+__all__ = [
+    "FIELD_WEIGHTS",
+    "SEARCH_INDEX_ENABLED",
+    "SEARCH_INDEX_GCS_OBJECT",
+    "SEARCH_INDEX_PATH",
+    "SEARCH_INDEX_PUBLISH_INTERVAL_SECONDS",
+    "SearchDocument",
+    "SearchHit",
+    "StorySearchIndex",
+    "build_search_index",
+    "flush_search_index",
+    "get_story_search_index",
+    "index_story_export",
+    "publish_search_index",
+    "search_index_ready",
+    "search_stories",
+    "story_texts",
+    "tokenize",
+]
@@ -1,18 +1,53 @@
 """Story generation, export, and persistence orchestration."""
 from __future__ import annotations
 
-import base64
-import html
+import hashlib
+import logging
+import os
 import re
+import tempfile
 from dataclasses import dataclass
 from datetime import datetime
-from pathlib import Path
+from functools import lru_cache
+from pathlib import Path, PurePosixPath
 from typing import Any, Mapping, Sequence
 
-from gcs_storage import upload_html_to_gcs
+from gcs_storage import (
+    GCS_HTML_CACHE_CONTROL,
+    GCS_HTML_GZIP,
+    decode_export_html,
+    gcs_object_name,
+    is_gcs_available,
+    record_gcs_export,
+)
+from services.image_asset import ImageAsset
+from services.story_html import HtmlStage, StoryHtmlWriter
+from services.story_manifest import (
+    MANIFEST_SUFFIX,
+    ManifestImage,
+    ManifestStage,
+    StoryManifest,
+    manifest_path_for,
+    manifest_to_json,
+    parse_manifest,
+)
+from services.storage_backend import (
+    GCSStorageBackend,
+    LocalStorageBackend,
+    ObjectStat,
+    StorageBackend,
+    TieredStorageBackend,
+)
+from services.thumbnails import make_thumbnail
+
+logger = logging.getLogger(__name__)
 
 HTML_EXPORT_DIR = "html_exports"
 HTML_EXPORT_PATH = Path(HTML_EXPORT_DIR)
+# Content-addressed image store shared by every export's manifest.
+STORY_ASSET_DIRNAME = "assets"
+_HTML_CONTENT_TYPE = "text/html; charset=utf-8"
+_MANIFEST_CONTENT_TYPE = "application/json; charset=utf-8"
 
 
 @dataclass(slots=True)
@@ -24,6 +59,11 @@ class StagePayload:
     image_bytes: bytes | None
     image_mime: str
     image_style_name: str | None = None
+    image_asset: ImageAsset | None = None
+
+    def __post_init__(self) -> None:
+        if self.image_asset is None and self.image_bytes:
+            self.image_asset = ImageAsset(self.image_bytes, self.image_mime)
 
 
 @dataclass(slots=True)
@@ -44,6 +84,10 @@ class ExportResult:
     local_path: str
     gcs_object: str | None = None
     gcs_url: str | None = None
+    manifest_path: str | None = None
+    manifest_object: str | None = None
+    thumbnail_path: str | None = None
+    thumbnail_url: str | None = None
 
 
 def _slugify_filename(value: str) -> str:
@@ -53,168 +97,282 @@ def _slugify_filename(value: str) -> str:
     return slug or "story"
 
 
-def _build_story_html_document(
-    *,
-    title: str,
-    age: str,
-    topic: str,
-    story_type: str,
-    stages: Sequence[Mapping[str, Any]],
-    cover: Mapping[str, Any] | None = None,
-    author: str | None = None,
-    audio_url: str | None = None,
-) -> str:
-    escaped_title = html.escape(title)
-    escaped_author = html.escape(author) if author else ""
-
-    cover_section = ""
-    if cover and cover.get("image_data_uri"):
-        cover_section = (
-            "    <section class=\"cover stage\">\n"
-            "        <figure>\n"
-            f"            <img src=\"{cover.get('image_data_uri')}\" alt=\"{escaped_title} 표지\" />\n"
-            "        </figure>\n"
-            "    </section>\n"
-        )
+def _asset_key(sha256: str) -> str:
+    return f"{STORY_ASSET_DIRNAME}/{sha256}"
 
-    audio_section = ""
-    if audio_url:
-        escaped_audio_url = html.escape(audio_url, quote=True)
-        audio_section = (
-            "    <section class=\"audio-player\">\n"
-            "        <h2>동화 읽어주기</h2>\n"
-            f"        <audio controls autoplay src=\"{escaped_audio_url}\">\n"
-            "            이 브라우저는 오디오 재생을 지원하지 않습니다.\n"
-            "        </audio>\n"
-            "    </section>\n"
-        )
 
-    stage_sections: list[str] = []
-    for stage in stages:
-        image_data_uri = stage.get("image_data_uri") or ""
-        paragraphs = stage.get("paragraphs") or []
-
-        paragraphs_html = "\n".join(
-            f"            <p>{html.escape(paragraph)}</p>" for paragraph in paragraphs
-        ) or "            <p>(본문이 없습니다)</p>"
-
-        image_section = (
-            "        <figure>\n"
-            f"            <img src=\"{image_data_uri}\" alt=\"{escaped_title} 삽화\" />\n"
-            "        </figure>\n"
-        ) if image_data_uri else ""
-
-        section_html = (
-            "    <section class=\"stage\">\n"
-            f"{image_section}"
-            f"{paragraphs_html}\n"
-            "    </section>\n"
-        )
-        stage_sections.append(section_html)
+def _asset_path(sha256: str) -> Path:
+    return HTML_EXPORT_PATH / _asset_key(sha256)
+
+
+# Replaces the bucket behind story_storage() (benchmarks, tests); None means GCS when configured.
+_remote_story_storage: StorageBackend | None = None
+
+
+def use_remote_story_storage(backend: StorageBackend | None) -> None:
+    global _remote_story_storage
+    _remote_story_storage = backend
+    _tiered_story_storage.cache_clear()
+
+
+def _verify_story_object(key: str, data: bytes) -> bool:
+    prefix = f"{STORY_ASSET_DIRNAME}/"
+    return not key.startswith(prefix) or hashlib.sha256(data).hexdigest() == key[len(prefix) :]
 
-    stages_html = "".join(stage_sections)
 
-    author_block = (
-        f"        <p class=\"meta\">작성자: {escaped_author}</p>\n" if escaped_author else ""
+def _story_cache_control(key: str) -> str | None:
+    # Manifests are rewritten with their export; documents and images never change under their name.
+    return None if key.endswith(MANIFEST_SUFFIX) else GCS_HTML_CACHE_CONTROL or None
+
+
+@lru_cache(maxsize=1)
+def _gcs_story_storage() -> GCSStorageBackend:
+    return GCSStorageBackend(
+        cache_control=_story_cache_control,
+        gzip_content_types=(_HTML_CONTENT_TYPE,) if GCS_HTML_GZIP else (),
     )
 
-    return (
-        "<!DOCTYPE html>\n"
-        "<html lang=\"ko\">\n"
-        "<head>\n"
-        "    <meta charset=\"utf-8\" />\n"
-        f"    <title>{escaped_title}</title>\n"
-        "    <style>\n"
-        "        body { font-family: 'Noto Sans KR', sans-serif; margin: 2rem; background: #faf7f2; color: #2c2c2c; }\n"
-        "        header { margin-bottom: 2.5rem; }\n"
-        "        h1 { font-size: 2rem; margin-bottom: 0.5rem; }\n"
-        "        .meta { color: #555; font-size: 0.95rem; margin-bottom: 0.5rem; }\n"
-        "        .cover { margin-bottom: 3rem; }\n"
-        "        .audio-player { margin: 2rem 0; padding: 1.5rem; background: #ffffff; border-radius: 12px; box-shadow: 0 8px 24px rgba(0,0,0,0.08); }\n"
-        "        .audio-player h2 { margin-top: 0; font-size: 1.25rem; }\n"
-        "        .audio-player audio { width: 100%; margin-top: 1rem; }\n"
-        "        .stage { margin-bottom: 3rem; padding-bottom: 2rem; border-bottom: 1px solid rgba(0,0,0,0.08); }\n"
-        "        .stage:last-of-type { border-bottom: none; }\n"
-        "        figure { text-align: center; margin: 1.5rem auto; }\n"
-        "        figure img { max-width: 100%; height: auto; border-radius: 12px; box-shadow: 0 12px 36px rgba(0,0,0,0.12); }\n"
-        "        figcaption { font-size: 0.9rem; color: #666; margin-top: 0.5rem; }\n"
-        "        p { line-height: 1.65; font-size: 1.05rem; margin-bottom: 1rem; }\n"
-        "    </style>\n"
-        "</head>\n"
-        "<body>\n"
-        "    <header>\n"
-        f"        <h1>{escaped_title}</h1>\n"
-        f"{author_block}"
-        "    </header>\n"
-        f"{cover_section}{audio_section}{stages_html}"
-        "</body>\n"
-        "</html>\n"
+
+@lru_cache(maxsize=1)
+def _tiered_story_storage(root: Path, remote: StorageBackend | None) -> TieredStorageBackend:
+    tiers: list[StorageBackend] = [LocalStorageBackend(root)]
+    if remote is not None:
+        tiers.append(remote)
+    return TieredStorageBackend(tiers, validate=_verify_story_object)
+
+
+def story_storage() -> TieredStorageBackend:
+    """``HTML_EXPORT_PATH`` read through to the bucket; images are hash-checked before use.
+
+    One instance is shared until the export path or the remote changes, so
+    its hit and backfill counters cover the whole process.
+    """
+
+    remote = _remote_story_storage
+    if remote is None and is_gcs_available():
+        remote = _gcs_story_storage()
+    return _tiered_story_storage(HTML_EXPORT_PATH, remote)
+
+
+def _write_atomic(path: Path, data: bytes | memoryview) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def _store_asset(asset: ImageAsset, style: str | None = None) -> ManifestImage:
+    image = ManifestImage.from_asset(asset, style)
+    path = _asset_path(image.sha256)
+    if not path.exists():
+        _write_atomic(path, asset.view)
+    return image
+
+
+def _write_manifest(
+    export_path: Path,
+    *,
+    bundle: StoryBundle,
+    author: str | None,
+    title: str,
+    stages: Sequence[HtmlStage],
+    cover: ImageAsset | None,
+) -> Path:
+    cover_style = (bundle.cover or {}).get("style_name")
+    preview_source = cover or next((stage.image for stage in stages if stage.image), None)
+    thumbnail = make_thumbnail(preview_source) if preview_source else None
+    manifest = StoryManifest(
+        title=title,
+        stages=[
+            ManifestStage(
+                name=payload.stage_name,
+                paragraphs=list(stage.paragraphs),
+                card=payload.card_name,
+                image=_store_asset(stage.image, payload.image_style_name) if stage.image else None,
+            )
+            for payload, stage in zip(bundle.stages, stages)
+        ],
+        author=author or None,
+        age=bundle.age,
+        topic=bundle.topic,
+        story_type=bundle.story_type_name,
+        synopsis=bundle.synopsis,
+        protagonist=bundle.protagonist,
+        style=cover_style,
+        audio_url=bundle.audio_url,
+        cover=_store_asset(cover, cover_style) if cover else None,
+        thumbnail=_store_asset(thumbnail) if thumbnail else None,
+        html_filename=export_path.name,
+        html_bytes=export_path.stat().st_size,
     )
+    manifest_path = manifest_path_for(export_path)
+    _write_atomic(manifest_path, manifest_to_json(manifest))
+    return manifest_path
 
 
-def export_story_to_html(
+def render_story_html(
     *,
     bundle: StoryBundle,
     author: str | None = None,
-) -> ExportResult:
+) -> Path:
+    """Write the story document under ``HTML_EXPORT_PATH`` and return its path.
+
+    The JSON manifest is written next to it (see ``manifest_path_for``) and
+    the images are stored once per content hash in the asset store.
+    """
+
     HTML_EXPORT_PATH.mkdir(parents=True, exist_ok=True)
 
-    normalized_stages: list[dict[str, Any]] = []
-    for stage in bundle.stages:
-        paragraphs = [str(p).strip() for p in stage.paragraphs if str(p).strip()]
-        image_data_uri = None
-        if stage.image_bytes:
-            encoded = base64.b64encode(stage.image_bytes).decode("utf-8")
-            image_data_uri = f"data:{stage.image_mime};base64,{encoded}"
-
-        normalized_stages.append(
-            {
-                "stage_name": stage.stage_name,
-                "card_name": stage.card_name,
-                "card_prompt": stage.card_prompt,
-                "paragraphs": paragraphs,
-                "image_data_uri": image_data_uri,
-                "image_style_name": stage.image_style_name,
-            }
+    stages = [
+        HtmlStage(
+            paragraphs=[str(p).strip() for p in stage.paragraphs if str(p).strip()],
+            image=stage.image_asset,
         )
+        for stage in bundle.stages
+    ]
 
-    cover_section = None
     cover = bundle.cover or None
-    if cover and cover.get("image_bytes"):
-        cover_bytes = cover.get("image_bytes")
-        image_mime = cover.get("image_mime") or "image/png"
-        encoded = base64.b64encode(cover_bytes).decode("utf-8")
-        cover_section = {
-            "image_data_uri": f"data:{image_mime};base64,{encoded}",
-            "style_name": cover.get("style_name"),
-        }
+    cover_asset = None
+    if cover:
+        cover_asset = ImageAsset.coerce(
+            cover.get("image_asset") or cover.get("image_bytes"),
+            cover.get("image_mime") or "image/png",
+        )
 
     safe_title = bundle.title.strip() or "동화"
-    html_doc = _build_story_html_document(
-        title=safe_title,
-        age=bundle.age,
-        topic=bundle.topic or "",
-        story_type=bundle.story_type_name,
-        stages=normalized_stages,
-        cover=cover_section,
-        author=author or "",
-        audio_url=bundle.audio_url,
-    )
-
     timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
     slug = _slugify_filename(safe_title)
     filename = f"{timestamp}_{slug}.html"
     export_path = HTML_EXPORT_PATH / filename
 
-    export_path.write_text(html_doc, encoding="utf-8")
-
+    # Stream the document to disk (images are encoded chunk by chunk), then
+    # upload from the file so no full in-memory copy of the book is created.
+    fd, tmp_name = tempfile.mkstemp(dir=HTML_EXPORT_PATH, suffix=".html.tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            StoryHtmlWriter(fh).write_document(
+                title=safe_title,
+                stages=stages,
+                cover=cover_asset,
+                author=author or "",
+                audio_url=bundle.audio_url,
+            )
+        os.replace(tmp_name, export_path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    _write_manifest(export_path, bundle=bundle, author=author, title=safe_title, stages=stages, cover=cover_asset)
+    return export_path
+
+
+def _publish(
+    storage: TieredStorageBackend,
+    key: str,
+    source: Path,
+    content_type: str,
+    **options: Any,
+) -> ObjectStat | None:
+    try:
+        return storage.publish(key, source, content_type=content_type, **options)
+    except Exception as exc:  # noqa: BLE001 - the export stays readable locally
+        logger.warning("Publishing %s to remote storage failed: %s", key, exc)
+        return None
+
+
+def upload_story_html(export_path: Path) -> ExportResult:
+    """Publish a rendered document, its manifest and the manifest's images through ``story_storage()``.
+
+    The files already sit in the local tier, so only the remote tier (GCS when
+    configured) is written; the exports index is updated here.
+    """
+
+    storage = story_storage()
     gcs_object = None
     gcs_url = None
-    upload_result = upload_html_to_gcs(html_doc, filename)
-    if upload_result:
-        gcs_object, gcs_url = upload_result
+    manifest_object = None
+    published = _publish(storage, export_path.name, export_path, _HTML_CONTENT_TYPE)
+    if published:
+        gcs_object, gcs_url = gcs_object_name(published.key), published.url
+        if gcs_url:
+            record_gcs_export(gcs_object, gcs_url, size=export_path.stat().st_size)
+
+    manifest_path = manifest_path_for(export_path)
+    manifest = parse_manifest(manifest_path.read_bytes()) if manifest_path.exists() else None
+    if manifest is None:
+        return ExportResult(str(export_path), gcs_object=gcs_object, gcs_url=gcs_url)
+
+    thumbnail_url = None
+    if published:
+        asset_urls: dict[str, str | None] = {}
+        for image in manifest.images():
+            key = _asset_key(image.sha256)
+            uploaded = _publish(storage, key, _asset_path(image.sha256), image.mime_type, skip_existing=True)
+            if not uploaded:
+                break
+            asset_urls[image.sha256] = uploaded.url
+        else:
+            # A manifest is only published once every image it references is readable remotely.
+            if _publish(storage, manifest_path.name, manifest_path, _MANIFEST_CONTENT_TYPE):
+                manifest_object = gcs_object_name(manifest_path.name)
+        if manifest.thumbnail:
+            thumbnail_url = asset_urls.get(manifest.thumbnail.sha256)
+
+    return ExportResult(
+        str(export_path),
+        gcs_object=gcs_object,
+        gcs_url=gcs_url,
+        manifest_path=str(manifest_path),
+        manifest_object=manifest_object,
+        thumbnail_path=str(_asset_path(manifest.thumbnail.sha256)) if manifest.thumbnail else None,
+        thumbnail_url=thumbnail_url,
+    )
+
+
+def load_story_manifest(*, local_path: str | None, gcs_object: str | None) -> StoryManifest | None:
+    """Read a manifest from disk, falling back to ``story_storage()`` (cached locally afterwards)."""
+
+    if local_path:
+        try:
+            manifest = parse_manifest(Path(local_path).read_bytes())
+        except OSError:
+            manifest = None
+        if manifest is not None:
+            return manifest
+    if gcs_object:
+        # Manifests sit at the top of the prefix, next to their export.
+        data = story_storage().get(PurePosixPath(gcs_object).name)
+        if data is not None:
+            try:
+                return parse_manifest(decode_export_html(data))
+            except (OSError, UnicodeDecodeError) as exc:
+                logger.warning("Story manifest %s could not be decoded: %s", gcs_object, exc)
+    return None
+
+
+def load_story_asset(image: ManifestImage) -> ImageAsset | None:
+    """Load one manifest image, from the local asset store or GCS (cached locally afterwards)."""
+
+    try:
+        data = story_storage().get(_asset_key(image.sha256))
+    except OSError as exc:
+        logger.warning("Story asset %s could not be read: %s", image.sha256[:12], exc)
+        return None
+    if data is None:
+        return None
+    return ImageAsset(data, image.mime_type, sha256=image.sha256)
 
-    return ExportResult(str(export_path), gcs_object=gcs_object, gcs_url=gcs_url)
+
+def export_story_to_html(
+    *,
+    bundle: StoryBundle,
+    author: str | None = None,
+) -> ExportResult:
+    return upload_story_html(render_story_html(bundle=bundle, author=author))
 
 
 __all__ = [
@@ -222,5 +380,11 @@ __all__ = [
     "StoryBundle",
     "ExportResult",
     "export_story_to_html",
+    "load_story_asset",
+    "load_story_manifest",
+    "render_story_html",
+    "story_storage",
+    "upload_story_html",
+    "use_remote_story_storage",
     "HTML_EXPORT_PATH",
 ]
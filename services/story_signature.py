@@ -0,0 +1,101 @@
+"""Incremental story signatures for the export step.
+
+The signature is a two-level Merkle hash: one leaf per stage (card, text and
+the illustration digest) plus a header leaf (title, age, topic, story type and
+cover digest), combined into a root. Image digests are recorded on the stage
+entry when the illustration is produced (``image_sha256``) or taken from the
+blob handle already held in session state, so building the signature never
+rehashes image bytes. Leaves are memoized on their inputs, so a rerun where one
+stage changed recomputes that leaf and the root only.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from functools import lru_cache
+from typing import Any, Mapping, Sequence
+
+_LEAF_CACHE_SIZE = 256
+
+
+def image_digest(value: Any) -> str | None:
+    """SHA-256 of an ``ImageAsset`` or ``BlobHandle`` without loading a handle's bytes."""
+
+    if value is None:
+        return None
+    digest = getattr(value, "sha256", None)
+    return digest if isinstance(digest, str) else None
+
+
+def stage_image_digest(entry: Mapping[str, Any] | None) -> str | None:
+    """Digest recorded on a stage entry, falling back to its image handle or asset."""
+
+    if not entry:
+        return None
+    recorded = entry.get("image_sha256")
+    if isinstance(recorded, str) and recorded:
+        return recorded
+    digest = image_digest(entry.get("image_asset"))
+    if digest is None and entry.get("image_bytes"):
+        digest = hashlib.sha256(entry["image_bytes"]).hexdigest()
+    return digest
+
+
+def _digest(payload: Any) -> str:
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=_LEAF_CACHE_SIZE)
+def stage_leaf(
+    stage_name: str,
+    card_name: str | None,
+    paragraphs: tuple[str, ...],
+    image_sha256: str | None,
+) -> str:
+    return _digest(["stage", stage_name, card_name, list(paragraphs), image_sha256])
+
+
+@lru_cache(maxsize=_LEAF_CACHE_SIZE)
+def header_leaf(
+    title: str,
+    age: str,
+    topic: str,
+    story_type: str,
+    cover_sha256: str | None,
+) -> str:
+    return _digest(["header", title, age, topic, story_type, cover_sha256])
+
+
+def stage_entry_leaf(stage_name: str, entry: Mapping[str, Any]) -> str:
+    story = entry.get("story") or {}
+    return stage_leaf(
+        stage_name,
+        (entry.get("card") or {}).get("name"),
+        tuple(story.get("paragraphs") or ()),
+        stage_image_digest(entry),
+    )
+
+
+@lru_cache(maxsize=_LEAF_CACHE_SIZE)
+def _combine(header: str, leaves: tuple[str, ...]) -> str:
+    hasher = hashlib.sha256(bytes.fromhex(header))
+    for leaf in leaves:
+        hasher.update(bytes.fromhex(leaf))
+    return hasher.hexdigest()
+
+
+def story_signature(header: str, stage_leaves: Sequence[str]) -> str:
+    """Root hash over the header leaf and the stage leaves, in stage order."""
+
+    return _combine(header, tuple(stage_leaves))
+
+
+__all__ = [
+    "header_leaf",
+    "image_digest",
+    "stage_entry_leaf",
+    "stage_image_digest",
+    "stage_leaf",
+    "story_signature",
+]
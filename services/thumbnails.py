@@ -0,0 +1,44 @@
+"""Small WebP cover thumbnails generated at export time.
+
+The library grid shows one of these per story instead of opening each export,
+so browsing a page of stories costs a handful of few-KB image fetches.
+"""
+from __future__ import annotations
+
+import io
+import logging
+
+from services.image_asset import ImageAsset
+from utils.lazy_import import lazy_module
+
+logger = logging.getLogger(__name__)
+
+Image = lazy_module("PIL.Image")
+
+THUMBNAIL_MAX_EDGE = 256
+THUMBNAIL_QUALITY = 70
+THUMBNAIL_MIME = "image/webp"
+
+
+def make_thumbnail(
+    asset: ImageAsset,
+    *,
+    max_edge: int = THUMBNAIL_MAX_EDGE,
+    quality: int = THUMBNAIL_QUALITY,
+) -> ImageAsset | None:
+    """Return a WebP thumbnail of ``asset``, or None when the image cannot be decoded."""
+
+    try:
+        with Image.open(io.BytesIO(asset.view)) as image:
+            image.load()
+            converted = image.convert("RGBA" if image.mode in {"RGBA", "LA", "P"} else "RGB")
+        converted.thumbnail((max_edge, max_edge))
+        buffer = io.BytesIO()
+        converted.save(buffer, format="WEBP", quality=quality, method=6)
+    except Exception as exc:  # noqa: BLE001 - a missing thumbnail must not fail the export
+        logger.warning("Could not build a cover thumbnail: %s", exc)
+        return None
+    return ImageAsset(buffer.getvalue(), THUMBNAIL_MIME)
+
+
+__all__ = ["THUMBNAIL_MAX_EDGE", "THUMBNAIL_MIME", "THUMBNAIL_QUALITY", "make_thumbnail"]
@@ -1,37 +1,130 @@
 """Session proxy for wrapping Streamlit's session state mapping."""
 from __future__ import annotations
 
+import uuid
 from collections.abc import MutableMapping
 from typing import Any, Iterator
 
+from services.blob_store import BlobHandle, BlobStore, get_blob_store, streamlit_session_id
+from services.image_asset import ImageAsset
+
+_BLOB_OWNER_KEY = "blob_owner_id"
+
+
+def _holds_asset(item: Any) -> bool:
+    return isinstance(item, dict) and any(isinstance(value, (ImageAsset, BlobHandle)) for value in item.values())
+
+
+def _handle_digests(value: Any) -> Iterator[str]:
+    if isinstance(value, BlobHandle):
+        yield value.sha256
+    elif isinstance(value, list):
+        for item in value:
+            if isinstance(item, dict):
+                for nested in item.values():
+                    if isinstance(nested, BlobHandle):
+                        yield nested.sha256
+
 
 class StorySessionProxy:
-    """Lightweight view over a Streamlit ``session_state`` mapping."""
+    """Lightweight view over a Streamlit ``session_state`` mapping.
+
+    Image assets assigned through the proxy (directly or inside list entries
+    such as ``stages_data``) are moved into the process blob store and only a
+    ``BlobHandle`` is kept in session state. Top-level handles resolve back to
+    assets on read; nested handles resolve through ``stage_image``.
+    """
 
-    def __init__(self, backing: MutableMapping[str, Any]):
+    def __init__(self, backing: MutableMapping[str, Any], *, blob_store: BlobStore | None = None):
         self._backing = backing
+        self._blob_store = blob_store
+        owner = backing.get(_BLOB_OWNER_KEY)
+        if owner:
+            self._store().touch(owner, session=streamlit_session_id())
+
+    # Blob handling ---------------------------------------------------------------
+    def _store(self) -> BlobStore:
+        return self._blob_store or get_blob_store()
+
+    def _owner_id(self) -> str:
+        owner = self._backing.get(_BLOB_OWNER_KEY)
+        if not owner:
+            owner = uuid.uuid4().hex
+            self._backing[_BLOB_OWNER_KEY] = owner
+            self._store().touch(owner, session=streamlit_session_id())
+        return owner
+
+    def _externalize(self, value: Any) -> Any:
+        if isinstance(value, ImageAsset):
+            return self._store().put(value, owner=self._owner_id())
+        if isinstance(value, BlobHandle):
+            self._store().adopt(value, owner=self._owner_id())
+            return value
+        if isinstance(value, list) and any(_holds_asset(item) for item in value):
+            return [
+                {key: self._externalize(nested) for key, nested in item.items()} if _holds_asset(item) else item
+                for item in value
+            ]
+        return value
+
+    def _internalize(self, value: Any) -> Any:
+        if isinstance(value, BlobHandle):
+            return self._store().get(value)
+        return value
+
+    def _release_unreferenced(self) -> None:
+        owner = self._backing.get(_BLOB_OWNER_KEY)
+        if not owner:
+            return
+        live = {digest for value in list(self._backing.values()) for digest in _handle_digests(value)}
+        self._store().retain(owner, live)
+
+    @property
+    def session_id(self) -> str:
+        """Stable identifier for this session, also used as its blob store owner."""
+
+        return self._owner_id()
+
+    def release_blobs(self) -> None:
+        """Drop every blob this session holds in the process store."""
+
+        owner = self._backing.get(_BLOB_OWNER_KEY)
+        if owner:
+            self._store().release(owner)
 
     # Basic mapping compatibility -------------------------------------------------
     def __getitem__(self, key: str) -> Any:
-        return self._backing[key]
+        return self._internalize(self._backing[key])
 
     def __setitem__(self, key: str, value: Any) -> None:
-        self._backing[key] = value
+        previous = self._backing.get(key)
+        self._backing[key] = self._externalize(value)
+        if any(True for _ in _handle_digests(previous)):
+            self._release_unreferenced()
 
     def __contains__(self, key: object) -> bool:  # pragma: no cover - mapping helper
         return key in self._backing
 
     def get(self, key: str, default: Any = None) -> Any:
-        return self._backing.get(key, default)
+        return self._internalize(self._backing.get(key, default))
 
+    def get_raw(self, key: str, default: Any = None) -> Any:
+        """Return the stored value without resolving blob handles."""
+
+        return self._backing.get(key, default)
+
     def setdefault(self, key: str, default: Any) -> Any:
-        return self._backing.setdefault(key, default)
+        return self._internalize(self._backing.setdefault(key, self._externalize(default)))
 
     def update(self, values: MutableMapping[str, Any]) -> None:
-        self._backing.update(values)
+        for key, value in values.items():
+            self[key] = value
 
     def pop(self, key: str, default: Any | None = None) -> Any:
-        return self._backing.pop(key, default)
+        value = self._backing.pop(key, default)
+        if any(True for _ in _handle_digests(value)):
+            self._release_unreferenced()
+        return self._internalize(value)
 
     def keys(self) -> Iterator[str]:  # pragma: no cover - mapping helper
         return iter(self._backing.keys())
@@ -62,7 +155,7 @@ class StorySessionProxy:
 
     def reset_keys(self, *keys: str) -> None:
         for key in keys:
-            self._backing[key] = None
+            self[key] = None
 
     def as_dict(self) -> dict[str, Any]:  # pragma: no cover - convenience helper
         return dict(self._backing)
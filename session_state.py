@@ -24,6 +24,9 @@ _STATE_DEFAULTS: dict[str, Any] = {
     "story_started_at": None,
     "view_story_id": None,
     "story_view_logged_token": None,
+    "library_reader_token": None,
+    "library_reader_page": 0,
+    "library_grid_page": 0,
     "board_view_logged": False,
     "current_stage_idx": 0,
     "selected_type_idx": 0,
@@ -64,6 +67,7 @@ _STATE_DEFAULTS: dict[str, Any] = {
     "story_export_remote_blob": None,
     "selected_export": None,
     "story_export_signature": None,
+    "story_export_without_illustrations": False,
     "story_audio_url": None,
     "story_audio_blob": None,
     "story_audio_signature": None,
@@ -77,6 +81,7 @@ _STATE_DEFAULTS: dict[str, Any] = {
     "is_generating_title": False,
     "is_generating_story": False,
     "is_generating_all": False,
+    "is_rendering_illustrations": False,
 
     # Synopsis & protagonist artefacts
     "synopsis_result": None,
@@ -105,6 +110,10 @@ _STATE_DEFAULTS: dict[str, Any] = {
     # MOTD
     "motd_seen_signature": None,
 
+    # Draft resume
+    "resume_draft": None,
+    "resume_draft_checked_uid": None,
+
     # Generation token tracker
     "generation_token_status": None,
     "generation_token_error": None,
@@ -149,9 +158,12 @@ def clear_stages_from(index: int) -> None:
         proxy["stages_data"] = [None] * len(STORY_PHASES)
         return
 
+    # Assign a new list so the proxy can release illustrations held by cleared stages.
+    updated = list(stages)
     for idx in range(index, len(STORY_PHASES)):
-        if idx < len(stages):
-            stages[idx] = None
+        if idx < len(updated):
+            updated[idx] = None
+    proxy["stages_data"] = updated
 
 
 def reset_character_art() -> None:
@@ -211,6 +223,7 @@ def reset_story_session(
         "story_export_remote_url": None,
         "story_export_remote_blob": None,
         "story_export_signature": None,
+        "story_export_without_illustrations": False,
         "selected_export": None,
         "story_audio_url": None,
         "story_audio_blob": None,
@@ -276,6 +289,9 @@ def reset_all_state() -> None:
         "story_started_at",
         "view_story_id",
         "story_view_logged_token",
+        "library_reader_token",
+        "library_reader_page",
+        "library_grid_page",
         "board_view_logged",
         "age_input",
         "topic_input",
@@ -298,6 +314,7 @@ def reset_all_state() -> None:
         "story_export_remote_url",
         "story_export_remote_blob",
         "story_export_signature",
+        "story_export_without_illustrations",
         "selected_export",
         "story_audio_url",
         "story_audio_blob",
@@ -306,6 +323,7 @@ def reset_all_state() -> None:
         "is_generating_title",
         "is_generating_story",
         "is_generating_all",
+        "is_rendering_illustrations",
         "stages_data",
         "story_style_choice",
         "cover_image",
@@ -326,6 +344,8 @@ def reset_all_state() -> None:
         "character_image_error",
         "is_generating_character_image",
         "selected_style_id",
+        "resume_draft",
+        "resume_draft_checked_uid",
     }
 
     for key in keys_to_clear:
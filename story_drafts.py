@@ -0,0 +1,417 @@
+"""Durable checkpoints of in-progress stories (Firestore metadata + image assets)."""
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Mapping
+
+from cloud_clients import shared_client
+from google_credentials import get_service_account_credentials
+from utils.lazy_import import lazy_module
+from services.blob_store import BlobHandle, register_blob_loader
+from services.image_asset import ImageAsset
+
+firestore = lazy_module("google.cloud.firestore")
+FieldFilter = lazy_module("google.cloud.firestore_v1.FieldFilter")
+
+logger = logging.getLogger(__name__)
+
+GCP_PROJECT_ID = (os.getenv("GCP_PROJECT_ID") or os.getenv("FIRESTORE_PROJECT_ID") or "").strip()
+STORY_DRAFTS_ENABLED = (os.getenv("STORY_DRAFTS_ENABLED", "true").strip().lower() not in {"0", "false", "no"})
+FIRESTORE_DRAFT_COLLECTION = (os.getenv("FIRESTORE_DRAFT_COLLECTION") or "story_drafts").strip() or "story_drafts"
+STORY_DRAFTS_DIR = Path((os.getenv("STORY_DRAFTS_DIR") or "").strip() or ".cache/drafts")
+_MAX_AGE_ENV = (os.getenv("STORY_DRAFT_MAX_AGE_DAYS") or "").strip()
+STORY_DRAFT_MAX_AGE_DAYS = int(_MAX_AGE_ENV) if _MAX_AGE_ENV.isdigit() else 30
+_GCS_DRAFT_FOLDER = "drafts/assets/"
+
+# Session keys copied verbatim into the draft document.
+_DRAFT_SESSION_KEYS = (
+    "age",
+    "topic",
+    "story_started_at",
+    "rand8",
+    "selected_type_idx",
+    "story_title",
+    "synopsis_result",
+    "synopsis_hooks",
+    "protagonist_result",
+    "story_style_choice",
+    "selected_style_id",
+    "cover_image_style",
+    "character_prompt",
+    "cover_prompt",
+    "story_cards_rand4",
+    "selected_story_card_idx",
+    "story_card_choice",
+    "current_stage_idx",
+)
+# Session keys holding image assets; the draft stores a content reference instead.
+_DRAFT_IMAGE_KEYS = ("character_image", "cover_image")
+
+
+@dataclass(slots=True)
+class StoryDraft:
+    story_id: str
+    user_id: str
+    title: str | None
+    step: int
+    completed_stages: int
+    updated_at: datetime
+    data: Mapping[str, Any]
+
+
+# Firestore --------------------------------------------------------------------------
+def _ensure_remote_ready() -> None:
+    if not firestore:
+        raise RuntimeError("google-cloud-firestore must be installed for story drafts")
+
+    if GCP_PROJECT_ID:
+        return
+
+    credentials = get_service_account_credentials()
+    project_id = getattr(credentials, "project_id", "") if credentials else ""
+    if not project_id:
+        raise RuntimeError("GCP_PROJECT_ID must be set or provided via service-account credentials for story drafts.")
+
+
+@lru_cache(maxsize=1)
+def _get_firestore_client():
+    _ensure_remote_ready()
+    client_kwargs: dict[str, object] = {}
+    credentials = get_service_account_credentials()
+    if credentials is not None:
+        client_kwargs["credentials"] = credentials
+        if not GCP_PROJECT_ID:
+            project_id = getattr(credentials, "project_id", "")
+            if project_id:
+                client_kwargs["project"] = project_id
+    if GCP_PROJECT_ID:
+        client_kwargs["project"] = GCP_PROJECT_ID
+    return shared_client("firestore", firestore.Client, user=__name__, **client_kwargs)
+
+
+def _get_draft_collection():
+    client = _get_firestore_client()
+    return client.collection(FIRESTORE_DRAFT_COLLECTION)
+
+
+def _apply_where(query: Any, field: str, operator: str, value: Any) -> Any:
+    if FieldFilter:
+        try:
+            return query.where(filter=FieldFilter(field, operator, value))
+        except Exception:  # pragma: no cover - fall back for unsupported ops
+            pass
+    return query.where(field, operator, value)
+
+
+def _resolve_descending_direction() -> Any:
+    query_cls = getattr(firestore, "Query", None) if firestore else None
+    return getattr(query_cls, "DESCENDING", "DESCENDING")
+
+
+# Asset storage ----------------------------------------------------------------------
+def _asset_path(sha256: str) -> Path:
+    return STORY_DRAFTS_DIR / sha256[:2] / f"{sha256}.bin"
+
+
+def _store_asset(asset: ImageAsset) -> None:
+    """Persist an image once per digest, locally and (when configured) in GCS.
+
+    The local copy doubles as the marker that the upload already happened, so
+    later checkpoints of the same draft skip both writes.
+    """
+
+    path = _asset_path(asset.sha256)
+    if path.exists():
+        # Keeps the local copy of a live draft out of ``purge_stale_drafts``.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(asset.view)
+        os.replace(tmp_name, path)
+    except OSError as exc:
+        logger.warning("Draft asset write failed for %s: %s", asset.sha256, exc)
+
+    import gcs_storage
+
+    if not gcs_storage.is_gcs_available():
+        return
+    try:
+        bucket = gcs_storage._get_client().bucket(gcs_storage.GCS_BUCKET_NAME)
+        blob = bucket.blob(gcs_storage._qualify_object_name(f"{_GCS_DRAFT_FOLDER}{asset.sha256}"))
+        # Content-addressed objects never change, so an existing object can be kept.
+        blob.upload_from_string(asset.data, content_type=asset.mime_type, if_generation_match=0)
+    except Exception as exc:  # pragma: no cover - includes precondition failures for existing objects
+        logger.debug("Draft asset upload skipped for %s: %s", asset.sha256, exc)
+
+
+def load_draft_asset(sha256: str, mime_type: str) -> ImageAsset | None:
+    """Blob store loader: read a checkpointed image from local disk, then GCS."""
+
+    path = _asset_path(sha256)
+    try:
+        return ImageAsset(path.read_bytes(), mime_type)
+    except OSError:
+        pass
+
+    import gcs_storage
+
+    if not gcs_storage.is_gcs_available():
+        return None
+    try:
+        bucket = gcs_storage._get_client().bucket(gcs_storage.GCS_BUCKET_NAME)
+        blob = bucket.get_blob(gcs_storage._qualify_object_name(f"{_GCS_DRAFT_FOLDER}{sha256}"))
+        data = blob.download_as_bytes() if blob is not None else None
+    except Exception as exc:  # pragma: no cover - network error path
+        logger.warning("Draft asset download failed for %s: %s", sha256, exc)
+        return None
+    return ImageAsset(data, mime_type) if data else None
+
+
+register_blob_loader(load_draft_asset)
+
+
+def _delete_asset(sha256: str) -> None:
+    try:
+        _asset_path(sha256).unlink(missing_ok=True)
+    except OSError as exc:
+        logger.warning("Draft asset delete failed for %s: %s", sha256, exc)
+
+    import gcs_storage
+
+    if not gcs_storage.is_gcs_available():
+        return
+    try:
+        bucket = gcs_storage._get_client().bucket(gcs_storage.GCS_BUCKET_NAME)
+        bucket.blob(gcs_storage._qualify_object_name(f"{_GCS_DRAFT_FOLDER}{sha256}")).delete()
+    except Exception as exc:  # pragma: no cover - includes NotFound when another replica got there first
+        logger.debug("Draft asset object delete skipped for %s: %s", sha256, exc)
+
+
+def _prune_local_assets(cutoff: datetime) -> int:
+    """Remove local asset copies untouched since ``cutoff`` (e.g. of drafts purged elsewhere)."""
+
+    removed = 0
+    threshold = cutoff.timestamp()
+    for path in STORY_DRAFTS_DIR.glob("*/*.bin"):
+        try:
+            if path.stat().st_mtime < threshold:
+                path.unlink()
+                removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+# Serialization ----------------------------------------------------------------------
+def _image_ref(value: Any) -> dict[str, Any] | None:
+    if isinstance(value, BlobHandle):
+        # Restored handles are already durable; only resolve bytes that were never saved here.
+        if not _asset_path(value.sha256).exists():
+            asset = ImageAsset.coerce(value)
+            if asset is not None:
+                _store_asset(asset)
+        return {"sha256": value.sha256, "mime_type": value.mime_type, "size": value.size}
+    asset = ImageAsset.coerce(value)
+    if asset is None:
+        return None
+    _store_asset(asset)
+    return {"sha256": asset.sha256, "mime_type": asset.mime_type, "size": asset.size}
+
+
+def _handle_from_ref(ref: Any) -> BlobHandle | None:
+    if not isinstance(ref, Mapping) or not ref.get("sha256"):
+        return None
+    return BlobHandle(
+        sha256=str(ref["sha256"]),
+        mime_type=str(ref.get("mime_type") or "image/png"),
+        size=int(ref.get("size") or 0),
+    )
+
+
+def _serialize_stage(entry: Mapping[str, Any] | None) -> dict[str, Any] | None:
+    if not entry:
+        return None
+    payload = {key: value for key, value in entry.items() if key not in {"image_asset", "image_bytes"}}
+    payload["image_ref"] = _image_ref(entry.get("image_asset") or entry.get("image_bytes"))
+    return payload
+
+
+def _asset_digests(data: Mapping[str, Any]) -> set[str]:
+    refs = [data.get(key) for key in _DRAFT_IMAGE_KEYS]
+    refs += [entry.get("image_ref") for entry in data.get("stages_data") or [] if entry]
+    return {str(ref["sha256"]) for ref in refs if isinstance(ref, Mapping) and ref.get("sha256")}
+
+
+def _serialize_session(session: Any) -> dict[str, Any]:
+    data: dict[str, Any] = {key: session.get(key) for key in _DRAFT_SESSION_KEYS}
+    read_raw = getattr(session, "get_raw", session.get)
+    for key in _DRAFT_IMAGE_KEYS:
+        data[key] = _image_ref(read_raw(key))
+    data["stages_data"] = [_serialize_stage(entry) for entry in session.get("stages_data") or []]
+    return data
+
+
+def _make_draft(doc_id: str, payload: Mapping[str, Any]) -> StoryDraft:
+    updated_at = payload.get("updated_at")
+    if not isinstance(updated_at, datetime):
+        updated_at = datetime.now(timezone.utc)
+    elif updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    data = payload.get("data") or {}
+    return StoryDraft(
+        story_id=str(payload.get("story_id") or doc_id),
+        user_id=str(payload.get("user_id") or ""),
+        title=payload.get("title"),
+        step=int(payload.get("step") or 0),
+        completed_stages=int(payload.get("completed_stages") or 0),
+        updated_at=updated_at,
+        data=data,
+    )
+
+
+# Public API -------------------------------------------------------------------------
+def checkpoint_draft(session: Any, *, user_id: str | None) -> StoryDraft | None:
+    """Save the current draft; failures are logged and never interrupt the flow."""
+
+    normalized_user = str(user_id or "").strip()
+    story_id = str(session.get("story_id") or "").strip()
+    if not STORY_DRAFTS_ENABLED or not normalized_user or not story_id:
+        return None
+
+    try:
+        data = _serialize_session(session)
+        completed = sum(1 for entry in data["stages_data"] if entry)
+        payload = {
+            "story_id": story_id,
+            "user_id": normalized_user,
+            "title": session.get("story_title"),
+            "step": int(session.get("step") or 0),
+            "completed_stages": completed,
+            "status": "active",
+            "updated_at": datetime.now(timezone.utc),
+            # Lets ``discard_draft`` find other drafts sharing a content-addressed asset.
+            "asset_refs": sorted(_asset_digests(data)),
+            "data": data,
+        }
+        _get_draft_collection().document(story_id).set(payload)
+    except Exception as exc:  # pragma: no cover - storage problems must not block creation
+        logger.warning("Story draft checkpoint failed for %s: %s", story_id, exc)
+        return None
+    return _make_draft(story_id, payload)
+
+
+def find_resumable_draft(user_id: str | None) -> StoryDraft | None:
+    """Return the most recently updated draft past step 0 for ``user_id``.
+
+    ``user_id ==`` + ``step >`` + ``order_by(updated_at desc)``; see firestore.indexes.json.
+    """
+
+    normalized_user = str(user_id or "").strip()
+    if not STORY_DRAFTS_ENABLED or not normalized_user:
+        return None
+    query = _apply_where(_get_draft_collection(), "user_id", "==", normalized_user)
+    query = _apply_where(query, "step", ">", 0)
+    query = query.order_by("updated_at", direction=_resolve_descending_direction()).limit(1)
+    for doc in query.stream():
+        return _make_draft(getattr(doc, "id", ""), doc.to_dict() or {})
+    return None
+
+
+def load_draft(story_id: str) -> StoryDraft | None:
+    snapshot = _get_draft_collection().document(story_id).get()
+    if not getattr(snapshot, "exists", False):
+        return None
+    return _make_draft(story_id, snapshot.to_dict() or {})
+
+
+def restore_draft(session: Any, draft: StoryDraft) -> None:
+    """Rehydrate session state; images come back as handles loaded on first use."""
+
+    data = draft.data
+    for key in _DRAFT_SESSION_KEYS:
+        if key in data:
+            session[key] = data[key]
+    for key in _DRAFT_IMAGE_KEYS:
+        handle = _handle_from_ref(data.get(key))
+        session[key] = handle
+        session[f"{key}_mime"] = handle.mime_type if handle else "image/png"
+
+    stages: list[dict[str, Any] | None] = []
+    for entry in data.get("stages_data") or []:
+        if not entry:
+            stages.append(None)
+            continue
+        restored = {key: value for key, value in entry.items() if key != "image_ref"}
+        restored["image_asset"] = _handle_from_ref(entry.get("image_ref"))
+        stages.append(restored)
+    session["stages_data"] = stages
+
+    session["story_id"] = draft.story_id
+    session["mode"] = "create"
+    session["step"] = draft.step or 1
+
+
+def discard_draft(story_id: str | None) -> None:
+    """Remove a draft, and the assets no other draft references, once it is exported or abandoned."""
+
+    if not STORY_DRAFTS_ENABLED or not story_id:
+        return
+    try:
+        collection = _get_draft_collection()
+        document = collection.document(story_id)
+        snapshot = document.get()
+        payload = (snapshot.to_dict() or {}) if getattr(snapshot, "exists", False) else {}
+        document.delete()
+        for sha256 in _asset_digests(payload.get("data") or {}):
+            query = _apply_where(collection, "asset_refs", "array_contains", sha256)
+            if not any(True for _ in query.limit(1).stream()):
+                _delete_asset(sha256)
+    except Exception as exc:  # pragma: no cover - stale drafts are removed by purge_stale_drafts
+        logger.warning("Story draft cleanup failed for %s: %s", story_id, exc)
+
+
+def purge_stale_drafts(*, max_age_days: int = STORY_DRAFT_MAX_AGE_DAYS, dry_run: bool = False) -> list[str]:
+    """Discard drafts not updated for ``max_age_days``; returns their story ids."""
+
+    if not STORY_DRAFTS_ENABLED:
+        return []
+    cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+    query = _apply_where(_get_draft_collection(), "updated_at", "<", cutoff)
+    stale = [str(getattr(doc, "id", "")) for doc in query.stream()]
+    if dry_run:
+        return stale
+    for story_id in stale:
+        discard_draft(story_id)
+    _prune_local_assets(cutoff)
+    return stale
+
+
+def reset_story_drafts_cache() -> None:
+    """Testing helper to reset cached Firestore clients."""
+
+    _get_firestore_client.cache_clear()
+
+
+__all__ = [
+    "StoryDraft",
+    "checkpoint_draft",
+    "discard_draft",
+    "find_resumable_draft",
+    "load_draft",
+    "load_draft_asset",
+    "purge_stale_drafts",
+    "reset_story_drafts_cache",
+    "restore_draft",
+]
@@ -1,19 +1,29 @@
 """Story export metadata storage helpers (Firestore only)."""
 from __future__ import annotations
 
+import logging
 import os
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from functools import lru_cache
 from pathlib import Path
-from typing import Iterable
+from typing import Any, Callable, Iterable, Mapping
 
+from cloud_clients import register_client_warm_up, shared_client
 from google_credentials import get_service_account_credentials
+from services.listing_cache import (
+    ALL_STORIES_SCOPE,
+    get_listing_cache,
+    invalidate_story_listings,
+    user_stories_scope,
+)
+from services.story_search import SearchDocument, index_story_export
+from utils.lazy_import import google_api_error, lazy_module
+
+firestore = lazy_module("google.cloud.firestore")
+FieldFilter = lazy_module("google.cloud.firestore_v1.FieldFilter")
 
-try:  # pragma: no cover - optional dependency checked at runtime
-    from google.cloud import firestore  # type: ignore
-except Exception:  # pragma: no cover - gracefully handle missing package
-    firestore = None  # type: ignore
+logger = logging.getLogger(__name__)
 
 _PROJECT_ID_RAW = (
     os.getenv("GCP_PROJECT_ID")
@@ -24,6 +34,23 @@ GCP_PROJECT_ID = _PROJECT_ID_RAW.strip()
 
 _STORY_COLLECTION_RAW = (os.getenv("FIRESTORE_STORY_COLLECTION") or "stories").strip()
 FIRESTORE_STORY_COLLECTION = _STORY_COLLECTION_RAW or "stories"
+# Older documents stored ``created_at_utc`` as an ISO string, which the indexed
+# timestamp query cannot see. They are listed after the indexed results until
+# ``scripts/backfill_story_timestamps.py`` has converted them.
+STORY_LIBRARY_LEGACY_FALLBACK = (
+    os.getenv("STORY_LIBRARY_LEGACY_FALLBACK", "true").strip().lower() not in {"0", "false", "no"}
+)
+# One document per uid holding the newest USER_STORY_INDEX_SIZE story records, so
+# "내 동화" is a single document read instead of a collection query.
+_USER_INDEX_COLLECTION_RAW = (os.getenv("FIRESTORE_USER_STORY_INDEX_COLLECTION") or "user_story_index").strip()
+FIRESTORE_USER_STORY_INDEX_COLLECTION = _USER_INDEX_COLLECTION_RAW or "user_story_index"
+_INDEX_SIZE_ENV = (os.getenv("USER_STORY_INDEX_SIZE") or "").strip()
+USER_STORY_INDEX_SIZE = max(int(_INDEX_SIZE_ENV), 1) if _INDEX_SIZE_ENV.isdigit() else 100
+MAX_PAGE_SIZE = 500
+_LEGACY_CURSOR_PREFIX = "legacy:"
+_CURSOR_SEPARATOR = "|"
+# Exclusive upper bound for the first page; also restricts the range filter to timestamp values.
+_LATEST_BOUND = datetime(9999, 12, 31, tzinfo=timezone.utc)
 
 
 @dataclass(slots=True)
@@ -40,10 +67,25 @@ class StoryRecord:
     gcs_url: str | None
     author_name: str | None
     created_at_utc: datetime
+    # JSON manifest written next to the export (see services.story_manifest).
+    manifest_path: str | None = None
+    manifest_object: str | None = None
+    # Cover thumbnail for the library grid: public URL when uploaded, else the local file.
+    thumbnail_url: str | None = None
+    thumbnail_path: str | None = None
+
+
+@dataclass(slots=True)
+class StoryRecordPage:
+    """One page of story records, newest first."""
+
+    records: list[StoryRecord]
+    next_cursor: str | None
+    has_more: bool
 
 
 def _ensure_remote_ready() -> None:
-    if firestore is None:
+    if not firestore:
         raise RuntimeError("google-cloud-firestore must be installed for story storage")
 
     if GCP_PROJECT_ID:
@@ -70,7 +112,7 @@ def _get_firestore_client():
                 client_kwargs["project"] = project_id
     if GCP_PROJECT_ID:
         client_kwargs["project"] = GCP_PROJECT_ID
-    return firestore.Client(**client_kwargs)  # type: ignore[arg-type]
+    return shared_client("firestore", firestore.Client, user=__name__, **client_kwargs)
 
 
 def _get_story_collection():
@@ -78,6 +120,16 @@ def _get_story_collection():
     return client.collection(FIRESTORE_STORY_COLLECTION)
 
 
+def _get_user_index_collection():
+    return _get_firestore_client().collection(FIRESTORE_USER_STORY_INDEX_COLLECTION)
+
+
+def _run_transaction(callback: Callable[[Any], None]) -> None:
+    """Run ``callback(transaction)`` in a Firestore transaction, retrying on contention."""
+
+    firestore.transactional(callback)(_get_firestore_client().transaction())
+
+
 def init_story_library() -> None:
     """Validate Firestore connectivity for story export metadata."""
 
@@ -115,6 +167,10 @@ def record_story_export(
     gcs_url: str | None,
     story_id: str | None = None,
     author_name: str | None = None,
+    manifest_path: str | None = None,
+    manifest_object: str | None = None,
+    thumbnail_url: str | None = None,
+    thumbnail_path: str | None = None,
 ) -> StoryRecord:
     """Persist metadata for a newly generated story export."""
 
@@ -127,6 +183,10 @@ def record_story_export(
     normalized_local_path = str(local_path).strip() if local_path else None
     normalized_gcs_object = str(gcs_object).strip() if gcs_object else None
     normalized_gcs_url = str(gcs_url).strip() if gcs_url else None
+    normalized_manifest_path = str(manifest_path).strip() if manifest_path else None
+    normalized_manifest_object = str(manifest_object).strip() if manifest_object else None
+    normalized_thumbnail_url = str(thumbnail_url).strip() if thumbnail_url else None
+    normalized_thumbnail_path = str(thumbnail_path).strip() if thumbnail_path else None
     html_filename = _derive_filename(normalized_local_path, normalized_gcs_object)
     timestamp = datetime.now(timezone.utc)
 
@@ -142,11 +202,27 @@ def record_story_export(
         "local_path": normalized_local_path,
         "gcs_object": normalized_gcs_object,
         "gcs_url": normalized_gcs_url,
+        "manifest_path": normalized_manifest_path,
+        "manifest_object": normalized_manifest_object,
+        "thumbnail_url": normalized_thumbnail_url,
+        "thumbnail_path": normalized_thumbnail_path,
         "created_at_utc": timestamp,
     }
-    doc_ref.set(payload)
+    index_ref = _get_user_index_collection().document(normalized_user)
+    summary = {"id": str(getattr(doc_ref, "id", "")), **payload}
+
+    def _write(transaction: Any) -> None:
+        index = _read_user_index(index_ref, transaction)
+        transaction.set(doc_ref, payload)
+        transaction.set(
+            index_ref,
+            _user_index_payload(normalized_user, [summary, *index.get("stories", [])], complete=bool(index.get("complete"))),
+        )
 
-    return StoryRecord(
+    _run_transaction(_write)
+    invalidate_story_listings(normalized_user)
+
+    record = StoryRecord(
         id=str(getattr(doc_ref, "id", "")),
         story_id=assigned_story_id,
         user_id=normalized_user,
@@ -157,9 +233,128 @@ def record_story_export(
         gcs_url=normalized_gcs_url,
         author_name=normalized_author,
         created_at_utc=timestamp,
+        manifest_path=normalized_manifest_path,
+        manifest_object=normalized_manifest_object,
+        thumbnail_url=normalized_thumbnail_url,
+        thumbnail_path=normalized_thumbnail_path,
+    )
+    try:
+        index_story_export(search_document(record))
+    except Exception as exc:  # noqa: BLE001 - search is best effort; the record is saved
+        logger.warning("Could not add story %s to the search index: %s", record.id, exc)
+    return record
+
+
+def search_document(record: StoryRecord) -> SearchDocument:
+    """Search index entry for a story record."""
+
+    return SearchDocument(
+        record_id=record.id,
+        user_id=record.user_id,
+        title=record.title,
+        story_id=record.story_id,
+        author=record.author_name,
+        created_at=record.created_at_utc.isoformat(),
+        html_filename=record.html_filename,
+        local_path=record.local_path,
+        gcs_object=record.gcs_object,
+        gcs_url=record.gcs_url,
+        manifest_path=record.manifest_path,
+        manifest_object=record.manifest_object,
+        thumbnail_url=record.thumbnail_url,
+        thumbnail_path=record.thumbnail_path,
     )
 
 
+def _read_user_index(index_ref: Any, transaction: Any = None) -> dict:
+    snapshot = index_ref.get(transaction=transaction)
+    return (snapshot.to_dict() or {}) if getattr(snapshot, "exists", False) else {}
+
+
+def _user_index_payload(user_id: str, summaries: Iterable[Mapping[str, Any]], *, complete: bool) -> dict:
+    """Newest ``USER_STORY_INDEX_SIZE`` summaries, one per story, newest first."""
+
+    unique: dict[str, dict] = {}
+    for summary in summaries:
+        if isinstance(summary, Mapping) and summary.get("id"):
+            unique.setdefault(str(summary["id"]), dict(summary))
+    stories = sorted(unique.values(), key=lambda item: _coerce_datetime(item.get("created_at_utc")), reverse=True)
+    return {
+        "user_id": user_id,
+        # False until a backfill or a read repair has merged in the records written before the index existed.
+        "complete": complete,
+        "stories": stories[:USER_STORY_INDEX_SIZE],
+        "updated_at_utc": datetime.now(timezone.utc),
+    }
+
+
+def _record_summary(record: StoryRecord) -> dict:
+    return {
+        "id": record.id,
+        "user_id": record.user_id,
+        "author_name": record.author_name,
+        "title": record.title,
+        "story_id": record.story_id,
+        "html_filename": record.html_filename,
+        "local_path": record.local_path,
+        "gcs_object": record.gcs_object,
+        "gcs_url": record.gcs_url,
+        "manifest_path": record.manifest_path,
+        "manifest_object": record.manifest_object,
+        "thumbnail_url": record.thumbnail_url,
+        "thumbnail_path": record.thumbnail_path,
+        "created_at_utc": record.created_at_utc,
+    }
+
+
+def rebuild_user_story_index(user_id: str, records: Iterable[StoryRecord]) -> int:
+    """Merge ``records`` (the user's newest stories) into their index and mark it complete.
+
+    Runs in a transaction and keeps summaries already in the index, so a story
+    recorded while ``records`` was being queried is not lost. Returns the
+    number of summaries stored.
+    """
+
+    index_ref = _get_user_index_collection().document(user_id)
+    stored = 0
+
+    def _write(transaction: Any) -> None:
+        nonlocal stored
+        index = _read_user_index(index_ref, transaction)
+        summaries = [*index.get("stories", []), *(_record_summary(record) for record in records)]
+        payload = _user_index_payload(user_id, summaries, complete=True)
+        transaction.set(index_ref, payload)
+        stored = len(payload["stories"])
+
+    _run_transaction(_write)
+    return stored
+
+
+def list_user_stories(*, user_id: str, limit: int = 100) -> list[StoryRecord]:
+    """A user's newest stories from their index document (one read).
+
+    Falls back to the collection query when the index is missing or has not
+    been backfilled yet, and repairs it from the query's results.
+    """
+
+    normalized_user = str(user_id or "").strip()
+    if not normalized_user or limit <= 0:
+        return []
+
+    index = _read_user_index(_get_user_index_collection().document(normalized_user))
+    stories = index.get("stories") or []
+    if index.get("complete") and (limit <= USER_STORY_INDEX_SIZE or len(stories) < USER_STORY_INDEX_SIZE):
+        return [_make_story_record(str(item.get("id", "")), item) for item in stories[:limit]]
+
+    records = list_story_records(user_id=normalized_user, limit=max(limit, USER_STORY_INDEX_SIZE))
+    if not index.get("complete"):
+        try:
+            rebuild_user_story_index(normalized_user, records[:USER_STORY_INDEX_SIZE])
+        except Exception as exc:  # noqa: BLE001 - the listing itself succeeded
+            logger.warning("Could not repair the story index for %s: %s", normalized_user, exc)
+    return records[:limit]
+
+
 def _make_story_record(doc_id: str, data: dict) -> StoryRecord:
     resolved_story_id = str(data.get("story_id")) if data.get("story_id") else str(doc_id)
     return StoryRecord(
@@ -173,42 +368,223 @@ def _make_story_record(doc_id: str, data: dict) -> StoryRecord:
         gcs_url=(str(data.get("gcs_url")) if data.get("gcs_url") else None),
         author_name=(str(data.get("author_name")) if data.get("author_name") else None),
         created_at_utc=_coerce_datetime(data.get("created_at_utc")),
+        manifest_path=(str(data.get("manifest_path")) if data.get("manifest_path") else None),
+        manifest_object=(str(data.get("manifest_object")) if data.get("manifest_object") else None),
+        thumbnail_url=(str(data.get("thumbnail_url")) if data.get("thumbnail_url") else None),
+        thumbnail_path=(str(data.get("thumbnail_path")) if data.get("thumbnail_path") else None),
     )
 
 
+def _apply_where(query: Any, field: str, operator: str, value: Any) -> Any:
+    if FieldFilter:
+        try:
+            return query.where(filter=FieldFilter(field, operator, value))
+        except Exception:  # pragma: no cover - fall back for unsupported ops
+            pass
+    return query.where(field, operator, value)
+
+
+def _resolve_descending_direction() -> Any:
+    query_cls = getattr(firestore, "Query", None) if firestore else None
+    return getattr(query_cls, "DESCENDING", "DESCENDING")
+
+
+def _records_from(documents: Iterable) -> list[StoryRecord]:
+    return [_make_story_record(getattr(doc, "id", ""), doc.to_dict() or {}) for doc in documents]
+
+
+def _position(record: StoryRecord) -> tuple[datetime, str]:
+    """Sort key matching the query order: ``created_at_utc`` then document id."""
+
+    return record.created_at_utc, record.id
+
+
+def _indexed_query(collection: Any, user_id: str | None, after: tuple[datetime, str] | None) -> Any:
+    """``user_id ==`` + ``order_by(created_at_utc desc, __name__ desc)``; see firestore.indexes.json.
+
+    Pages resume with ``start_after`` on both order keys, so stories sharing
+    the boundary timestamp are neither skipped nor repeated.
+    """
+
+    query = collection
+    if user_id:
+        query = _apply_where(query, "user_id", "==", user_id)
+    # A datetime range bound only matches timestamp-typed values, leaving legacy strings out.
+    query = _apply_where(query, "created_at_utc", "<", _LATEST_BOUND)
+    direction = _resolve_descending_direction()
+    query = query.order_by("created_at_utc", direction=direction).order_by("__name__", direction=direction)
+    if after is None:
+        return query
+    created_at, doc_id = after
+    # Cursors issued before the document id was added only carry the timestamp.
+    values = {"created_at_utc": created_at, "__name__": doc_id} if doc_id else {"created_at_utc": created_at}
+    return query.start_after(values)
+
+
+def _load_legacy_records(collection: Any, user_id: str | None) -> list[StoryRecord]:
+    query = collection
+    if user_id:
+        query = _apply_where(query, "user_id", "==", user_id)
+    # A string range bound only matches string-typed values, i.e. exactly the legacy documents.
+    query = _apply_where(query, "created_at_utc", ">=", "")
+    try:
+        records = _records_from(query.stream())
+    except google_api_error() as exc:
+        logger.warning("Legacy story query failed: %s", exc)
+        return []
+    records.sort(key=_position, reverse=True)
+    return records
+
+
+def _legacy_records(
+    collection: Any, user_id: str | None, after: tuple[datetime, str] | None
+) -> list[StoryRecord]:
+    """Records whose ``created_at_utc`` is still a string, newest first.
+
+    No new document is written with a string timestamp, so the set is read
+    once per listing-cache TTL rather than on every page;
+    ``scripts/backfill_story_timestamps.py`` migrates it away entirely.
+    """
+
+    scope = user_stories_scope(user_id) if user_id else ALL_STORIES_SCOPE
+    records = get_listing_cache().get_or_load(scope, "legacy", lambda: _load_legacy_records(collection, user_id))
+    if after is None:
+        return list(records)
+    return [record for record in records if _position(record) < after]
+
+
+def _scan_page(
+    collection: Any, user_id: str | None, limit: int, after: tuple[datetime, str] | None
+) -> StoryRecordPage:
+    """Full-collection fallback used while the composite index is missing."""
+
+    records = [
+        record
+        for record in _records_from(collection.stream())
+        if (not user_id or record.user_id == user_id) and (after is None or _position(record) < after)
+    ]
+    records.sort(key=_position, reverse=True)
+    has_more = len(records) > limit
+    records = records[:limit]
+    next_cursor = _format_cursor(records[-1]) if records and has_more else None
+    return StoryRecordPage(records=records, next_cursor=next_cursor, has_more=has_more)
+
+
+def _format_cursor(record: StoryRecord) -> str:
+    return f"{record.created_at_utc.isoformat()}{_CURSOR_SEPARATOR}{record.id}"
+
+
+def _parse_cursor(cursor: str) -> tuple[datetime, str] | None:
+    """``(created_at_utc, document id)`` of the last record on the previous page."""
+
+    if not cursor:
+        return None
+    stamp, _, doc_id = cursor.partition(_CURSOR_SEPARATOR)
+    try:
+        parsed = datetime.fromisoformat(stamp)
+    except ValueError as exc:
+        raise ValueError(f"Invalid cursor value: {cursor}") from exc
+    return (parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)), doc_id
+
+
+def list_story_page(
+    *,
+    user_id: str | None = None,
+    limit: int = 50,
+    cursor: str | None = None,
+) -> StoryRecordPage:
+    """Fetch one page of story records ordered by ``created_at_utc`` descending.
+
+    Args:
+        user_id: Restrict the page to one author.
+        limit: Maximum number of records to return (1-500).
+        cursor: ``next_cursor`` of the previous page.
+    """
+
+    if limit <= 0 or limit > MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    collection = _get_story_collection()
+    normalized_user = str(user_id or "").strip() or None
+    records: list[StoryRecord] = []
+    legacy_after: tuple[datetime, str] | None = None
+
+    if cursor and cursor.startswith(_LEGACY_CURSOR_PREFIX):
+        legacy_after = _parse_cursor(cursor[len(_LEGACY_CURSOR_PREFIX):])
+    else:
+        after = _parse_cursor(cursor or "")
+        try:
+            records = _records_from(_indexed_query(collection, normalized_user, after).limit(limit + 1).stream())
+        except google_api_error() as exc:
+            logger.warning("Indexed story query failed (%s); scanning the collection instead", exc)
+            return _scan_page(collection, normalized_user, limit, after)
+        if len(records) > limit:
+            records = records[:limit]
+            return StoryRecordPage(records=records, next_cursor=_format_cursor(records[-1]), has_more=True)
+
+    if not STORY_LIBRARY_LEGACY_FALLBACK:
+        return StoryRecordPage(records=records, next_cursor=None, has_more=False)
+
+    legacy = _legacy_records(collection, normalized_user, legacy_after)
+    room = limit - len(records)
+    records.extend(legacy[:room])
+    has_more = len(legacy) > room
+    next_cursor = None
+    if has_more:
+        bound = _format_cursor(legacy[room - 1]) if room > 0 else ""
+        next_cursor = f"{_LEGACY_CURSOR_PREFIX}{bound}"
+    return StoryRecordPage(records=records, next_cursor=next_cursor, has_more=has_more)
+
+
 def list_story_records(
     *,
     user_id: str | None = None,
     limit: int | None = 50,
 ) -> list[StoryRecord]:
-    """Return story export metadata sorted by recency."""
+    """Return story export metadata sorted by recency (all records when ``limit`` is None)."""
 
-    collection = _get_story_collection()
-    documents: Iterable = collection.stream()
-
-    records = []
-    for doc in documents:
-        data = doc.to_dict() or {}
-        if user_id and str(data.get("user_id", "")) != user_id:
-            continue
-        records.append(_make_story_record(getattr(doc, "id", ""), data))
-
-    records.sort(key=lambda item: item.created_at_utc, reverse=True)
-    if limit is not None and limit >= 0:
-        records = records[:limit]
-    return records
+    if limit is not None and limit <= 0:
+        return []
+
+    records: list[StoryRecord] = []
+    cursor: str | None = None
+    while True:
+        remaining = MAX_PAGE_SIZE if limit is None else min(limit - len(records), MAX_PAGE_SIZE)
+        page = list_story_page(user_id=user_id, limit=remaining, cursor=cursor)
+        records.extend(page.records)
+        if not page.has_more or (limit is not None and len(records) >= limit):
+            return records
+        cursor = page.next_cursor
 
 
 def reset_story_library_cache() -> None:
-    """Testing helper to reset cached Firestore clients."""
+    """Testing helper to reset cached Firestore clients and listings."""
 
     _get_firestore_client.cache_clear()
+    get_listing_cache().clear()
+
+
+def _probe_firestore(client: Any) -> None:
+    # A read of a document that need not exist: one round trip, one billed read.
+    client.collection(FIRESTORE_STORY_COLLECTION).document("_warm_up").get()
+
+
+# Every Firestore store shares this client, so warming it warms them all.
+register_client_warm_up("firestore", _get_firestore_client, _probe_firestore)
 
 
 __all__ = [
+    "FIRESTORE_USER_STORY_INDEX_COLLECTION",
+    "MAX_PAGE_SIZE",
+    "USER_STORY_INDEX_SIZE",
     "StoryRecord",
+    "StoryRecordPage",
     "init_story_library",
+    "list_story_page",
     "list_story_records",
+    "list_user_stories",
+    "rebuild_user_story_index",
     "record_story_export",
     "reset_story_library_cache",
+    "search_document",
 ]
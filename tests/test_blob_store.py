@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import mmap
+
+import pytest
+
+import session_proxy
+from services import blob_store
+from services.blob_store import BlobHandle, BlobStore
+from services.image_asset import ImageAsset, stage_image
+from session_proxy import StorySessionProxy
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    clock = FakeClock()
+    instance = BlobStore(tmp_path, memory_limit_bytes=64, session_ttl_seconds=100, clock=clock)
+    instance.clock = clock  # type: ignore[attr-defined]
+    monkeypatch.setattr(blob_store, "get_blob_store", lambda: instance)
+    monkeypatch.setattr(session_proxy, "get_blob_store", lambda: instance)
+    yield instance
+    instance.clear()
+
+
+def test_blob_store_spills_to_disk_and_maps_reads(store):
+    first = ImageAsset(b"a" * 40, "image/png")
+    second = ImageAsset(b"b" * 40, "image/jpeg")
+
+    first_handle = store.put(first, owner="s1")
+    store.put(second, owner="s1")
+
+    stats = store.stats()
+    assert stats.spills == 1
+    assert stats.memory_entries == 1
+    assert stats.disk_bytes == 40
+
+    restored = store.get(first_handle)
+    assert isinstance(restored.view.obj, mmap.mmap)
+    assert restored.data == b"a" * 40
+    assert restored.sha256 == first.sha256
+    assert restored.mime_type == "image/png"
+
+
+def test_blob_store_releases_on_owner_expiry(store):
+    asset = ImageAsset(b"shared", "image/png")
+    handle = store.put(asset, owner="s1")
+    store.put(asset, owner="s2")
+
+    store.clock.now = 50
+    store.touch("s2")
+    store.clock.now = 120
+    assert store.sweep() == 1
+    assert store.get(handle) is asset
+
+    store.release("s2")
+    assert store.get(handle) is None
+    assert store.stats().owners == 0
+
+
+def test_blob_store_keeps_idle_owners_until_their_session_ends(tmp_path):
+    clock = FakeClock()
+    open_sessions = {"browser-1"}
+    store = BlobStore(
+        tmp_path,
+        memory_limit_bytes=1024,
+        session_ttl_seconds=100,
+        session_probe=lambda session: session in open_sessions,
+        clock=clock,
+    )
+    asset = ImageAsset(b"idle-but-open", "image/png")
+    handle = store.put(asset, owner="s1")
+    store.touch("s1", session="browser-1")
+
+    clock.now = 500
+    assert store.sweep() == 0
+    stats = store.stats()
+    assert (stats.memory_entries, stats.disk_entries, stats.owners) == (0, 1, 1)
+    assert store.get(handle).data == asset.data
+
+    open_sessions.clear()
+    assert store.sweep() == 1
+    assert store.get(handle) is None
+    store.clear()
+
+
+def test_proxy_keeps_handles_in_session_state(store):
+    backing: dict = {}
+    proxy = StorySessionProxy(backing)
+    cover = ImageAsset(b"cover", "image/png")
+    stage = ImageAsset(b"stage", "image/webp")
+
+    proxy["cover_image"] = cover
+    proxy["stages_data"] = [{"stage": "발단", "image_asset": stage}, None]
+
+    assert isinstance(backing["cover_image"], BlobHandle)
+    assert isinstance(backing["stages_data"][0]["image_asset"], BlobHandle)
+    assert proxy["cover_image"] is cover
+    assert stage_image(proxy.get("stages_data")[0]) is stage
+
+    proxy["stages_data"] = [None, None]
+    proxy.reset_keys("cover_image")
+    assert store.stats().memory_entries == 0
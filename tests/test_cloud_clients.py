@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import community_board
+import story_library
+from cloud_clients import CloudClientRegistry, get_cloud_client_registry
+
+
+class FakeFirestore:
+    def __init__(self) -> None:
+        self.built: list[dict] = []
+
+    def Client(self, **kwargs):
+        self.built.append(kwargs)
+        return SimpleNamespace(kwargs=kwargs)
+
+
+def test_registry_shares_clients_per_configuration():
+    registry = CloudClientRegistry()
+    factory = FakeFirestore()
+    credentials = SimpleNamespace(project_id="demo")
+
+    first = registry.get("firestore", factory.Client, user="a", project="demo", credentials=credentials)
+    second = registry.get("firestore", factory.Client, user="b", project="demo", credentials=credentials)
+    other = registry.get("firestore", factory.Client, user="a", project="other", credentials=credentials)
+
+    assert first is second
+    assert other is not first
+    assert len(factory.built) == 2
+    metrics = {item.project: item for item in registry.metrics()}
+    assert metrics["demo"].users == ["a", "b"]
+    assert metrics["demo"].acquisitions == 2
+    assert metrics["other"].to_dict()["users"] == ["a"]
+
+
+def test_warm_up_probes_registered_clients_and_skips_unconfigured():
+    registry = CloudClientRegistry()
+    factory = FakeFirestore()
+    probed: list[object] = []
+    registry.register_warm_up(
+        "firestore",
+        lambda: registry.get("firestore", factory.Client, user="store"),
+        probed.append,
+    )
+
+    def _unconfigured():
+        raise RuntimeError("GCS is not configured")
+
+    registry.register_warm_up("storage", _unconfigured)
+
+    assert registry.warm_up() == {"firestore": None, "storage": "GCS is not configured"}
+    [metrics] = registry.metrics()
+    assert metrics.warm_up_seconds is not None
+    assert probed == [registry.get("firestore", factory.Client, user="store")]
+    assert len(factory.built) == 1
+
+    def _unreachable(client):
+        raise ConnectionError("deadline exceeded")
+
+    registry.register_warm_up("firestore", lambda: registry.get("firestore", factory.Client, user="store"), _unreachable)
+    assert registry.warm_up()["firestore"] == "deadline exceeded"
+
+
+def test_firestore_stores_share_one_client(monkeypatch):
+    fake = FakeFirestore()
+    credentials = SimpleNamespace(project_id="shared-project")
+    for module in (story_library, community_board):
+        monkeypatch.setattr(module, "firestore", fake, raising=False)
+        monkeypatch.setattr(module, "GCP_PROJECT_ID", "", raising=False)
+        monkeypatch.setattr(module, "get_service_account_credentials", lambda: credentials)
+    story_library.reset_story_library_cache()
+    community_board.reset_board_storage_cache()
+    get_cloud_client_registry().reset()
+
+    assert story_library._get_firestore_client() is community_board._get_firestore_client()
+    assert fake.built == [{"credentials": credentials, "project": "shared-project"}]
+    [metrics] = [item for item in get_cloud_client_registry().metrics() if item.project == "shared-project"]
+    assert metrics.users == ["story_library", "community_board"]
+
+    story_library.reset_story_library_cache()
+    community_board.reset_board_storage_cache()
+    get_cloud_client_registry().reset()
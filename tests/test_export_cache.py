@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import gzip
+
+from services import export_cache
+from services.export_cache import ExportHtmlCache
+
+
+class FakeBucket:
+    """Objects keyed by name holding (generation, stored bytes)."""
+
+    def __init__(self) -> None:
+        self.objects: dict[str, tuple[int, bytes]] = {}
+        self.downloads: list[tuple[str, int | None]] = []
+        self.metadata_requests = 0
+
+    def generation(self, object_name: str) -> int | None:
+        self.metadata_requests += 1
+        stored = self.objects.get(object_name)
+        return stored[0] if stored else None
+
+    def download(self, object_name: str, *, generation: int | None = None):
+        self.downloads.append((object_name, generation))
+        stored = self.objects.get(object_name)
+        if stored is None or (generation is not None and stored[0] != generation):
+            return None
+        return stored[1], stored[0]
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _cache(monkeypatch, tmp_path, bucket: FakeBucket, clock: FakeClock) -> ExportHtmlCache:
+    monkeypatch.setattr(export_cache, "get_gcs_export_generation", bucket.generation)
+    monkeypatch.setattr(export_cache, "download_gcs_export_bytes", bucket.download)
+    return ExportHtmlCache(tmp_path, max_bytes=1024 * 1024, revalidate_seconds=60, clock=clock)
+
+
+def test_second_view_is_served_from_disk(monkeypatch, tmp_path):
+    bucket = FakeBucket()
+    bucket.objects["exports/a.html"] = (7, gzip.compress("<html>달님</html>".encode("utf-8")))
+    clock = FakeClock()
+    cache = _cache(monkeypatch, tmp_path, bucket, clock)
+
+    assert cache.load("exports/a.html") == "<html>달님</html>"
+    for _ in range(3):
+        assert cache.load("exports/a.html") == "<html>달님</html>"
+
+    assert bucket.downloads == [("exports/a.html", 7)]
+    assert bucket.metadata_requests == 1
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (3, 1, 1)
+    assert stats.hit_rate == 0.75
+    # Stored as the bucket holds it, compressed.
+    assert stats.bytes_stored == len(bucket.objects["exports/a.html"][1])
+
+
+def test_revalidation_picks_up_a_new_generation(monkeypatch, tmp_path):
+    bucket = FakeBucket()
+    bucket.objects["exports/a.html"] = (1, b"<html>old</html>")
+    clock = FakeClock()
+    cache = _cache(monkeypatch, tmp_path, bucket, clock)
+    assert cache.load("exports/a.html") == "<html>old</html>"
+
+    bucket.objects["exports/a.html"] = (2, b"<html>new</html>")
+    clock.now = 30
+    assert cache.load("exports/a.html") == "<html>old</html>"  # still within the revalidation window
+
+    clock.now = 61
+    assert cache.load("exports/a.html") == "<html>new</html>"
+    assert bucket.downloads == [("exports/a.html", 1), ("exports/a.html", 2)]
+    assert cache.stats().revalidations == 2
+
+
+def test_restart_reuses_disk_entries_after_one_metadata_request(monkeypatch, tmp_path):
+    bucket = FakeBucket()
+    bucket.objects["exports/a.html"] = (3, b"<html>story</html>")
+    clock = FakeClock()
+    _cache(monkeypatch, tmp_path, bucket, clock).load("exports/a.html")
+
+    restarted = _cache(monkeypatch, tmp_path, bucket, clock)
+    assert restarted.load("exports/a.html") == "<html>story</html>"
+    assert len(bucket.downloads) == 1
+    assert restarted.stats().hits == 1
+
+    del bucket.objects["exports/a.html"]
+    clock.now = 120
+    assert restarted.load("exports/a.html") is None
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from services import export_jobs
+from services.export_jobs import ExportJobManager, ExportRequest
+from services.generation_tokens import ConsumeOutcome, GenerationTokenStatus
+from services.story_service import ExportResult, StoryBundle
+
+
+def _request(signature: str = "sig-1", **overrides) -> ExportRequest:
+    bundle = StoryBundle(
+        title="달빛 모험",
+        stages=[],
+        synopsis=None,
+        protagonist=None,
+        cover=None,
+        story_type_name="모험",
+        age="6-8",
+        topic=None,
+    )
+    values = dict(
+        signature=signature,
+        bundle=bundle,
+        full_text="옛날 옛적에",
+        story_id="story-1",
+        author="작가",
+        user_id="uid-1",
+        user_email="user@example.com",
+        synthesize_audio=True,
+    )
+    values.update(overrides)
+    return ExportRequest(**values)
+
+
+def _token_status(tokens: int) -> GenerationTokenStatus:
+    return GenerationTokenStatus(
+        tokens=tokens,
+        auto_cap=10,
+        created_at=None,
+        updated_at=None,
+        last_login_at=None,
+        last_refill_at=None,
+        last_consumed_at=None,
+        last_consumed_signature=None,
+    )
+
+
+def _wait(manager: ExportJobManager, signature: str, user_id: str = "uid-1"):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        job = manager.get(signature, user_id)
+        if job and job.done:
+            return job
+        time.sleep(0.01)
+    raise AssertionError("export job did not finish")
+
+
+@pytest.fixture
+def calls(monkeypatch, tmp_path):
+    recorded: dict[str, list] = {"audio": [], "render": [], "upload": [], "record": [], "token": []}
+
+    class _Audio:
+        public_url = "https://audio.example/story-1.mp3"
+        blob_name = "audio/story-1.mp3"
+
+    def fake_audio(**kwargs):
+        recorded["audio"].append(kwargs)
+        return _Audio()
+
+    def fake_render(*, bundle, author):
+        recorded["render"].append(bundle.audio_url)
+        path = tmp_path / "story.html"
+        path.write_text("<html></html>", encoding="utf-8")
+        return path
+
+    def fake_upload(path: Path):
+        recorded["upload"].append(path)
+        return ExportResult(str(path), gcs_object="exports/story.html", gcs_url="https://gcs.example/story.html")
+
+    def fake_consume(*, uid, signature):
+        recorded["token"].append(signature)
+        return ConsumeOutcome(consumed=True, status=_token_status(4), signature=signature)
+
+    monkeypatch.setattr(export_jobs, "generate_story_audio", fake_audio)
+    monkeypatch.setattr(export_jobs, "render_story_html", fake_render)
+    monkeypatch.setattr(export_jobs, "upload_story_html", fake_upload)
+    monkeypatch.setattr(export_jobs, "record_story_export", lambda **kwargs: recorded["record"].append(kwargs))
+    monkeypatch.setattr(export_jobs, "discard_draft", lambda story_id: None)
+    monkeypatch.setattr(export_jobs, "consume_token", fake_consume)
+    monkeypatch.setattr(export_jobs, "log_event", lambda **kwargs: None)
+    return recorded
+
+
+def test_job_runs_every_stage_and_records(calls):
+    manager = ExportJobManager(max_workers=1)
+
+    job = manager.submit(_request())
+    assert job.state == export_jobs.QUEUED
+
+    finished = _wait(manager, "sig-1")
+    assert finished.state == export_jobs.RECORDED
+    assert finished.audio_url == "https://audio.example/story-1.mp3"
+    assert finished.gcs_object == "exports/story.html"
+    assert finished.token_consumed is True
+    assert finished.token_status.tokens == 4
+    # The narration URL produced by the job is embedded in the rendered document.
+    assert calls["render"] == ["https://audio.example/story-1.mp3"]
+    assert calls["record"][0]["gcs_url"] == "https://gcs.example/story.html"
+    assert calls["token"] == ["sig-1"]
+
+
+def test_resubmitting_a_signature_reuses_the_job(calls, monkeypatch):
+    manager = ExportJobManager(max_workers=1)
+    release = threading.Event()
+    original_render = export_jobs.render_story_html
+
+    def slow_render(**kwargs):
+        release.wait(5)
+        return original_render(**kwargs)
+
+    monkeypatch.setattr(export_jobs, "render_story_html", slow_render)
+    manager.submit(_request())
+    for _ in range(5):
+        assert manager.submit(_request()).attempts == 1
+    release.set()
+    _wait(manager, "sig-1")
+
+    assert manager.submit(_request()).state == export_jobs.RECORDED
+    assert len(calls["audio"]) == 1
+    assert len(calls["upload"]) == 1
+    assert len(calls["token"]) == 1
+
+
+def test_retry_resumes_after_failed_upload(calls, monkeypatch):
+    manager = ExportJobManager(max_workers=1)
+    working_upload = export_jobs.upload_story_html
+
+    def broken_upload(path):
+        raise RuntimeError("bucket unavailable")
+
+    monkeypatch.setattr(export_jobs, "upload_story_html", broken_upload)
+    manager.submit(_request(synthesize_audio=False, audio_url="https://audio.example/cached.mp3"))
+    failed = _wait(manager, "sig-1")
+    assert failed.state == export_jobs.FAILED
+    assert failed.error == "bucket unavailable"
+    assert calls["record"] == []
+
+    # Without retry=True a failed job is returned as-is.
+    assert manager.submit(_request()).state == export_jobs.FAILED
+
+    monkeypatch.setattr(export_jobs, "upload_story_html", working_upload)
+    manager.submit(_request(), retry=True)
+    recovered = _wait(manager, "sig-1")
+    assert recovered.state == export_jobs.RECORDED
+    assert recovered.attempts == 2
+    assert recovered.audio_url == "https://audio.example/cached.mp3"
+    assert calls["audio"] == []
+    assert len(calls["render"]) == 1
+    assert len(calls["upload"]) == 1
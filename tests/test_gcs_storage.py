@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import gzip
 from datetime import datetime, timezone
 from types import SimpleNamespace
 
+from google.api_core.exceptions import PreconditionFailed
+
 import gcs_storage
 
 
@@ -27,49 +30,67 @@ def configure_storage(monkeypatch, *, bucket: str = "bucket", prefix: str = "")
     gcs_storage.reset_gcs_client_cache()
 
 
-def test_upload_html_to_gcs_success(monkeypatch):
-    configure_storage(monkeypatch, prefix="exports/")
+class IndexBucket:
+    """In-memory bucket honouring ``if_generation_match`` like GCS does."""
 
-    class RecordingBlob:
-        def __init__(self, name: str):
-            self.name = name
-            self.public_url = f"https://storage.googleapis.com/test/{name}"
-            self.calls: list[tuple[str, str]] = []
+    def __init__(self) -> None:
+        self.objects: dict[str, tuple[bytes, int]] = {}
+        self.conflicts = 0
 
-        def upload_from_string(self, data: str, **kwargs) -> None:
-            self.calls.append((data, kwargs.get("content_type")))
+    def get_blob(self, name: str):
+        if name not in self.objects:
+            return None
+        return IndexBlob(self, name, self.objects[name][1])
 
-    class StubBucket:
-        def __init__(self) -> None:
-            self.blobs: dict[str, RecordingBlob] = {}
+    def blob(self, name: str):
+        return IndexBlob(self, name, None)
 
-        def blob(self, object_name: str) -> RecordingBlob:
-            blob = self.blobs.setdefault(object_name, RecordingBlob(object_name))
-            return blob
 
-    bucket = StubBucket()
+class IndexBlob:
+    def __init__(self, bucket: IndexBucket, name: str, generation: int | None) -> None:
+        self.bucket = bucket
+        self.name = name
+        self.generation = generation
+        self.cache_control = None
 
-    class StubClient:
-        def bucket(self, bucket_name: str) -> StubBucket:
-            assert bucket_name == "bucket"
-            return bucket
+    def download_as_bytes(self, *, if_generation_match: int | None = None) -> bytes:
+        data, generation = self.bucket.objects[self.name]
+        assert if_generation_match in (None, generation)
+        return data
+
+    def upload_from_string(self, data: bytes, *, content_type: str, if_generation_match: int | None = None) -> None:
+        current = self.bucket.objects.get(self.name, (b"", 0))[1]
+        if self.bucket.conflicts:
+            # Simulate another replica writing between our read and write.
+            self.bucket.conflicts -= 1
+            stored = self.bucket.objects[self.name][0]
+            self.bucket.objects[self.name] = (stored, current + 1)
+            current += 1
+        if if_generation_match is not None and if_generation_match != current:
+            raise PreconditionFailed("generation mismatch")
+        self.bucket.objects[self.name] = (data, current + 1)
 
-    monkeypatch.setattr(gcs_storage, "_get_client", StubClientFactory(StubClient()), raising=False)
 
-    result = gcs_storage.upload_html_to_gcs("<html></html>", "story.html")
+def _listing_client(bucket: IndexBucket, blobs: list):
+    class StubClient:
+        def __init__(self) -> None:
+            self.list_calls: list[dict] = []
 
-    assert result == ("exports/story.html", "https://storage.googleapis.com/test/exports/story.html")
-    blob = bucket.blobs["exports/story.html"]
-    assert blob.calls == [("<html></html>", "text/html; charset=utf-8")]
+        def list_blobs(self, bucket_name: str, **kwargs):
+            assert bucket_name == "bucket"
+            self.list_calls.append(kwargs)
+            size = kwargs["page_size"]
+            return SimpleNamespace(pages=[blobs[i : i + size] for i in range(0, len(blobs), size)])
 
+        def bucket(self, bucket_name: str):
+            return bucket
 
-def test_upload_html_to_gcs_without_bucket(monkeypatch):
-    configure_storage(monkeypatch, bucket="")
-    assert gcs_storage.upload_html_to_gcs("<p>data</p>", "story.html") is None
+    return StubClient()
 
 
-def test_list_gcs_exports_sorted(monkeypatch):
+def test_list_gcs_exports_scans_pages_once_then_reads_index(monkeypatch):
     configure_storage(monkeypatch, prefix="exports/")
+    monkeypatch.setattr(gcs_storage, "GCS_LIST_PAGE_SIZE", 1)
 
     newer = datetime(2024, 1, 2, tzinfo=timezone.utc)
     older = datetime(2024, 1, 1, tzinfo=timezone.utc)
@@ -86,46 +107,59 @@ def test_list_gcs_exports_sorted(monkeypatch):
             updated=newer,
             size=140,
         ),
-        SimpleNamespace(
-            name="exports/ignore.txt",
-            public_url="https://example.com/ignore",
-            updated=newer,
-            size=10,
-        ),
     ]
+    bucket = IndexBucket()
+    client = _listing_client(bucket, blobs)
+    monkeypatch.setattr(gcs_storage, "_get_client", StubClientFactory(client), raising=False)
 
-    class StubClient:
-        def __init__(self) -> None:
-            self.prefix = None
+    exports = gcs_storage.list_gcs_exports()
 
-        def list_blobs(self, bucket_name: str, *, prefix: str | None = None):
-            assert bucket_name == "bucket"
-            self.prefix = prefix
-            return blobs
+    assert [item.filename for item in exports] == ["newer.html", "older.html"]
+    assert exports[0].public_url == "https://example.com/newer"
+    assert client.list_calls[0]["prefix"] == "exports/"
+    assert client.list_calls[0]["match_glob"] == "exports/*.html"
+    assert "exports/exports-index.json" in bucket.objects
 
-        def bucket(self, bucket_name: str):  # pragma: no cover - not used
-            raise AssertionError("bucket() should not be called in this test")
+    # The scan was written back as the index, so later listings read one object.
+    assert gcs_storage.list_gcs_exports() == exports
+    assert len(client.list_calls) == 1
 
-    client = StubClient()
+
+def test_record_gcs_export_retries_on_concurrent_index_writes(monkeypatch):
+    configure_storage(monkeypatch, prefix="exports/")
+    bucket = IndexBucket()
+    client = _listing_client(bucket, [])
     monkeypatch.setattr(gcs_storage, "_get_client", StubClientFactory(client), raising=False)
 
-    exports = gcs_storage.list_gcs_exports()
+    # Without an index there is nothing complete to extend.
+    assert gcs_storage.record_gcs_export("exports/first.html", "https://example.com/first") is False
+    assert gcs_storage.list_gcs_exports() == []
 
-    assert [item.filename for item in exports] == ["newer.html", "older.html"]
-    assert client.prefix == "exports/"
-    assert exports[0].public_url == "https://example.com/newer"
+    bucket.conflicts = 2
+    assert gcs_storage.record_gcs_export("exports/first.html", "https://example.com/first", size=10)
+    assert gcs_storage.record_gcs_export("exports/second.html", "https://example.com/second")
+    assert gcs_storage.record_gcs_export("exports/first.html", "https://example.com/first", size=12)
+
+    exports = gcs_storage.list_gcs_exports()
+    assert [(item.filename, item.size) for item in exports] == [("first.html", 12), ("second.html", None)]
+    assert len(client.list_calls) == 1
 
 
 def test_download_gcs_export(monkeypatch):
     configure_storage(monkeypatch, prefix="exports/")
 
+    stored = {
+        "exports/demo.html": gzip.compress("<html>이야기</html>".encode("utf-8")),
+        "exports/legacy.html": b"<html>story</html>",
+    }
+
     class StubBlob:
         def __init__(self, object_name: str) -> None:
             self.object_name = object_name
 
-        def download_as_text(self, encoding: str = "utf-8") -> str:
-            assert encoding == "utf-8"
-            return "<html>story</html>"
+        def download_as_bytes(self, raw_download: bool = False) -> bytes:
+            assert raw_download is True
+            return stored[self.object_name]
 
     class StubBucket:
         def __init__(self) -> None:
@@ -146,8 +180,9 @@ def test_download_gcs_export(monkeypatch):
 
     content = gcs_storage.download_gcs_export("exports/demo.html")
 
-    assert content == "<html>story</html>"
+    assert content == "<html>이야기</html>"
     assert bucket.requested == "exports/demo.html"
+    assert gcs_storage.download_gcs_export("exports/legacy.html") == "<html>story</html>"
 
 
 def test_download_gcs_export_without_bucket(monkeypatch):
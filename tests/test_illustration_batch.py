@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import threading
+
+from services.image_asset import ImageAsset
+from services.illustration_batch import (
+    apply_illustration_result,
+    build_illustration_jobs,
+    find_missing_illustrations,
+    render_stage_illustrations,
+)
+
+
+def make_stage(name: str, *, image: bytes | None = None, error: str | None = None) -> dict:
+    return {
+        "stage": name,
+        "card": {"name": f"{name} 카드", "prompt": ""},
+        "story": {"title": "숲", "paragraphs": [f"{name} 문단"]},
+        "image_bytes": image,
+        "image_mime": "image/png",
+        "image_style": None,
+        "image_prompt": None,
+        "image_error": error,
+    }
+
+
+def test_find_missing_illustrations_skips_empty_and_rendered():
+    stages = [
+        make_stage("발단", image=b"png"),
+        make_stage("전개"),
+        None,
+        make_stage("절정", error="safety"),
+        {"stage": "결말", "story": {"paragraphs": []}},
+    ]
+
+    assert find_missing_illustrations(stages) == [1, 3]
+    assert find_missing_illustrations(None) == []
+
+
+def test_render_stage_illustrations_runs_concurrently_and_reports_errors():
+    stages = [make_stage("발단"), make_stage("전개"), make_stage("위기")]
+    jobs = build_illustration_jobs(stages, [0, 1, 2])
+    barrier = threading.Barrier(3, timeout=5)
+    captured: list[dict] = []
+
+    def fake_prompt_builder(**kwargs):
+        captured.append(kwargs)
+        return {"prompt": f"draw {kwargs['stage_name']}", "style_name": "Soft", "style_text": "pastel"}
+
+    references: list[object] = []
+
+    def fake_image_generator(prompt: str, *, image_input=None, style_name=None):
+        references.append(image_input)
+        barrier.wait()  # all three jobs must be in flight at the same time
+        if "위기" in prompt:
+            return {"error": "blocked"}
+        return {"bytes": prompt.encode("utf-8"), "mime_type": "image/jpeg"}
+
+    results = list(
+        render_stage_illustrations(
+            jobs,
+            age="6-8",
+            topic="숲",
+            story_type_name="모험",
+            style_choice={"name": "Soft", "style": "pastel"},
+            reference_image=b"ref",
+            max_workers=3,
+            prompt_builder=fake_prompt_builder,
+            image_generator=fake_image_generator,
+        )
+    )
+
+    by_index = {result.stage_index: result for result in results}
+    assert set(by_index) == {0, 1, 2}
+    assert by_index[0].image_asset.data == "draw 발단".encode("utf-8")
+    assert by_index[0].image_asset.mime_type == "image/jpeg"
+    assert by_index[2].image_asset is None
+    assert by_index[2].image_error == "blocked"
+    assert len({id(ref) for ref in references}) == 1
+    assert all(call["style_override"] == {"name": "Soft", "style": "pastel"} for call in captured)
+
+    for result in results:
+        stages = apply_illustration_result(stages, result)
+    assert find_missing_illustrations(stages) == [2]
+    assert stages[2]["image_error"] == "blocked"
+    assert stages[1]["image_style"] == {"name": "Soft", "style": "pastel"}
+    assert isinstance(stages[1]["image_asset"], ImageAsset)
+    assert "image_bytes" not in stages[1]
+
+
+def test_render_stage_illustrations_converts_exceptions():
+    jobs = build_illustration_jobs([make_stage("발단")], [0])
+
+    def broken_builder(**_kwargs):
+        raise RuntimeError("boom")
+
+    results = list(
+        render_stage_illustrations(
+            jobs,
+            age="6-8",
+            topic=None,
+            story_type_name="모험",
+            style_choice=None,
+            prompt_builder=broken_builder,
+            image_generator=lambda *_args, **_kwargs: {},
+        )
+    )
+
+    assert len(results) == 1
+    assert results[0].image_error == "RuntimeError: boom"
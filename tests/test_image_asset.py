@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+
+import pytest
+
+from services import story_service
+from services.image_asset import ImageAsset, stage_image
+from services.storage_backend import MemoryStorageBackend
+from services.story_service import StagePayload, StoryBundle
+
+
+def test_image_asset_shares_bytes_and_caches_encodings():
+    payload = b"\x89PNG" + bytes(range(64))
+    asset = ImageAsset(payload, "image/png")
+
+    assert asset.data is payload
+    assert asset.view.readonly
+    assert asset.sha256 == hashlib.sha256(payload).hexdigest()
+    assert asset.data_uri == "data:image/png;base64," + base64.b64encode(payload).decode("ascii")
+    assert asset.data_uri is asset.data_uri
+    assert asset.drop_encodings() > 0
+    assert asset.data_uri.endswith(base64.b64encode(payload).decode("ascii"))
+
+    with pytest.raises(AttributeError):
+        asset.mime_type = "image/jpeg"  # type: ignore[misc]
+
+
+def test_image_asset_freezes_mutable_buffers():
+    buffer = bytearray(b"abc")
+    asset = ImageAsset(buffer)
+    buffer[0] = ord("z")
+
+    assert asset.data == b"abc"
+    assert ImageAsset(memoryview(bytearray(b"xyz"))).view.readonly
+    assert ImageAsset.coerce(asset) is asset
+    assert ImageAsset.coerce(b"") is None
+
+
+def test_stage_image_accepts_legacy_entries():
+    asset = ImageAsset(b"new", "image/webp")
+
+    assert stage_image({"image_asset": asset}) is asset
+    legacy = stage_image({"image_bytes": b"old", "image_mime": "image/jpeg"})
+    assert legacy.data == b"old"
+    assert legacy.mime_type == "image/jpeg"
+    assert stage_image({"image_bytes": None}) is None
+
+
+def test_export_reuses_assets_without_reencoding_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(story_service, "HTML_EXPORT_PATH", tmp_path)
+    bucket = MemoryStorageBackend()
+    monkeypatch.setattr(story_service, "_remote_story_storage", bucket)
+
+    asset = ImageAsset(b"illustration", "image/png")
+    bundle = StoryBundle(
+        title="캐시",
+        stages=[StagePayload("발단", None, None, ["문단"], None, "image/png", image_asset=asset)],
+        synopsis=None,
+        protagonist=None,
+        cover={"image_asset": asset, "style_name": None},
+        story_type_name="모험",
+        age="6-8",
+        topic=None,
+    )
+
+    first_uri = asset.data_uri
+    result = story_service.export_story_to_html(bundle=bundle)
+
+    assert asset.data_uri is first_uri
+    html_name = result.local_path.rsplit("/", 1)[-1]
+    html_bytes = (tmp_path / html_name).read_bytes()
+    assert bucket.get(html_name) == html_bytes
+    assert html_bytes.count(first_uri.encode("ascii")) == 2
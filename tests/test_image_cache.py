@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from services import gemini_api
+from services.image_cache import (
+    CachedImage,
+    LocalImageCache,
+    TieredImageCache,
+    make_image_cache_key,
+)
+
+
+def test_make_image_cache_key_depends_on_every_component():
+    base = make_image_cache_key(model="m", prompt="forest", style_name="Soft", reference_hash="ref-digest")
+
+    assert base == make_image_cache_key(model="m", prompt="forest", style_name="Soft", reference_hash="ref-digest")
+    assert base != make_image_cache_key(model="other", prompt="forest", style_name="Soft", reference_hash="ref-digest")
+    assert base != make_image_cache_key(model="m", prompt="sea", style_name="Soft", reference_hash="ref-digest")
+    assert base != make_image_cache_key(model="m", prompt="forest", style_name="Bold", reference_hash="ref-digest")
+    assert base != make_image_cache_key(model="m", prompt="forest", style_name="Soft", reference_hash=None)
+
+
+def test_local_image_cache_is_binary_safe_and_evicts_lru(tmp_path):
+    cache = LocalImageCache(tmp_path, max_bytes=80)
+    payload = bytes(range(20)) + b"\n\x00\n"
+    keys = [make_image_cache_key(model="m", prompt=str(i), style_name=None, reference_hash=None) for i in range(3)]
+
+    cache.put(keys[0], CachedImage(data=payload, mime_type="image/png"))
+    cache.put(keys[1], CachedImage(data=payload, mime_type="image/jpeg"))
+    assert cache.get(keys[0]) == CachedImage(data=payload, mime_type="image/png")
+
+    # keys[1] is now the least recently used entry and must be evicted first.
+    cache.put(keys[2], CachedImage(data=payload, mime_type="image/webp"))
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[2]).mime_type == "image/webp"
+    stats = cache.stats()
+    assert stats.evictions == 1
+    assert stats.entries == 2
+    assert stats.bytes_stored <= 80
+
+
+def test_tiered_image_cache_promotes_remote_hits(tmp_path):
+    local = LocalImageCache(tmp_path, max_bytes=1024)
+    remote_store: dict[str, CachedImage] = {}
+    remote = SimpleNamespace(get=remote_store.get, put=remote_store.__setitem__)
+    cache = TieredImageCache(local, remote)
+    key = make_image_cache_key(model="m", prompt="p", style_name=None, reference_hash=None)
+
+    remote_store[key] = CachedImage(data=b"remote", mime_type="image/png")
+
+    assert cache.get(key).data == b"remote"
+    assert local.get(key).data == b"remote"
+
+
+def test_generate_image_returns_cached_bytes_without_model_call(monkeypatch, tmp_path):
+    cache = TieredImageCache(LocalImageCache(tmp_path, max_bytes=1024))
+    monkeypatch.setattr(gemini_api, "API_KEY", "test-key")
+    monkeypatch.setattr(gemini_api, "get_image_cache", lambda: cache)
+
+    calls: list[str] = []
+
+    class DummyModel:
+        def generate_content(self, content):
+            calls.append(content[0])
+            blob = SimpleNamespace(mime_type="image/png", data=b"fresh-image")
+            part = SimpleNamespace(inline_data=blob)
+            return SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))])
+
+    monkeypatch.setattr(gemini_api, "_instantiate_image_model", lambda _name: DummyModel())
+
+    first = gemini_api.generate_image("a fox", style_name="Soft")
+    second = gemini_api.generate_image("a fox", style_name="Soft")
+    other_style = gemini_api.generate_image("a fox", style_name="Bold")
+
+    assert first["bytes"] == b"fresh-image"
+    assert first["asset"].data is first["bytes"]
+    assert "cached" not in first
+    assert second["bytes"] == b"fresh-image"
+    assert second["asset"] == first["asset"]
+    assert second["cached"] is True
+    assert "cached" not in other_style
+    assert calls == ["a fox", "a fox"]
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import sys
+
+import pytest
+
+from utils.lazy_import import google_api_error, lazy_module
+
+
+@pytest.fixture
+def fake_sdk(tmp_path, monkeypatch):
+    (tmp_path / "fake_sdk_mod.py").write_text(
+        "LOADS = 1\n"
+        "class Filter:\n"
+        "    def __init__(self, *args):\n"
+        "        self.args = args\n"
+        "def post(url):\n"
+        "    return 'real'\n",
+        encoding="utf-8",
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "fake_sdk_mod", raising=False)
+    yield "fake_sdk_mod"
+    sys.modules.pop("fake_sdk_mod", None)
+
+
+def test_module_imports_on_first_attribute_access(fake_sdk):
+    proxy = lazy_module(fake_sdk)
+
+    assert proxy
+    assert fake_sdk not in sys.modules
+    assert proxy.LOADS == 1
+    assert fake_sdk in sys.modules
+    assert proxy.loaded is True
+
+
+def test_attribute_proxy_is_callable_and_setattr_forwards(fake_sdk, monkeypatch):
+    field_filter = lazy_module(f"{fake_sdk}.Filter")
+    sdk = lazy_module(fake_sdk)
+
+    assert field_filter("stage", "==", 1).args == ("stage", "==", 1)
+    monkeypatch.setattr(sdk, "post", lambda url: "patched")
+    assert sys.modules[fake_sdk].post("x") == "patched"
+
+
+def test_missing_module_is_falsy_and_raises_on_use():
+    proxy = lazy_module("definitely_not_installed_sdk")
+
+    assert not proxy
+    with pytest.raises(ImportError):
+        proxy.Client  # noqa: B018
+    assert issubclass(google_api_error(), BaseException)
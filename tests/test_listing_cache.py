@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import threading
+from types import SimpleNamespace
+
+from services import listing_cache
+from services.listing_cache import ALL_STORIES_SCOPE, ListingCache, user_stories_scope
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_entries_expire_after_ttl_and_report_hit_rate():
+    clock = FakeClock()
+    cache = ListingCache(ttl_seconds=30, clock=clock)
+    loads: list[int] = []
+
+    def loader() -> list[int]:
+        loads.append(1)
+        return [len(loads)]
+
+    assert cache.get_or_load(ALL_STORIES_SCOPE, 1, loader) == [1]
+    assert cache.get_or_load(ALL_STORIES_SCOPE, 1, loader) == [1]
+    assert cache.get_or_load(ALL_STORIES_SCOPE, 2, loader) == [2]
+
+    clock.now = 31
+    assert cache.get_or_load(ALL_STORIES_SCOPE, 1, loader) == [3]
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 3, 2)
+    assert stats.hit_rate == 0.25
+
+
+def test_invalidation_drops_scope_and_discards_overlapping_loads():
+    cache = ListingCache(ttl_seconds=30)
+    cache.get_or_load(user_stories_scope("u1"), 1, lambda: ["mine"])
+    cache.get_or_load(user_stories_scope("u2"), 1, lambda: ["theirs"])
+
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_loader() -> list[str]:
+        started.set()
+        release.wait(5)
+        return ["stale"]
+
+    worker = threading.Thread(target=lambda: cache.get_or_load(ALL_STORIES_SCOPE, 1, slow_loader))
+    worker.start()
+    started.wait(5)
+    cache.invalidate(ALL_STORIES_SCOPE, user_stories_scope("u1"))
+    release.set()
+    worker.join(5)
+
+    # The load began before the write, so it must not be cached after it.
+    assert cache.get_or_load(ALL_STORIES_SCOPE, 1, lambda: ["fresh"]) == ["fresh"]
+    assert cache.get_or_load(user_stories_scope("u1"), 1, lambda: ["new"]) == ["new"]
+    assert cache.get_or_load(user_stories_scope("u2"), 1, lambda: ["unused"]) == ["theirs"]
+
+
+def test_record_story_export_invalidates_listings(monkeypatch):
+    import story_library
+
+    class DocRef:
+        id = "doc-1"
+
+        def set(self, payload) -> None:
+            pass
+
+        def get(self, transaction=None):
+            return SimpleNamespace(exists=False)
+
+    class Collection:
+        def document(self, doc_id=None):
+            return DocRef()
+
+    monkeypatch.setattr(story_library, "_get_story_collection", lambda: Collection())
+    monkeypatch.setattr(story_library, "_get_user_index_collection", lambda: Collection())
+    monkeypatch.setattr(story_library, "_run_transaction", lambda callback: callback(SimpleNamespace(set=lambda ref, data: None)))
+    monkeypatch.setattr(story_library, "index_story_export", lambda document: None)
+    cache = listing_cache.get_listing_cache()
+    cache.clear()
+    cache.get_or_load(ALL_STORIES_SCOPE, 1, lambda: [])
+    cache.get_or_load(user_stories_scope("user"), 1, lambda: [])
+
+    story_library.record_story_export(user_id="user", title="새 이야기", local_path=None, gcs_object=None, gcs_url=None)
+
+    assert cache.stats().entries == 0
+    cache.clear()
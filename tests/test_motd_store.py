@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+import motd_store
+
+
+class FakeDocument:
+    def __init__(self, data: dict | None = None, *, supports_listener: bool = True):
+        self.data = data
+        self.reads = 0
+        self.callbacks: list = []
+        self.supports_listener = supports_listener
+
+    def _snapshot(self):
+        return SimpleNamespace(exists=self.data is not None, to_dict=lambda: dict(self.data or {}))
+
+    def get(self):
+        self.reads += 1
+        return self._snapshot()
+
+    def set(self, record: dict) -> None:
+        self.data = dict(record)
+
+    def on_snapshot(self, callback):
+        if not self.supports_listener:
+            raise RuntimeError("listeners unavailable")
+        self.callbacks.append(callback)
+        callback([self._snapshot()], [], None)
+        return SimpleNamespace(is_active=True, unsubscribe=lambda: None)
+
+    def push(self, data: dict | None) -> None:
+        self.data = data
+        for callback in self.callbacks:
+            callback([self._snapshot()], [], None)
+
+
+def _record(message: str) -> dict:
+    return {"message": message, "is_active": True, "updated_at": datetime(2024, 5, 1, tzinfo=timezone.utc)}
+
+
+@pytest.fixture
+def document(monkeypatch):
+    doc = FakeDocument(_record("점검 안내"))
+    monkeypatch.setattr(motd_store, "_get_firestore_document", lambda: doc)
+    motd_store._MOTD_CACHE.reset()
+    yield doc
+    motd_store._MOTD_CACHE.reset()
+
+
+def test_cached_motd_reads_once_and_follows_listener(document):
+    assert motd_store.get_cached_motd().message == "점검 안내"
+    for _ in range(5):
+        motd_store.get_cached_motd()
+    assert document.reads == 1
+
+    document.push(_record("새 공지"))
+    assert motd_store.get_cached_motd().message == "새 공지"
+
+    document.push(None)
+    assert motd_store.get_cached_motd() is None
+    assert document.reads == 1
+
+
+def test_save_motd_updates_local_cache(document):
+    motd_store.get_cached_motd()
+
+    motd_store.save_motd(message="저장한 공지", is_active=True, updated_by="admin")
+
+    assert motd_store.get_cached_motd().message == "저장한 공지"
+    motd_store.clear_motd(updated_by="admin")
+    assert motd_store.get_cached_motd().is_active is False
+
+
+def test_cached_motd_polls_when_listener_unavailable(document, monkeypatch):
+    document.supports_listener = False
+    now = [0.0]
+    monkeypatch.setattr(motd_store._MOTD_CACHE, "_clock", lambda: now[0])
+
+    assert motd_store.get_cached_motd().message == "점검 안내"
+    document.data = _record("폴링 공지")
+    now[0] = 1.0
+    assert motd_store.get_cached_motd().message == "점검 안내"
+
+    now[0] = motd_store.MOTD_CACHE_TTL_SECONDS + 1.0
+    monkeypatch.setattr(
+        motd_store.threading,
+        "Thread",
+        lambda target, **_kwargs: SimpleNamespace(start=target),
+    )
+    motd_store.get_cached_motd()
+    assert motd_store.get_cached_motd().message == "폴링 공지"
+    assert document.reads == 2
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+from services.process_init import InitRegistry
+
+
+def test_ensure_runs_check_once_and_caches_status():
+    calls: list[int] = []
+    registry = InitRegistry(attempts=3, backoff_seconds=0, recheck_seconds=0)
+
+    def check() -> None:
+        calls.append(1)
+
+    first = registry.ensure("library", check)
+    for _ in range(10):
+        assert registry.ensure("library", check) is first
+    assert first.ok is True
+    assert first.attempts == 1
+    assert len(calls) == 1
+
+
+def test_ensure_retries_then_reports_error():
+    attempts: list[int] = []
+    sleeps: list[float] = []
+    registry = InitRegistry(attempts=3, backoff_seconds=0.5, recheck_seconds=0, sleep=sleeps.append)
+
+    def check() -> None:
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError("firestore unavailable")
+
+    status = registry.ensure("activity", check)
+    assert status.ok is True
+    assert status.attempts == 3
+    assert sleeps == [0.5, 1.0]
+
+    failing = registry.ensure("board", lambda: (_ for _ in ()).throw(RuntimeError("no credentials")))
+    assert failing.ok is False
+    assert failing.error == "no credentials"
+    assert registry.status("board") is failing
+
+
+def test_stale_status_is_rechecked_in_background(monkeypatch):
+    now = [0.0]
+    healthy = [False]
+    registry = InitRegistry(attempts=1, backoff_seconds=0, recheck_seconds=60, clock=lambda: now[0])
+
+    def check() -> None:
+        if not healthy[0]:
+            raise RuntimeError("down")
+
+    assert registry.ensure("library", check).ok is False
+
+    started: list[threading.Thread] = []
+
+    class InlineThread:
+        def __init__(self, target, **_kwargs):
+            self._target = target
+            started.append(self)
+
+        def start(self) -> None:
+            self._target()
+
+    monkeypatch.setattr(threading, "Thread", InlineThread)
+    now[0] = 30.0
+    healthy[0] = True
+    assert registry.ensure("library", check).ok is False
+    assert not started
+
+    now[0] = 61.0
+    registry.ensure("library", check)
+    assert len(started) == 1
+    assert registry.ensure("library", check).ok is True
+
+
+def test_malformed_retry_settings_fall_back_to_defaults():
+    env = {**os.environ, "INIT_RETRY_ATTEMPTS": "three", "INIT_RETRY_BACKOFF_SECONDS": "0.5s", "INIT_RECHECK_SECONDS": "1.5"}
+    script = (
+        "from services import process_init as p; "
+        "print(p.INIT_RETRY_ATTEMPTS, p.INIT_RETRY_BACKOFF_SECONDS, p.INIT_RECHECK_SECONDS)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=Path(__file__).resolve().parents[1], env=env, capture_output=True, text=True
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["3", "0.5", "1.5"]
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from admin_tool.runtime_metrics import summarize_replicas
+from services import session_memory
+from services.blob_store import BlobStore
+from services.image_asset import ImageAsset
+from services.session_memory import SessionMemoryTracker, classify_key, measure_session
+from services.story_manifest import ManifestStage, StoryManifest
+from services.story_reader import StoryDocumentCache
+from session_proxy import StorySessionProxy
+
+
+def test_measure_session_groups_bytes_by_family(tmp_path):
+    store = BlobStore(tmp_path, memory_limit_bytes=1 << 20, session_ttl_seconds=60)
+    proxy = StorySessionProxy({}, blob_store=store)
+    proxy["cover_image"] = ImageAsset(b"x" * 5000)
+    proxy["stages_data"] = [{"story": {"paragraphs": ["가" * 400]}, "image_asset": ImageAsset(b"y" * 3000)}]
+    proxy["auth_user"] = {"email": "reader@example.com"}
+    proxy["board_content"] = "안녕"
+
+    report = measure_session(proxy)
+
+    assert report.session_id == proxy.session_id
+    assert report.blob_bytes == 8000
+    assert report.families["images"] >= 8000
+    assert report.families["story"] > 400
+    assert report.families["auth"] > 0
+    assert report.families["board"] > 0
+    assert report.resident_bytes < report.total_bytes
+    assert classify_key("generation_token_status") == "auth"
+    assert classify_key("mode") == "other"
+
+
+def test_enforce_budget_drops_cheapest_artifacts_first(tmp_path, monkeypatch):
+    store = BlobStore(tmp_path, memory_limit_bytes=1 << 20, session_ttl_seconds=60)
+    tracker = SessionMemoryTracker(budget_bytes=2_000, session_ttl_seconds=60, blob_store=store)
+    documents = StoryDocumentCache()
+    documents.get_or_parse("story", lambda: None, lambda: StoryManifest(title="제목", stages=[ManifestStage("발단", ["옛날 옛적에"])]))
+    monkeypatch.setattr(session_memory, "_REGENERABLE_CACHES", {"story_documents": documents.clear})
+
+    proxy = StorySessionProxy({}, blob_store=store)
+    asset = ImageAsset(b"z" * 3000)
+    proxy["cover_image"] = asset
+    asset.data_uri  # populate the cached encoding
+    tracker.record(measure_session(proxy))
+
+    actions = tracker.enforce_budget()
+
+    assert actions[:2] == ["encodings", "regenerable"]
+    assert asset.encoded_size == 0
+    assert documents.get("story") == (False, None)
+    snapshot = tracker.snapshot()
+    assert snapshot.evictions["encodings"] == 1
+    assert snapshot.sessions == 1
+
+
+def test_summarize_replicas_totals_families():
+    rows = [
+        {"sessions": 2, "accounted_bytes": 10, "rss_bytes": 100, "families": {"images": 7}},
+        {"sessions": 1, "accounted_bytes": 5, "rss_bytes": None, "families": {"images": 1, "story": 3}},
+    ]
+
+    totals = summarize_replicas(rows)
+
+    assert totals["replicas"] == 2
+    assert totals["sessions"] == 3
+    assert totals["accounted_bytes"] == 15
+    assert totals["rss_bytes"] == 100
+    assert totals["family_images"] == 8
+    assert totals["family_story"] == 3
+
+
+def test_fetch_published_snapshots_skips_stale_replicas(monkeypatch):
+    now = datetime.now(timezone.utc)
+    rows = [
+        {"replica_id": "old", "captured_at": now - timedelta(hours=2)},
+        {"replica_id": "a", "captured_at": now - timedelta(seconds=30)},
+        {"replica_id": "b", "captured_at": now - timedelta(seconds=5)},
+    ]
+
+    class FakeQuery:
+        def __init__(self, items):
+            self.items = items
+
+        def where(self, field=None, operator=None, value=None, *, filter=None):
+            if filter is not None:
+                field, operator, value = filter.field_path, filter.op_string, filter.value
+            assert (field, operator) == ("captured_at", ">=")
+            return FakeQuery([row for row in self.items if row[field] >= value])
+
+        def order_by(self, field, direction=None):
+            return FakeQuery(sorted(self.items, key=lambda row: row[field], reverse=True))
+
+        def limit(self, count):
+            return FakeQuery(self.items[:count])
+
+        def stream(self):
+            return [SimpleNamespace(to_dict=lambda row=row: row) for row in self.items]
+
+    client = SimpleNamespace(collection=lambda name: FakeQuery(rows))
+    monkeypatch.setattr(session_memory, "_get_firestore_client", lambda: client)
+
+    fetched = session_memory.fetch_published_snapshots(max_age_seconds=600)
+
+    assert [row["replica_id"] for row in fetched] == ["b", "a"]
+
+
+def test_track_session_is_throttled_and_drops_ended_sessions(tmp_path, monkeypatch):
+    now = [0.0]
+    active = {"runtime-a": True, "runtime-b": True}
+    store = BlobStore(tmp_path, memory_limit_bytes=1 << 20, session_ttl_seconds=60)
+    tracker = SessionMemoryTracker(
+        budget_bytes=1 << 30,
+        session_ttl_seconds=3 * 60 * 60,
+        measure_interval_seconds=30,
+        blob_store=store,
+        session_probe=active.get,
+        clock=lambda: now[0],
+    )
+    monkeypatch.setattr(session_memory, "get_memory_tracker", lambda: tracker)
+    snapshots: list[object] = []
+    real_snapshot = tracker.snapshot
+    monkeypatch.setattr(tracker, "snapshot", lambda: snapshots.append(now[0]) or real_snapshot())
+    monkeypatch.setattr(session_memory, "publish_snapshot", lambda snapshot, **_: False)
+    first = StorySessionProxy({}, blob_store=store)
+    second = StorySessionProxy({}, blob_store=store)
+
+    monkeypatch.setattr(session_memory, "streamlit_session_id", lambda: "runtime-a")
+    assert session_memory.track_session(first) is not None
+    now[0] = 10.0
+    assert session_memory.track_session(first) is None
+    monkeypatch.setattr(session_memory, "streamlit_session_id", lambda: "runtime-b")
+    assert session_memory.track_session(second) is not None
+
+    assert snapshots == [0.0, 10.0]
+    assert real_snapshot().sessions == 2
+
+    active["runtime-a"] = False
+    assert real_snapshot().sessions == 1
+    now[0] = 45.0
+    monkeypatch.setattr(session_memory, "streamlit_session_id", lambda: "runtime-b")
+    assert session_memory.track_session(second) is not None
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from PIL import Image
+
+from services import static_assets
+from services.static_assets import StaticAsset, build_asset, check_budgets, load_manifest, write_manifest
+
+
+def _png(path, size=(900, 600)):
+    Image.new("RGB", size, (240, 200, 160)).save(path, format="PNG")
+    return path
+
+
+def test_build_writes_fingerprinted_webp_and_manifest(tmp_path, monkeypatch):
+    out = tmp_path / "static"
+    source = _png(tmp_path / "hero.png")
+
+    asset = build_asset(source, "hero", output_dir=out)
+    manifest_path = write_manifest([asset], output_dir=out)
+
+    assert asset.file.startswith("hero/hero.") and asset.file.endswith(".webp")
+    assert (out / asset.file).read_bytes()[8:12] == b"WEBP"
+    assert max(asset.width, asset.height) <= static_assets.BUILD_PROFILES["hero"][0]
+    assert build_asset(source, "hero", output_dir=out).file == asset.file
+
+    monkeypatch.setattr(static_assets, "STATIC_ASSET_BASE_URL", "https://cdn.example.com/static")
+    monkeypatch.setattr(static_assets, "load_manifest", lambda: load_manifest.__wrapped__(manifest_path))
+    assert static_assets.static_asset_url(source) == f"https://cdn.example.com/static/{asset.file}"
+    assert static_assets.static_asset_url_or_path(tmp_path / "other.png") == str(tmp_path / "other.png")
+
+
+def test_write_manifest_prunes_stale_builds(tmp_path):
+    out = tmp_path / "static"
+    stale = out / "illustration" / "card.0000.webp"
+    stale.parent.mkdir(parents=True)
+    stale.write_bytes(b"old")
+
+    asset = build_asset(_png(tmp_path / "card.png", (300, 400)), "illustration", output_dir=out)
+    write_manifest([asset], output_dir=out)
+
+    assert not stale.exists()
+    assert (out / asset.file).exists()
+
+
+def test_check_budgets_reports_oversized_assets():
+    small = StaticAsset("a.png", "hero/a.webp", "hero", 10, 1, 1, "x")
+    large = StaticAsset("b.png", "illustration/b.webp", "illustration", 5_000, 1, 1, "y")
+
+    violations = check_budgets([small, large], {"hero": 100, "illustration": 1_000})
+
+    assert len(violations) == 1 and "b.png" in violations[0]
+
+
+def test_committed_assets_stay_within_budget():
+    assets = load_manifest().values()
+
+    assert check_budgets(assets) == []
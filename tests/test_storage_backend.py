@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import io
+
+import pytest
+from google.api_core.exceptions import NotFound
+
+import gcs_storage
+from services import story_service
+from services.image_asset import ImageAsset
+from services.story_manifest import ManifestImage
+from services.storage_backend import (
+    GCSStorageBackend,
+    LocalStorageBackend,
+    MemoryStorageBackend,
+    TieredStorageBackend,
+)
+
+
+class FakeBlob:
+    def __init__(self, bucket: "FakeBucket", name: str) -> None:
+        self.bucket = bucket
+        self.name = name
+        self.cache_control = None
+        self.content_encoding = None
+        self.content_type = None
+        self.data = b""
+        self.size = None
+        self.updated = None
+        self.public_url = f"https://storage.googleapis.com/bucket/{name}"
+
+    def upload_from_filename(self, filename, content_type=None):
+        with open(filename, "rb") as fh:
+            self.upload_from_string(fh.read(), content_type=content_type)
+
+    def upload_from_string(self, data, content_type=None):
+        self.data, self.size, self.content_type = bytes(data), len(data), content_type
+        self.bucket.objects[self.name] = self
+
+    def _served(self) -> bytes:
+        # The client library decodes ``Content-Encoding: gzip`` on download.
+        return gzip.decompress(self.data) if self.content_encoding == "gzip" else self.data
+
+    def download_as_bytes(self):
+        stored = self.bucket.objects.get(self.name)
+        if stored is None:
+            raise NotFound(self.name)
+        return stored._served()
+
+    def open(self, mode, chunk_size=None):
+        return io.BytesIO(self._served())
+
+
+class FakeBucket:
+    def __init__(self) -> None:
+        self.objects: dict[str, FakeBlob] = {}
+
+    def blob(self, name):
+        return FakeBlob(self, name)
+
+    def get_blob(self, name):
+        return self.objects.get(name)
+
+
+class FakeClient:
+    def __init__(self) -> None:
+        self.fake_bucket = FakeBucket()
+
+    def bucket(self, name):
+        return self.fake_bucket
+
+    def list_blobs(self, bucket_name, prefix=None):
+        return [blob for name, blob in sorted(self.fake_bucket.objects.items()) if name.startswith(prefix or "")]
+
+
+@pytest.fixture
+def gcs_client(monkeypatch):
+    client = FakeClient()
+    monkeypatch.setattr(gcs_storage, "GCS_BUCKET_NAME", "bucket")
+    monkeypatch.setattr(gcs_storage, "GCS_PREFIX", "exports/")
+    monkeypatch.setattr(gcs_storage, "_get_client", lambda: client)
+    return client
+
+
+@pytest.fixture(params=["local", "memory"])
+def backend(request, tmp_path):
+    return LocalStorageBackend(tmp_path / "store") if request.param == "local" else MemoryStorageBackend()
+
+
+def test_backends_share_the_object_contract(backend, tmp_path):
+    source = tmp_path / "story.html"
+    source.write_bytes(b"<html>" + b"x" * 100 + b"</html>")
+
+    assert backend.get("story.html") is None
+    assert backend.stat("story.html") is None
+    assert backend.stream("story.html") is None
+    assert backend.list() == []
+
+    stat = backend.put("story.html", source, content_type="text/html")
+    backend.put("assets/abc", b"image")
+
+    assert stat.size == source.stat().st_size
+    assert backend.get("story.html") == source.read_bytes()
+    assert backend.stat("assets/abc").size == 5
+    assert b"".join(backend.stream("story.html", chunk_size=16)) == source.read_bytes()
+    assert [item.key for item in backend.list()] == ["assets/abc", "story.html"]
+    assert [item.key for item in backend.list("assets/")] == ["assets/abc"]
+    with pytest.raises(ValueError):
+        backend.put("../escape", b"nope")
+
+
+def test_tiered_reads_through_backfills_and_rejects_corrupt_copies(tmp_path):
+    local = LocalStorageBackend(tmp_path)
+    remote = MemoryStorageBackend()
+    good = b"illustration"
+    key = f"assets/{hashlib.sha256(good).hexdigest()}"
+    remote.put(key, good)
+    remote.put("assets/" + "0" * 64, b"corrupt")
+    tiered = TieredStorageBackend(
+        [local, remote],
+        validate=lambda k, data: hashlib.sha256(data).hexdigest() == k.rsplit("/", 1)[-1],
+    )
+
+    assert tiered.get(key) == good
+    assert local.get(key) == good
+    assert tiered.get(key) == good
+    assert tiered.get("assets/" + "0" * 64) is None
+    assert local.get("assets/" + "0" * 64) is None
+
+    stats = tiered.stats()
+    assert (stats.hits, stats.backfills, stats.rejected, stats.misses) == ([1, 1], 1, 1, 1)
+
+
+def test_load_story_asset_reads_through_remote_storage(monkeypatch, tmp_path):
+    monkeypatch.setattr(story_service, "HTML_EXPORT_PATH", tmp_path / "exports")
+    remote = MemoryStorageBackend()
+    monkeypatch.setattr(story_service, "_remote_story_storage", remote)
+    asset = ImageAsset(b"remote-image", "image/png")
+    image = ManifestImage.from_asset(asset)
+
+    assert story_service.load_story_asset(image) is None
+    remote.put(f"assets/{image.sha256}", asset.data)
+
+    assert story_service.load_story_asset(image) == asset
+    assert (tmp_path / "exports" / "assets" / image.sha256).read_bytes() == asset.data
+
+
+def test_gcs_backend_compresses_configured_types_and_applies_cache_policy(gcs_client, tmp_path):
+    backend = GCSStorageBackend(
+        cache_control=lambda key: None if key.endswith(".json") else "public, immutable",
+        gzip_content_types={"text/html; charset=utf-8"},
+    )
+    source = tmp_path / "story.html"
+    source.write_bytes(b"<html>" + b"story " * 500 + b"</html>")
+
+    assert backend.get("story.html") is None
+    assert backend.stat("story.html") is None
+    stat = backend.put("story.html", source, content_type="text/html; charset=utf-8")
+    backend.put("story.json", b'{"version": 1}', content_type="application/json; charset=utf-8")
+
+    html = gcs_client.fake_bucket.objects["exports/story.html"]
+    assert html.content_encoding == "gzip"
+    assert html.cache_control == "public, immutable"
+    assert gzip.decompress(html.data) == source.read_bytes()
+    assert stat.key == "story.html"
+    assert stat.size < source.stat().st_size
+    assert stat.url == html.public_url
+    manifest = gcs_client.fake_bucket.objects["exports/story.json"]
+    assert (manifest.content_encoding, manifest.cache_control, manifest.data) == (None, None, b'{"version": 1}')
+
+    assert [path.name for path in tmp_path.iterdir()] == ["story.html"]
+    backend.put("inline.html", "<html>달님</html>".encode("utf-8"), content_type="text/html; charset=utf-8")
+    assert gzip.decompress(gcs_client.fake_bucket.objects["exports/inline.html"].data) == "<html>달님</html>".encode("utf-8")
+
+    assert backend.get("story.html") == source.read_bytes()
+    assert b"".join(backend.stream("story.html", chunk_size=64)) == source.read_bytes()
+    assert [item.key for item in backend.list("story.")] == ["story.html", "story.json"]
+    with pytest.raises(ValueError):
+        backend.put("../escape", b"nope")
+
+
+def test_gcs_backend_prefix_overrides_the_export_prefix(gcs_client):
+    backend = GCSStorageBackend(prefix="tts/", cache_control="public, max-age=86400")
+
+    stat = backend.put("story-1.mp3", b"ID3", content_type="audio/mpeg")
+
+    blob = gcs_client.fake_bucket.objects["tts/story-1.mp3"]
+    assert (blob.cache_control, blob.content_type, blob.content_encoding) == ("public, max-age=86400", "audio/mpeg", None)
+    assert stat.key == "story-1.mp3"
+    assert backend.stat("story-1.mp3").url == blob.public_url
+
+
+def test_story_storage_is_shared_until_the_remote_or_path_changes(monkeypatch, tmp_path):
+    monkeypatch.setattr(story_service, "HTML_EXPORT_PATH", tmp_path / "a")
+    remote = MemoryStorageBackend()
+    story_service.use_remote_story_storage(remote)
+    try:
+        storage = story_service.story_storage()
+        assert story_service.story_storage() is storage
+        assert storage.tiers[-1] is remote
+
+        monkeypatch.setattr(story_service, "HTML_EXPORT_PATH", tmp_path / "b")
+        assert story_service.story_storage() is not storage
+
+        storage = story_service.story_storage()
+        story_service.use_remote_story_storage(MemoryStorageBackend())
+        assert story_service.story_storage() is not storage
+    finally:
+        story_service.use_remote_story_storage(None)
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+import gcs_storage
+import session_proxy
+import story_drafts
+from services import blob_store
+from services.blob_store import BlobHandle, BlobStore
+from services.image_asset import ImageAsset, stage_image
+from session_proxy import StorySessionProxy
+
+
+class FakeDocRef:
+    def __init__(self, collection: "FakeCollection", doc_id: str):
+        self._collection = collection
+        self.id = doc_id
+
+    def set(self, data: dict[str, Any]) -> None:
+        self._collection.store[self.id] = dict(data)
+
+    def get(self):
+        data = self._collection.store.get(self.id)
+        return SimpleNamespace(exists=data is not None, to_dict=lambda: dict(data or {}))
+
+    def delete(self) -> None:
+        self._collection.store.pop(self.id, None)
+
+
+_OPERATORS = {
+    "==": lambda left, right: left == right,
+    ">": lambda left, right: left is not None and left > right,
+    "<": lambda left, right: left is not None and left < right,
+    "array_contains": lambda left, right: right in (left or []),
+}
+
+
+class FakeQuery:
+    def __init__(self, collection: "FakeCollection", filters: list[tuple[str, str, Any]]):
+        self._collection = collection
+        self._filters = filters
+        self._order: str | None = None
+        self._limit: int | None = None
+
+    def where(self, field: str, op: str, value: Any) -> "FakeQuery":
+        return FakeQuery(self._collection, [*self._filters, (field, op, value)])
+
+    def order_by(self, field: str, direction: Any = None) -> "FakeQuery":
+        self._order = field
+        return self
+
+    def limit(self, count: int) -> "FakeQuery":
+        self._limit = count
+        return self
+
+    def stream(self):
+        rows = [
+            (doc_id, data)
+            for doc_id, data in self._collection.store.items()
+            if all(_OPERATORS[op](data.get(field), value) for field, op, value in self._filters)
+        ]
+        if self._order is not None:
+            rows.sort(key=lambda row: row[1][self._order], reverse=True)
+        matches = [SimpleNamespace(id=doc_id, to_dict=lambda data=data: dict(data)) for doc_id, data in rows]
+        return matches[: self._limit] if self._limit is not None else matches
+
+
+class FakeCollection:
+    def __init__(self) -> None:
+        self.store: dict[str, dict[str, Any]] = {}
+
+    def document(self, doc_id: str) -> FakeDocRef:
+        return FakeDocRef(self, doc_id)
+
+    def where(self, field: str, op: str, value: Any) -> FakeQuery:
+        return FakeQuery(self, [(field, op, value)])
+
+
+@pytest.fixture
+def drafts(tmp_path, monkeypatch):
+    collection = FakeCollection()
+    monkeypatch.setattr(story_drafts, "_get_draft_collection", lambda: collection)
+    monkeypatch.setattr(story_drafts, "FieldFilter", None)
+    monkeypatch.setattr(story_drafts, "STORY_DRAFTS_DIR", tmp_path / "drafts")
+    monkeypatch.setattr(gcs_storage, "is_gcs_available", lambda: False)
+    return collection
+
+
+def _use_store(monkeypatch, store: BlobStore) -> None:
+    monkeypatch.setattr(blob_store, "get_blob_store", lambda: store)
+    monkeypatch.setattr(session_proxy, "get_blob_store", lambda: store)
+
+
+def test_checkpoint_and_restore_rehydrates_images_lazily(drafts, tmp_path, monkeypatch):
+    original_store = BlobStore(tmp_path / "a", memory_limit_bytes=1 << 20, session_ttl_seconds=60)
+    _use_store(monkeypatch, original_store)
+    session = StorySessionProxy({})
+    session["story_id"] = "story-1"
+    session["story_title"] = "달빛 숲"
+    session["synopsis_result"] = "시놉시스"
+    session["cover_image"] = ImageAsset(b"cover-bytes", "image/png")
+    session["stages_data"] = [
+        {"stage": "발단", "story": {"paragraphs": ["하나"]}, "image_asset": ImageAsset(b"stage-1", "image/webp")},
+        None,
+    ]
+    session.step = 5
+
+    saved = story_drafts.checkpoint_draft(session, user_id="user-1")
+
+    assert saved.completed_stages == 1
+    stored = drafts.store["story-1"]
+    assert stored["data"]["cover_image"]["sha256"] == ImageAsset(b"cover-bytes").sha256
+    assert "image_asset" not in stored["data"]["stages_data"][0]
+
+    # Simulate a replica restart: a fresh blob store that has never seen the images.
+    fresh_store = BlobStore(tmp_path / "b", memory_limit_bytes=1 << 20, session_ttl_seconds=60)
+    _use_store(monkeypatch, fresh_store)
+    draft = story_drafts.find_resumable_draft("user-1")
+    backing: dict = {}
+    resumed = StorySessionProxy(backing)
+    story_drafts.restore_draft(resumed, draft)
+
+    assert resumed.step == 5
+    assert resumed["story_title"] == "달빛 숲"
+    assert isinstance(backing["cover_image"], BlobHandle)
+    assert fresh_store.stats().memory_entries == 0
+    assert resumed["cover_image"].data == b"cover-bytes"
+    assert stage_image(resumed.get("stages_data")[0]).data == b"stage-1"
+    assert fresh_store.stats().memory_entries == 2
+
+
+def test_checkpoint_requires_user_and_story(drafts):
+    session = StorySessionProxy({"story_id": None})
+
+    assert story_drafts.checkpoint_draft(session, user_id="user-1") is None
+    session["story_id"] = "story-2"
+    assert story_drafts.checkpoint_draft(session, user_id=None) is None
+    assert drafts.store == {}
+
+
+def test_find_resumable_draft_returns_newest_started_draft(drafts):
+    drafts.store["old"] = {"user_id": "user-1", "step": 4, "updated_at": datetime(2026, 1, 1, tzinfo=timezone.utc)}
+    drafts.store["new"] = {"user_id": "user-1", "step": 2, "updated_at": datetime(2026, 3, 1, tzinfo=timezone.utc)}
+    drafts.store["blank"] = {"user_id": "user-1", "step": 0, "updated_at": datetime(2026, 4, 1, tzinfo=timezone.utc)}
+    drafts.store["other"] = {"user_id": "user-2", "step": 5, "updated_at": datetime(2026, 5, 1, tzinfo=timezone.utc)}
+
+    assert story_drafts.find_resumable_draft("user-1").story_id == "new"
+
+
+def test_discard_draft_removes_document(drafts):
+    drafts.store["story-3"] = {"user_id": "user-1", "step": 3}
+
+    story_drafts.discard_draft("story-3")
+
+    assert story_drafts.find_resumable_draft("user-1") is None
+
+
+def test_discard_draft_deletes_assets_no_other_draft_uses(drafts, tmp_path, monkeypatch):
+    _use_store(monkeypatch, BlobStore(tmp_path / "blobs", memory_limit_bytes=1 << 20, session_ttl_seconds=60))
+    shared = ImageAsset(b"shared-cover", "image/png")
+    own = ImageAsset(b"own-stage", "image/png")
+    for story_id, stage in (("story-4", own), ("story-5", None)):
+        session = StorySessionProxy({})
+        session["story_id"] = story_id
+        session["cover_image"] = shared
+        session["stages_data"] = [{"stage": "발단", "image_asset": stage}] if stage else []
+        session.step = 3
+        story_drafts.checkpoint_draft(session, user_id="user-1")
+
+    story_drafts.discard_draft("story-4")
+
+    assert "story-4" not in drafts.store
+    assert not story_drafts._asset_path(own.sha256).exists()
+    assert story_drafts._asset_path(shared.sha256).exists()
+
+
+def test_purge_stale_drafts_discards_old_drafts(drafts):
+    drafts.store["stale"] = {"user_id": "user-1", "step": 2, "updated_at": datetime(2020, 1, 1, tzinfo=timezone.utc)}
+    drafts.store["fresh"] = {"user_id": "user-1", "step": 2, "updated_at": datetime.now(timezone.utc)}
+
+    assert story_drafts.purge_stale_drafts(max_age_days=30, dry_run=True) == ["stale"]
+    assert "stale" in drafts.store
+    assert story_drafts.purge_stale_drafts(max_age_days=30) == ["stale"]
+    assert list(drafts.store) == ["fresh"]
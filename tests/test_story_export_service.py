@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import base64
+import io
+from dataclasses import replace
 from pathlib import Path
 import sys
 
@@ -9,22 +12,48 @@ ROOT_DIR = Path(__file__).resolve().parents[1]
 if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
+from gcs_storage import gcs_object_name
+from services.image_asset import ImageAsset
+from services.storage_backend import MemoryStorageBackend
+from services.story_manifest import ManifestImage, parse_manifest
 from services.story_service import (
     HTML_EXPORT_PATH,
     StagePayload,
     StoryBundle,
     export_story_to_html,
+    load_story_asset,
+    load_story_manifest,
 )
 
 
+class RecordingBucket(MemoryStorageBackend):
+    """Bucket stand-in that remembers every put and hands out public URLs."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.puts: list[tuple[str, object]] = []
+
+    def put(self, key, data, *, content_type=None):
+        self.puts.append((key, data))
+        return replace(super().put(key, data, content_type=content_type), url=f"https://example.com/{key}")
+
+
 @pytest.fixture(autouse=True)
 def _patch_export_path(monkeypatch, tmp_path: Path):
     export_dir = tmp_path / "exports"
     export_dir.mkdir(parents=True, exist_ok=True)
     monkeypatch.setattr("services.story_service.HTML_EXPORT_PATH", export_dir, raising=False)
+    monkeypatch.setattr("services.story_service.is_gcs_available", lambda: False)
     return export_dir
 
 
+@pytest.fixture
+def bucket(monkeypatch) -> RecordingBucket:
+    remote = RecordingBucket()
+    monkeypatch.setattr("services.story_service._remote_story_storage", remote)
+    return remote
+
+
 @pytest.fixture
 def sample_bundle() -> StoryBundle:
     stage = StagePayload(
@@ -48,30 +77,42 @@ def sample_bundle() -> StoryBundle:
     )
 
 
-def test_export_story_remote_mode(monkeypatch, sample_bundle):
-    upload_calls: list[str] = []
-
-    def fake_upload(html: str, filename: str):
-        upload_calls.append(filename)
-        return (f"remote/{filename}", f"https://example.com/{filename}")
-
-    monkeypatch.setattr("services.story_service.upload_html_to_gcs", fake_upload)
+def test_export_story_remote_mode(monkeypatch, sample_bundle, bucket):
+    indexed: list[tuple[str, str, int | None]] = []
+    monkeypatch.setattr(
+        "services.story_service.record_gcs_export",
+        lambda name, url, *, size=None: indexed.append((name, url, size)) or True,
+    )
 
     result = export_story_to_html(
         bundle=sample_bundle,
         author=None,
     )
 
-    assert upload_calls, "remote mode should upload to GCS"
-    expected_suffix = upload_calls[0]
-    assert result.gcs_object == f"remote/{expected_suffix}"
+    assert bucket.puts, "remote mode should upload to the bucket"
+    expected_suffix = bucket.puts[0][0]
+    assert expected_suffix == Path(result.local_path).name
+    assert result.gcs_object == gcs_object_name(expected_suffix)
     assert result.gcs_url == f"https://example.com/{expected_suffix}"
+    assert indexed == [(result.gcs_object, result.gcs_url, Path(result.local_path).stat().st_size)]
     assert Path(result.local_path).exists()
 
 
-def test_export_story_includes_audio(monkeypatch, sample_bundle):
-    monkeypatch.setattr("services.story_service.upload_html_to_gcs", lambda *_, **__: None)
+def test_export_story_streams_images_and_uploads_file(sample_bundle, bucket):
+    image = b"\x89PNG" + bytes(range(200)) * 50
+    sample_bundle.stages[0].image_asset = ImageAsset(image, "image/png")
+    sample_bundle.cover = {"image_asset": ImageAsset(b"cover-bytes", "image/png")}
+
+    result = export_story_to_html(bundle=sample_bundle, author=None)
+
+    html = Path(result.local_path).read_text(encoding="utf-8")
+    assert base64.b64encode(image).decode("ascii") in html
+    assert base64.b64encode(b"cover-bytes").decode("ascii") in html
+    assert bucket.puts[0] == (Path(result.local_path).name, Path(result.local_path))
+    assert not list(Path(result.local_path).parent.glob("*.tmp"))
+
 
+def test_export_story_includes_audio(sample_bundle):
     sample_bundle.audio_url = "https://example.com/story.mp3"
     result = export_story_to_html(
         bundle=sample_bundle,
@@ -82,3 +123,59 @@ def test_export_story_includes_audio(monkeypatch, sample_bundle):
     assert "<audio" in html
     assert "https://example.com/story.mp3" in html
     assert "autoplay" in html
+
+
+def test_export_writes_manifest_and_content_addressed_assets(sample_bundle, _patch_export_path):
+    image = ImageAsset(b"stage-image", "image/png")
+    sample_bundle.stages[0].image_asset = image
+    sample_bundle.stages[0].image_style_name = "수채화"
+    sample_bundle.cover = {"image_asset": image, "style_name": "수채화"}
+
+    result = export_story_to_html(bundle=sample_bundle, author="작가")
+
+    manifest = parse_manifest(Path(result.manifest_path).read_bytes())
+    assert manifest is not None
+    assert manifest.title == "테스트"
+    assert manifest.author == "작가"
+    assert manifest.age == "6-8"
+    assert manifest.stages[0].paragraphs == ["첫 문장"]
+    assert manifest.stages[0].image == ManifestImage(image.sha256, "image/png", image.size, "수채화")
+    assert manifest.html_bytes == Path(result.local_path).stat().st_size
+    assert [path.name for path in (_patch_export_path / "assets").iterdir()] == [image.sha256]
+    assert load_story_asset(manifest.cover) == image
+    assert result.manifest_object is None
+
+
+def test_manifest_is_published_after_its_assets(monkeypatch, sample_bundle, bucket, tmp_path):
+    image = ImageAsset(b"stage-image", "image/png")
+    sample_bundle.stages[0].image_asset = image
+    sample_bundle.cover = {"image_asset": image}
+
+    result = export_story_to_html(bundle=sample_bundle, author=None)
+
+    manifest_name = Path(result.manifest_path).name
+    assert [key for key, _ in bucket.puts] == [Path(result.local_path).name, f"assets/{image.sha256}", manifest_name]
+    assert result.manifest_object == gcs_object_name(manifest_name)
+
+    replica = tmp_path / "replica"
+    monkeypatch.setattr("services.story_service.HTML_EXPORT_PATH", replica)
+    manifest = load_story_manifest(local_path=None, gcs_object=result.manifest_object)
+    assert manifest == parse_manifest(bucket.get(manifest_name))
+    assert (replica / manifest_name).read_bytes() == bucket.get(manifest_name)
+
+
+def test_export_records_a_small_webp_cover_thumbnail(sample_bundle):
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (1024, 768), (200, 120, 40)).save(buffer, format="PNG")
+    sample_bundle.cover = {"image_asset": ImageAsset(buffer.getvalue(), "image/png")}
+
+    result = export_story_to_html(bundle=sample_bundle, author=None)
+
+    manifest = parse_manifest(Path(result.manifest_path).read_bytes())
+    assert manifest.thumbnail.mime_type == "image/webp"
+    assert manifest.thumbnail.size < 8 * 1024
+    with Image.open(result.thumbnail_path) as thumbnail:
+        assert max(thumbnail.size) == 256
+    assert result.thumbnail_url is None
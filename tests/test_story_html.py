@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import base64
+import io
+
+import pytest
+
+from services.image_asset import ImageAsset
+from services.story_html import HtmlStage, StoryHtmlWriter
+
+
+def test_chunked_encoding_matches_single_pass():
+    payload = bytes(range(256)) * 41 + b"tail"  # length not a multiple of the chunk size
+    asset = ImageAsset(payload, "image/webp")
+    buffer = io.BytesIO()
+
+    written = StoryHtmlWriter(buffer, chunk_bytes=3 * 7).write_document(
+        title="<별> 이야기",
+        stages=[HtmlStage(paragraphs=["첫 문장"], image=asset), HtmlStage(paragraphs=[])],
+        cover=asset,
+        author="작가",
+    )
+
+    document = buffer.getvalue().decode("utf-8")
+    assert written == len(buffer.getvalue())
+    assert document.count(f"data:image/webp;base64,{base64.b64encode(payload).decode('ascii')}\"") == 2
+    assert "&lt;별&gt; 이야기" in document
+    assert "(본문이 없습니다)" in document
+    assert asset.encoded_size == 0  # streaming never populates the cached encodings
+
+
+def test_chunk_size_must_keep_base64_aligned():
+    with pytest.raises(ValueError):
+        StoryHtmlWriter(io.BytesIO(), chunk_bytes=1000)
@@ -3,6 +3,7 @@ from __future__ import annotations
 import importlib
 import sys
 from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
 from typing import Any
 
 
@@ -35,11 +36,106 @@ class FakeDocRef:
     def set(self, data: dict[str, Any]) -> None:
         self._collection.store[self._id] = dict(data)
 
+    def get(self, transaction=None) -> SimpleNamespace:
+        data = self._collection.store.get(self._id)
+        return SimpleNamespace(exists=bool(data), to_dict=lambda: dict(data or {}))
+
+
+class FakeTransaction:
+    def __init__(self) -> None:
+        self.writes: list[str] = []
+
+    def set(self, ref: FakeDocRef, data: dict[str, Any]) -> None:
+        self.writes.append(ref.id)
+        ref.set(data)
+
+
+_OPERATORS = {
+    "==": lambda left, right: left == right,
+    "<": lambda left, right: left < right,
+    ">=": lambda left, right: left >= right,
+}
+
+
+class FakeQuery:
+    """Subset of Firestore query semantics: range filters only match values of the bound's type.
+
+    Every ``order_by`` must use the same direction; ``__name__`` is the document id.
+    """
+
+    def __init__(self, collection: "FakeCollection", filters=(), order=(), limit=None, start_after=None):
+        self._collection = collection
+        self._filters = tuple(filters)
+        self._order = tuple(order)
+        self._limit = limit
+        self._start_after = start_after
+
+    def _copy(self, **changes):
+        state = {
+            "filters": self._filters,
+            "order": self._order,
+            "limit": self._limit,
+            "start_after": self._start_after,
+        }
+        state.update(changes)
+        return FakeQuery(self._collection, **state)
+
+    def where(self, field=None, op=None, value=None, *, filter=None):
+        if filter is not None:
+            field, op, value = filter.field_path, filter.op_string, filter.value
+        return self._copy(filters=self._filters + ((field, op, value),))
+
+    def order_by(self, field, direction=None):
+        descending = str(direction).upper().endswith("DESCENDING")
+        return self._copy(order=self._order + ((field, descending),))
+
+    def start_after(self, values):
+        return self._copy(start_after=dict(values))
+
+    def limit(self, count):
+        return self._copy(limit=count)
+
+    def stream(self):
+        self._collection.queries.append(self._filters)
+        if self._collection.query_error is not None:
+            raise self._collection.query_error
+        docs = []
+        for doc_id, data in self._collection.store.items():
+            matched = True
+            for field, op, value in self._filters:
+                current = data.get(field)
+                if current is None or type(current) is not type(value) or not _OPERATORS[op](current, value):
+                    matched = False
+                    break
+            if matched:
+                docs.append(FakeDoc(doc_id, data))
+        if self._order:
+            fields = [field for field, _ in self._order]
+            descending = self._order[0][1]
+            docs = [doc for doc in docs if all(f == "__name__" or f in doc.to_dict() for f in fields)]
+            docs.sort(key=lambda doc: _order_key(doc, fields), reverse=descending)
+            if self._start_after is not None:
+                bound_fields = [field for field in fields if field in self._start_after]
+                bound = tuple(self._start_after[field] for field in bound_fields)
+                docs = [
+                    doc
+                    for doc in docs
+                    if (_order_key(doc, bound_fields) < bound if descending else _order_key(doc, bound_fields) > bound)
+                ]
+        return docs[: self._limit] if self._limit is not None else docs
+
+
+def _order_key(doc: FakeDoc, fields: list[str]) -> tuple:
+    return tuple(doc.id if field == "__name__" else doc.to_dict()[field] for field in fields)
+
 
 class FakeCollection:
     def __init__(self) -> None:
         self.store: dict[str, dict[str, Any]] = {}
         self._counter = 0
+        self.full_scans = 0
+        self.queries: list[tuple] = []
+        self.query_error: Exception | None = None
 
     def new_id(self) -> str:
         self._counter += 1
@@ -48,17 +144,28 @@ class FakeCollection:
     def document(self, doc_id: str | None = None) -> FakeDocRef:
         return FakeDocRef(self, doc_id)
 
+    def where(self, *args, **kwargs):
+        return FakeQuery(self).where(*args, **kwargs)
+
+    def order_by(self, *args, **kwargs):
+        return FakeQuery(self).order_by(*args, **kwargs)
+
     def stream(self):
+        self.full_scans += 1
         return [FakeDoc(doc_id, data) for doc_id, data in self.store.items()]
 
 
-def _reload_story_library(monkeypatch, collection: FakeCollection):
+def _reload_story_library(monkeypatch, collection: FakeCollection, index_collection: FakeCollection | None = None):
     module_name = "story_library"
     if module_name in sys.modules:
         sys.modules.pop(module_name)
     module = importlib.import_module(module_name)
+    index_collection = index_collection if index_collection is not None else FakeCollection()
     monkeypatch.setattr(module, "_get_story_collection", lambda: collection)
+    monkeypatch.setattr(module, "_get_user_index_collection", lambda: index_collection)
+    monkeypatch.setattr(module, "_run_transaction", lambda callback: callback(FakeTransaction()))
     monkeypatch.setattr(module, "_ensure_remote_ready", lambda: None)
+    monkeypatch.setattr(module, "index_story_export", lambda document: None)
     module.reset_story_library_cache()
     return module
 
@@ -150,3 +257,175 @@ def test_record_story_export_assigns_story_id(monkeypatch):
     assert stored["local_path"] == "/tmp/story.html"
     assert stored["gcs_object"] == "exports/story.html"
     assert stored["gcs_url"] == "https://example.com/story.html"
+
+
+def test_record_story_export_keeps_manifest_location(monkeypatch):
+    collection = FakeCollection()
+    lib = _reload_story_library(monkeypatch, collection)
+
+    lib.record_story_export(
+        user_id="user",
+        title="매니페스트 이야기",
+        local_path="/tmp/story.html",
+        gcs_object="exports/story.html",
+        gcs_url=None,
+        manifest_path="/tmp/story.json",
+        manifest_object="exports/story.json",
+    )
+
+    [record] = lib.list_story_records(user_id="user")
+    assert record.manifest_path == "/tmp/story.json"
+    assert record.manifest_object == "exports/story.json"
+
+
+def _seed(lib, collection: FakeCollection, user_id: str, count: int, base: datetime, *, legacy: bool = False) -> None:
+    for offset in range(count):
+        export = lib.record_story_export(
+            user_id=user_id,
+            title=f"{'legacy' if legacy else 'story'}-{offset}",
+            local_path=None,
+            gcs_object=None,
+            gcs_url=None,
+        )
+        created = base + timedelta(minutes=offset)
+        collection.store[export.id]["created_at_utc"] = created.isoformat() if legacy else created
+
+
+def test_list_story_page_queries_server_side_with_cursor(monkeypatch):
+    collection = FakeCollection()
+    lib = _reload_story_library(monkeypatch, collection)
+    base = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    _seed(lib, collection, "user-1", 5, base)
+    _seed(lib, collection, "user-2", 3, base)
+
+    first = lib.list_story_page(user_id="user-1", limit=2)
+    assert [record.title for record in first.records] == ["story-4", "story-3"]
+    assert first.has_more is True
+
+    second = lib.list_story_page(user_id="user-1", limit=2, cursor=first.next_cursor)
+    third = lib.list_story_page(user_id="user-1", limit=2, cursor=second.next_cursor)
+    assert [record.title for record in second.records] == ["story-2", "story-1"]
+    assert [record.title for record in third.records] == ["story-0"]
+    assert third.has_more is False and third.next_cursor is None
+
+    assert collection.full_scans == 0
+    assert ("user_id", "==", "user-1") in collection.queries[0]
+
+
+def test_list_story_page_does_not_skip_stories_sharing_the_boundary_timestamp(monkeypatch):
+    collection = FakeCollection()
+    lib = _reload_story_library(monkeypatch, collection)
+    created = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    for index in range(5):
+        export = lib.record_story_export(
+            user_id="user", title=f"story-{index}", local_path=None, gcs_object=None, gcs_url=None
+        )
+        collection.store[export.id]["created_at_utc"] = created
+
+    titles: list[str] = []
+    cursor = None
+    while True:
+        page = lib.list_story_page(user_id="user", limit=2, cursor=cursor)
+        titles.extend(record.title for record in page.records)
+        if not page.has_more:
+            break
+        cursor = page.next_cursor
+
+    assert sorted(titles) == [f"story-{index}" for index in range(5)]
+    assert len(titles) == 5
+
+
+def test_list_story_page_reads_legacy_records_once(monkeypatch):
+    collection = FakeCollection()
+    lib = _reload_story_library(monkeypatch, collection)
+    _seed(lib, collection, "user", 5, datetime(2023, 1, 1, tzinfo=timezone.utc), legacy=True)
+
+    titles = [record.title for record in lib.list_story_records(user_id="user")]
+    for cursor in (None, "legacy:"):
+        lib.list_story_page(user_id="user", limit=2, cursor=cursor)
+
+    assert titles == [f"legacy-{index}" for index in range(4, -1, -1)]
+    legacy_queries = [filters for filters in collection.queries if ("created_at_utc", ">=", "") in filters]
+    assert len(legacy_queries) == 1
+
+
+def test_list_story_page_appends_legacy_string_timestamps(monkeypatch):
+    collection = FakeCollection()
+    lib = _reload_story_library(monkeypatch, collection)
+    _seed(lib, collection, "user", 2, datetime(2024, 3, 1, tzinfo=timezone.utc))
+    _seed(lib, collection, "user", 3, datetime(2023, 1, 1, tzinfo=timezone.utc), legacy=True)
+
+    first = lib.list_story_page(user_id="user", limit=3)
+    assert [record.title for record in first.records] == ["story-1", "story-0", "legacy-2"]
+    assert first.next_cursor.startswith("legacy:")
+
+    second = lib.list_story_page(user_id="user", limit=3, cursor=first.next_cursor)
+    assert [record.title for record in second.records] == ["legacy-1", "legacy-0"]
+    assert second.has_more is False
+
+    monkeypatch.setattr(lib, "STORY_LIBRARY_LEGACY_FALLBACK", False)
+    assert [record.title for record in lib.list_story_records(user_id="user")] == ["story-1", "story-0"]
+
+
+def test_list_story_page_scans_when_index_is_missing(monkeypatch):
+    from google.api_core.exceptions import FailedPrecondition
+
+    collection = FakeCollection()
+    lib = _reload_story_library(monkeypatch, collection)
+    _seed(lib, collection, "user", 3, datetime(2024, 3, 1, tzinfo=timezone.utc))
+    collection.query_error = FailedPrecondition("The query requires an index")
+
+    page = lib.list_story_page(user_id="user", limit=2)
+
+    assert [record.title for record in page.records] == ["story-2", "story-1"]
+    assert page.has_more is True
+    assert collection.full_scans == 1
+
+
+def test_record_story_export_updates_user_index_in_the_same_transaction(monkeypatch):
+    collection = FakeCollection()
+    index_collection = FakeCollection()
+    lib = _reload_story_library(monkeypatch, collection, index_collection)
+    transactions: list[FakeTransaction] = []
+
+    def run(callback):
+        transactions.append(FakeTransaction())
+        callback(transactions[-1])
+
+    monkeypatch.setattr(lib, "_run_transaction", run)
+
+    export = lib.record_story_export(
+        user_id="user-1",
+        title="새 이야기",
+        local_path=None,
+        gcs_object=None,
+        gcs_url=None,
+        thumbnail_url="https://example.com/thumb.webp",
+    )
+
+    assert [transaction.writes for transaction in transactions] == [[export.id, "user-1"]]
+    index = index_collection.store["user-1"]
+    assert index["complete"] is False
+    assert [(item["id"], item["thumbnail_url"]) for item in index["stories"]] == [
+        (export.id, "https://example.com/thumb.webp")
+    ]
+
+
+def test_list_user_stories_repairs_then_reads_only_the_index(monkeypatch):
+    collection = FakeCollection()
+    index_collection = FakeCollection()
+    lib = _reload_story_library(monkeypatch, collection, index_collection)
+    base = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    _seed(lib, collection, "user-1", 3, base)
+    # Simulate stories written before the index existed.
+    index_collection.store.clear()
+    lib.record_story_export(user_id="user-1", title="story-new", local_path=None, gcs_object=None, gcs_url=None)
+
+    first = lib.list_user_stories(user_id="user-1", limit=10)
+    assert [record.title for record in first] == ["story-new", "story-2", "story-1", "story-0"]
+    assert index_collection.store["user-1"]["complete"] is True
+
+    queries_before = len(collection.queries)
+    second = lib.list_user_stories(user_id="user-1", limit=2)
+    assert [record.title for record in second] == ["story-new", "story-2"]
+    assert len(collection.queries) == queries_before
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import io
+
+from services.image_asset import ImageAsset
+from services.story_html import HtmlStage, StoryHtmlWriter
+from services.story_reader import StoryDocumentCache, parse_story_html
+
+
+def _export(**kwargs) -> str:
+    buffer = io.BytesIO()
+    StoryHtmlWriter(buffer, chunk_bytes=3).write_document(**kwargs)
+    return buffer.getvalue().decode("utf-8")
+
+
+def test_parse_round_trips_writer_output():
+    cover = ImageAsset(b"cover-bytes", "image/jpeg")
+    illustration = ImageAsset(b"\x89PNG stage")
+    html = _export(
+        title="달빛 <모험>",
+        author="홍길동",
+        cover=cover,
+        audio_url="https://example.com/a.mp3",
+        stages=[
+            HtmlStage(paragraphs=["첫 문단 & 둘", "다음 문단"], image=illustration),
+            HtmlStage(paragraphs=[]),
+        ],
+    )
+
+    document = parse_story_html(html)
+
+    assert document is not None
+    assert document.title == "달빛 <모험>"
+    assert document.author == "홍길동"
+    assert document.cover == cover
+    assert document.cover.mime_type == "image/jpeg"
+    assert document.audio_url == "https://example.com/a.mp3"
+    assert [stage.paragraphs for stage in document.stages] == [["첫 문단 & 둘", "다음 문단"], []]
+    assert document.stages[0].image == illustration
+    assert document.stages[1].image is None
+
+
+def test_unrecognized_html_is_not_parsed():
+    assert parse_story_html("<html><body><h1>옛 동화</h1><div>본문</div></body></html>") is None
+
+
+def test_cache_parses_once_and_skips_failed_loads():
+    html = _export(title="이야기", stages=[HtmlStage(paragraphs=["문단"])])
+    cache = StoryDocumentCache(max_entries=1)
+    loads: list[str] = []
+
+    def load(key: str):
+        def _load():
+            loads.append(key)
+            return None if key == "missing" else html
+
+        return _load
+
+    first = cache.get_or_parse("a", load("a"))
+    assert cache.get_or_parse("a", load("a")) is first
+    assert cache.get_or_parse("missing", load("missing")) is None
+    assert cache.get_or_parse("missing", load("missing")) is None
+    cache.get_or_parse("b", load("b"))
+    cache.get_or_parse("a", load("a"))
+
+    assert loads == ["a", "missing", "missing", "b", "a"]
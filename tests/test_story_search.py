@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from gcs_storage import GCSGenerationMismatch
+from services import story_search
+from services.story_manifest import ManifestStage, StoryManifest
+from services.story_search import SearchDocument, StorySearchIndex, publish_search_index, story_texts, tokenize
+from story_library import StoryRecord
+
+
+def _add(index: StorySearchIndex, record_id: str, title: str, *, user_id: str = "user", body: str = "", created_at: str = "") -> None:
+    index.add(
+        SearchDocument(record_id=record_id, user_id=user_id, title=title, created_at=created_at),
+        story_texts(title=title, paragraphs=[body]),
+    )
+
+
+def test_tokenize_uses_bigrams_within_words():
+    assert tokenize("토끼와 달!") == {"토끼": 1, "끼와": 1, "달": 1}
+    assert tokenize("ＡＢ c") == {"ab": 1, "c": 1}
+
+
+def test_search_ranks_title_matches_and_filters_by_user():
+    index = StorySearchIndex()
+    _add(index, "1", "달빛 모험", body="토끼 한 마리가 달을 보았어요.")
+    _add(index, "2", "토끼와 거북이", body="느린 거북이가 이겼어요.")
+    _add(index, "3", "토끼의 겨울", user_id="other", body="눈이 내렸어요.")
+    _add(index, "4", "바다 여행", body="물고기를 만났어요.")
+
+    ranked = [hit.document.record_id for hit in index.search("토끼")]
+    assert set(ranked[:2]) == {"2", "3"}
+    assert ranked[2:] == ["1"]
+    assert [hit.document.record_id for hit in index.search("토끼", user_id="user")] == ["2", "1"]
+    assert [hit.document.record_id for hit in index.search("거북이가")] == ["2"]
+    assert index.search("우주선") == []
+
+
+def test_manifest_fields_are_indexed():
+    manifest = StoryManifest(
+        title="숲속 이야기",
+        stages=[ManifestStage(name="발단", paragraphs=["반딧불이가 길을 밝혔어요."])],
+        synopsis="길 잃은 아이",
+        protagonist="다람쥐 콩이",
+    )
+    index = StorySearchIndex()
+    index.add(SearchDocument("1", "user", "숲속 이야기"), story_texts(title="숲속 이야기", manifest=manifest))
+
+    for query in ("반딧불이", "콩이", "길 잃은"):
+        assert [hit.document.record_id for hit in index.search(query)] == ["1"]
+
+
+def test_saved_index_is_memory_mapped_and_replaces_rerecorded_stories(tmp_path):
+    path = tmp_path / "stories.idx"
+    index = StorySearchIndex()
+    _add(index, "1", "토끼와 거북이")
+    _add(index, "2", "달빛 모험", body="달")
+    index.save(path)
+
+    loaded = StorySearchIndex.load(path)
+    assert len(loaded) == 2
+    assert [hit.document.record_id for hit in loaded.search("달")] == ["2"]
+
+    _add(loaded, "1", "고양이와 거북이")
+    assert [hit.document.title for hit in loaded.search("거북이")] == ["고양이와 거북이"]
+    loaded.save(path)
+
+    reloaded = StorySearchIndex.load(path)
+    assert len(reloaded) == 2
+    assert reloaded.search("토끼") == []
+    assert [hit.document.title for hit in reloaded.search("고양이")] == ["고양이와 거북이"]
+    reloaded.close()
+
+
+class FakeSharedIndex:
+    """The SEARCH_INDEX_GCS_OBJECT object: bytes plus a generation, with one optional racing write."""
+
+    def __init__(self) -> None:
+        self.data: bytes | None = None
+        self.generation = 0
+        self.race: bytes | None = None
+
+    def install(self, monkeypatch) -> None:
+        monkeypatch.setattr(story_search, "get_gcs_export_generation", lambda name: self.generation or None)
+        monkeypatch.setattr(story_search, "download_gcs_export_bytes", self.download)
+        monkeypatch.setattr(story_search, "upload_file_if_generation", self.upload)
+
+    def download(self, name, *, generation=None):
+        if self.data is None or generation not in (None, self.generation):
+            return None
+        return self.data, self.generation
+
+    def upload(self, source, filename, *, content_type, generation):
+        if self.race is not None:
+            self.data, self.race = self.race, None
+            self.generation += 1
+        if generation != self.generation:
+            raise GCSGenerationMismatch(filename)
+        self.data = Path(source).read_bytes()
+        self.generation += 1
+        return self.generation
+
+
+def _index_bytes(tmp_path, *titles: str) -> bytes:
+    index = StorySearchIndex()
+    for title in titles:
+        _add(index, title, title)
+    index.save(tmp_path / "other.idx")
+    return (tmp_path / "other.idx").read_bytes()
+
+
+def test_publish_merges_stories_written_by_other_replicas(tmp_path, monkeypatch):
+    shared = FakeSharedIndex()
+    shared.install(monkeypatch)
+    monkeypatch.setattr(story_search, "SEARCH_INDEX_GCS_OBJECT", "search/stories.idx")
+    monkeypatch.setattr(story_search, "SEARCH_INDEX_PATH", str(tmp_path / "local" / "stories.idx"))
+    shared.data, shared.generation = _index_bytes(tmp_path, "토끼와 거북이"), 1
+    shared.race = _index_bytes(tmp_path, "토끼와 거북이", "달빛 모험")
+
+    index = StorySearchIndex()
+    _add(index, "고양이 여행", "고양이 여행")
+    assert publish_search_index(index) is True
+
+    published = tmp_path / "published.idx"
+    published.write_bytes(shared.data)
+    merged = StorySearchIndex.load(published)
+    for query, title in (("고양이", "고양이 여행"), ("거북이", "토끼와 거북이"), ("달빛", "달빛 모험")):
+        assert [hit.document.title for hit in merged.search(query)] == [title]
+    assert index.generation == shared.generation == 3
+    assert index.pending() == {}
+    merged.close()
+    index.close()
+
+
+def test_missing_index_is_built_from_firestore(tmp_path, monkeypatch):
+    record = StoryRecord(
+        id="rec-1",
+        story_id="story-1",
+        user_id="user",
+        title="별을 모으는 아이",
+        html_filename="story.html",
+        local_path=None,
+        gcs_object=None,
+        gcs_url=None,
+        author_name="작가",
+        created_at_utc=datetime(2026, 1, 1, tzinfo=timezone.utc),
+    )
+    # By name: tests/test_story_library.py re-imports the module.
+    release = threading.Event()
+
+    def list_story_records(limit=None):
+        release.wait(timeout=10)
+        return [record]
+
+    monkeypatch.setattr("story_library.list_story_records", list_story_records)
+    monkeypatch.setattr(story_search, "SEARCH_INDEX_GCS_OBJECT", "")
+    monkeypatch.setattr(story_search, "SEARCH_INDEX_PATH", str(tmp_path / "stories.idx"))
+    story_search.get_story_search_index.cache_clear()
+
+    try:
+        index = story_search.get_story_search_index()
+        assert story_search.search_index_ready() is False
+        assert index.search("별을") == []
+        release.set()
+        story_search._build_thread.join(timeout=10)
+        assert story_search.search_index_ready() is True
+        assert [hit.document.record_id for hit in index.search("별을")] == ["rec-1"]
+        assert (tmp_path / "stories.idx").exists()
+    finally:
+        story_search.get_story_search_index.cache_clear()
+
+
+def test_new_stories_are_published_in_batches(tmp_path, monkeypatch):
+    path = tmp_path / "stories.idx"
+    monkeypatch.setattr(story_search, "SEARCH_INDEX_GCS_OBJECT", "")
+    monkeypatch.setattr(story_search, "SEARCH_INDEX_PATH", str(path))
+    monkeypatch.setattr(story_search, "SEARCH_INDEX_ENABLED", True)
+    monkeypatch.setattr(story_search, "SEARCH_INDEX_PUBLISH_INTERVAL_SECONDS", 3600)
+    monkeypatch.setattr(story_search, "_last_publish", time.monotonic())
+    monkeypatch.setattr(story_search, "_publish_timer", None)
+    monkeypatch.setattr(story_search, "_scheduled_index", None)
+    index = StorySearchIndex()
+    monkeypatch.setattr(story_search, "get_story_search_index", lambda: index)
+
+    for number, title in enumerate(("토끼와 거북이", "달빛 모험")):
+        story_search.index_story_export(SearchDocument(record_id=f"rec-{number}", user_id="user", title=title))
+    timer = story_search._publish_timer
+    try:
+        assert not path.exists()
+        assert [hit.document.title for hit in index.search("달빛")] == ["달빛 모험"]
+
+        assert story_search.flush_search_index() is True
+        published = StorySearchIndex.load(path)
+        assert len(published) == 2
+        assert index.pending() == {}
+        published.close()
+    finally:
+        timer.cancel()
+    index.close()
@@ -28,7 +28,7 @@ def test_export_story_to_html_smoke(tmp_path, monkeypatch):
         topic="용",
     )
 
-    monkeypatch.setattr(story_service, "upload_html_to_gcs", lambda *_, **__: None)
+    monkeypatch.setattr(story_service, "is_gcs_available", lambda: False)
 
     result = story_service.export_story_to_html(bundle=bundle, author="작가")
 
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from services.blob_store import BlobHandle
+from services.illustration_batch import StageIllustrationResult, apply_illustration_result
+from services.image_asset import ImageAsset
+from services.story_signature import (
+    header_leaf,
+    stage_entry_leaf,
+    stage_image_digest,
+    stage_leaf,
+    story_signature,
+)
+
+
+class _UnloadableHandle:
+    sha256 = "ab" * 32
+
+    def resolve_asset(self):  # pragma: no cover - must not be called
+        raise AssertionError("signature must not load image bytes")
+
+
+def _entry(text: str, image=None) -> dict:
+    return {"card": {"name": "용기"}, "story": {"paragraphs": [text]}, "image_asset": image}
+
+
+def _signature(entries: list[dict]) -> str:
+    header = header_leaf("달빛 모험", "6-8", "", "모험", None)
+    return story_signature(header, [stage_entry_leaf(f"stage-{idx}", entry) for idx, entry in enumerate(entries)])
+
+
+def test_signature_is_stable_and_sensitive_to_each_stage():
+    entries = [_entry(f"문단 {idx}", ImageAsset(bytes([idx]) * 32)) for idx in range(5)]
+    baseline = _signature(entries)
+    assert _signature([dict(entry) for entry in entries]) == baseline
+
+    changed = list(entries)
+    changed[3] = _entry("다른 문단", entries[3]["image_asset"])
+    assert _signature(changed) != baseline
+
+    recolored = list(entries)
+    recolored[1] = _entry("문단 1", ImageAsset(b"\xff" * 32))
+    assert _signature(recolored) != baseline
+
+
+def test_only_the_changed_stage_leaf_is_recomputed():
+    stage_leaf.cache_clear()
+    entries = [_entry(f"문단 {idx}") for idx in range(5)]
+    _signature(entries)
+    assert stage_leaf.cache_info().misses == 5
+
+    entries[2] = _entry("새 문단")
+    _signature(entries)
+    info = stage_leaf.cache_info()
+    assert info.misses == 6
+    assert info.hits == 4
+
+
+def test_digest_comes_from_entry_or_handle_without_loading_bytes():
+    assert stage_image_digest(_entry("문단", _UnloadableHandle())) == "ab" * 32
+
+    handle = BlobHandle(sha256="cd" * 32, mime_type="image/png", size=10)
+    assert stage_image_digest({"image_asset": handle}) == "cd" * 32
+    assert stage_image_digest({"image_sha256": "ef" * 32, "image_asset": _UnloadableHandle()}) == "ef" * 32
+
+
+def test_illustration_results_record_the_image_digest():
+    asset = ImageAsset(b"illustration")
+    stages = [{"stage": "발단", "story": {"paragraphs": ["문단"]}, "image_asset": None}]
+    result = StageIllustrationResult(
+        stage_index=0,
+        image_asset=asset,
+        image_style=None,
+        image_prompt=None,
+        image_error=None,
+    )
+
+    [entry] = apply_illustration_result(stages, result)
+
+    assert entry["image_sha256"] == asset.sha256
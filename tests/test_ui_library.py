@@ -1,13 +1,32 @@
 from __future__ import annotations
 
+import gzip
 from datetime import datetime, timezone
 from types import SimpleNamespace
 
+import pytest
+
+from services import export_cache
+from services.export_cache import ExportHtmlCache
+from services.image_asset import ImageAsset
+from services.listing_cache import get_listing_cache
+from services.story_manifest import ManifestImage, ManifestStage, StoryManifest, manifest_to_json
+from services.story_html import HtmlStage, StoryHtmlWriter
+from services.story_reader import get_story_document_cache
 from story_library import StoryRecord
 
 import ui.library as library
 
 
+@pytest.fixture(autouse=True)
+def _clear_listing_cache():
+    get_listing_cache().clear()
+    get_story_document_cache().clear()
+    yield
+    get_listing_cache().clear()
+    get_story_document_cache().clear()
+
+
 def make_record(uid: str, created_at: datetime) -> StoryRecord:
     return StoryRecord(
         id="1",
@@ -29,7 +48,7 @@ def test_load_library_entries_merges_records_and_remote(monkeypatch):
 
     captured: dict[str, object | None] = {}
 
-    def fake_list_story_records(*, user_id: str | None = None, limit: int | None = None):
+    def fake_list_user_stories(*, user_id: str, limit: int):
         captured["user_id"] = user_id
         captured["limit"] = limit
         return [record]
@@ -49,7 +68,7 @@ def test_load_library_entries_merges_records_and_remote(monkeypatch):
         ),
     ]
 
-    monkeypatch.setattr(library, "list_story_records", fake_list_story_records)
+    monkeypatch.setattr(library, "list_user_stories", fake_list_user_stories)
     monkeypatch.setattr(library, "list_gcs_exports", lambda: remote_exports)
 
     entries, error = library.load_library_entries(
@@ -93,3 +112,103 @@ def test_load_library_entries_legacy_remote_only(monkeypatch):
     assert entry.origin == "legacy-remote"
     assert entry.gcs_object == "exports/story3.html"
     assert entry.html_filename == "story3.html"
+
+
+def test_reader_document_is_parsed_once_per_entry(tmp_path, monkeypatch):
+    export_path = tmp_path / "story1.html"
+    with export_path.open("wb") as handle:
+        StoryHtmlWriter(handle).write_document(title="첫 번째 이야기", stages=[HtmlStage(paragraphs=["문단"])])
+    entry = library.LibraryEntry(
+        token="record:1",
+        title="첫 번째 이야기",
+        author=None,
+        story_id="story-1",
+        created_at=None,
+        local_path=str(export_path),
+        gcs_object=None,
+        gcs_url=None,
+        html_filename=None,
+        origin="record",
+    )
+    reads: list[str] = []
+    resolve = library._resolve_entry_html
+    monkeypatch.setattr(library, "_resolve_entry_html", lambda item: reads.append(item.token) or resolve(item))
+
+    first = library._load_entry_document(entry)
+    second = library._load_entry_document(entry)
+
+    assert first[0] is not None and first[0].stages[0].paragraphs == ["문단"]
+    assert second == (first[0], None, None, str(export_path))
+    assert reads == ["record:1"]
+
+
+def test_reader_prefers_manifest_over_html(tmp_path, monkeypatch):
+    monkeypatch.setattr("services.story_service.HTML_EXPORT_PATH", tmp_path)
+    image = ImageAsset(b"stage-image", "image/png")
+    manifest_path = tmp_path / "story1.json"
+    manifest_path.write_bytes(
+        manifest_to_json(
+            StoryManifest(
+                title="첫 번째 이야기",
+                stages=[ManifestStage(name="발단", paragraphs=["문단"], image=ManifestImage.from_asset(image))],
+            )
+        )
+    )
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "assets" / image.sha256).write_bytes(image.data)
+    entry = library.LibraryEntry(
+        token="record:1",
+        title="첫 번째 이야기",
+        author=None,
+        story_id="story-1",
+        created_at=None,
+        local_path=None,
+        gcs_object="exports/story1.html",
+        gcs_url=None,
+        html_filename=None,
+        origin="record",
+        manifest_path=str(manifest_path),
+    )
+    monkeypatch.setattr(library, "_resolve_entry_html", lambda item: pytest.fail("HTML must not be loaded"))
+
+    document, html_content, error, _ = library._load_entry_document(entry)
+
+    assert html_content is None and error is None
+    [stage] = document.stages
+    assert stage.paragraphs == ["문단"]
+    assert stage.image is None
+    assert library._reader_image(stage.image, stage.image_ref) == image
+
+
+def test_second_remote_view_is_served_from_the_export_cache(tmp_path, monkeypatch):
+    stored = gzip.compress("<html>달님</html>".encode("utf-8"))
+    downloads: list[tuple[str, int | None]] = []
+
+    def fake_download(object_name, *, generation=None):
+        downloads.append((object_name, generation))
+        return stored, 3
+
+    monkeypatch.setattr(export_cache, "get_gcs_export_generation", lambda object_name: 3)
+    monkeypatch.setattr(export_cache, "download_gcs_export_bytes", fake_download)
+    cache = ExportHtmlCache(tmp_path / "cache", max_bytes=1024 * 1024)
+    monkeypatch.setattr(export_cache, "get_export_cache", lambda: cache)
+    entry = library.LibraryEntry(
+        token="legacy-remote:archive/story9.html",
+        title="story9",
+        author=None,
+        story_id=None,
+        created_at=None,
+        local_path=None,
+        gcs_object="archive/story9.html",
+        gcs_url=None,
+        html_filename="story9.html",
+        origin="legacy-remote",
+    )
+
+    first = library._resolve_entry_html(entry)
+    second = library._resolve_entry_html(entry)
+
+    assert first == second == ("<html>달님</html>", None, None)
+    assert downloads == [("archive/story9.html", 3)]
+    stats = cache.stats()
+    assert (stats.hits, stats.misses) == (1, 1)
@@ -8,26 +8,26 @@ from typing import Iterable, Iterator
 
 from dotenv import load_dotenv
 
+from cloud_clients import register_client_warm_up, shared_client
 from google_credentials import get_service_account_credentials
+from services.storage_backend import GCSStorageBackend
+from utils.lazy_import import google_api_error, lazy_module
 
 load_dotenv()
 
-try:  # pragma: no cover - optional dependency guard
-    from google.api_core.exceptions import GoogleAPIError  # type: ignore
-    from google.cloud import storage, texttospeech  # type: ignore
-except Exception:  # pragma: no cover - degrade gracefully when dependencies missing
-    storage = None  # type: ignore
-    texttospeech = None  # type: ignore
-    GoogleAPIError = Exception  # type: ignore
+storage = lazy_module("google.cloud.storage")
+texttospeech = lazy_module("google.cloud.texttospeech")
 
 logger = logging.getLogger(__name__)
 
 GCS_BUCKET_NAME = (os.getenv("GCS_BUCKET_NAME") or "").strip()
-GCP_PROJECT = (os.getenv("GCP_PROJECT") or "").strip()
 TTS_PREFIX_RAW = (os.getenv("TTS_PREFIX") or "tts").strip()
 DEFAULT_VOICE_NAME = (os.getenv("TTS_DEFAULT_VOICE") or "ko-KR-Wavenet-A").strip() or "ko-KR-Wavenet-A"
 MAX_CHAR_LIMIT = 3900  # Leave headroom under the API's 5000 byte cap.
 _AUDIO_CONTENT_TYPE = "audio/mpeg"
+# MP3 is already compressed, so narration is uploaded as-is with only a cache header.
+# Objects are keyed by story id and can be regenerated, hence no ``immutable`` by default.
+TTS_AUDIO_CACHE_CONTROL = (os.getenv("TTS_AUDIO_CACHE_CONTROL") or "public, max-age=86400").strip()
 
 
 @dataclass(slots=True)
@@ -53,8 +53,8 @@ def _normalize_prefix(raw: str) -> str:
     return f"{trimmed}/" if trimmed else ""
 
 
-def _object_name(story_id: str) -> str:
-    return f"{_normalize_prefix(TTS_PREFIX_RAW)}{story_id}.mp3"
+def _audio_storage() -> GCSStorageBackend:
+    return GCSStorageBackend(prefix=_normalize_prefix(TTS_PREFIX_RAW), cache_control=TTS_AUDIO_CACHE_CONTROL or None)
 
 
 def _language_code(voice_name: str) -> str:
@@ -104,22 +104,7 @@ def _get_tts_client() -> "texttospeech.TextToSpeechClient":
     client_kwargs: dict[str, object] = {}
     if credentials is not None:
         client_kwargs["credentials"] = credentials
-    return texttospeech.TextToSpeechClient(**client_kwargs)  # type: ignore[arg-type]
-
-
-def _get_storage_client() -> "storage.Client":
-    if not storage:
-        raise RuntimeError("google-cloud-storage is not installed")
-    client_kwargs: dict[str, object] = {}
-    credentials = get_service_account_credentials()
-    if credentials is not None:
-        client_kwargs["credentials"] = credentials
-        project_id = getattr(credentials, "project_id", "")
-        if project_id and not GCP_PROJECT:
-            client_kwargs["project"] = project_id
-    if GCP_PROJECT:
-        client_kwargs["project"] = GCP_PROJECT
-    return storage.Client(**client_kwargs)  # type: ignore[arg-type]
+    return shared_client("texttospeech", texttospeech.TextToSpeechClient, user=__name__, **client_kwargs)
 
 
 def _synthesize_chunks(chunks: Iterable[str], voice_name: str) -> bytes:
@@ -174,18 +159,17 @@ def generate_story_audio(
     if not chosen_voice:
         raise ValueError("A voice name must be provided or configured")
 
-    object_name = _object_name(normalized_story_id)
-
-    storage_client = _get_storage_client()
-    bucket = storage_client.bucket(GCS_BUCKET_NAME)
-    blob = bucket.blob(object_name)
+    audio_storage = _audio_storage()
+    key = f"{normalized_story_id}.mp3"
+    object_name = f"{_normalize_prefix(TTS_PREFIX_RAW)}{key}"
 
     if skip_if_exists:
         try:
-            if blob.exists(storage_client):
+            existing = audio_storage.stat(key)
+            if existing is not None:
                 logger.debug("Reusing existing narration blob %s", object_name)
-                return StoryAudio(blob_name=object_name, public_url=blob.public_url)
-        except GoogleAPIError as exc:  # pragma: no cover - network error
+                return StoryAudio(blob_name=object_name, public_url=existing.url or "")
+        except google_api_error() as exc:  # pragma: no cover - network error
             logger.warning("Failed to check existence of %s: %s", object_name, exc)
 
     chunks = _chunk_text(text)
@@ -195,7 +179,7 @@ def generate_story_audio(
 
     try:
         audio_bytes = _synthesize_chunks(chunks, chosen_voice)
-    except GoogleAPIError as exc:  # pragma: no cover - API error
+    except google_api_error() as exc:  # pragma: no cover - API error
         logger.warning("TTS synthesis failed for %s: %s", story_id, exc)
         return None
     except Exception as exc:  # pragma: no cover - defensive catch
@@ -207,8 +191,8 @@ def generate_story_audio(
         return None
 
     try:
-        blob.upload_from_string(audio_bytes, content_type=_AUDIO_CONTENT_TYPE)
-    except GoogleAPIError as exc:  # pragma: no cover - network error
+        uploaded = audio_storage.put(key, audio_bytes, content_type=_AUDIO_CONTENT_TYPE)
+    except google_api_error() as exc:  # pragma: no cover - network error
         logger.warning("Failed to upload narration for %s: %s", story_id, exc)
         return None
     except Exception as exc:  # pragma: no cover - defensive catch
@@ -216,7 +200,21 @@ def generate_story_audio(
         return None
 
     logger.info("tts.audio.generated", extra={"story_id": normalized_story_id, "blob_name": object_name})
-    return StoryAudio(blob_name=object_name, public_url=blob.public_url)
+    return StoryAudio(blob_name=object_name, public_url=uploaded.url or "")
+
+
+def _warm_up_tts_client() -> "texttospeech.TextToSpeechClient":
+    if not _is_ready():
+        raise RuntimeError("Text-to-Speech is not configured")
+    return _get_tts_client()
+
+
+def _probe_tts_client(client: "texttospeech.TextToSpeechClient") -> None:
+    # Listing voices is free, unlike a synthesis request.
+    client.list_voices(language_code=_language_code(DEFAULT_VOICE_NAME))
+
+
+register_client_warm_up("texttospeech", _warm_up_tts_client, _probe_tts_client)
 
 
 __all__ = ["generate_story_audio", "StoryAudio", "is_tts_configured"]
@@ -6,6 +6,7 @@ from typing import Any, Mapping
 import streamlit as st
 
 from community_board import BoardPost, add_post, init_board_store, list_posts
+from services.process_init import ensure_initialized
 from telemetry import emit_log_event
 from ui.styles import render_app_styles
 from utils.auth import auth_display_name
@@ -22,7 +23,9 @@ def render_board_page(
     motd: Mapping[str, Any] | None = None,
 ) -> None:
     """Render the lightweight community board view."""
-    init_board_store()
+    board_status = ensure_initialized("community_board", init_board_store)
+    if not board_status.ok:
+        raise RuntimeError(board_status.error)
     render_app_styles(home_bg, show_home_hero=False)
 
     current_ip = get_client_ip()
@@ -16,12 +16,14 @@ from gemini_client import (
     generate_synopsis_with_gemini,
     generate_title_with_gemini,
 )
+from services.static_assets import static_asset_url_or_path
 from session_state import (
     clear_stages_from,
     reset_all_state,
     reset_cover_art,
     reset_story_session,
 )
+from story_drafts import checkpoint_draft
 from story_identifier import generate_story_id
 from telemetry import emit_log_event
 
@@ -121,12 +123,15 @@ def render_step(context: CreatePageContext) -> None:
             st.warning(f"주인공 설정화 프롬프트 생성 실패: {char_prompt_data['error']}")
         else:
             session["character_prompt"] = char_prompt_data.get("prompt")
-            char_image_resp = generate_image_with_gemini(char_prompt_data["prompt"])
+            char_image_resp = generate_image_with_gemini(
+                char_prompt_data["prompt"],
+                style_name=char_prompt_data.get("style_name"),
+            )
             if "error" in char_image_resp:
                 st.warning(f"주인공 설정화 생성 실패: {char_image_resp['error']}")
                 session["character_image_error"] = char_image_resp["error"]
             else:
-                session["character_image"] = char_image_resp.get("bytes")
+                session["character_image"] = char_image_resp.get("asset")
                 session["character_image_mime"] = char_image_resp.get("mime_type", "image/png")
 
         progress_bar.progress(0.7, "멋진 제목을 짓고 있어요...")
@@ -164,22 +169,24 @@ def render_step(context: CreatePageContext) -> None:
             cover_image_resp = generate_image_with_gemini(
                 cover_prompt_data["prompt"],
                 image_input=session.get("character_image"),
+                style_name=cover_prompt_data.get("style_name"),
             )
             if "error" in cover_image_resp:
                 st.warning(f"표지 이미지 생성 실패: {cover_image_resp['error']}")
                 session["cover_image_error"] = cover_image_resp["error"]
             else:
-                session["cover_image"] = cover_image_resp.get("bytes")
+                session["cover_image"] = cover_image_resp.get("asset")
                 session["cover_image_mime"] = cover_image_resp.get("mime_type", "image/png")
 
         progress_bar.progress(1.0, "완성! 다음 화면으로 이동합니다.")
         session["is_generating_all"] = False
         session.step = 3
+        checkpoint_draft(session, user_id=(context.auth_user or {}).get("uid"))
         st.rerun()
         st.stop()
 
     st.caption("마음에 드는 이야기 유형 카드를 클릭한 뒤, '제목 만들기' 버튼을 눌러주세요.")
-    type_images = [os.path.join(illust_dir, t.get("illust", "")) for t in rand8]
+    type_images = [static_asset_url_or_path(os.path.join(illust_dir, t.get("illust", ""))) for t in rand8]
     type_captions = [t.get("name", "이야기 유형") for t in rand8]
 
     sel_idx = image_select(
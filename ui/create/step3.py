@@ -36,7 +36,7 @@ def render_step(context: CreatePageContext) -> None:
         caption = "표지 일러스트"
         if cover_style and cover_style.get("name"):
             caption += f" · {cover_style.get('name')} 스타일"
-        st.image(cover_image, caption=caption, width='stretch')
+        st.image(cover_image.data, caption=caption, width='stretch')
     elif cover_error:
         st.warning(f"표지 일러스트 생성 실패: {cover_error}")
     else:
@@ -63,7 +63,7 @@ def render_step(context: CreatePageContext) -> None:
         active_style = style_choice or cover_style
         if active_style and active_style.get("name"):
             caption += f" · {active_style.get('name')} 스타일"
-        st.image(character_image, caption=caption, width='stretch')
+        st.image(character_image.data, caption=caption, width='stretch')
     elif character_error:
         st.warning(f"설정화 생성 실패: {character_error}")
     else:
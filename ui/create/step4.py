@@ -8,6 +8,7 @@ import streamlit as st
 from streamlit_image_select import image_select
 
 from app_constants import STAGE_GUIDANCE, STORY_PHASES
+from services.static_assets import static_asset_url_or_path
 from session_state import (
     clear_stages_from,
     go_step,
@@ -121,7 +122,7 @@ def render_step(context: CreatePageContext) -> None:
     )
     st.caption("카드를 선택한 뒤 ‘이야기 만들기’ 버튼을 눌러주세요. 단계별로 생성된 내용은 자동으로 이어집니다.")
 
-    card_images = [os.path.join(illust_dir, card.get("illust", "")) for card in cards]
+    card_images = [static_asset_url_or_path(os.path.join(illust_dir, card.get("illust", ""))) for card in cards]
     card_captions = [card.get("name", "이야기 카드") for card in cards]
 
     selected_idx = image_select(
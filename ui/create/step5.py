@@ -7,12 +7,15 @@ import streamlit as st
 
 from app_constants import STORY_PHASES
 from gemini_client import build_image_prompt, generate_image_with_gemini, generate_story_with_gemini
+from services.image_asset import stage_image
+from services.story_signature import image_digest
 from session_state import (
     clear_stages_from,
     go_step,
     reset_all_state,
     reset_story_session,
 )
+from story_drafts import checkpoint_draft
 from telemetry import emit_log_event
 
 from .context import CreatePageContext
@@ -189,6 +192,7 @@ def render_step(context: CreatePageContext) -> None:
                     image_response = generate_image_with_gemini(
                         prompt_data["prompt"],
                         image_input=session.get("character_image"),
+                        style_name=style_info.get("name"),
                     )
                     if "error" in image_response:
                         session["story_image_error"] = image_response["error"]
@@ -196,7 +200,7 @@ def render_step(context: CreatePageContext) -> None:
                         session["story_image_mime"] = "image/png"
                     else:
                         session["story_image_error"] = None
-                        session["story_image"] = image_response.get("bytes")
+                        session["story_image"] = image_response.get("asset")
                         session["story_image_mime"] = image_response.get("mime_type", "image/png")
 
                 stages_copy = list(session.get("stages_data") or [None] * len(STORY_PHASES))
@@ -209,13 +213,15 @@ def render_step(context: CreatePageContext) -> None:
                         "prompt": card_prompt,
                     },
                     "story": story_payload,
-                    "image_bytes": session.get("story_image"),
+                    "image_asset": session.get("story_image"),
+                    "image_sha256": image_digest(session.get("story_image")),
                     "image_mime": session.get("story_image_mime"),
                     "image_style": session.get("story_image_style"),
                     "image_prompt": session.get("story_prompt"),
                     "image_error": session.get("story_image_error"),
                 }
                 session["stages_data"] = stages_copy
+                checkpoint_draft(session, user_id=(context.auth_user or {}).get("uid"))
                 action_name = "story end" if stage_idx == len(STORY_PHASES) - 1 else "story card"
                 emit_log_event(
                     type="story",
@@ -283,11 +289,11 @@ def render_step(context: CreatePageContext) -> None:
     for paragraph in story_data.get("paragraphs", []):
         st.write(paragraph)
 
-    image_bytes = stage_entry.get("image_bytes") if stage_entry else session.get("story_image")
+    image_asset = stage_image(stage_entry) if stage_entry else session.get("story_image")
     image_error = stage_entry.get("image_error") if stage_entry else session.get("story_image_error")
 
-    if image_bytes:
-        st.image(image_bytes, caption="AI 생성 삽화", width='stretch')
+    if image_asset:
+        st.image(image_asset.data, caption="AI 생성 삽화", width='stretch')
     elif image_error:
         st.warning(f"삽화 생성 실패: {image_error}")
 
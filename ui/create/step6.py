@@ -1,8 +1,6 @@
 """Step 6 view: aggregate story, export, and present downloads."""
 from __future__ import annotations
 
-import hashlib
-import json
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
@@ -11,13 +9,29 @@ import streamlit as st
 
 from app_constants import STORY_PHASES
 from gcs_storage import download_gcs_export, is_gcs_available, list_gcs_exports
-from services.generation_tokens import (
-    InsufficientGenerationTokens,
-    consume_token,
-    status_to_dict,
+from services.export_jobs import (
+    FAILED,
+    QUEUED,
+    RECORDED,
+    RENDERING,
+    SYNTHESIZING,
+    UPLOADING,
+    ExportJob,
+    ExportRequest,
+    get_export_job_manager,
 )
-from services.story_service import StagePayload, StoryBundle, export_story_to_html
-from story_library import record_story_export
+from services.generation_tokens import status_to_dict
+from services.listing_cache import GCS_EXPORTS_SCOPE, get_listing_cache
+from services.image_asset import stage_image
+from services.illustration_batch import (
+    apply_illustration_result,
+    build_illustration_jobs,
+    find_missing_illustrations,
+    render_stage_illustrations,
+)
+from services.story_service import StagePayload, StoryBundle
+from services.story_signature import header_leaf, image_digest, stage_entry_leaf, story_signature
+from story_drafts import checkpoint_draft
 from telemetry import emit_log_event
 from utils.auth import auth_display_name, auth_email
 from utils.time_utils import format_kst
@@ -26,7 +40,123 @@ from session_state import reset_all_state, reset_story_session
 
 from .context import CreatePageContext
 from .tokens import render_token_status
-from tts_client import generate_story_audio, is_tts_configured
+from tts_client import is_tts_configured
+
+
+def _render_remaining_illustrations(
+    context: CreatePageContext,
+    indices: list[int],
+    *,
+    story_type_name: str,
+) -> None:
+    """Generate every missing stage illustration concurrently and store results as they arrive."""
+
+    session = context.session
+    stages_data = list(session.get("stages_data") or [])
+    jobs = build_illustration_jobs(stages_data, indices)
+    if not jobs:
+        return
+
+    style_choice = session.get("story_style_choice") or session.get("cover_image_style")
+    progress_bar = st.progress(0.0, "남은 삽화를 그리고 있어요...")
+    completed = 0
+    for result in render_stage_illustrations(
+        jobs,
+        age=session.get("age") or "6-8",
+        topic=session.get("topic") or "",
+        story_type_name=story_type_name,
+        style_choice=style_choice,
+        protagonist_text=session.get("protagonist_result"),
+        reference_image=session.get("character_image"),
+    ):
+        stages_data = apply_illustration_result(stages_data, result)
+        session["stages_data"] = stages_data
+        completed += 1
+        stage_name = STORY_PHASES[result.stage_index]
+        emit_log_event(
+            type="story",
+            action="story illustration",
+            result="fail" if result.image_error else "success",
+            params=[
+                session.get("story_id"),
+                stage_name,
+                "batch",
+                None,
+                result.image_error,
+            ],
+        )
+        progress_bar.progress(completed / len(jobs), f"{stage_name} 삽화 완료 ({completed}/{len(jobs)})")
+    checkpoint_draft(session, user_id=(context.auth_user or {}).get("uid"))
+
+
+_EXPORT_STATE_LABELS = {
+    QUEUED: "저장을 준비하고 있어요...",
+    SYNTHESIZING: "동화를 읽어주는 음성을 준비하고 있어요...",
+    RENDERING: "동화책 파일을 만들고 있어요...",
+    UPLOADING: "동화책을 업로드하고 있어요...",
+}
+
+
+def _remember_audio(session: Any, job: ExportJob) -> None:
+    """Keep a job's narration in the session so a later export of the same story reuses it."""
+
+    session["story_audio_signature"] = job.signature
+    session["story_audio_url"] = job.audio_url
+    session["story_audio_blob"] = job.audio_blob
+    session["story_audio_error"] = job.audio_error
+
+
+def _apply_export_job(context: CreatePageContext, job: ExportJob) -> tuple[str | None, str | None]:
+    """Copy a finished job's artifacts into the session; return the token notice and error."""
+
+    session = context.session
+    _remember_audio(session, job)
+    session["story_export_path"] = job.local_path
+    session["story_export_signature"] = job.signature
+    session["story_export_remote_url"] = job.gcs_url
+    session["story_export_remote_blob"] = job.gcs_object
+    if job.gcs_object:
+        session["selected_export"] = f"gcs:{job.gcs_object}"
+    elif job.local_path:
+        session["selected_export"] = job.local_path
+
+    if job.token_error:
+        st.session_state["generation_token_error"] = job.token_error
+        context.generation_token_error = job.token_error
+        return None, job.token_error
+    if job.token_status is None:
+        return None, None
+    updated_payload = status_to_dict(job.token_status)
+    st.session_state["generation_token_status"] = updated_payload
+    st.session_state["generation_token_error"] = None
+    st.session_state["generation_token_synced_at"] = datetime.now(timezone.utc).isoformat()
+    st.session_state["generation_token_uid"] = str((context.auth_user or {}).get("uid") or "").strip()
+    st.session_state["generation_token_refill_delta"] = 0
+    context.generation_tokens = updated_payload
+    context.generation_token_error = None
+    if job.token_consumed:
+        return f"생성 토큰 1개를 사용했어요. 남은 토큰 {job.token_status.tokens}개", None
+    return None, None
+
+
+def _render_export_progress(job: ExportJob, request: ExportRequest) -> None:
+    """Show the background export's state, rerunning the page once it settles."""
+
+    if job.state == FAILED:
+        st.warning(f"자동 저장에 실패했습니다: {job.error}")
+        if st.button("🔁 다시 저장하기", key="retry_story_export", width='stretch'):
+            get_export_job_manager().submit(request, retry=True)
+            st.rerun()
+        return
+
+    @st.fragment(run_every=1.0)
+    def _poll() -> None:
+        current = get_export_job_manager().get(job.signature, request.user_id)
+        if current is None or current.done:
+            st.rerun()
+        st.info(_EXPORT_STATE_LABELS.get(current.state, "저장 중이에요..."))
+
+    _poll()
 
 
 def render_step(context: CreatePageContext) -> None:
@@ -35,7 +165,7 @@ def render_step(context: CreatePageContext) -> None:
 
     st.subheader("6단계. 이야기를 모아봤어요")
 
-    token_status = render_token_status(context, show_error=False)
+    render_token_status(context, show_error=False)
     if context.generation_token_error:
         st.warning(f"토큰 정보를 불러오지 못했어요: {context.generation_token_error}")
 
@@ -78,6 +208,31 @@ def render_step(context: CreatePageContext) -> None:
             st.rerun()
         st.stop()
 
+    missing_illustrations = find_missing_illustrations(stages_data)
+    if session.get("is_rendering_illustrations"):
+        _render_remaining_illustrations(
+            context,
+            missing_illustrations,
+            story_type_name=story_type_name,
+        )
+        session["is_rendering_illustrations"] = False
+        st.rerun()
+        st.stop()
+
+    # Saving now and again after the batch would record the story and charge a token twice,
+    # so the export waits until the illustrations are drawn or the user saves without them.
+    if missing_illustrations and not session.get("story_export_without_illustrations"):
+        missing_names = ", ".join(STORY_PHASES[idx] for idx in missing_illustrations)
+        st.info(f"삽화가 없는 단계가 있어요: {missing_names}")
+        if st.button("🎨 남은 삽화 한꺼번에 그리기", width='stretch', key="render_remaining_illustrations"):
+            session["is_rendering_illustrations"] = True
+            st.rerun()
+            st.stop()
+        if st.button("삽화 없이 저장하기", width='stretch', key="export_without_illustrations"):
+            session["story_export_without_illustrations"] = True
+            st.rerun()
+        st.stop()
+
     cover_image = session.get("cover_image")
     cover_error = session.get("cover_image_error")
     cover_style = session.get("story_style_choice") or session.get("cover_image_style")
@@ -85,14 +240,7 @@ def render_step(context: CreatePageContext) -> None:
     export_ready_stages: list[StagePayload] = []
     display_sections: list[dict[str, Any]] = []
     text_lines: list[str] = [title_val, ""]
-    signature_payload = {
-        "title": title_val,
-        "age": age_val,
-        "topic": topic_val or "",
-        "story_type": story_type_name,
-        "stages": [],
-        "cover_hash": None,
-    }
+    stage_leaves: list[str] = []
 
     for idx, stage_name in enumerate(STORY_PHASES):
         entry = stages_data[idx] if idx < len(stages_data) else None
@@ -105,8 +253,7 @@ def render_step(context: CreatePageContext) -> None:
         text_lines.extend(paragraphs)
         text_lines.append("")
 
-        image_bytes = entry.get("image_bytes")
-        image_hash = hashlib.sha256(image_bytes).hexdigest() if image_bytes else None
+        image_asset = stage_image(entry)
 
         export_ready_stages.append(
             StagePayload(
@@ -114,22 +261,16 @@ def render_step(context: CreatePageContext) -> None:
                 card_name=card_info.get("name"),
                 card_prompt=card_info.get("prompt"),
                 paragraphs=paragraphs,
-                image_bytes=image_bytes,
-                image_mime=entry.get("image_mime") or "image/png",
+                image_bytes=None,
+                image_mime=image_asset.mime_type if image_asset else "image/png",
                 image_style_name=(entry.get("image_style") or {}).get("name"),
+                image_asset=image_asset,
             )
         )
-        signature_payload["stages"].append(
-            {
-                "stage_name": stage_name,
-                "card_name": card_info.get("name"),
-                "paragraphs": paragraphs,
-                "image_hash": image_hash,
-            }
-        )
+        stage_leaves.append(stage_entry_leaf(stage_name, entry))
         display_sections.append(
             {
-                "image_bytes": image_bytes,
+                "image_asset": image_asset,
                 "image_error": entry.get("image_error"),
                 "paragraphs": paragraphs,
             }
@@ -138,62 +279,28 @@ def render_step(context: CreatePageContext) -> None:
     full_text = "\n".join(line for line in text_lines if line is not None)
 
     cover_payload = None
-    cover_hash = None
     if cover_image:
-        cover_mime = session.get("cover_image_mime", "image/png")
         cover_payload = {
-            "image_bytes": cover_image,
-            "image_mime": cover_mime,
+            "image_asset": cover_image,
+            "image_mime": cover_image.mime_type,
             "style_name": (cover_style or {}).get("name"),
         }
-        cover_hash = hashlib.sha256(cover_image).hexdigest()
 
-    signature_payload["cover_hash"] = cover_hash
-    signature_raw = json.dumps(signature_payload, ensure_ascii=False, sort_keys=True)
-    signature = hashlib.sha256(signature_raw.encode("utf-8")).hexdigest()
+    signature = story_signature(
+        header_leaf(title_val, age_val, topic_val or "", story_type_name, image_digest(cover_image)),
+        stage_leaves,
+    )
 
-    audio_url = session.get("story_audio_url")
-    audio_error = session.get("story_audio_error")
-    audio_blob = session.get("story_audio_blob")
-    audio_signature = session.get("story_audio_signature")
     story_id_value = (session.get("story_id") or "").strip()
-
     tts_ready = is_tts_configured()
-    if story_id_value and tts_ready and audio_signature != signature:
-        with st.spinner("동화를 읽어주는 음성을 준비하고 있어요..."):
-            audio_result = generate_story_audio(
-                story_id=story_id_value,
-                full_text=full_text,
-                voice_name=None,
-            )
-
-        session["story_audio_signature"] = signature
-        if audio_result:
-            audio_url = audio_result.public_url
-            audio_blob = audio_result.blob_name
-            audio_error = None
-            session["story_audio_url"] = audio_url
-            session["story_audio_blob"] = audio_blob
-            session["story_audio_error"] = None
-            emit_log_event(
-                type="tts",
-                action="story audio",
-                result="success",
-                params=[story_id_value, audio_blob, audio_url, None, None],
-            )
-        else:
-            audio_url = None
-            audio_blob = None
-            audio_error = "음성 파일을 준비하지 못했어요. 잠시 후 다시 시도해 주세요."
-            session["story_audio_url"] = None
-            session["story_audio_blob"] = None
-            session["story_audio_error"] = audio_error
-
 
     auto_saved = False
+    export_job: ExportJob | None = None
     if session.get("story_export_signature") != signature:
-        try:
-            bundle = StoryBundle(
+        reuse_audio = session.get("story_audio_signature") == signature and bool(session.get("story_audio_url"))
+        export_request = ExportRequest(
+            signature=signature,
+            bundle=StoryBundle(
                 title=title_val,
                 stages=export_ready_stages,
                 synopsis=session.get("synopsis_result"),
@@ -202,125 +309,28 @@ def render_step(context: CreatePageContext) -> None:
                 story_type_name=story_type_name,
                 age=age_val,
                 topic=topic_val,
-                audio_url=audio_url,
-            )
-            export_result = export_story_to_html(
-                bundle=bundle,
-                author=auth_display_name(auth_user) if auth_user else None,
-            )
-            session["story_export_path"] = export_result.local_path
-            session["story_export_signature"] = signature
-            session["story_export_remote_url"] = export_result.gcs_url
-            session["story_export_remote_blob"] = export_result.gcs_object
-            if export_result.gcs_object:
-                session["selected_export"] = f"gcs:{export_result.gcs_object}"
-            elif export_result.local_path:
-                session["selected_export"] = export_result.local_path
+            ),
+            full_text=full_text,
+            story_id=story_id_value or None,
+            author=auth_display_name(auth_user) if auth_user else None,
+            user_id=str((auth_user or {}).get("uid") or "").strip() or None,
+            user_email=auth_email(auth_user),
+            synthesize_audio=tts_ready and not reuse_audio,
+            audio_url=session.get("story_audio_url") if reuse_audio else None,
+            audio_blob=session.get("story_audio_blob") if reuse_audio else None,
+        )
+        export_job = get_export_job_manager().submit(export_request)
+        # Saved as soon as synthesis finishes: a failed or resubmitted export (after the job
+        # expired) then reuses the narration instead of synthesizing it again.
+        if export_job.audio_done and export_job.audio_url and not reuse_audio:
+            _remember_audio(session, export_job)
+        if export_job.state == RECORDED:
+            token_notice, token_error_message = _apply_export_job(context, export_job)
             auto_saved = True
-            user_email = auth_email(auth_user)
-            emit_log_event(
-                type="story",
-                action="story save",
-                result="success",
-                params=[
-                    session.get("story_id"),
-                    title_val,
-                    export_result.gcs_object or export_result.local_path,
-                    export_result.gcs_url,
-                    "auto-save",
-                ],
-                user_email=user_email,
-            )
-            if auth_user:
-                try:
-                    record_story_export(
-                        user_id=str(auth_user.get("uid", "")),
-                        title=title_val,
-                        local_path=export_result.local_path,
-                        gcs_object=export_result.gcs_object,
-                        gcs_url=export_result.gcs_url,
-                        story_id=session.get("story_id"),
-                        author_name=auth_display_name(auth_user),
-                    )
-                except Exception as exc:  # pragma: no cover
-                    emit_log_event(
-                        type="story",
-                        action="story save",
-                        result="fail",
-                        params=[
-                            session.get("story_id"),
-                            title_val,
-                            export_result.gcs_object or export_result.local_path,
-                            export_result.gcs_url,
-                            f"library error: {exc}",
-                        ],
-                    )
-                uid = str(auth_user.get("uid") or "").strip()
-                if uid:
-                    try:
-                        outcome = consume_token(uid=uid, signature=signature)
-                    except InsufficientGenerationTokens:
-                        token_error_message = "생성 토큰이 부족해 새로 만든 이야기를 저장할 수 없었어요."
-                        st.session_state["generation_token_error"] = token_error_message
-                        context.generation_token_error = token_error_message
-                        emit_log_event(
-                            type="user",
-                            action="token consume",
-                            result="fail",
-                            params=[session.get("story_id"), uid, signature, "insufficient", None],
-                            user_email=user_email,
-                        )
-                    except Exception as exc:  # noqa: BLE001
-                        token_error_message = f"토큰을 차감하지 못했어요: {exc}"
-                        st.session_state["generation_token_error"] = token_error_message
-                        context.generation_token_error = token_error_message
-                        emit_log_event(
-                            type="user",
-                            action="token consume",
-                            result="fail",
-                            params=[session.get("story_id"), uid, signature, "error", str(exc)],
-                            user_email=user_email,
-                        )
-                    else:
-                        token_status = outcome.status
-                        updated_payload = status_to_dict(token_status)
-                        st.session_state["generation_token_status"] = updated_payload
-                        st.session_state["generation_token_error"] = None
-                        st.session_state["generation_token_synced_at"] = datetime.now(timezone.utc).isoformat()
-                        st.session_state["generation_token_uid"] = uid
-                        st.session_state["generation_token_refill_delta"] = 0
-                        context.generation_tokens = updated_payload
-                        context.generation_token_error = None
-                        if outcome.consumed:
-                            token_notice = f"생성 토큰 1개를 사용했어요. 남은 토큰 {token_status.tokens}개"
-                        emit_log_event(
-                            type="user",
-                            action="token consume",
-                            result="success" if outcome.consumed else "noop",
-                            params=[
-                                session.get("story_id"),
-                                uid,
-                                signature,
-                                str(token_status.tokens),
-                                None,
-                            ],
-                            user_email=user_email,
-                        )
-        except Exception as exc:  # pragma: no cover
-            st.warning(f"자동 저장에 실패했습니다: {exc}")
-            emit_log_event(
-                type="story",
-                action="story save",
-                result="fail",
-                params=[
-                    session.get("story_id"),
-                    title_val,
-                    None,
-                    None,
-                    str(exc),
-                ],
-            )
+            export_job = None
 
+    audio_url = session.get("story_audio_url")
+    audio_error = session.get("story_audio_error")
     st.markdown("#### 완성된 동화 정보")
     st.caption(f"나이대: **{age_val}** · 주제: **{topic_display}** · 이야기 유형: **{story_type_name}**")
     st.caption(f"단계 수: {len(STORY_PHASES)} · 본문 길이: {len(full_text.split())} 단어")
@@ -329,7 +339,9 @@ def render_step(context: CreatePageContext) -> None:
     export_remote_url = session.get("story_export_remote_url")
     export_remote_blob = session.get("story_export_remote_blob")
 
-    if auto_saved:
+    if export_job is not None:
+        _render_export_progress(export_job, export_request)
+    elif auto_saved:
         st.success("새로운 이야기를 자동으로 저장했어요.")
         if token_notice:
             st.success(token_notice)
@@ -353,7 +365,7 @@ def render_step(context: CreatePageContext) -> None:
         seen_tokens.add(token)
 
     if is_gcs_available():
-        for item in list_gcs_exports():
+        for item in get_listing_cache().get_or_load(GCS_EXPORTS_SCOPE, "all", list_gcs_exports):
             token = f"gcs:{item.object_name}"
             if token in seen_tokens:
                 continue
@@ -384,7 +396,7 @@ def render_step(context: CreatePageContext) -> None:
 
     st.markdown(f"### {title_val}")
     if cover_image:
-        st.image(cover_image, width='stretch')
+        st.image(cover_image.data, width='stretch')
     elif cover_error:
         st.caption("표지 일러스트를 준비하지 못했어요.")
 
@@ -394,12 +406,12 @@ def render_step(context: CreatePageContext) -> None:
             st.warning("이야기 단계가 비어 있습니다. 다시 생성해 주세요.")
             continue
 
-        image_bytes = section.get("image_bytes")
+        image_asset = section.get("image_asset")
         image_error = section.get("image_error")
         paragraphs = section.get("paragraphs") or []
 
-        if image_bytes:
-            st.image(image_bytes, width='stretch')
+        if image_asset:
+            st.image(image_asset.data, width='stretch')
         elif image_error:
             st.caption("삽화를 준비하지 못했어요.")
 
@@ -5,12 +5,62 @@ from typing import Any, Mapping, Sequence
 
 import streamlit as st
 
+from app_constants import STORY_PHASES
 from gcs_storage import is_gcs_available, list_gcs_exports
 from services.generation_tokens import status_from_mapping
+from session_proxy import StorySessionProxy
+from story_drafts import find_resumable_draft, load_draft, restore_draft
 from story_library import list_story_records
 from session_state import ensure_state, reset_all_state
 from utils.time_utils import format_kst
 
+
+def _resumable_draft_summary(uid: str) -> Mapping[str, Any] | None:
+    """Look up the user's latest draft once per session and cache a small summary."""
+
+    if st.session_state.get("resume_draft_checked_uid") != uid:
+        summary = None
+        try:
+            draft = find_resumable_draft(uid)
+        except Exception:  # pragma: no cover - drafts are optional
+            draft = None
+        if draft is not None:
+            summary = {
+                "story_id": draft.story_id,
+                "title": draft.title,
+                "completed_stages": draft.completed_stages,
+                "updated_at": draft.updated_at,
+            }
+        st.session_state["resume_draft"] = summary
+        st.session_state["resume_draft_checked_uid"] = uid
+    return st.session_state.get("resume_draft")
+
+
+def _render_resume_draft(
+    auth_user: Mapping[str, object],
+    story_types: Sequence[Mapping[str, object]],
+) -> None:
+    uid = str(auth_user.get("uid") or "").strip()
+    summary = _resumable_draft_summary(uid) if uid else None
+    if not summary:
+        return
+
+    title = summary.get("title") or "제목 없는 동화"
+    st.info(
+        f"만들던 동화가 있어요: **{title}** "
+        f"({summary.get('completed_stages', 0)}/{len(STORY_PHASES)} 단계 · {format_kst(summary.get('updated_at'))})"
+    )
+    if st.button("⏯️ 이어서 만들기", width='stretch', key="resume_draft_button"):
+        draft = load_draft(str(summary.get("story_id")))
+        if draft is None:
+            st.session_state["resume_draft"] = None
+            st.warning("저장된 초안을 찾지 못했어요. 새로 만들어 주세요.")
+            return
+        reset_all_state()
+        ensure_state(story_types)
+        restore_draft(StorySessionProxy(st.session_state), draft)
+        st.rerun()
+
 def render_home_screen(
     *,
     auth_user: Mapping[str, object] | None,
@@ -38,6 +88,7 @@ def render_home_screen(
             if token_status.tokens <= 0:
                 allow_create = False
                 st.error("생성 토큰이 모두 소진되었어요. 자정 이후 자동 충전되면 다시 시도해 주세요.")
+        _render_resume_draft(auth_user, story_types)
 
     c1, c2 = st.columns(2)
     with c1:
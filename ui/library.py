@@ -1,19 +1,33 @@
 """Story library viewer helpers."""
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Mapping
 
-from gcs_storage import download_gcs_export, list_gcs_exports
-from services.story_service import HTML_EXPORT_PATH
+from gcs_storage import list_gcs_exports
+from services.export_cache import load_export_html
+from services.image_asset import ImageAsset
+from services.listing_cache import (
+    ALL_STORIES_SCOPE,
+    GCS_EXPORTS_SCOPE,
+    get_listing_cache,
+    user_stories_scope,
+)
+from services.story_manifest import ManifestImage
+from services.story_reader import StoryDocument, get_story_document_cache
+from services.story_search import SearchDocument, search_index_ready, search_stories
+from services.story_service import HTML_EXPORT_PATH, load_story_asset, load_story_manifest
 from session_proxy import StorySessionProxy
-from story_library import StoryRecord, list_story_records
+from story_library import StoryRecord, list_story_records, list_user_stories
 from telemetry import emit_log_event
 from utils.time_utils import format_kst
 
 _EPOCH = datetime.fromtimestamp(0, tz=timezone.utc)
+LIBRARY_GRID_PAGE_SIZE = 12
+_GRID_COLUMNS = 4
 
 
 @dataclass(slots=True)
@@ -28,6 +42,10 @@ class LibraryEntry:
     gcs_url: str | None
     html_filename: str | None
     origin: str
+    manifest_path: str | None = None
+    manifest_object: str | None = None
+    thumbnail_url: str | None = None
+    thumbnail_path: str | None = None
 
 
 def _normalize_timestamp(timestamp: datetime | None) -> datetime:
@@ -48,12 +66,17 @@ def load_library_entries(
     """Load story entries for the library view."""
 
     records_error: str | None = None
+    cache = get_listing_cache()
     try:
         if only_mine and auth_user:
             uid = str(auth_user.get("uid") or "").strip()
-            records = list_story_records(user_id=uid, limit=limit)
+            records = cache.get_or_load(
+                user_stories_scope(uid),
+                ("limit", limit),
+                lambda: list_user_stories(user_id=uid, limit=limit),
+            )
         else:
-            records = list_story_records(limit=limit)
+            records = cache.get_or_load(ALL_STORIES_SCOPE, ("limit", limit), lambda: list_story_records(limit=limit))
     except Exception as exc:  # pragma: no cover - defensive catch
         records_error = str(exc)
         records = []
@@ -77,11 +100,15 @@ def load_library_entries(
                 gcs_url=record.gcs_url,
                 html_filename=record.html_filename,
                 origin="record",
+                manifest_path=record.manifest_path,
+                manifest_object=record.manifest_object,
+                thumbnail_url=record.thumbnail_url,
+                thumbnail_path=record.thumbnail_path,
             )
         )
 
     if include_legacy:
-        for item in list_gcs_exports():
+        for item in cache.get_or_load(GCS_EXPORTS_SCOPE, "all", list_gcs_exports):
             object_name = (getattr(item, "object_name", "") or "").strip()
             filename = (getattr(item, "filename", "") or "").strip()
             key = (object_name or filename).lower()
@@ -111,18 +138,67 @@ def load_library_entries(
     return entries, records_error
 
 
-def _resolve_entry_html(entry: LibraryEntry) -> tuple[str | None, str | None, str | None]:
-    """Return HTML content and source metadata for a library entry."""
-
-    local_candidates: list[Path] = []
+def _local_candidates(entry: LibraryEntry) -> list[Path]:
+    candidates: list[Path] = []
     if entry.local_path:
-        local_candidates.append(Path(entry.local_path))
+        candidates.append(Path(entry.local_path))
     if entry.html_filename:
-        local_candidates.append(HTML_EXPORT_PATH / entry.html_filename)
+        candidates.append(HTML_EXPORT_PATH / entry.html_filename)
+    return candidates
+
+
+def _existing_local_path(entry: LibraryEntry) -> str | None:
+    for candidate in _local_candidates(entry):
+        if candidate.exists():
+            return str(candidate)
+    return None
+
+
+def _entry_from_search_document(document: SearchDocument) -> LibraryEntry:
+    created_at = None
+    if document.created_at:
+        try:
+            created_at = datetime.fromisoformat(document.created_at)
+        except ValueError:
+            created_at = None
+    return LibraryEntry(
+        token=f"record:{document.record_id}",
+        title=document.title,
+        author=document.author,
+        story_id=document.story_id,
+        created_at=created_at,
+        local_path=document.local_path,
+        gcs_object=document.gcs_object,
+        gcs_url=document.gcs_url,
+        html_filename=document.html_filename,
+        origin="record",
+        manifest_path=document.manifest_path,
+        manifest_object=document.manifest_object,
+        thumbnail_url=document.thumbnail_url,
+        thumbnail_path=document.thumbnail_path,
+    )
+
+
+def search_library_entries(
+    query: str,
+    *,
+    auth_user: Mapping[str, Any] | None,
+    only_mine: bool,
+    limit: int = 50,
+) -> list[LibraryEntry]:
+    """Ranked library entries for ``query`` from the local search index (no Firestore reads)."""
+
+    user_id = str((auth_user or {}).get("uid") or "").strip() if only_mine else None
+    hits = search_stories(query, user_id=user_id or None, limit=limit)
+    return [_entry_from_search_document(hit.document) for hit in hits]
+
+
+def _resolve_entry_html(entry: LibraryEntry) -> tuple[str | None, str | None, str | None]:
+    """Return HTML content and source metadata for a library entry."""
 
     last_error: str | None = None
     last_path: str | None = None
-    for candidate in local_candidates:
+    for candidate in _local_candidates(entry):
         last_path = str(candidate)
         try:
             if candidate.exists():
@@ -131,7 +207,7 @@ def _resolve_entry_html(entry: LibraryEntry) -> tuple[str | None, str | None, st
             last_error = str(exc)
 
     if entry.gcs_object:
-        html_content = download_gcs_export(entry.gcs_object)
+        html_content = load_export_html(entry.gcs_object)
         if html_content is None:
             return None, "원격 저장소에서 파일을 불러오지 못했어요.", None
         return html_content, None, None
@@ -141,6 +217,144 @@ def _resolve_entry_html(entry: LibraryEntry) -> tuple[str | None, str | None, st
     return None, "동화 파일을 찾을 수 없습니다.", None
 
 
+def _load_entry_document(
+    entry: LibraryEntry,
+) -> tuple[StoryDocument | None, str | None, str | None, str | None]:
+    """Return the parsed document, raw HTML (only when it had to be read), error and local path.
+
+    Entries with a manifest are built from it without touching the HTML.
+    Documents are cached per process, so paging through a story or rerunning
+    the page does not read or download anything again. The raw HTML is
+    returned only for exports the reader cannot parse.
+    """
+
+    loaded: dict[str, str | None] = {}
+
+    def _load_html() -> str | None:
+        html_content, html_error, local_path_used = _resolve_entry_html(entry)
+        loaded.update(html=html_content, error=html_error, path=local_path_used)
+        return html_content
+
+    def _load_manifest():
+        return load_story_manifest(local_path=entry.manifest_path, gcs_object=entry.manifest_object)
+
+    cache_key = (entry.token, entry.gcs_object, entry.local_path, entry.manifest_object)
+    has_manifest = bool(entry.manifest_path or entry.manifest_object)
+    document = get_story_document_cache().get_or_parse(
+        cache_key,
+        _load_html,
+        _load_manifest if has_manifest else None,
+    )
+    if document is not None:
+        return document, None, None, loaded["path"] if loaded else _existing_local_path(entry)
+    if not loaded:
+        _load_html()
+    return None, loaded["html"], loaded["error"], loaded["path"]
+
+
+def _reader_image(asset: ImageAsset | None, ref: ManifestImage | None) -> ImageAsset | None:
+    if asset is not None or ref is None:
+        return asset
+    return load_story_asset(ref)
+
+
+def _render_reader(st: Any, session: StorySessionProxy, document: StoryDocument) -> None:
+    """Show the cover page or a single stage; only that page's image is sent to the browser."""
+
+    page_count = len(document.stages) + 1
+    page = min(max(int(session.get("library_reader_page") or 0), 0), page_count - 1)
+
+    if page == 0:
+        st.markdown(f"### {document.title}")
+        if document.author:
+            st.caption(f"작성자: {document.author}")
+        cover = _reader_image(document.cover, document.cover_ref)
+        if cover:
+            st.image(cover.data, width='stretch')
+        if document.audio_url:
+            st.audio(document.audio_url)
+    else:
+        stage = document.stages[page - 1]
+        image = _reader_image(stage.image, stage.image_ref)
+        if image:
+            st.image(image.data, width='stretch')
+        for paragraph in stage.paragraphs:
+            st.write(paragraph)
+
+    prev_col, page_col, next_col = st.columns([1, 2, 1])
+    with prev_col:
+        if st.button("← 이전", key="library_reader_prev", disabled=page == 0, width='stretch'):
+            session["library_reader_page"] = page - 1
+            st.rerun()
+    with page_col:
+        st.caption("표지" if page == 0 else f"{page} / {page_count - 1}")
+    with next_col:
+        if st.button("다음 →", key="library_reader_next", disabled=page >= page_count - 1, width='stretch'):
+            session["library_reader_page"] = page + 1
+            st.rerun()
+
+
+def _entry_thumbnail(entry: LibraryEntry) -> str | None:
+    """Thumbnail URL (fetched by the browser) or local file for an entry, if it has one."""
+
+    if entry.thumbnail_url:
+        return entry.thumbnail_url
+    if entry.thumbnail_path and Path(entry.thumbnail_path).exists():
+        return entry.thumbnail_path
+    return None
+
+
+def _render_cover_grid(
+    st: Any,
+    session: StorySessionProxy,
+    entries: list[LibraryEntry],
+    selected_index: int,
+    *,
+    include_author: bool,
+) -> int:
+    """Show one page of cover thumbnails and return the index of the selected entry."""
+
+    page_count = max(1, -(-len(entries) // LIBRARY_GRID_PAGE_SIZE))
+    page = min(max(int(session.get("library_grid_page") or 0), 0), page_count - 1)
+    start = page * LIBRARY_GRID_PAGE_SIZE
+    page_entries = entries[start : start + LIBRARY_GRID_PAGE_SIZE]
+
+    for row_start in range(0, len(page_entries), _GRID_COLUMNS):
+        columns = st.columns(_GRID_COLUMNS)
+        for column, offset in zip(columns, range(row_start, min(row_start + _GRID_COLUMNS, len(page_entries)))):
+            index = start + offset
+            entry = entries[index]
+            with column:
+                thumbnail = _entry_thumbnail(entry)
+                if thumbnail:
+                    st.image(thumbnail, width='stretch')
+                else:
+                    st.caption("표지 이미지가 없어요.")
+                st.caption(_format_entry_caption(entry, include_author=include_author))
+                if st.button(
+                    "읽기",
+                    key=f"library_grid_open_{index}",
+                    type="primary" if index == selected_index else "secondary",
+                    width='stretch',
+                ):
+                    session["selected_export"] = entry.token
+                    st.rerun()
+
+    if page_count > 1:
+        prev_col, page_col, next_col = st.columns([1, 2, 1])
+        with prev_col:
+            if st.button("← 이전 목록", key="library_grid_prev", disabled=page == 0, width='stretch'):
+                session["library_grid_page"] = page - 1
+                st.rerun()
+        with page_col:
+            st.caption(f"{page + 1} / {page_count} 페이지")
+        with next_col:
+            if st.button("다음 목록 →", key="library_grid_next", disabled=page >= page_count - 1, width='stretch'):
+                session["library_grid_page"] = page + 1
+                st.rerun()
+    return selected_index
+
+
 def _format_entry_caption(entry: LibraryEntry, *, include_author: bool) -> str:
     created_display = format_kst(entry.created_at) if entry.created_at else "시간 정보 없음"
     if include_author and entry.author:
@@ -175,17 +389,33 @@ def render_library_view(
     if not auth_user:
         st.caption("로그인하면 내가 만든 동화만 모아볼 수 있어요.")
 
-    entries, load_error = load_library_entries(
-        auth_user=auth_user,
-        only_mine=only_mine,
-        include_legacy=not only_mine,
-    )
+    search_query = st.text_input(
+        "동화 검색",
+        key="library_search_query",
+        placeholder="제목, 주인공, 문장으로 찾아보세요",
+    ).strip()
+    load_error = None
+    if search_query:
+        started = time.perf_counter()
+        entries = search_library_entries(search_query, auth_user=auth_user, only_mine=only_mine)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        st.caption(f"검색 결과 {len(entries)}건 · {elapsed_ms:.1f}ms")
+        if not search_index_ready():
+            st.caption("검색 색인을 만드는 중이라 일부 동화만 검색될 수 있어요.")
+    else:
+        entries, load_error = load_library_entries(
+            auth_user=auth_user,
+            only_mine=only_mine,
+            include_legacy=not only_mine,
+        )
 
     if load_error:
         st.error(f"동화 기록을 불러오지 못했어요: {load_error}")
 
     if not entries:
-        if only_mine:
+        if search_query:
+            st.info("검색 결과가 없어요. 다른 낱말로 찾아보세요.")
+        elif only_mine:
             st.info("아직 내가 만든 동화가 없어요. 새 동화를 만들어보세요.")
         else:
             st.info("저장된 동화가 없습니다. 먼저 동화를 생성해주세요.")
@@ -200,13 +430,23 @@ def render_library_view(
         include_author = not only_mine
         return _format_entry_caption(entry, include_author=include_author)
 
-    selected_index = st.selectbox(
-        "읽고 싶은 동화를 선택하세요",
-        list(range(len(entries))),
-        index=default_index,
-        format_func=_format_entry,
-        key="story_entry_select",
-    )
+    layout = st.radio("보기 방식", ["표지 보기", "목록 보기"], horizontal=True, key="library_layout")
+    if layout == "표지 보기":
+        selected_index = _render_cover_grid(
+            st,
+            session,
+            entries,
+            default_index,
+            include_author=not only_mine,
+        )
+    else:
+        selected_index = st.selectbox(
+            "읽고 싶은 동화를 선택하세요",
+            list(range(len(entries))),
+            index=default_index,
+            format_func=_format_entry,
+            key="story_entry_select",
+        )
 
     selected_entry = entries[selected_index]
     session["selected_export"] = selected_entry.token
@@ -214,15 +454,19 @@ def render_library_view(
     session["story_export_remote_blob"] = selected_entry.gcs_object
     session["story_export_remote_url"] = selected_entry.gcs_url
 
-    html_content, html_error, local_path_used = _resolve_entry_html(selected_entry)
+    token = selected_entry.token
+    if session.get("library_reader_token") != token:
+        session["library_reader_token"] = token
+        session["library_reader_page"] = 0
+
+    document, html_content, html_error, local_path_used = _load_entry_document(selected_entry)
     session["story_export_path"] = local_path_used
 
-    token = selected_entry.token
     story_origin = selected_entry.origin
     story_title_display = selected_entry.title
     story_id_value = selected_entry.story_id
 
-    if html_content is None:
+    if document is None and html_content is None:
         if html_error:
             st.error(f"동화를 여는 데 실패했습니다: {html_error}")
         else:
@@ -247,9 +491,10 @@ def render_library_view(
             )
             session["story_view_logged_token"] = log_key
     else:
+        # The full document is read only when the user actually downloads it.
         st.download_button(
             "동화 다운로드",
-            data=html_content,
+            data=lambda: _resolve_entry_html(selected_entry)[0] or "",
             file_name=selected_entry.html_filename or "story.html",
             mime="text/html",
             width='stretch',
@@ -258,7 +503,10 @@ def render_library_view(
             st.caption(f"파일 URL: {selected_entry.gcs_url}")
         elif selected_entry.local_path:
             st.caption(f"파일 경로: {selected_entry.local_path}")
-        components.html(html_content, height=700, scrolling=True)
+        if document is not None:
+            _render_reader(st, session, document)
+        else:
+            components.html(html_content, height=700, scrolling=True)
         log_key = f"success:{token}"
         if session.get("story_view_logged_token") != log_key:
             emit_log_event(
@@ -284,6 +532,9 @@ def render_library_view(
             session["story_export_path"] = None
             session["view_story_id"] = None
             session["story_view_logged_token"] = None
+            session["library_reader_token"] = None
+            session["library_reader_page"] = 0
+            session["library_grid_page"] = 0
             session["story_export_remote_blob"] = None
             session["story_export_remote_url"] = None
             st.rerun()
@@ -300,4 +551,5 @@ __all__ = [
     "LibraryEntry",
     "load_library_entries",
     "render_library_view",
+    "search_library_entries",
 ]
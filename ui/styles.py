@@ -7,7 +7,10 @@ import streamlit as st
 
 
 def render_app_styles(home_bg: Optional[str], *, show_home_hero: bool = False) -> None:
-    """Apply global background styling and optionally render the home hero image."""
+    """Apply global background styling and optionally render the home hero image.
+
+    ``home_bg`` is an image URL: the fingerprinted static asset, or a data URI fallback.
+    """
     base_css = """
     <style>
     .stApp {
@@ -47,6 +50,6 @@ def render_app_styles(home_bg: Optional[str], *, show_home_hero: bool = False) -
 
     if show_home_hero and home_bg:
         st.markdown(
-            f"<div class='home-hero' style='background-image: url(\"data:image/png;base64,{home_bg}\");'></div>",
+            f"<div class='home-hero' style='background-image: url(\"{home_bg}\");'></div>",
             unsafe_allow_html=True,
         )
@@ -0,0 +1,129 @@
+"""Deferred imports for heavy optional SDKs.
+
+The Google Cloud, Firebase and imaging SDKs each take hundreds of milliseconds
+to import. Modules bind them through :func:`lazy_module` so the import happens
+on first attribute access instead of when the Streamlit entry point loads.
+"""
+from __future__ import annotations
+
+import importlib
+import importlib.util
+import threading
+from typing import Any
+
+_MISSING = object()
+
+
+class LazyModule:
+    """Proxy that imports ``name`` (a module, or a ``module.attr`` object) on first use.
+
+    Truthiness reports whether the module can be imported, so the existing
+    ``if firestore is None`` guards become ``if not firestore`` and still
+    accept ``None`` patched in by tests. Attribute assignment is forwarded to
+    the real module so ``monkeypatch.setattr(module.requests, ...)`` works.
+    """
+
+    __slots__ = ("_lazy_name", "_lazy_module", "_lazy_lock", "_lazy_available")
+
+    def __init__(self, name: str) -> None:
+        object.__setattr__(self, "_lazy_name", name)
+        object.__setattr__(self, "_lazy_module", _MISSING)
+        object.__setattr__(self, "_lazy_lock", threading.Lock())
+        object.__setattr__(self, "_lazy_available", None)
+
+    def _load(self) -> Any:
+        module = self._lazy_module
+        if module is _MISSING:
+            with self._lazy_lock:
+                module = self._lazy_module
+                if module is _MISSING:
+                    try:
+                        module = importlib.import_module(self._lazy_name)
+                    except Exception:  # broken installs degrade like missing ones
+                        module = _import_attribute(self._lazy_name)
+                    object.__setattr__(self, "_lazy_module", module)
+        if module is None:
+            raise ImportError(f"{self._lazy_name} is not installed")
+        return module
+
+    @property
+    def available(self) -> bool:
+        if self._lazy_module is not _MISSING:
+            return self._lazy_module is not None
+        if self._lazy_available is None:
+            # Locating the spec is a path scan, not an import; remember the answer.
+            parent = self._lazy_name.rpartition(".")[0]
+            found = _has_spec(self._lazy_name) or (bool(parent) and _has_spec(parent))
+            object.__setattr__(self, "_lazy_available", found)
+        return self._lazy_available
+
+    @property
+    def loaded(self) -> bool:
+        return self._lazy_module not in (_MISSING, None)
+
+    def __bool__(self) -> bool:
+        return self.available
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        # Lets a proxy stand in for a lazily imported class such as FieldFilter.
+        return self._load()(*args, **kwargs)
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        setattr(self._load(), attr, value)
+
+    def __delattr__(self, attr: str) -> None:
+        delattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "deferred"
+        return f"<LazyModule {self._lazy_name!r} ({state})>"
+
+
+def _has_spec(name: str) -> bool:
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def _import_attribute(name: str) -> Any | None:
+    """Resolve ``pkg.attr`` when ``attr`` is an attribute rather than a submodule."""
+
+    parent, _, attr = name.rpartition(".")
+    if not parent:
+        return None
+    try:
+        return getattr(importlib.import_module(parent), attr)
+    except Exception:
+        return None
+
+
+def lazy_module(name: str) -> LazyModule:
+    return LazyModule(name)
+
+
+def google_api_error() -> type[BaseException]:
+    """``GoogleAPIError`` for ``except`` clauses, or ``Exception`` without google-api-core."""
+
+    return lazy_attribute("google.api_core.exceptions", "GoogleAPIError", Exception)
+
+
+def lazy_attribute(module_name: str, attr: str, default: Any = None) -> Any:
+    """Return ``module_name.attr``, importing on demand; ``default`` when unavailable.
+
+    Meant for call sites evaluated only when needed, such as
+    ``except lazy_attribute("google.api_core.exceptions", "GoogleAPIError", Exception)``,
+    which Python evaluates only once an exception is being handled.
+    """
+
+    try:
+        module = importlib.import_module(module_name)
+    except Exception:
+        return default
+    return getattr(module, attr, default)
+
+
+__all__ = ["LazyModule", "google_api_error", "lazy_attribute", "lazy_module"]